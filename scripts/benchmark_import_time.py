@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# Copyright 2021 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Measures the time needed to import the unified_planning package, parsing the output of
+`python -X importtime` in fresh interpreters, and the time needed to create an
+Environment (and so its Factory) once the package is imported.
+
+For every module the best time over the repetitions is kept; the script prints the total
+times and the modules with the highest cumulative import time.
+
+The results can be written as JSON and compared with a previous run, in which case the
+script exits with status 1 when the total import time or the environment creation time
+are slower than the given tolerance.
+
+Usage: python3 scripts/benchmark_import_time.py [--module unified_planning.shortcuts]
+    [--repetitions 5] [--top 15] [--output results.json]
+    [--baseline old_results.json] [--tolerance 1.3]
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import subprocess
+import sys
+from typing import Dict
+
+ROOT_PATH = str(pathlib.Path(__file__).parent.parent.resolve())
+
+# The modules needed by the Environment are imported before starting the timer,
+# so only the creation of the Environment (and so of its Factory) is measured
+ENVIRONMENT_CODE = """
+import time
+import unified_planning.environment
+import unified_planning.engines
+import unified_planning.model.walkers
+start = time.perf_counter()
+unified_planning.environment.Environment()
+print(time.perf_counter() - start)
+"""
+
+
+def run_python(args) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([ROOT_PATH] + sys.path[1:])
+    # The interpreter is started outside of the repository, so no up.ini file is found
+    return subprocess.run(
+        [sys.executable] + args,
+        env=env,
+        cwd=os.path.expanduser("~"),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """Returns the cumulative import time, in microseconds, of every imported module."""
+    res = {}
+    output = run_python(["-X", "importtime", "-c", f"import {module}"]).stderr
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        res[name.strip()] = int(cumulative)
+    return res
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="unified_planning.shortcuts")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=1.3)
+    args = parser.parse_args()
+
+    times: Dict[str, int] = {}
+    environment_time = None
+    for _ in range(args.repetitions):
+        for name, t in import_times(args.module).items():
+            times[name] = min(t, times.get(name, t))
+        t = float(run_python(["-c", ENVIRONMENT_CODE]).stdout)
+        environment_time = t if environment_time is None else min(t, environment_time)
+    assert environment_time is not None
+    results = {
+        "module": args.module,
+        "import_time": times[args.module] / 1e6,
+        "environment_time": environment_time,
+        "modules": {
+            name: t / 1e6 for name, t in sorted(times.items(), key=lambda x: -x[1])
+        },
+    }
+
+    print(f"import {args.module}: {results['import_time']:.4f}s")
+    print(f"Environment(): {environment_time:.4f}s")
+    print(f"{'module':<60}{'cumulative':>12}")
+    for name, t in sorted(times.items(), key=lambda x: -x[1])[: args.top]:
+        print(f"{name:<60}{t / 1e6:>11.4f}s")
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        ok = True
+        for key in ["import_time", "environment_time"]:
+            if results[key] > args.tolerance * baseline[key]:
+                print(f"REGRESSION {key}: {baseline[key]:.4f}s -> {results[key]:.4f}s")
+                ok = False
+        if not ok:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# Copyright 2021 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Compares the fast problem parser of the PDDLReader with the pyparsing grammar on the
+PDDL files in unified_planning/test/pddl and on a generated depot problem with big
+:objects and :init sections.
+
+Usage: python3 scripts/benchmark_pddl_reader.py [--crates N] [--repetitions R]
+"""
+
+import argparse
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.resolve()))
+
+from unified_planning.io import PDDLReader
+from unified_planning.io.pddl_reader import (
+    PDDLGrammar,
+    _read_problem,
+    _UnsupportedSyntax,
+)
+
+PDDL_DOMAINS_PATH = os.path.join(
+    pathlib.Path(__file__).parent.parent.resolve(), "unified_planning", "test", "pddl"
+)
+
+
+def write_depot_problem(filename: str, crates: int):
+    with open(filename, "w") as f:
+        f.write("(define (problem big-depot) (:domain Depot)\n(:objects depot0 hoist0")
+        for i in range(crates):
+            f.write(f" crate{i}")
+        f.write(")\n(:init (depot depot0) (place depot0) (hoist hoist0)\n")
+        f.write("  (at hoist0 depot0) (available hoist0)\n")
+        for i in range(crates):
+            f.write(f"  (crate crate{i}) (surface crate{i}) (at crate{i} depot0)\n")
+            if i > 0:
+                f.write(f"  (on crate{i} crate{i - 1})\n")
+        f.write(f"  (clear crate{crates - 1})\n)\n")
+        f.write("(:goal (and (clear crate0)))\n)\n")
+
+
+def best_time(function, repetitions: int) -> float:
+    res = None
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        res = elapsed if res is None else min(res, elapsed)
+    assert res is not None
+    return res
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--crates", type=int, default=2000)
+    parser.add_argument("--repetitions", type=int, default=3)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    instances = []
+    for domain in sorted(os.listdir(PDDL_DOMAINS_PATH)):
+        folder = os.path.join(PDDL_DOMAINS_PATH, domain)
+        if os.path.isfile(os.path.join(folder, "problem.pddl")):
+            instances.append(
+                (
+                    domain,
+                    os.path.join(folder, "domain.pddl"),
+                    os.path.join(folder, "problem.pddl"),
+                )
+            )
+    tmp_dir = tempfile.TemporaryDirectory()
+    big_problem = os.path.join(tmp_dir.name, "problem.pddl")
+    write_depot_problem(big_problem, args.crates)
+    instances.append(
+        (
+            f"depot-{args.crates}-crates",
+            os.path.join(PDDL_DOMAINS_PATH, "depot", "domain.pddl"),
+            big_problem,
+        )
+    )
+
+    grammar = PDDLGrammar()
+    print(f"{'instance':<24}{'pyparsing':>12}{'fast':>12}{'speedup':>10}{'reader':>12}")
+    for name, domain_filename, problem_filename in instances:
+        try:
+            _read_problem(problem_filename)
+        except _UnsupportedSyntax:
+            print(f"{name:<24}{'not supported by the fast parser':>46}")
+            continue
+        pyparsing_time = best_time(
+            lambda: grammar.problem.parseFile(problem_filename), args.repetitions
+        )
+        fast_time = best_time(lambda: _read_problem(problem_filename), args.repetitions)
+        reader_time = best_time(
+            lambda: PDDLReader().parse_problem(domain_filename, problem_filename),
+            args.repetitions,
+        )
+        print(
+            f"{name:<24}{pyparsing_time:>11.4f}s{fast_time:>11.4f}s"
+            f"{pyparsing_time / fast_time:>9.1f}x{reader_time:>11.4f}s"
+        )
+    tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
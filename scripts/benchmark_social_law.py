@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# Copyright 2022 Technion
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Measures how the social law functionalities scale on the intersection and grid problems
+generated by unified_planning.social_law.robustness_verification, sweeping the number of
+agents, the size of the grid and the number of waitfor annotations.
+
+For each instance the script times (and measures the peak memory of) the compilation of a
+social law, of each robustness verifier, of the single agent projections and of the
+centralizer, a robustness check and the synthesis of a robust social law.
+By default the planner is a deterministic breadth first search defined in this script,
+so no external planner is needed.
+
+The results can be written as JSON and compared with a previous run, in which case the
+script exits with status 1 when a stage is slower than the given tolerance, or when
+its result changed.
+
+The synthesis is only run on the benchmarks given with --synthesis-on, because the
+search on the grid problems with more than one agent takes minutes.
+
+Usage: python3 scripts/benchmark_social_law.py [--cars 2 3] [--grid 3 4] [--agents 1 2]
+    [--waitfors 0 1 2] [--planner NAME] [--no-memory]
+    [--synthesis-on intersection grid] [--counterexample-guided]
+    [--output results.json] [--baseline old_results.json] [--tolerance 1.5]
+"""
+
+import argparse
+import json
+import pathlib
+import sys
+import time
+import tracemalloc
+import warnings
+from collections import deque
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.resolve()))
+
+import unified_planning as up
+from unified_planning.engines import (
+    CompilationKind,
+    Engine,
+    PlanGenerationResult,
+    PlanGenerationResultStatus,
+)
+from unified_planning.engines.compilers import ReachabilityGrounder
+from unified_planning.engines.mixins import OneshotPlannerMixin
+from unified_planning.engines.sequential_simulator import SequentialSimulator
+from unified_planning.model.multi_agent.ma_centralizer import (
+    MultiAgentProblemCentralizer,
+)
+from unified_planning.plans import ActionInstance, SequentialPlan
+from unified_planning.social_law.robustness_checker import SocialLawRobustnessChecker
+from unified_planning.social_law.robustness_verification import (
+    DeleteDecompositionVerifier,
+    SimpleInstantaneousActionRobustnessVerifier,
+    WaitingActionRobustnessVerifier,
+    create_grid_problem,
+    get_intersection_problem,
+)
+from unified_planning.social_law.single_agent_projection import SingleAgentProjection
+from unified_planning.social_law.social_law import SocialLaw
+from unified_planning.social_law.synthesis import SocialLawGenerator
+
+STUB_PLANNER_NAME = "benchmark-bfs"
+
+VERIFIERS = [
+    SimpleInstantaneousActionRobustnessVerifier,
+    WaitingActionRobustnessVerifier,
+    DeleteDecompositionVerifier,
+]
+
+
+class BreadthFirstPlanner(Engine, OneshotPlannerMixin):
+    """
+    Deterministic breadth first search over the grounded problem, used instead of an
+    external planner; when more than max_states states are generated, it gives up with
+    a MEMOUT result.
+    """
+
+    def __init__(self, max_states: int = 100000):
+        Engine.__init__(self)
+        OneshotPlannerMixin.__init__(self)
+        self._max_states = max_states
+
+    @property
+    def name(self) -> str:
+        return STUB_PLANNER_NAME
+
+    @staticmethod
+    def supported_kind() -> "up.model.ProblemKind":
+        return SequentialSimulator.supported_kind()
+
+    @staticmethod
+    def supports(problem_kind: "up.model.ProblemKind") -> bool:
+        return problem_kind <= BreadthFirstPlanner.supported_kind()
+
+    def _solve(self, problem, callback=None, timeout=None, output_stream=None):
+        grounding = ReachabilityGrounder().compile(problem, CompilationKind.GROUNDING)
+        grounded_problem = grounding.problem
+        simulator = SequentialSimulator(grounded_problem)
+        events = [
+            (action, event)
+            for action in grounded_problem.actions
+            for event in simulator.get_events(action, ())
+        ]
+        initial_state = simulator.get_initial_state()
+        parents = {initial_state: None}
+        frontier = deque([initial_state])
+        while len(frontier) > 0:
+            state = frontier.popleft()
+            if simulator.is_goal(state):
+                actions = []
+                while parents[state] is not None:
+                    state, action = parents[state]
+                    actions.append(ActionInstance(action))
+                plan = SequentialPlan(actions[::-1]).replace_action_instances(
+                    grounding.map_back_action_instance
+                )
+                return PlanGenerationResult(
+                    PlanGenerationResultStatus.SOLVED_SATISFICING, plan, self.name
+                )
+            for action, event in events:
+                if simulator.is_applicable(event, state):
+                    successor = simulator.apply_unsafe(event, state)
+                    if successor not in parents:
+                        if len(parents) >= self._max_states:
+                            return PlanGenerationResult(
+                                PlanGenerationResultStatus.MEMOUT, None, self.name
+                            )
+                        parents[successor] = (state, action)
+                        frontier.append(successor)
+        return PlanGenerationResult(
+            PlanGenerationResultStatus.UNSOLVABLE_PROVEN, None, self.name
+        )
+
+
+def instances(args):
+    for cars in args.cars:
+        names = ["car-north", "car-south", "car-east", "car-west"][:cars]
+        for waitfors in args.waitfors:
+            if waitfors <= cars:
+                problem = get_intersection_problem(names, wait_drive=False)
+                yield "intersection", {"agents": cars, "waitfors": waitfors}, problem
+    for size in args.grid:
+        for agents in args.agents:
+            for waitfors in args.waitfors:
+                if agents <= size and waitfors <= agents:
+                    problem = create_grid_problem(size, size, agents)
+                    params = {"size": size, "agents": agents, "waitfors": waitfors}
+                    yield "grid", params, problem
+
+
+def waitfor_social_law(problem, waitfors: int) -> SocialLaw:
+    """Returns the social law which makes the first agents wait for the next location to be free."""
+    social_law = SocialLaw()
+    for agent in problem.agents[:waitfors]:
+        social_law.add_waitfor_annotation(agent.name, "drive", "free", ("l2",))
+    return social_law
+
+
+def measure(function, memory: bool):
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    peak = None
+    if memory:
+        # The peak memory is measured in a second run, so tracemalloc does not slow down the timed one
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def stages(problem, waitfors: int, planner_name: str, synthesis: bool, guided: bool):
+    social_law = waitfor_social_law(problem, waitfors)
+    compiled = social_law.compile(problem).problem
+    yield "social_law_compile", lambda: social_law.compile(problem), lambda r: len(
+        r.problem.waitfor.waitfor_map
+    )
+    for verifier in VERIFIERS:
+        yield f"verifier:{verifier.__name__}", lambda v=verifier: v().compile(
+            compiled
+        ), lambda r: len(r.problem.actions)
+    yield "single_agent_projection", lambda: [
+        SingleAgentProjection(agent).compile(compiled) for agent in compiled.agents
+    ], lambda r: sum(len(p.problem.actions) for p in r)
+    yield "centralizer", lambda: MultiAgentProblemCentralizer().compile(
+        compiled
+    ), lambda r: len(r.problem.actions)
+    yield "is_robust", lambda: SocialLawRobustnessChecker(
+        planner_name=planner_name
+    ).is_robust(compiled), lambda r: r.status.name
+    if synthesis:
+
+        def generate():
+            generator = SocialLawGenerator(
+                planner_name=planner_name, counterexample_guided=guided
+            )
+            return generator.generate_social_law(compiled), generator
+
+        yield "generate_social_law", generate, lambda r: {
+            "found": r[0] is not None,
+            "expanded": r[1].expanded,
+            "generated": r[1].generated,
+        }
+
+
+def compare(records, baseline_filename: str, tolerance: float) -> bool:
+    with open(baseline_filename) as f:
+        baseline = {
+            (r["benchmark"], json.dumps(r["params"], sort_keys=True), r["stage"]): r
+            for r in json.load(f)
+        }
+    ok = True
+    for r in records:
+        key = (r["benchmark"], json.dumps(r["params"], sort_keys=True), r["stage"])
+        old = baseline.get(key, None)
+        if old is None:
+            continue
+        # Very short stages are too noisy to be compared
+        if r["time"] > tolerance * old["time"] and r["time"] - old["time"] > 0.01:
+            print(f"REGRESSION {key}: {old['time']:.4f}s -> {r['time']:.4f}s")
+            ok = False
+        if r["result"] != old["result"]:
+            print(f"CHANGED {key}: {old['result']} -> {r['result']}")
+            ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cars", type=int, nargs="*", default=[2, 3])
+    parser.add_argument("--grid", type=int, nargs="*", default=[3, 4])
+    parser.add_argument("--agents", type=int, nargs="*", default=[1, 2])
+    parser.add_argument("--waitfors", type=int, nargs="*", default=[0, 1, 2])
+    parser.add_argument("--planner", default=STUB_PLANNER_NAME)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--synthesis-on", nargs="*", default=["intersection"])
+    parser.add_argument("--counterexample-guided", action="store_true")
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+    env = up.environment.get_env()
+    env.credits_stream = None
+    if args.planner == STUB_PLANNER_NAME:
+        env.factory.add_engine(STUB_PLANNER_NAME, __name__, "BreadthFirstPlanner")
+
+    records = []
+    print(f"{'benchmark':<14}{'params':<44}{'stage':<58}{'time':>10}{'peak KiB':>10}")
+    for benchmark, params, problem in instances(args):
+        for stage, function, summary in stages(
+            problem,
+            params["waitfors"],
+            args.planner,
+            benchmark in args.synthesis_on,
+            args.counterexample_guided,
+        ):
+            result, elapsed, peak = measure(function, not args.no_memory)
+            records.append(
+                {
+                    "benchmark": benchmark,
+                    "params": params,
+                    "stage": stage,
+                    "time": elapsed,
+                    "peak_memory": peak,
+                    "result": summary(result),
+                }
+            )
+            peak_str = "-" if peak is None else str(peak // 1024)
+            print(
+                f"{benchmark:<14}{json.dumps(params):<44}{stage:<58}"
+                f"{elapsed:>9.4f}s{peak_str:>10}"
+            )
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(records, f, indent=1)
+    if args.baseline is not None and not compare(
+        records, args.baseline, args.tolerance
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
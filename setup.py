@@ -1,7 +1,73 @@
 #!/usr/bin/env python3
 
+import os
+import re
+import subprocess
 from setuptools import setup, find_packages  # type: ignore
-import unified_planning
+from setuptools.command.build_py import build_py  # type: ignore
+
+
+def get_version():
+    """Returns the version tuple and string, without importing the unified_planning package."""
+    init_filename = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "unified_planning", "__init__.py"
+    )
+    with open(init_filename) as f:
+        match = re.search(r"^VERSION: .* = \((\d+), (\d+), (\d+)\)", f.read(), re.M)
+    assert match is not None
+    version = tuple(int(x) for x in match.groups())
+    str_version = ".".join(str(x) for x in version)
+
+    # Try to provide human-readable version of latest commit for dev versions
+    # E.g. v0.5.1-4-g49a49f2-wip
+    #      * 4 commits after tag v0.5.1
+    #      * Latest commit "49a49f2"
+    #      * -wip: Working tree is dirty (non committed stuff)
+    # See: https://git-scm.com/docs/git-describe
+    try:
+        git_version = subprocess.check_output(
+            ["git", "describe", "--tags", "--dirty=-wip"], stderr=subprocess.STDOUT
+        )
+        output = git_version.strip().decode("ascii")
+        data = output.split("-")
+        tag = data[0]
+        match = re.match(r"^v(\d+)\.(\d)+\.(\d)$", tag)
+        if match is not None:
+            MAJOR, MINOR, REL = tuple(int(x) for x in match.groups())
+
+        try:
+            COMMITS = int(data[1])
+        except ValueError:
+            COMMITS = 0
+
+        if data[-1] == "wip":
+            if COMMITS == 0:
+                version = (MAJOR, MINOR, REL, "post", 1)
+                str_version = f"{MAJOR}.{MINOR}.{REL}.post1"
+            else:
+                version = (MAJOR, MINOR, REL, COMMITS, "post", 1)
+                str_version = f"{MAJOR}.{MINOR}.{REL}.{COMMITS}.post1"
+        else:
+            version = (MAJOR, MINOR, REL, COMMITS, "dev", 1)
+            str_version = f"{MAJOR}.{MINOR}.{REL}.{COMMITS}.dev1"
+    except Exception as ex:
+        pass
+    return version, str_version
+
+
+VERSION, __version__ = get_version()
+
+
+class BuildPyWithVersion(build_py):
+    """Stores the version computed at build time in unified_planning/_version.py."""
+
+    def run(self):
+        build_py.run(self)
+        if not self.dry_run:
+            filename = os.path.join(self.build_lib, "unified_planning", "_version.py")
+            with open(filename, "w") as f:
+                f.write(f"VERSION = {VERSION!r}\n")
+                f.write(f"__version__ = {__version__!r}\n")
 
 
 long_description = """============================================================
@@ -12,7 +78,8 @@ long_description = """==========================================================
 
 setup(
     name="unified_planning",
-    version=unified_planning.__version__,
+    version=__version__,
+    cmdclass={"build_py": BuildPyWithVersion},
     description="Unified Planning Framework",
     author="AIPlan4EU Project",
     author_email="aiplan4eu@fbk.eu",
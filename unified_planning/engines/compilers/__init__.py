@@ -20,6 +20,9 @@ from unified_planning.engines.compilers.disjunctive_conditions_remover import (
     DisjunctiveConditionsRemover,
 )
 from unified_planning.engines.compilers.grounder import Grounder, GrounderHelper
+from unified_planning.engines.compilers.reachability_grounder import (
+    ReachabilityGrounder,
+)
 from unified_planning.engines.compilers.quantifiers_remover import QuantifiersRemover
 from unified_planning.engines.compilers.negative_conditions_remover import (
     NegativeConditionsRemover,
@@ -19,7 +19,10 @@ import unified_planning.engines as engines
 from unified_planning.engines.mixins.compiler import CompilationKind, CompilerMixin
 from unified_planning.engines.compilers.utils import get_fresh_name, replace_action
 from unified_planning.engines.results import CompilerResult
-from unified_planning.exceptions import UPProblemDefinitionError
+from unified_planning.exceptions import (
+    UPNormalFormSizeError,
+    UPProblemDefinitionError,
+)
 from unified_planning.model import (
     FNode,
     Problem,
@@ -30,9 +33,10 @@ from unified_planning.model import (
     Action,
     ProblemKind,
 )
-from unified_planning.model.walkers import Dnf
+from unified_planning.model.walkers import Dnf, Nnf
 from typing import List, Optional, Tuple, Dict, cast
 from itertools import product
+from collections import OrderedDict
 from functools import partial
 
 
@@ -46,12 +50,17 @@ class DisjunctiveConditionsRemover(engines.engine.Engine, CompilerMixin):
     Then, the resulting `OR` is decomposed into multiple `subActions`; every `subAction` has the same :func:`Effects <unified_planning.model.InstantaneousAction.effects>`
     of the original `Action`, and as condition an element of the decomposed `Or`. So, for every element of the `Or`, an `Action` is created.
 
+    The `DNF` can be exponentially larger than the original condition; when the `DNF` of the preconditions of an
+    `InstantaneousAction` (in a problem without `DurativeActions`) or of the goals has more than `max_clauses` clauses,
+    the disjunctions are encoded with auxiliary fluents instead, set by auxiliary actions when the disjunction holds.
+
     For this `Compiler`, only the `DISJUNCTIVE_CONDITIONS_REMOVING` :class:`~unified_planning.engines.CompilationKind` is supported.
     """
 
-    def __init__(self):
+    def __init__(self, max_clauses: Optional[int] = 1000):
         engines.engine.Engine.__init__(self)
         CompilerMixin.__init__(self, CompilationKind.DISJUNCTIVE_CONDITIONS_REMOVING)
+        self._max_clauses = max_clauses
 
     @property
     def name(self):
@@ -130,11 +139,34 @@ class DisjunctiveConditionsRemover(engines.engine.Engine, CompilerMixin):
         new_problem.clear_timed_goals()
 
         dnf = Dnf(env)
+        bounded_dnf = Dnf(env, self._max_clauses)
+        # The auxiliary fluents encoding of the preconditions needs the actions to be
+        # executed one at a time, so it is not used when there are DurativeActions
+        has_durative_actions = any(
+            isinstance(a, DurativeAction) for a in problem.actions
+        )
+        # The fluent that is True while an action with encoded preconditions is executed
+        busy: Optional["up.model.Fluent"] = None
+        encoded_actions: List[InstantaneousAction] = []
         for a in problem.actions:
             if isinstance(a, InstantaneousAction):
-                new_precond = dnf.get_dnf_expression(
-                    env.expression_manager.And(a.preconditions)
-                )
+                try:
+                    new_precond = (
+                        dnf if has_durative_actions else bounded_dnf
+                    ).get_dnf_expression(env.expression_manager.And(a.preconditions))
+                except UPNormalFormSizeError:
+                    if busy is None:
+                        busy = up.model.Fluent(
+                            get_fresh_name(new_problem, f"{self.name}_busy"), env=env
+                        )
+                        new_problem.add_fluent(busy, default_initial_value=False)
+                    na = self._encode_preconditions_with_auxiliary_fluents(
+                        new_problem, a, busy, bounded_dnf, dnf, new_to_old
+                    )
+                    encoded_actions.append(na)
+                    new_to_old[na] = a
+                    new_problem.add_action(na)
+                    continue
                 if new_precond.is_or():
                     for and_exp in new_precond.args:
                         na = self._create_new_action_with_given_precond(
@@ -173,10 +205,12 @@ class DisjunctiveConditionsRemover(engines.engine.Engine, CompilerMixin):
 
         # Meaningful action is the list of the actions that modify fluents that are not added
         # just to remove the disjunction from goals
-        meaningful_actions: List["up.model.Action"] = new_problem.actions[:]
+        meaningful_actions: List["up.model.Action"] = [
+            a for a in new_problem.actions if new_to_old[a] is not None
+        ]
 
         self._remove_disjunctions_from_goals_adding_new_elements(
-            dnf,
+            bounded_dnf,
             new_problem,
             new_to_old,
             new_fluents,
@@ -185,7 +219,7 @@ class DisjunctiveConditionsRemover(engines.engine.Engine, CompilerMixin):
 
         for t, gl in problem.timed_goals.items():
             self._remove_disjunctions_from_goals_adding_new_elements(
-                dnf,
+                bounded_dnf,
                 new_problem,
                 new_to_old,
                 new_fluents,
@@ -204,6 +238,8 @@ class DisjunctiveConditionsRemover(engines.engine.Engine, CompilerMixin):
             # Since we modify the action that is a key in the Dict, we must update the mapping
             old_action = new_to_old.pop(a)
             if isinstance(a, InstantaneousAction):
+                if busy is not None and all(a is not ea for ea in encoded_actions):
+                    a.add_precondition(em.Not(em.FluentExp(busy)))
                 for e in new_effects:
                     a._add_effect_instance(e)
             elif isinstance(a, DurativeAction):
@@ -228,8 +264,34 @@ class DisjunctiveConditionsRemover(engines.engine.Engine, CompilerMixin):
         timing: Optional["up.model.timing.TimeInterval"] = None,
     ):
         env = new_problem.env
-        new_goal = dnf.get_dnf_expression(env.expression_manager.And(goals))
-        if new_goal.is_or():
+        try:
+            new_goal: Optional[FNode] = dnf.get_dnf_expression(
+                env.expression_manager.And(goals)
+            )
+        except UPNormalFormSizeError:
+            new_goal = None
+        if new_goal is None:
+            # The auxiliary fluents are reset by every meaningful action, like the
+            # fake goal fluent
+            new_name = self.name if timing is None else f"{self.name}_timed"
+            fake_goal = self._new_auxiliary_fluent(
+                new_problem, f"{new_name}_fake_goal", [], new_fluents
+            )
+            self._add_auxiliary_actions(
+                new_problem,
+                Nnf(env).get_nnf_expression(env.expression_manager.And(goals)),
+                fake_goal,
+                [],
+                [],
+                dnf,
+                new_to_old,
+                new_fluents,
+            )
+            if timing is None:
+                new_problem.add_goal(fake_goal)
+            else:
+                new_problem.add_timed_goal(timing, fake_goal)
+        elif new_goal.is_or():
             new_name = self.name if timing is None else f"{self.name}_timed"
             fake_fluent = up.model.Fluent(
                 get_fresh_name(new_problem, f"{new_name}_fake_goal")
@@ -320,3 +382,210 @@ class DisjunctiveConditionsRemover(engines.engine.Engine, CompilerMixin):
             else:
                 new_action._add_effect_instance(e)
         return new_action
+
+    def _encode_preconditions_with_auxiliary_fluents(
+        self,
+        new_problem: "up.model.Problem",
+        original_action: InstantaneousAction,
+        busy: "up.model.Fluent",
+        dnf: Dnf,
+        effects_dnf: Dnf,
+        new_to_old: Dict[Action, Optional[Action]],
+    ) -> InstantaneousAction:
+        """
+        Encodes the preconditions of the given action, whose `DNF` is too large, with
+        auxiliary fluents parametrized like the action.
+
+        A start action, applicable when the `busy` fluent is False, sets it and the
+        pending fluent of the action parameters; then the auxiliary actions set the
+        auxiliary fluents of the disjunctions of the preconditions that hold, and the
+        returned action, that requires all of them, has the effects of the original
+        action and resets the auxiliary fluents.
+        Every other action requires the `busy` fluent to be False, so the state does
+        not change between the start action and the returned action.
+        """
+        env = new_problem.env
+        em = env.expression_manager
+        parameters = original_action.parameters
+        aux_fluents: List["up.model.Fluent"] = []
+        pending = self._new_auxiliary_fluent(
+            new_problem,
+            f"{self.name}_{original_action.name}_pending",
+            parameters,
+            aux_fluents,
+        )
+        start = self._new_auxiliary_action(
+            new_problem,
+            f"{original_action.name}_start",
+            parameters,
+            [em.Not(em.FluentExp(busy))],
+            [em.FluentExp(busy), pending],
+        )
+        new_to_old[start] = None
+        precond = Nnf(env).get_nnf_expression(em.And(original_action.preconditions))
+        conditions = [pending]
+        if precond.is_and():
+            conditions.extend(
+                self._encode_conjunction(
+                    new_problem,
+                    precond,
+                    parameters,
+                    [pending],
+                    dnf,
+                    new_to_old,
+                    aux_fluents,
+                )
+            )
+        else:
+            target = self._new_auxiliary_fluent(
+                new_problem,
+                f"{self.name}_{original_action.name}_aux",
+                parameters,
+                aux_fluents,
+            )
+            self._add_auxiliary_actions(
+                new_problem,
+                precond,
+                target,
+                parameters,
+                [pending],
+                dnf,
+                new_to_old,
+                aux_fluents,
+            )
+            conditions.append(target)
+        new_action = self._create_new_action_with_given_precond(
+            new_problem, em.And(conditions), original_action, effects_dnf
+        )
+        new_action.add_effect(busy, False)
+        params_exp = tuple(em.ParameterExp(p) for p in parameters)
+        for f in aux_fluents:
+            new_action.add_effect(em.FluentExp(f, params_exp), False)
+        return new_action
+
+    def _add_auxiliary_actions(
+        self,
+        new_problem: "up.model.Problem",
+        condition: FNode,
+        target: FNode,
+        parameters: List["up.model.Parameter"],
+        guard: List[FNode],
+        dnf: Dnf,
+        new_to_old: Dict[Action, Optional[Action]],
+        aux_fluents: List["up.model.Fluent"],
+    ):
+        """
+        Adds to the problem the auxiliary actions that set the `target` fluent when the
+        given `condition`, in `NNF`, and the `guard` hold.
+
+        When the `DNF` of the condition is small enough an auxiliary action is added
+        for every clause; otherwise, the disjunctions of the condition are encoded
+        recursively with new auxiliary fluents.
+        """
+        try:
+            dnf_condition: Optional[FNode] = dnf.get_dnf_expression(condition)
+        except UPNormalFormSizeError:
+            dnf_condition = None
+        if dnf_condition is not None:
+            if dnf_condition.is_or():
+                clauses = dnf_condition.args
+            else:
+                clauses = [dnf_condition]
+            for clause in clauses:
+                if not clause.is_false():
+                    na = self._new_auxiliary_action(
+                        new_problem, "aux", parameters, guard + [clause], [target]
+                    )
+                    new_to_old[na] = None
+        elif condition.is_or():
+            for arg in condition.args:
+                self._add_auxiliary_actions(
+                    new_problem,
+                    arg,
+                    target,
+                    parameters,
+                    guard,
+                    dnf,
+                    new_to_old,
+                    aux_fluents,
+                )
+        else:
+            # In NNF, only the conjunctions and the disjunctions have more than one clause
+            assert condition.is_and()
+            conditions = self._encode_conjunction(
+                new_problem, condition, parameters, guard, dnf, new_to_old, aux_fluents
+            )
+            na = self._new_auxiliary_action(
+                new_problem, "aux", parameters, guard + conditions, [target]
+            )
+            new_to_old[na] = None
+
+    def _encode_conjunction(
+        self,
+        new_problem: "up.model.Problem",
+        condition: FNode,
+        parameters: List["up.model.Parameter"],
+        guard: List[FNode],
+        dnf: Dnf,
+        new_to_old: Dict[Action, Optional[Action]],
+        aux_fluents: List["up.model.Fluent"],
+    ) -> List[FNode]:
+        """Returns the conditions equivalent to the given conjunction, where every
+        argument that is not a literal is replaced by a new auxiliary fluent."""
+        res = []
+        for arg in condition.args:
+            if arg.is_and() or arg.is_or():
+                target = self._new_auxiliary_fluent(
+                    new_problem, f"{self.name}_aux", parameters, aux_fluents
+                )
+                self._add_auxiliary_actions(
+                    new_problem,
+                    arg,
+                    target,
+                    parameters,
+                    guard,
+                    dnf,
+                    new_to_old,
+                    aux_fluents,
+                )
+                res.append(target)
+            else:
+                res.append(arg)
+        return res
+
+    def _new_auxiliary_fluent(
+        self,
+        new_problem: "up.model.Problem",
+        name: str,
+        parameters: List["up.model.Parameter"],
+        aux_fluents: List["up.model.Fluent"],
+    ) -> FNode:
+        env = new_problem.env
+        fluent = up.model.Fluent(
+            get_fresh_name(new_problem, name), _signature=parameters, env=env
+        )
+        new_problem.add_fluent(fluent, default_initial_value=False)
+        aux_fluents.append(fluent)
+        return env.expression_manager.FluentExp(
+            fluent, tuple(env.expression_manager.ParameterExp(p) for p in parameters)
+        )
+
+    def _new_auxiliary_action(
+        self,
+        new_problem: "up.model.Problem",
+        name: str,
+        parameters: List["up.model.Parameter"],
+        conditions: List[FNode],
+        effects: List[FNode],
+    ) -> InstantaneousAction:
+        na = InstantaneousAction(
+            get_fresh_name(new_problem, f"{self.name}_{name}"),
+            _parameters=OrderedDict((p.name, p.type) for p in parameters),
+            _env=new_problem.env,
+        )
+        for c in conditions:
+            na.add_precondition(c)
+        for e in effects:
+            na.add_effect(e, True)
+        new_problem.add_action(na)
+        return na
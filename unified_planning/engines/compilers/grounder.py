@@ -20,16 +20,28 @@ import unified_planning.engines.compilers
 from unified_planning.plans import ActionInstance
 from unified_planning.engines.mixins.compiler import CompilationKind, CompilerMixin
 from unified_planning.engines.results import CompilerResult
-from unified_planning.model import Problem, ProblemKind, Action, Type, Expression, FNode
+from unified_planning.model import (
+    Problem,
+    ProblemKind,
+    Action,
+    InstantaneousAction,
+    DurativeAction,
+    Effect,
+    Type,
+    Expression,
+    FNode,
+    OperatorKind,
+)
 from unified_planning.model.types import domain_size, domain_item
 from unified_planning.model.walkers import Substituter, Simplifier
 from unified_planning.engines.compilers.utils import (
     lift_action_instance,
     create_action_with_given_subs,
 )
-from typing import Dict, List, Optional, Tuple, Iterator
+from typing import Any, Dict, List, Optional, Set, Tuple, Union, Iterator
 from itertools import product
 from functools import partial
+import multiprocessing
 
 
 class GrounderHelper:
@@ -49,6 +61,7 @@ class GrounderHelper:
         self,
         problem: Problem,
         grounding_actions_map: Optional[Dict[Action, List[Tuple[FNode, ...]]]] = None,
+        processes: int = 1,
     ):
         """
         Creates an instance of the GrounderHelper.
@@ -63,10 +76,19 @@ class GrounderHelper:
             - `b (o3)`
             - `b (o4)`
             If this map is `None`, the `unified_planning` grounding algorithm is applied.
+        :param processes: The number of processes used by :func:`~unified_planning.engines.compilers.GrounderHelper.get_grounded_actions`;
+            when it is greater than `1` the parameters of the actions are split in shards that are grounded and
+            simplified in a pool of processes. The resulting actions and their order are the same of the
+            sequential grounding.
         """
         assert isinstance(problem, Problem)
+        if processes < 1:
+            raise up.exceptions.UPValueError(
+                f"The number of grounding processes must be > 0, {processes} given."
+            )
         self._problem = problem
         self._grounding_actions_map = grounding_actions_map
+        self._processes = processes
         # grounded_actions is a map from an Action of the original problem and it's parameters
         # to the grounded instance of the Action with the given parameters.
         # When the grounded instance of the Action is None, it means that the resulting grounding
@@ -81,6 +103,8 @@ class GrounderHelper:
         env = problem.env
         self._substituter = Substituter(env)
         self._simplifier = Simplifier(env, problem)
+        self._domains: Dict[Type, List[FNode]] = {}
+        self._static_join: Optional[_StaticConditionsJoin] = None
 
     def ground_action(
         self, action: Action, parameters: Tuple[FNode, ...] = tuple()
@@ -106,7 +130,7 @@ class GrounderHelper:
         key = (action, tuple(parameters))
         value = self._grounded_actions.get(key, 0)
         if value != 0:  # The action is already created
-            assert isinstance(value, up.model.InstantaneousAction) or value is None
+            assert isinstance(value, Action) or value is None
             return value
         else:
             # if the action does not have parameters, it does not need to be grounded.
@@ -140,18 +164,86 @@ class GrounderHelper:
                 the `grounded_action` can be `None` if the grounding of the `original_action` with the given parameters
                 creates an invalid or meaningless `Action` (invalid if it has conflicting `Effects`,
                 meaningless if it has no `effects` or contradicting `conditions`).
+
+        The parameters that falsify a condition on the `static fluents` of the `Problem` are not returned,
+        see :func:`~unified_planning.engines.compilers.GrounderHelper.get_possible_parameters`.
         """
+        if self._processes > 1:
+            self._ground_in_parallel()
         for old_action in self._problem.actions:
             for grounded_params in self.get_possible_parameters(old_action):
                 assert isinstance(grounded_params, tuple)
                 new_action = self.ground_action(old_action, grounded_params)
                 yield (old_action, grounded_params, new_action)
 
+    def _ground_in_parallel(self):
+        """
+        Grounds all the actions of the `Problem` in a pool of processes and adds the results to the
+        cache of the grounded actions, so they are retrieved by :func:`~unified_planning.engines.compilers.GrounderHelper.ground_action`.
+
+        Every process receives a copy of the `Problem` once, when the pool is created; then the possible parameters
+        are split in shards and every shard is grounded by a process. Since the expressions of the processes
+        belong to a different `Environment`, the grounded actions are sent back with a compact
+        encoding and rebuilt in the `Environment` of the `Problem`.
+
+        The actions with a `SimulatedEffect` are not grounded in parallel, because the simulated
+        effect function can't be sent between processes.
+        """
+        actions_index = {a: i for i, a in enumerate(self._problem.actions)}
+        encoder = _ExpressionEncoder()
+        to_ground: List[Tuple[Action, Tuple[FNode, ...]]] = []
+        for action in self._problem.actions:
+            if len(action.parameters) == 0 or _has_simulated_effects(action):
+                continue
+            for grounded_params in self.get_possible_parameters(action):
+                if (action, grounded_params) not in self._grounded_actions:
+                    to_ground.append((action, grounded_params))
+        if len(to_ground) == 0:
+            return
+        # more shards than processes, so a process that gets many meaningless actions
+        # does not have to wait for the others
+        shard_size = -(-len(to_ground) // (self._processes * 4))
+        shards = []
+        for i in range(0, len(to_ground), shard_size):
+            shards.append(
+                [
+                    (actions_index[a], tuple(encoder.encode(p) for p in params))
+                    for a, params in to_ground[i : i + shard_size]
+                ]
+            )
+        with multiprocessing.Pool(
+            self._processes,
+            initializer=_init_grounding_process,
+            initargs=(self._problem,),
+        ) as pool:
+            results = pool.map(_ground_shard, shards)
+        i = 0
+        for encoded_actions in results:
+            decoder = _ExpressionDecoder(self._problem)
+            for encoded_action in encoded_actions:
+                action, grounded_params = to_ground[i]
+                i += 1
+                self._grounded_actions[
+                    (action, grounded_params)
+                ] = decoder.decode_action(action, encoded_action)
+
+    def _domain(self, type: Type) -> List[FNode]:
+        res = self._domains.get(type, None)
+        if res is None:
+            size = domain_size(self._problem, type)
+            res = [domain_item(self._problem, type, j) for j in range(size)]
+            self._domains[type] = res
+        return res
+
     def get_possible_parameters(self, action: Action) -> Iterator[Tuple[FNode, ...]]:
         """
         Takes in input an `Action` and returns the iterator over all the possible parameters compatible with the given
         action signature; this is computed in the domain of the :class:`~unified_planning.model.Problem` given at construction time.
 
+        When no `grounding_actions_map` is given, the parameters that falsify a condition of the `Action` on the
+        `static fluents` of the `Problem` are not returned, because the resulting grounded `Action` would be
+        meaningless; the order of the returned parameters is the order of the full product of the domains.
+
         :param action: The `Action` providing the signature to get all the possible grounding parameters in the
             `Problem` 's domain.
         :return: An `Iterator` over all the possible `Tuple of expressions` that are compatible with the given `Action`.
@@ -177,24 +269,437 @@ class GrounderHelper:
                 # objects_list = [[r1, r2], [l1, l2]]
                 # the product of *objects_list will be:
                 # [(r1, l1), (r1, l2), (r2, l1), (r2,l2)]
-                ground_size = 1
-                domain_sizes = []
-                for t in type_list:
-                    ds = domain_size(self._problem, t)
-                    domain_sizes.append(ds)
-                    ground_size *= ds
-                items_list: List[List[FNode]] = []
-                for size, type in zip(domain_sizes, type_list):
-                    items_list.append(
-                        [domain_item(self._problem, type, j) for j in range(size)]
-                    )
-                res = product(*items_list)
+                # The tuples violating a static condition of the action are then
+                # removed by the _StaticConditionsJoin, without enumerating them.
+                items_list: List[List[FNode]] = [self._domain(t) for t in type_list]
+                if self._static_join is None:
+                    self._static_join = _StaticConditionsJoin(self._problem)
+                res = self._static_join.join(action, items_list)
             else:
                 # The grounding_actions_map is not None, therefore it must be used to ground
                 res = iter(self._grounding_actions_map.get(action, []))
         return res
 
 
+def _has_simulated_effects(action: Action) -> bool:
+    if isinstance(action, InstantaneousAction):
+        return action.simulated_effect is not None
+    elif isinstance(action, DurativeAction):
+        return len(action.simulated_effects) > 0
+    raise NotImplementedError
+
+
+# A condition on the static fluents, made of the fluent (None for an equality), the
+# arguments (an int is the index of a parameter of the action) and the polarity
+_StaticCondition = Tuple[
+    Optional["up.model.Fluent"], Tuple[Union[int, FNode], ...], bool
+]
+
+# A step of the join: the index of the parameter bound by the step, the conditions
+# that are fully bound by the step and, if the parameter values are generated by a
+# static fluent, the condition used to generate them
+_JoinStep = Tuple[int, List[_StaticCondition], Optional[_StaticCondition]]
+
+
+class _StaticConditionsJoin:
+    """
+    Enumerates the parameters of the actions of a `Problem` that do not falsify the conditions
+    of the actions on the boolean `static fluents` of the `Problem`.
+
+    The conjuncts of the conditions that are static fluents (or their negation) and equalities
+    between objects are evaluated on the initial values of the `Problem`, as soon as all their
+    parameters are bound; so every prefix of parameters is checked once and the prefixes that
+    falsify a condition are never extended.
+    The parameters are bound in a join order that prefers the parameters whose values can be
+    looked up in the true initial values of a static fluent, instead of trying every object
+    of their domain.
+    """
+
+    def __init__(self, problem: Problem):
+        self._static_fluents: Set["up.model.Fluent"] = {
+            f for f in problem.get_static_fluents() if f.type.is_bool_type()
+        }
+        self._static_facts = problem.static_facts
+        # the fluents whose true values are all explicit, so they can generate the
+        # values of the parameters
+        self._generating_fluents: Set["up.model.Fluent"] = set()
+        for f in self._static_fluents:
+            default = self._static_facts.default(f)
+            if default is not None and default.is_false():
+                values = self._static_facts.explicit_values(f).values()
+                if all(v.is_bool_constant() for v in values):
+                    self._generating_fluents.add(f)
+        # maps a fluent, the positions of the bound arguments and the position of the
+        # generated argument to the map from the bound arguments to the generated values
+        self._indexes: Dict[
+            Tuple["up.model.Fluent", Tuple[int, ...], int],
+            Dict[Tuple[FNode, ...], List[FNode]],
+        ] = {}
+        self._plans: Dict[Action, Optional[List[_JoinStep]]] = {}
+
+    def join(
+        self, action: Action, domains: List[List[FNode]]
+    ) -> Iterator[Tuple[FNode, ...]]:
+        """
+        Returns the `Iterator` over the tuples of the product of the given domains that
+        do not falsify the conditions of the given `Action` on the `static fluents`, in the
+        order of the product.
+
+        :param action: The `Action` to ground.
+        :param domains: The list of the values of every parameter of the `action`.
+        :return: The `Iterator` over the possible parameters of the `action`.
+        """
+        if action not in self._plans:
+            self._plans[action] = self._plan(action)
+        plan = self._plans[action]
+        if plan is None:
+            return iter([])
+        elif all(len(checks) == 0 for _, checks, _ in plan):
+            return product(*domains)
+        positions = [{v: j for j, v in enumerate(domain)} for domain in domains]
+        values: List[Optional[FNode]] = [None] * len(domains)
+        res = self._extend(plan, domains, positions, values, 0)
+        if any(step[0] != i for i, step in enumerate(plan)):
+            # the parameters are not bound in their order, so the result is sorted
+            return iter(
+                sorted(
+                    res,
+                    key=lambda params: [p[v] for p, v in zip(positions, params)],
+                )
+            )
+        return res
+
+    def _extend(
+        self,
+        plan: List[_JoinStep],
+        domains: List[List[FNode]],
+        positions: List[Dict[FNode, int]],
+        values: List[Optional[FNode]],
+        k: int,
+    ) -> Iterator[Tuple[FNode, ...]]:
+        if k == len(plan):
+            yield tuple(values)  # type: ignore[arg-type]
+            return
+        i, checks, generator = plan[k]
+        if generator is None:
+            candidates = domains[i]
+        else:
+            fluent, args, _ = generator
+            assert fluent is not None
+            target = args.index(i)
+            key_positions = tuple(j for j in range(len(args)) if j != target)
+            index = self._indexes.get((fluent, key_positions, target), None)
+            if index is None:
+                index = {}
+                for f_args in self._static_facts.true_args(fluent):
+                    key = tuple(f_args[j] for j in key_positions)
+                    index.setdefault(key, []).append(f_args[target])
+                self._indexes[(fluent, key_positions, target)] = index
+            key = tuple(self._ground(args[j], values) for j in key_positions)
+            domain_positions = positions[i]
+            candidates = sorted(
+                (v for v in index.get(key, []) if v in domain_positions),
+                key=domain_positions.__getitem__,
+            )
+        for v in candidates:
+            values[i] = v
+            if all(self._holds(c, values) for c in checks):
+                yield from self._extend(plan, domains, positions, values, k + 1)
+        values[i] = None
+
+    def _ground(self, arg: Union[int, FNode], values: List[Optional[FNode]]) -> FNode:
+        if isinstance(arg, FNode):
+            return arg
+        value = values[arg]
+        # the join order binds every variable of a check before testing it
+        assert value is not None
+        return value
+
+    def _holds(
+        self, condition: _StaticCondition, values: List[Optional[FNode]]
+    ) -> bool:
+        fluent, args, positive = condition
+        ground_args = tuple(self._ground(a, values) for a in args)
+        if fluent is None:
+            return (ground_args[0] == ground_args[1]) == positive
+        value = self._static_facts.args_value(fluent, ground_args)
+        if value is None or not value.is_bool_constant():
+            return True
+        return value.is_true() == positive
+
+    def _conditions(self, action: Action) -> List[_StaticCondition]:
+        conditions: List[FNode] = []
+        if isinstance(action, InstantaneousAction):
+            conditions.extend(action.preconditions)
+        elif isinstance(action, DurativeAction):
+            for cl in action.conditions.values():
+                conditions.extend(cl)
+        parameters_index = {p: i for i, p in enumerate(action.parameters)}
+        res: List[_StaticCondition] = []
+        while len(conditions) > 0:
+            c = conditions.pop()
+            if c.is_and():
+                conditions.extend(c.args)
+                continue
+            positive = not c.is_not()
+            if not positive:
+                c = c.arg(0)
+            fluent: Optional["up.model.Fluent"] = None
+            if c.is_fluent_exp() and c.fluent() in self._static_fluents:
+                fluent = c.fluent()
+            elif not c.is_equals() or not all(a.type.is_user_type() for a in c.args):
+                continue
+            args: List[Union[int, FNode]] = []
+            for a in c.args:
+                if a.is_parameter_exp() and a.parameter() in parameters_index:
+                    args.append(parameters_index[a.parameter()])
+                elif a.is_object_exp():
+                    args.append(a)
+                else:
+                    break
+            else:
+                res.append((fluent, tuple(args), positive))
+        return res
+
+    def _plan(self, action: Action) -> Optional[List[_JoinStep]]:
+        """
+        Returns the join order of the parameters of the given `Action`, or `None` if a
+        condition without parameters is false.
+        """
+        conditions: List[Tuple[_StaticCondition, Set[int]]] = []
+        values: List[Optional[FNode]] = []
+        for c in self._conditions(action):
+            c_params = {a for a in c[1] if isinstance(a, int)}
+            if len(c_params) > 0:
+                conditions.append((c, c_params))
+            elif not self._holds(c, values):
+                return None
+        plan: List[_JoinStep] = []
+        bound: Set[int] = set()
+        remaining = list(range(len(action.parameters)))
+        while len(remaining) > 0:
+            best_score: Optional[Tuple[bool, int, int]] = None
+            best_step: Optional[_JoinStep] = None
+            for i in remaining:
+                checks = [
+                    c
+                    for c, c_params in conditions
+                    if i in c_params and c_params.issubset(bound | {i})
+                ]
+                generator = None
+                for c in checks:
+                    fluent, args, positive = c
+                    if (
+                        positive
+                        and fluent in self._generating_fluents
+                        and args.count(i) == 1
+                    ):
+                        generator = c
+                        break
+                score = (generator is not None, len(checks), -i)
+                if best_score is None or score > best_score:
+                    best_score, best_step = score, (i, checks, generator)
+            assert best_step is not None
+            plan.append(best_step)
+            bound.add(best_step[0])
+            remaining.remove(best_step[0])
+        return plan
+
+
+class _ExpressionEncoder:
+    """
+    Encodes expressions as nested tuples that do not reference the `Environment`, so they can be sent
+    to another process and decoded there by the :class:`_ExpressionDecoder`.
+
+    `Fluents` and `Objects` are encoded by name; shared sub-expressions are encoded as the same tuple,
+    so the sharing is preserved by `pickle`.
+    """
+
+    def __init__(self):
+        self._memoization: Dict[FNode, Tuple[Any, ...]] = {}
+
+    def encode(self, expression: FNode) -> Tuple[Any, ...]:
+        res = self._memoization.get(expression, None)
+        if res is None:
+            payload: Any = None
+            if expression.is_fluent_exp():
+                payload = expression.fluent().name
+            elif expression.is_object_exp():
+                payload = expression.object().name
+            elif expression.is_constant() or expression.is_timing_exp():
+                payload = expression._content.payload
+            elif expression.is_variable_exp():
+                payload = self._encode_variable(expression.variable())
+            elif expression.is_exists() or expression.is_forall():
+                payload = tuple(
+                    self._encode_variable(v) for v in expression.variables()
+                )
+            elif expression.is_parameter_exp() or expression.is_dot():
+                raise NotImplementedError
+            res = (
+                expression.node_type,
+                payload,
+                tuple(self.encode(a) for a in expression.args),
+            )
+            self._memoization[expression] = res
+        return res
+
+    def _encode_variable(self, variable: "up.model.Variable") -> Tuple[Any, ...]:
+        return (variable.name, self._encode_type(variable.type))
+
+    def _encode_type(self, type: Type) -> Tuple[Any, ...]:
+        if type.is_user_type():
+            return ("user", type.name)  # type: ignore[attr-defined]
+        elif type.is_int_type() or type.is_real_type():
+            kind = "int" if type.is_int_type() else "real"
+            return (kind, type.lower_bound, type.upper_bound)  # type: ignore[attr-defined]
+        assert type.is_bool_type()
+        return ("bool",)
+
+    def encode_action(self, action: Optional[Action]) -> Optional[Tuple[Any, ...]]:
+        if action is None:
+            return None
+        elif isinstance(action, InstantaneousAction):
+            return (
+                action.name,
+                tuple(self.encode(p) for p in action.preconditions),
+                tuple(self._encode_effect(e) for e in action.effects),
+            )
+        elif isinstance(action, DurativeAction):
+            return (
+                action.name,
+                tuple(
+                    (i, tuple(self.encode(c) for c in cl))
+                    for i, cl in action.conditions.items()
+                ),
+                tuple(
+                    (t, tuple(self._encode_effect(e) for e in el))
+                    for t, el in action.effects.items()
+                ),
+            )
+        raise NotImplementedError
+
+    def _encode_effect(self, effect: Effect) -> Tuple[Any, ...]:
+        return (
+            self.encode(effect.fluent),
+            self.encode(effect.value),
+            self.encode(effect.condition),
+            effect.kind,
+        )
+
+
+class _ExpressionDecoder:
+    """Decodes the expressions and the actions encoded by the :class:`_ExpressionEncoder` in the `Environment` of the given `Problem`."""
+
+    def __init__(self, problem: Problem):
+        self._problem = problem
+        self._manager = problem.env.expression_manager
+        self._fluents = {f.name: f for f in problem.fluents}
+        self._objects = {o.name: o for o in problem.all_objects}
+        # the encoded expressions are memoized by id, because equal sub-expressions are encoded as the same tuple
+        self._memoization: Dict[int, FNode] = {}
+
+    def decode(self, encoded_expression: Tuple[Any, ...]) -> FNode:
+        res = self._memoization.get(id(encoded_expression), None)
+        if res is None:
+            node_type, payload, encoded_args = encoded_expression
+            args = tuple(self.decode(a) for a in encoded_args)
+            if node_type == OperatorKind.FLUENT_EXP:
+                payload = self._fluents[payload]
+            elif node_type == OperatorKind.OBJECT_EXP:
+                payload = self._objects[payload]
+            elif node_type == OperatorKind.VARIABLE_EXP:
+                payload = self._decode_variable(payload)
+            elif node_type in (OperatorKind.EXISTS, OperatorKind.FORALL):
+                payload = tuple(self._decode_variable(v) for v in payload)
+            res = self._manager.create_node(node_type, args, payload)
+            self._memoization[id(encoded_expression)] = res
+        return res
+
+    def _decode_variable(
+        self, encoded_variable: Tuple[Any, ...]
+    ) -> "up.model.Variable":
+        name, encoded_type = encoded_variable
+        return up.model.Variable(
+            name, self._decode_type(encoded_type), self._problem.env
+        )
+
+    def _decode_type(self, encoded_type: Tuple[Any, ...]) -> Type:
+        tm = self._problem.env.type_manager
+        if encoded_type[0] == "user":
+            return self._problem.user_type(encoded_type[1])
+        elif encoded_type[0] == "int":
+            return tm.IntType(encoded_type[1], encoded_type[2])
+        elif encoded_type[0] == "real":
+            return tm.RealType(encoded_type[1], encoded_type[2])
+        assert encoded_type[0] == "bool"
+        return tm.BoolType()
+
+    def _decode_effect(self, encoded_effect: Tuple[Any, ...]) -> Effect:
+        fluent, value, condition, kind = encoded_effect
+        return Effect(
+            self.decode(fluent), self.decode(value), self.decode(condition), kind
+        )
+
+    def decode_action(
+        self, lifted_action: Action, encoded_action: Optional[Tuple[Any, ...]]
+    ) -> Optional[Action]:
+        if encoded_action is None:
+            return None
+        env = self._problem.env
+        if isinstance(lifted_action, InstantaneousAction):
+            name, preconditions, effects = encoded_action
+            new_action = InstantaneousAction(name, _env=env)
+            for e in effects:
+                new_action._add_effect_instance(self._decode_effect(e))
+            new_action._set_preconditions([self.decode(p) for p in preconditions])
+            return new_action
+        elif isinstance(lifted_action, DurativeAction):
+            name, conditions, timed_effects = encoded_action
+            new_durative_action = DurativeAction(name, _env=env)
+            new_durative_action.set_duration_constraint(lifted_action.duration)
+            for i, cl in conditions:
+                for c in cl:
+                    new_durative_action.add_condition(i, self.decode(c))
+            for t, el in timed_effects:
+                for e in el:
+                    new_durative_action._add_effect_instance(t, self._decode_effect(e))
+            return new_durative_action
+        raise NotImplementedError
+
+
+# The GrounderHelper used by a grounding process, created by _init_grounding_process.
+_PROCESS_GROUNDER_HELPER: Optional[GrounderHelper] = None
+
+
+def _init_grounding_process(problem: Problem):
+    global _PROCESS_GROUNDER_HELPER
+    _PROCESS_GROUNDER_HELPER = GrounderHelper(problem)
+
+
+def _ground_shard(
+    shard: List[Tuple[int, Tuple[Tuple[Any, ...], ...]]]
+) -> List[Optional[Tuple[Any, ...]]]:
+    """
+    Grounds the given shard of actions in a grounding process.
+
+    :param shard: The list of the actions to ground, each one represented as the index of the
+        action in the `Problem` and its encoded parameters.
+    :return: The list of the encoded grounded actions, in the same order of the given shard.
+    """
+    helper = _PROCESS_GROUNDER_HELPER
+    assert helper is not None
+    actions = helper._problem.actions
+    decoder = _ExpressionDecoder(helper._problem)
+    encoder = _ExpressionEncoder()
+    res = []
+    for action_index, encoded_params in shard:
+        params = tuple(decoder.decode(p) for p in encoded_params)
+        new_action = helper.ground_action(actions[action_index], params)
+        res.append(encoder.encode_action(new_action))
+    return res
+
+
 class Grounder(engines.engine.Engine, CompilerMixin):
     """
     Grounder class: the `Grounder` takes a :class:`~unified_planning.model.Problem` where the :class:`Actions <unified_planning.model.Action>`
@@ -209,16 +714,22 @@ class Grounder(engines.engine.Engine, CompilerMixin):
     the integration of external grounders inside the library. To see a practical example, checkout the :class:`~unified_planning.engines.compilers.TarskiGrounder` `_compile`
     implementation.
 
+    The `processes` parameter sets the number of processes used to ground the `Problem`; when it is greater
+    than `1` the grounding is split in shards that are grounded in parallel, obtaining the same `Problem`
+    of the sequential grounding.
+
     This `Compiler` supports only the the `GROUNDING` :class:`~unified_planning.engines.CompilationKind`.
     """
 
     def __init__(
         self,
         grounding_actions_map: Optional[Dict[Action, List[Tuple[FNode, ...]]]] = None,
+        processes: int = 1,
     ):
         engines.engine.Engine.__init__(self)
         CompilerMixin.__init__(self, CompilationKind.GROUNDING)
         self._grounding_actions_map = grounding_actions_map
+        self._processes = processes
 
     @property
     def name(self):
@@ -284,7 +795,9 @@ class Grounder(engines.engine.Engine, CompilerMixin):
         assert isinstance(
             problem, Problem
         ), "The given problem is not a class supported by the Grounder"
-        grounder_helper = GrounderHelper(problem, self._grounding_actions_map)
+        grounder_helper = GrounderHelper(
+            problem, self._grounding_actions_map, self._processes
+        )
         trace_back_map: Dict[Action, Tuple[Action, List[FNode]]] = {}
 
         new_problem = problem.clone()
@@ -0,0 +1,362 @@
+# Copyright 2021 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""This module implements a grounder that prunes the action instances that are not reachable in the delete relaxation."""
+
+
+import unified_planning as up
+import unified_planning.engines as engines
+from unified_planning.engines.mixins.compiler import CompilationKind, CompilerMixin
+from unified_planning.engines.results import CompilerResult
+from unified_planning.engines.compilers.grounder import Grounder
+from unified_planning.model import (
+    Problem,
+    ProblemKind,
+    Action,
+    InstantaneousAction,
+    DurativeAction,
+    Effect,
+    Fluent,
+    FNode,
+    Parameter,
+)
+from unified_planning.model.types import domain_size, domain_item
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+
+class RelaxedReachabilityAnalysis:
+    """
+    This class computes, with a fixpoint over the delete relaxation of a :class:`~unified_planning.model.Problem`,
+    an over-approximation of the action instances that are applicable in a reachable state.
+
+    Starting from the `boolean fluents` that are `True` in the initial state, the action instances whose
+    conditions are satisfied by the reached fluents are computed by joining the positive atoms of the conditions
+    with the reached fluents; then the positive effects of those instances are added to the reached fluents
+    and the process is repeated until no new fluent is reached.
+
+    The conditions that can't be evaluated on the reached fluents (negative conditions on non-static fluents,
+    numeric conditions, quantifiers, ...) are considered satisfiable, so every action instance that is
+    applicable in a reachable state is always returned.
+    """
+
+    def __init__(self, problem: Problem):
+        self._problem = problem
+        self._static_fluents = problem.get_static_fluents()
+        # The fluents that can be assigned in a way that can't be known without grounding
+        # (for example with a simulated effect or with nested fluents as arguments);
+        # all the atoms of these fluents are considered reachable.
+        self._unrestricted_fluents: Set[Fluent] = set()
+        self._reached: Dict[Fluent, Set[Tuple[FNode, ...]]] = {}
+        self._reachable_actions: Optional[Dict[Action, List[Tuple[FNode, ...]]]] = None
+
+    def is_reached(self, fluent_exp: FNode) -> bool:
+        """
+        Returns `True` if the given grounded boolean fluent expression can be `True` in a reachable state;
+        this method must be called after :func:`reachable_actions`.
+
+        :param fluent_exp: The grounded fluent expression to check.
+        :return: `False` if the given fluent is surely `False` in every reachable state, `True` otherwise.
+        """
+        assert self._reachable_actions is not None
+        fluent = fluent_exp.fluent()
+        return fluent in self._unrestricted_fluents or tuple(
+            fluent_exp.args
+        ) in self._reached.get(fluent, set())
+
+    def reachable_actions(self) -> Dict[Action, List[Tuple[FNode, ...]]]:
+        """
+        Returns the map from every `Action` of the `Problem` to the list of parameters that make the
+        `Action` instance reachable; the `Actions` with no reachable instances are not in the map.
+
+        The lists of parameters are ordered as in the :class:`~unified_planning.engines.compilers.Grounder`, so
+        the map can be given to it as the `grounding_actions_map`.
+        """
+        if self._reachable_actions is None:
+            self._compute_fixpoint()
+        assert self._reachable_actions is not None
+        return self._reachable_actions
+
+    def _compute_fixpoint(self):
+        problem = self._problem
+        for fluent_exp, value in problem.initial_values.items():
+            if value.is_true():
+                self._add_atom(fluent_exp.fluent(), tuple(fluent_exp.args))
+        for el in problem.timed_effects.values():
+            for e in el:
+                self._add_effect(e, {})
+        for a in problem.actions:
+            for f in _simulated_fluents(a):
+                self._unrestricted_fluents.add(f.fluent())
+        reached_instances: Dict[Action, Dict[Tuple[FNode, ...], None]] = {
+            a: {} for a in problem.actions
+        }
+        changed = True
+        while changed:
+            changed = False
+            for action in problem.actions:
+                conditions = _conditions(action)
+                instances = reached_instances[action]
+                for binding in self._candidate_bindings(action, conditions):
+                    key = tuple(binding[p] for p in action.parameters)
+                    if key in instances:
+                        continue
+                    if all(self._relaxed_holds(c, binding) for c in conditions):
+                        instances[key] = None
+                        for e in _effects(action):
+                            changed = self._add_effect(e, binding) or changed
+        # The instances are sorted as in the Cartesian product of the domains, like the Grounder does
+        self._reachable_actions = {}
+        for action, instances in reached_instances.items():
+            if len(instances) == 0:
+                continue
+            positions = [
+                {
+                    domain_item(problem, p.type, j): j
+                    for j in range(domain_size(problem, p.type))
+                }
+                for p in action.parameters
+            ]
+            self._reachable_actions[action] = sorted(
+                instances,
+                key=lambda k: tuple(pos[o] for pos, o in zip(positions, k)),
+            )
+
+    def _add_atom(self, fluent: Fluent, args: Tuple[FNode, ...]) -> bool:
+        atoms = self._reached.setdefault(fluent, set())
+        if args in atoms:
+            return False
+        atoms.add(args)
+        return True
+
+    def _add_effect(self, effect: Effect, binding: Dict[Parameter, FNode]) -> bool:
+        fluent_exp = effect.fluent
+        fluent = fluent_exp.fluent()
+        if not fluent.type.is_bool_type() or fluent in self._unrestricted_fluents:
+            return False
+        if effect.value.is_false():
+            return False
+        args = self._ground_args(fluent_exp, binding)
+        if args is None:
+            self._unrestricted_fluents.add(fluent)
+            return True
+        return self._add_atom(fluent, args)
+
+    def _ground_args(
+        self, fluent_exp: FNode, binding: Dict[Parameter, FNode]
+    ) -> Optional[Tuple[FNode, ...]]:
+        """Returns the arguments of the given fluent expression with the given binding, or `None` if they can't be computed without a state."""
+        args = []
+        for a in fluent_exp.args:
+            if a.is_parameter_exp():
+                args.append(binding[a.parameter()])
+            elif a.is_constant():
+                args.append(a)
+            else:
+                return None
+        return tuple(args)
+
+    def _join_atoms(self, conditions: List[FNode]) -> List[FNode]:
+        """Returns the positive atoms in the top level conjunctions of the given conditions that can be used to bind parameters."""
+        atoms = []
+        stack = list(conditions)
+        while stack:
+            c = stack.pop()
+            if c.is_and():
+                stack.extend(c.args)
+            elif (
+                c.is_fluent_exp()
+                and c.fluent() not in self._unrestricted_fluents
+                and all(a.is_parameter_exp() or a.is_constant() for a in c.args)
+            ):
+                atoms.append(c)
+        return atoms
+
+    def _candidate_bindings(
+        self, action: Action, conditions: List[FNode]
+    ) -> Iterator[Dict[Parameter, FNode]]:
+        """
+        Yields the bindings of the action parameters that are compatible with the reached atoms of
+        the positive conditions; the parameters not appearing in those atoms take every value of their type.
+        """
+        atoms = self._join_atoms(conditions)
+        # the atoms with less reached facts are joined first
+        atoms.sort(key=lambda a: len(self._reached.get(a.fluent(), ())))
+        problem = self._problem
+        domains = {
+            p: [
+                domain_item(problem, p.type, j)
+                for j in range(domain_size(problem, p.type))
+            ]
+            for p in action.parameters
+        }
+
+        def join(i: int, binding: Dict[Parameter, FNode]):
+            if i < len(atoms):
+                atom = atoms[i]
+                for args in list(self._reached.get(atom.fluent(), ())):
+                    new_binding = dict(binding)
+                    for a, v in zip(atom.args, args):
+                        if a.is_parameter_exp():
+                            p = a.parameter()
+                            bound = new_binding.get(p, None)
+                            if bound is None:
+                                if not v.type.is_compatible(p.type):
+                                    break
+                                new_binding[p] = v
+                            elif bound != v:
+                                break
+                        elif a != v:
+                            break
+                    else:
+                        yield from join(i + 1, new_binding)
+            else:
+                free = [p for p in action.parameters if p not in binding]
+
+                def expand(j: int, binding: Dict[Parameter, FNode]):
+                    if j == len(free):
+                        yield binding
+                        return
+                    for v in domains[free[j]]:
+                        new_binding = dict(binding)
+                        new_binding[free[j]] = v
+                        yield from expand(j + 1, new_binding)
+
+                yield from expand(0, binding)
+
+        return join(0, {})
+
+    def _relaxed_holds(self, condition: FNode, binding: Dict[Parameter, FNode]) -> bool:
+        """Returns `False` only if the given condition is surely `False` in every reachable state, with the given binding."""
+        if condition.is_bool_constant():
+            return condition.bool_constant_value()
+        elif condition.is_and():
+            return all(self._relaxed_holds(c, binding) for c in condition.args)
+        elif condition.is_or():
+            return any(self._relaxed_holds(c, binding) for c in condition.args)
+        elif condition.is_fluent_exp():
+            fluent = condition.fluent()
+            if fluent in self._unrestricted_fluents:
+                return True
+            args = self._ground_args(condition, binding)
+            return args is None or args in self._reached.get(fluent, ())
+        elif condition.is_not():
+            arg = condition.arg(0)
+            if arg.is_fluent_exp() and arg.fluent() in self._static_fluents:
+                args = self._ground_args(arg, binding)
+                return args is None or args not in self._reached.get(arg.fluent(), ())
+            elif arg.is_equals():
+                return not self._equals(arg, binding, False)
+            return True
+        elif condition.is_equals():
+            return self._equals(condition, binding, True)
+        return True
+
+    def _equals(
+        self, condition: FNode, binding: Dict[Parameter, FNode], default: bool
+    ) -> bool:
+        """Returns the value of an equality between objects, or `default` if the value depends on the state."""
+        values = []
+        for a in condition.args:
+            if a.is_parameter_exp():
+                a = binding[a.parameter()]
+            if not a.is_object_exp():
+                return default
+            values.append(a)
+        return values[0] == values[1]
+
+
+def _conditions(action: Action) -> List[FNode]:
+    if isinstance(action, InstantaneousAction):
+        return action.preconditions
+    elif isinstance(action, DurativeAction):
+        return [c for cl in action.conditions.values() for c in cl]
+    raise NotImplementedError
+
+
+def _effects(action: Action) -> List[Effect]:
+    if isinstance(action, InstantaneousAction):
+        return action.effects
+    elif isinstance(action, DurativeAction):
+        return [e for el in action.effects.values() for e in el]
+    raise NotImplementedError
+
+
+def _simulated_fluents(action: Action) -> List[FNode]:
+    if isinstance(action, InstantaneousAction):
+        se = action.simulated_effect
+        return [] if se is None else se.fluents
+    elif isinstance(action, DurativeAction):
+        return [f for se in action.simulated_effects.values() for f in se.fluents]
+    raise NotImplementedError
+
+
+class ReachabilityGrounder(engines.engine.Engine, CompilerMixin):
+    """
+    Implements a Grounder that only creates the action instances that are reachable in the delete relaxation of the
+    :class:`~unified_planning.model.Problem`, computed with the :class:`~unified_planning.engines.compilers.reachability_grounder.RelaxedReachabilityAnalysis`.
+    The reachable instances are then grounded by the :class:`~unified_planning.engines.compilers.Grounder`; for more details
+    about Grounding check the `Grounder` documentation.
+
+    This `Compiler` supports only the the `GROUNDING` :class:`~unified_planning.engines.CompilationKind`.
+    """
+
+    def __init__(self):
+        engines.engine.Engine.__init__(self)
+        CompilerMixin.__init__(self, CompilationKind.GROUNDING)
+
+    @property
+    def name(self):
+        return "reachability_grounder"
+
+    @staticmethod
+    def supported_kind() -> ProblemKind:
+        return Grounder.supported_kind()
+
+    @staticmethod
+    def supports(problem_kind):
+        return problem_kind <= ReachabilityGrounder.supported_kind()
+
+    @staticmethod
+    def supports_compilation(compilation_kind: CompilationKind) -> bool:
+        return compilation_kind == CompilationKind.GROUNDING
+
+    @staticmethod
+    def resulting_problem_kind(
+        problem_kind: ProblemKind, compilation_kind: Optional[CompilationKind] = None
+    ) -> ProblemKind:
+        return ProblemKind(problem_kind.features)
+
+    def _compile(
+        self,
+        problem: "up.model.AbstractProblem",
+        compilation_kind: "up.engines.CompilationKind",
+    ) -> CompilerResult:
+        """
+        Takes an instance of a :class:`~unified_planning.model.Problem` and the `GROUNDING` :class:`~unified_planning.engines.CompilationKind`
+        and returns a `CompilerResult` where the problem does not have actions with parameters; so every action is grounded.
+
+        :param problem: The instance of the `Problem` that must be grounded.
+        :param compilation_kind: The `CompilationKind` that must be applied on the given problem;
+            only `GROUNDING` is supported by this compiler
+        :return: The resulting `CompilerResult` data structure.
+        """
+        assert isinstance(
+            problem, Problem
+        ), "The given problem is not a class supported by the ReachabilityGrounder"
+        grounding_actions_map = RelaxedReachabilityAnalysis(problem).reachable_actions()
+        up_grounder = Grounder(grounding_actions_map=grounding_actions_map)
+        up_res = up_grounder.compile(problem, compilation_kind)
+        return CompilerResult(
+            up_res.problem, up_res.map_back_action_instance, self.name
+        )
@@ -138,7 +138,8 @@ def create_action_with_given_subs(
         naming_list.append(str(value))
     if isinstance(old_action, InstantaneousAction):
         new_action = InstantaneousAction(
-            get_fresh_name(problem, old_action.name, naming_list)
+            get_fresh_name(problem, old_action.name, naming_list),
+            _env=problem.env,
         )
         for p in old_action.preconditions:
             new_action.add_precondition(substituter.substitute(p, subs))
@@ -177,7 +178,8 @@ def create_action_with_given_subs(
         return new_action
     elif isinstance(old_action, DurativeAction):
         new_durative_action = DurativeAction(
-            get_fresh_name(problem, old_action.name, naming_list)
+            get_fresh_name(problem, old_action.name, naming_list),
+            _env=problem.env,
         )
         new_durative_action.set_duration_constraint(old_action.duration)
         for i, cl in old_action.conditions.items():
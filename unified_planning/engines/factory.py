@@ -15,6 +15,7 @@
 
 
 import importlib
+import importlib.util
 import sys
 import os
 import inspect
@@ -29,7 +30,7 @@ from unified_planning.engines.mixins.oneshot_planner import OneshotPlannerMixin
 from unified_planning.engines.mixins.plan_validator import PlanValidatorMixin
 from unified_planning.engines.mixins.replanner import ReplannerMixin
 from unified_planning.engines.mixins.simulator import SimulatorMixin
-from typing import IO, Dict, Tuple, Optional, List, Union, Type, cast
+from typing import IO, Dict, Tuple, Optional, List, Set, Union, Type, cast
 from pathlib import PurePath
 
 
@@ -69,6 +70,10 @@ DEFAULT_ENGINES = {
         "TarskiGrounder",
     ),
     "up_grounder": ("unified_planning.engines.compilers.grounder", "Grounder"),
+    "up_reachability_grounder": (
+        "unified_planning.engines.compilers.reachability_grounder",
+        "ReachabilityGrounder",
+    ),
 }
 
 DEFAULT_META_ENGINES = {
@@ -97,6 +102,7 @@ DEFAULT_ENGINES_PREFERENCE_LIST = [
     "up_quantifiers_remover",
     "tarski_grounder",
     "up_grounder",
+    "up_reachability_grounder",
 ]
 
 DEFAULT_META_ENGINES_PREFERENCE_LIST = ["oversubscription"]
@@ -116,12 +122,25 @@ def format_table(header: List[str], rows: List[List[str]]) -> str:
     return "\n".join(rows_str)
 
 
+def _is_installed(module_name: str) -> bool:
+    """Returns `True` if the top level package of the given module can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(module_name.split(".")[0]) is not None
+    except (ImportError, ValueError):
+        return False
+
+
 def get_possible_config_locations() -> List[str]:
     """Returns all the possible location of the configuration file."""
     home = os.path.expanduser("~")
     files = []
-    stack = inspect.stack()
-    for p in PurePath(os.path.abspath(stack[-1].filename)).parents:
+    # The outermost frame is the one of the script that is running; walking the frames
+    # is much cheaper than inspect.stack(), that reads the source code of every frame
+    frame = inspect.currentframe()
+    assert frame is not None
+    while frame.f_back is not None:
+        frame = frame.f_back
+    for p in PurePath(os.path.abspath(frame.f_code.co_filename)).parents:
         files.append(os.path.join(p, "up.ini"))
         files.append(os.path.join(p, ".up.ini"))
     files.append(os.path.join(home, "up.ini"))
@@ -138,33 +157,30 @@ class Factory:
 
     def __init__(self, env: "Environment"):
         self._env = env
+        # The engines are registered by name and their modules are imported only
+        # when the engine is used for the first time; _engines caches the loaded classes
+        # and the MetaEngine classes are instantiated on demand for every engine
         self._engines: Dict[str, Type["up.engines.engine.Engine"]] = {}
-        self._engines_info: List[Tuple[str, str, str]] = []
+        self._engines_info: Dict[str, Tuple[str, str]] = {}
+        self._engine_names: List[str] = []
+        self._unavailable_engines: Set[str] = set()
         self._meta_engines: Dict[str, Type["up.engines.meta_engine.MetaEngine"]] = {}
-        self._meta_engines_info: List[Tuple[str, str, str]] = []
+        self._meta_engines_info: Dict[str, Tuple[str, str]] = {}
         self._credit_disclaimer_printed = False
         for name, (module_name, class_name) in DEFAULT_ENGINES.items():
-            try:
-                self._add_engine(name, module_name, class_name)
-            except ImportError:
-                pass
-        engines = dict(self._engines)
+            if _is_installed(module_name):
+                self._register_engine(name, module_name, class_name)
         for name, (module_name, class_name) in DEFAULT_META_ENGINES.items():
-            try:
-                for engine_name, engine in engines.items():
-                    self._add_meta_engine(
-                        name, module_name, class_name, engine_name, engine
-                    )
-            except ImportError:
-                pass
+            if _is_installed(module_name):
+                self._register_meta_engine(name, module_name, class_name)
         self._preference_list = []
         for name in DEFAULT_ENGINES_PREFERENCE_LIST:
-            if name in self._engines:
+            if name in self._engines_info:
                 self._preference_list.append(name)
         for name in DEFAULT_META_ENGINES_PREFERENCE_LIST:
-            for e in self._engines.keys():
-                if e.startswith(f"{name}["):
-                    self._preference_list.append(e)
+            if name in self._meta_engines_info:
+                for e in self._engines_info.keys():
+                    self._preference_list.append(f"{name}[{e}]")
         self.configure_from_file()
 
     # The getstate and setstate method are needed in the Parallel engine.
@@ -172,32 +188,22 @@ class Factory:
     # in another process by pickling it.
     # Since local classes are not picklable and engines instantiated from
     # a meta engine are local classes, we need to remove them from the
-    # state and then re-create them in the new process.
+    # state; they are loaded again in the new process when they are used.
     def __getstate__(self):
         state = self.__dict__.copy()
         del state["_engines"]
+        del state["_meta_engines"]
         return state
 
     def __setstate__(self, state):
         self.__dict__.update(state)
         self._engines = {}
-        engines_info = list(self._engines_info)
-        self._engines_info = []
-        for name, module_name, class_name in engines_info:
-            self._add_engine(name, module_name, class_name)
-        engines = dict(self._engines)
-        meta_engines_info = list(self._meta_engines_info)
-        self._meta_engines_info = []
-        for name, module_name, class_name in meta_engines_info:
-            for engine_name, engine in engines.items():
-                self._add_meta_engine(
-                    name, module_name, class_name, engine_name, engine
-                )
+        self._meta_engines = {}
 
     @property
     def engines(self) -> List[str]:
         """Returns the list of the available :class:`Engines <unified_planning.engines.Engine>` names."""
-        return list(self._engines.keys())
+        return [n for n in self._engine_names if self._load_engine(n) is not None]
 
     def engine(self, name: str) -> Type["up.engines.engine.Engine"]:
         """
@@ -206,12 +212,15 @@ class Factory:
         :param name: The name of the `engine` in the factory.
         :return: The `engine` Class.
         """
-        return self._engines[name]
+        EngineClass = self._load_engine(name)
+        if EngineClass is None:
+            raise KeyError(name)
+        return EngineClass
 
     @property
     def preference_list(self) -> List[str]:
         """Returns the current list of preferences."""
-        return self._preference_list
+        return [n for n in self._preference_list if self._load_engine(n) is not None]
 
     @preference_list.setter
     def preference_list(self, preference_list: List[str]):
@@ -235,14 +244,18 @@ class Factory:
         :param module_name: The `name` of the module in which the `engine Class` is defined.
         :param class_name: The `name` of the `engine Class`.
         """
-        self._add_engine(name, module_name, class_name)
+        # The module of an engine added explicitly is imported right away, so errors are raised here
+        module = importlib.import_module(module_name)
+        EngineImpl = getattr(module, class_name)
+        self._register_engine(name, module_name, class_name)
+        self._engines[name] = EngineImpl
+        self._unavailable_engines.discard(name)
         self._preference_list.append(name)
-        engine = self._engines[name]
-        for me_name, me in self._meta_engines.items():
-            if me.is_compatible_engine(engine):
-                n = f"{me_name}[{name}]"
-                self._engines[n] = me[engine]
-                self._preference_list.append(n)
+        for me_name in self._meta_engines_info.keys():
+            n = f"{me_name}[{name}]"
+            self._engines.pop(n, None)
+            self._unavailable_engines.discard(n)
+            self._preference_list.append(n)
 
     def add_meta_engine(self, name: str, module_name: str, class_name: str):
         """
@@ -252,11 +265,10 @@ class Factory:
         :param module_name: The `name` of the module in which the `meta engine Class` is defined.
         :param class_name: The name of the `meta engine Class`.
         """
-        for engine_name, engine in self._engines.items():
-            self._add_meta_engine(name, module_name, class_name, engine_name, engine)
-            n = f"{name}[{engine_name}]"
-            if n in self.engines:
-                self._preference_list.append(n)
+        self._register_meta_engine(name, module_name, class_name)
+        self._load_meta_engine(name)
+        for engine_name in self._engines_info.keys():
+            self._preference_list.append(f"{name}[{engine_name}]")
 
     def configure_from_file(self, config_filename: Optional[str] = None):
         """
@@ -329,31 +341,63 @@ class Factory:
 
             if pref_list is not None:
                 prefs = [x.strip() for x in pref_list.split() if len(x.strip()) > 0]
-                self.preference_list = [e for e in prefs if e in self.engines]
-
-    def _add_engine(self, name: str, module_name: str, class_name: str):
-        module = importlib.import_module(module_name)
-        EngineImpl = getattr(module, class_name)
-        self._engines[name] = EngineImpl
-        self._engines_info.append((name, module_name, class_name))
+                self.preference_list = [
+                    e for e in prefs if self._load_engine(e) is not None
+                ]
+
+    def _register_engine(self, name: str, module_name: str, class_name: str):
+        if name not in self._engines_info:
+            self._engine_names.append(name)
+            for me_name in self._meta_engines_info.keys():
+                self._engine_names.append(f"{me_name}[{name}]")
+        self._engines_info[name] = (module_name, class_name)
+
+    def _register_meta_engine(self, name: str, module_name: str, class_name: str):
+        if name not in self._meta_engines_info:
+            for engine_name in self._engines_info.keys():
+                self._engine_names.append(f"{name}[{engine_name}]")
+        self._meta_engines_info[name] = (module_name, class_name)
+
+    def _load_meta_engine(self, name: str) -> Type["up.engines.meta_engine.MetaEngine"]:
+        MetaEngineImpl = self._meta_engines.get(name, None)
+        if MetaEngineImpl is None:
+            module_name, class_name = self._meta_engines_info[name]
+            module = importlib.import_module(module_name)
+            MetaEngineImpl = getattr(module, class_name)
+            self._meta_engines[name] = MetaEngineImpl
+        return MetaEngineImpl
 
-    def _add_meta_engine(
-        self,
-        name: str,
-        module_name: str,
-        class_name: str,
-        engine_name: str,
-        engine: Type["up.engines.engine.Engine"],
-    ):
-        if name in self._meta_engines:
-            EngineImpl = self._meta_engines[name]
+    def _load_engine(self, name: str) -> Optional[Type["up.engines.engine.Engine"]]:
+        """
+        Returns the `Engine` class with the given name, importing its module the first
+        time it is requested, or `None` if the engine is not available because it is not
+        registered, its module can not be imported or, for an engine created by a
+        `MetaEngine`, the `MetaEngine` is not compatible with the engine.
+        """
+        EngineImpl = self._engines.get(name, None)
+        if EngineImpl is not None or name in self._unavailable_engines:
+            return EngineImpl
+        try:
+            if name in self._engines_info:
+                module_name, class_name = self._engines_info[name]
+                module = importlib.import_module(module_name)
+                EngineImpl = getattr(module, class_name)
+            elif name.endswith("]") and "[" in name:
+                me_name, engine_name = name[:-1].split("[", 1)
+                if me_name in self._meta_engines_info:
+                    MetaEngineImpl = self._load_meta_engine(me_name)
+                    engine = self._load_engine(engine_name)
+                    if engine is not None and MetaEngineImpl.is_compatible_engine(
+                        engine
+                    ):
+                        EngineImpl = MetaEngineImpl[engine]
+        except ImportError:
+            EngineImpl = None
+        if EngineImpl is None:
+            self._unavailable_engines.add(name)
         else:
-            module = importlib.import_module(module_name)
-            EngineImpl = getattr(module, class_name)
-            self._meta_engines[name] = EngineImpl
-            self._meta_engines_info.append((name, module_name, class_name))
-        if EngineImpl.is_compatible_engine(engine):
-            self._engines[f"{name}[{engine_name}]"] = EngineImpl[engine]
+            self._engines[name] = EngineImpl
+        return EngineImpl
 
     def _get_engine_class(
         self,
@@ -365,8 +409,9 @@ class Factory:
         plan_kind: Optional["PlanKind"] = None,
     ) -> Type["up.engines.engine.Engine"]:
         if name is not None:
-            if name in self._engines:
-                return self._engines[name]
+            EngineClass = self._load_engine(name)
+            if EngineClass is not None:
+                return EngineClass
             else:
                 raise up.exceptions.UPNoRequestedEngineAvailableException
         problem_features = list(problem_kind.features)
@@ -374,7 +419,9 @@ class Factory:
         # Make sure that optimality guarantees and compilation kind are mutually exclusive
         assert optimality_guarantee is None or compilation_kind is None
         for name in self._preference_list:
-            EngineClass = self._engines[name]
+            EngineClass = self._load_engine(name)
+            if EngineClass is None:
+                continue
             if getattr(EngineClass, "is_" + engine_kind)():
                 if engine_kind == "oneshot_planner" or engine_kind == "replanner":
                     assert issubclass(EngineClass, OneshotPlannerMixin) or issubclass(
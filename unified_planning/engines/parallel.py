@@ -14,12 +14,17 @@
 #
 
 
+import os
+import pickle
+import queue
+import signal
+import time
 import warnings
 import unified_planning as up
 import unified_planning.engines as engines
 from unified_planning.plans import Plan
 from unified_planning.model import ProblemKind
-from unified_planning.exceptions import UPUsageError
+from unified_planning.exceptions import UPException, UPUsageError
 from unified_planning.engines.results import (
     LogLevel,
     PlanGenerationResultStatus,
@@ -27,9 +32,22 @@ from unified_planning.engines.results import (
     ValidationResult,
     PlanGenerationResult,
 )
-from typing import IO, Callable, Dict, List, Optional, Tuple, Type, cast
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 from fractions import Fraction
-from multiprocessing import Process, Queue
+from multiprocessing import Process, Queue, Value
+from multiprocessing.util import Finalize
 
 
 class Parallel(
@@ -42,6 +60,13 @@ class Parallel(
 
     The `Engines` run the same command in parallel and the first definitive :class:`Result <unified_planning.engines.Result>` returned
     by the `Engine` is returned to the user.
+
+    Every `Engine` runs in its own worker process, that is started at the first call
+    and kept alive (with its `Engine` already created) for the following calls until
+    the `Parallel` is destroyed. When a definitive `Result` is found, the other
+    workers are asked to cancel their call, so that their `Engines` can clean up
+    (for example killing the planner subprocess); the workers that do not stop
+    within `cancellation_timeout` seconds are terminated.
     """
 
     def __init__(
@@ -54,6 +79,8 @@ class Parallel(
         self.error_on_failed_checks = False
         self.engines = engines
         self._factory = factory
+        self.cancellation_timeout: float = 5.0
+        self._pool: Optional[WorkerPool] = None
 
     @property
     def name(self) -> str:
@@ -74,51 +101,45 @@ class Parallel(
         return True
 
     def _run_parallel(self, fname, *args) -> List[Result]:
-        signaling_queue: Queue = Queue()
-        processes = []
-        for idx, (engine_name, opts) in enumerate(self.engines):
-            options = opts
-            _p = Process(
-                name=str(idx),
-                target=_run,
-                args=(
-                    idx,
-                    self._factory,
-                    engine_name,
-                    options,
-                    self.skip_checks,
-                    self.error_on_failed_checks,
-                    signaling_queue,
-                    fname,
-                    *args,
-                ),
+        if self._pool is None:
+            self._pool = WorkerPool(self._factory)
+        self._pool.cancellation_timeout = self.cancellation_timeout
+        self._pool.start(self.engines)
+        # The arguments are serialized only once and shared by all the workers
+        payload = serialize_arguments(args)
+        pending: Dict[int, int] = {}
+        for idx in range(len(self.engines)):
+            call_id = self._pool.submit(
+                idx, fname, self.skip_checks, self.error_on_failed_checks, payload
             )
-            processes.append(_p)
-            _p.start()
-        processes_alive = len(processes)
+            pending[call_id] = idx
         results: List[Result] = []
-        definitive_result_found: bool = False
-        while True:
-            if processes_alive == 0:  # Every planner gave a result
-                break
-            (idx, res) = signaling_queue.get(block=True)
-            processes_alive -= 1
-            if isinstance(res, BaseException):
+        while len(pending) > 0:  # Wait until every planner gives a result
+            res_item = self._pool.get(pending)
+            if res_item is None:
+                continue
+            call_id, res = res_item
+            del pending[call_id]
+            if res is None:
+                continue  # The worker died without giving a result
+            elif isinstance(res, BaseException):
+                self._pool.cancel(pending)
                 raise res
             else:
                 assert isinstance(res, Result)
                 # If the planner is sure about the result (optimality of the result or impossibility of the problem or the problem does not need optimality) exit the loop
                 if res.is_definitive_result(*args):
-                    definitive_result_found = True
-                    break
+                    self._pool.cancel(pending)
+                    return [res]
                 else:
                     results.append(res)
-        for p in processes:
-            p.terminate()
-        if definitive_result_found:  # A planner found a definitive result
-            return [res]
         return results
 
+    def destroy(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
     def _solve(
         self,
         problem: "up.model.AbstractProblem",
@@ -197,27 +218,381 @@ class Parallel(
                 raise UPUsageError(
                     "Parallel engines cannot validate this kind of problem!"
                 )
-        return cast(ValidationResult, self._run_parallel("validate", problem, plan)[0])
+        results = self._run_parallel("validate", problem, plan)
+        if len(results) == 0:
+            raise UPException(
+                "Every worker of the Parallel engine died while validating the plan"
+            )
+        return cast(ValidationResult, results[0])
+
+
+class _Cancelled(BaseException):
+    """Raised in a worker when the running call is cancelled by the `WorkerPool`."""
+
+    pass
+
+
+# The signal used to cancel the running call of a worker; on the platforms without
+# it (Windows) the workers can not be interrupted, so they are terminated.
+_CANCEL_SIGNAL: Optional[int] = getattr(signal, "SIGUSR1", None)
+
+
+class WorkerPool:
+    """
+    A pool of warm worker processes, each one running an :class:`~unified_planning.engines.Engine`.
+
+    The workers are identified by an index and they are started lazily; every
+    worker creates its `Engine` once and serves all the calls submitted to it until
+    the pool is shut down. A call can be cancelled cooperatively, so that the
+    `Engine` can clean up its resources (for example killing the planner
+    subprocess); the workers that do not stop within `cancellation_timeout`
+    seconds are terminated and restarted by the following :func:`start`.
+
+    This is the pool used by the :class:`~unified_planning.engines.Parallel`
+    engine, but it can also be used to run the same `Engine` on many problems.
+    """
+
+    def __init__(
+        self,
+        factory: "up.engines.factory.Factory",
+        cancellation_timeout: float = 5.0,
+    ):
+        self._factory = factory
+        self.cancellation_timeout = cancellation_timeout
+        self._workers: Dict[int, _Worker] = {}
+        self._results_queue: Optional[Queue] = None
+        self._calls_count = 0
+        # The workers are not daemonic, so that their engines can start processes
+        # of their own; they are stopped when the pool is collected or, at the
+        # latest, when the process that owns the pool exits
+        self._finalizer = Finalize(
+            self,
+            _stop_workers,
+            args=(self._workers, cancellation_timeout),
+            exitpriority=10,
+        )
+
+    def start(
+        self,
+        engines: Sequence[
+            Tuple[Union[str, Type["up.engines.engine.Engine"]], Dict[str, Any]]
+        ],
+    ):
+        """
+        Makes sure that the worker `i` runs the `i-th` of the given engines; the
+        workers that are already running the wanted engine are kept warm.
+
+        :param engines: The `Engines` of the workers, given by their name in the
+            `Factory` or by their class, with their options.
+        """
+        if self._results_queue is None:
+            self._results_queue = Queue()
+        for idx, (engine_name, options) in enumerate(engines):
+            worker = self._workers.get(idx, None)
+            if worker is not None and (
+                not worker.process.is_alive()
+                or worker.engine_name != engine_name
+                or worker.options != options
+            ):
+                worker.shutdown()
+                worker.join(self.cancellation_timeout)
+                worker = None
+            if worker is None:
+                self._workers[idx] = _Worker(
+                    idx, self._factory, engine_name, options, self._results_queue
+                )
+
+    def submit(
+        self,
+        idx: int,
+        fname: str,
+        skip_checks: bool,
+        error_on_failed_checks: bool,
+        payload: bytes,
+    ) -> int:
+        """
+        Submits the call of the given method of the `Engine` to the worker `idx`.
+
+        :param idx: The index of the worker.
+        :param fname: The name of the `Engine` method to call.
+        :param skip_checks: The `skip_checks` flag of the `Engine`.
+        :param error_on_failed_checks: The `error_on_failed_checks` flag of the `Engine`.
+        :param payload: The arguments of the call, serialized with `serialize_arguments`.
+        :return: The id of the submitted call.
+        """
+        self._calls_count += 1
+        self._workers[idx].submit(
+            self._calls_count, fname, skip_checks, error_on_failed_checks, payload
+        )
+        return self._calls_count
+
+    def get(
+        self, pending: Dict[int, int], timeout: float = 1
+    ) -> Optional[Tuple[int, Any]]:
+        """
+        Waits for the result of one of the pending calls.
+
+        :param pending: The map from the id of the pending calls to the index of
+            the worker running them.
+        :param timeout: The maximum time to wait, in seconds.
+        :return: `None` if no call ended within the `timeout`, otherwise the
+            id of the ended call and its result; the result is the returned value
+            or the raised `Exception`, or `None` if the worker died.
+        """
+        assert self._results_queue is not None
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            try:
+                (idx, call_id, res) = pickle.loads(
+                    self._results_queue.get(block=True, timeout=max(remaining, 0))
+                )
+            except queue.Empty:
+                # A worker that died without giving a result will be restarted by
+                # the next start
+                for call_id, idx in pending.items():
+                    worker = self._workers.get(idx, None)
+                    if worker is None or not worker.process.is_alive():
+                        self._workers.pop(idx, None)
+                        return call_id, None
+                return None
+            if call_id in pending:
+                return call_id, res
+            # Otherwise, it is a late result of a cancelled call
+
+    def cancel(self, pending: Dict[int, int]):
+        """
+        Cancels the pending calls; the workers that do not acknowledge the
+        cancellation within `cancellation_timeout` seconds are terminated.
+
+        :param pending: The map from the id of the calls to cancel to the index
+            of the worker running them.
+        """
+        assert self._results_queue is not None
+        pending = dict(pending)
+        for call_id, idx in list(pending.items()):
+            if not self._workers[idx].cancel(call_id):
+                self._workers.pop(idx).terminate()
+                del pending[call_id]
+        deadline = time.time() + self.cancellation_timeout
+        while len(pending) > 0:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                _, call_id, _ = pickle.loads(
+                    self._results_queue.get(block=True, timeout=remaining)
+                )
+            except queue.Empty:
+                break
+            pending.pop(call_id, None)
+        for idx in pending.values():
+            self._workers.pop(idx).terminate()
+
+    def shutdown(self):
+        """Stops all the workers of the pool."""
+        _stop_workers(self._workers, self.cancellation_timeout)
+        if self._results_queue is not None:
+            self._results_queue.close()
+            self._results_queue = None
+
+
+class _Worker:
+    """
+    The parent side of a warm process of the `WorkerPool`.
+
+    The process creates its engine once and then serves the calls received on
+    its own tasks queue, putting the results (tagged with the engine index and
+    the call id) in the results queue shared by all the workers.
+    """
+
+    def __init__(
+        self,
+        idx: int,
+        factory: "up.engines.factory.Factory",
+        engine_name: Union[str, Type["up.engines.engine.Engine"]],
+        options: Dict[str, Any],
+        results_queue: Queue,
+    ):
+        self.idx = idx
+        self.engine_name = engine_name
+        self.options = options
+        self.tasks_queue: Queue = Queue()
+        # The id of the last cancelled call, read by the process when it is signaled
+        self.cancelled_call = Value("q", 0)
+        self.process = Process(
+            name=f"{getattr(engine_name, '__name__', engine_name)}-{idx}",
+            target=_run,
+            args=(
+                idx,
+                factory,
+                engine_name,
+                options,
+                self.tasks_queue,
+                results_queue,
+                self.cancelled_call,
+            ),
+            daemon=False,
+        )
+        self.process.start()
+
+    def submit(
+        self,
+        call_id: int,
+        fname: str,
+        skip_checks: bool,
+        error_on_failed_checks: bool,
+        payload: bytes,
+    ):
+        self.tasks_queue.put(
+            (call_id, fname, skip_checks, error_on_failed_checks, payload)
+        )
+
+    def cancel(self, call_id: int) -> bool:
+        """Asks the process to interrupt the given call, returns `False` if it can not."""
+        pid = self.process.pid
+        if _CANCEL_SIGNAL is None or pid is None or not self.process.is_alive():
+            return False
+        with self.cancelled_call.get_lock():
+            self.cancelled_call.value = call_id
+        try:
+            os.kill(pid, _CANCEL_SIGNAL)
+        except OSError:
+            return False
+        return True
+
+    def shutdown(self):
+        if self.process.is_alive():
+            self.tasks_queue.put(None)
+
+    def join(self, timeout: float):
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.terminate()
+        self.tasks_queue.close()
+
+    def terminate(self):
+        self.process.terminate()
+        self.process.join()
+        self.tasks_queue.close()
+
+
+def _stop_workers(workers: Dict[int, _Worker], timeout: float):
+    """Stops the given workers, terminating the ones that do not exit within `timeout` seconds."""
+    for worker in workers.values():
+        worker.shutdown()
+    for worker in workers.values():
+        worker.join(timeout)
+    workers.clear()
+
+
+def serialize_arguments(args: Tuple) -> bytes:
+    """
+    Serializes the arguments of a call sent to the workers; when the protobuf
+    package is available and the first argument is a problem, the problem and the
+    plan are sent in the protobuf form, that is more compact than the pickled
+    problem with all its environment.
+    """
+    problem, *others = args
+    if not isinstance(problem, up.model.AbstractProblem):
+        return pickle.dumps(("pickle", args), pickle.HIGHEST_PROTOCOL)
+    try:
+        from unified_planning.grpc.proto_writer import ProtobufWriter  # type: ignore[attr-defined]
+    except ImportError:
+        ProtobufWriter = None
+    if ProtobufWriter is not None:
+        try:
+            writer = ProtobufWriter()
+            problem_msg = writer.convert(problem).SerializeToString()
+            if len(others) > 0 and isinstance(others[0], Plan):
+                plan_msg = writer.convert(others[0]).SerializeToString()
+                return pickle.dumps(
+                    ("protobuf", problem_msg, plan_msg, others[1:]),
+                    pickle.HIGHEST_PROTOCOL,
+                )
+            return pickle.dumps(
+                ("protobuf", problem_msg, None, others), pickle.HIGHEST_PROTOCOL
+            )
+        except Exception:
+            pass  # The problem is not supported by the protobuf writer
+    return pickle.dumps(("pickle", args), pickle.HIGHEST_PROTOCOL)
+
+
+def _deserialize(payload: bytes, env: "up.environment.Environment") -> Tuple:
+    data = pickle.loads(payload)
+    if data[0] == "pickle":
+        return data[1]
+    import unified_planning.grpc.generated.unified_planning_pb2 as proto  # type: ignore[attr-defined]
+    from unified_planning.grpc.proto_reader import ProtobufReader  # type: ignore[attr-defined]
+
+    _, problem_msg, plan_msg, others = data
+    reader = ProtobufReader()
+    problem = reader.convert(proto.Problem.FromString(problem_msg), env)
+    if plan_msg is None:
+        return (problem, *others)
+    plan = reader.convert(proto.Plan.FromString(plan_msg), problem)
+    return (problem, plan, *others)
 
 
 def _run(
     idx: int,
     factory: "up.engines.factory.Factory",
-    engine_name: str,
-    options: Dict[str, str],
-    skip_checks: bool,
-    error_on_failed_checks: bool,
-    signaling_queue: Queue,
-    fname: str,
-    *args,
+    engine_name: Union[str, Type["up.engines.engine.Engine"]],
+    options: Dict[str, Any],
+    tasks_queue: Queue,
+    results_queue: Queue,
+    cancelled_call: Any,
 ):
-    EngineClass = factory.engine(engine_name)
-    with EngineClass(**options) as s:
-        s.skip_checks = skip_checks
-        s.error_on_failed_checks = error_on_failed_checks
+    running_call: Optional[int] = None
+
+    def _on_cancel(signum, frame):
+        # The signal can arrive late, so only the call that is running is cancelled
+        if running_call is not None and running_call == cancelled_call.value:
+            raise _Cancelled()
+
+    if _CANCEL_SIGNAL is not None:
+        signal.signal(_CANCEL_SIGNAL, _on_cancel)
+    if isinstance(engine_name, str):
+        EngineClass = factory.engine(engine_name)
+    else:
+        EngineClass = engine_name
+    engine: Optional["up.engines.engine.Engine"] = None
+    while True:
+        task = tasks_queue.get(block=True)
+        if task is None:
+            break
+        call_id, fname, skip_checks, error_on_failed_checks, payload = task
+        local_res: Any = None
+        try:
+            args = _deserialize(payload, factory.environment)
+            if engine is None:
+                # The engine takes the problem at every call, so it is kept warm
+                # whatever the environment of the problems it receives
+                engine = EngineClass(**options)
+            engine.skip_checks = skip_checks
+            engine.error_on_failed_checks = error_on_failed_checks
+            running_call = call_id
+            try:
+                if cancelled_call.value == call_id:
+                    raise _Cancelled()  # Cancelled before starting
+                local_res = getattr(engine, fname)(*args)
+            finally:
+                running_call = None
+        except _Cancelled:
+            # The interrupted engine might be in an inconsistent state, so a new
+            # one is created for the next call
+            if engine is not None:
+                engine.destroy()
+            engine = None
+        except Exception as ex:
+            local_res = ex
+        # The result is serialized here, because the queue would silently drop a
+        # result that can not be pickled, leaving the call pending forever
         try:
-            local_res = getattr(s, fname)(*args)
+            message = pickle.dumps((idx, call_id, local_res), pickle.HIGHEST_PROTOCOL)
         except Exception as ex:
-            signaling_queue.put((idx, ex))
-            return
-        signaling_queue.put((idx, local_res))
+            error = UPException(f"The result of the {fname} call can not be sent: {ex}")
+            message = pickle.dumps((idx, call_id, error), pickle.HIGHEST_PROTOCOL)
+        results_queue.put(message)
+    if engine is not None:
+        engine.destroy()
@@ -32,7 +32,7 @@ from unified_planning.engines.results import (
     PlanGenerationResult,
     PlanGenerationResultStatus,
 )
-from unified_planning.io.pddl_writer import PDDLWriter
+from unified_planning.io.pddl_writer import PDDLWriter, PDDLWriterCache
 from unified_planning.exceptions import UPException
 from asyncio.subprocess import PIPE
 from fractions import Fraction
@@ -68,6 +68,8 @@ class PDDLPlanner(engines.engine.Engine, mixins.OneshotPlannerMixin):
         engines.engine.Engine.__init__(self)
         mixins.OneshotPlannerMixin.__init__(self)
         self._needs_requirements = needs_requirements
+        # The PDDL of the domain is generated again only if it changes between solves
+        self._writer_cache = PDDLWriterCache()
 
     def _get_cmd(
         self, domain_filename: str, problem_filename: str, plan_filename: str
@@ -166,7 +168,7 @@ class PDDLPlanner(engines.engine.Engine, mixins.OneshotPlannerMixin):
         output_stream: Optional[IO[str]] = None,
     ) -> "up.engines.results.PlanGenerationResult":
         assert isinstance(problem, up.model.Problem)
-        w = PDDLWriter(problem, self._needs_requirements)
+        w = PDDLWriter(problem, self._needs_requirements, self._writer_cache)
         plan = None
         logs: List["up.engines.results.LogMessage"] = []
         with tempfile.TemporaryDirectory() as tempdir:
@@ -191,6 +193,14 @@ class PDDLPlanner(engines.engine.Engine, mixins.OneshotPlannerMixin):
                     proc_out, proc_err = [[x.decode()] for x in out_err_bytes]
                 except subprocess.TimeoutExpired:
                     timeout_occurred = True
+                    process.kill()
+                    process.communicate()
+                except BaseException:
+                    # The call was interrupted (for example cancelled by the
+                    # Parallel engine), so the planner must not be left running
+                    process.kill()
+                    process.wait()
+                    raise
                 retval = process.returncode
             else:
                 if sys.platform == "win32":
@@ -15,13 +15,40 @@
 
 
 import unified_planning as up
+from itertools import chain
 from unified_planning.engines.compilers import Grounder, GrounderHelper
 from unified_planning.engines.engine import Engine
 from unified_planning.engines.mixins.simulator import Event, SimulatorMixin
 from unified_planning.exceptions import UPUsageError, UPConflictingEffectsException
 from unified_planning.plans import ActionInstance
-from unified_planning.model.walkers import StateEvaluator
-from typing import Dict, Iterator, List, Optional, Set, Tuple, Union, cast
+from unified_planning.model.walkers import CompiledStateEvaluator
+from unified_planning.model.walkers.compiled_state_evaluator import (
+    CompiledExpression,
+    NO_VARIABLES,
+)
+from typing import (
+    Container,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
+
+# The compiled version of an Effect: the grounded fluent (None if the fluent
+# arguments must be evaluated in the state), the compiled fluent arguments,
+# the compiled condition (None if the effect is not conditional) and the compiled value.
+CompiledEffect = Tuple[
+    "up.model.Effect",
+    Optional["up.model.FNode"],
+    List[CompiledExpression],
+    Optional[CompiledExpression],
+    CompiledExpression,
+]
 
 
 class InstantaneousEvent(Event):
@@ -65,8 +92,34 @@ class SequentialSimulator(Engine, SimulatorMixin):
         self._events: Dict[
             Tuple["up.model.Action", Tuple["up.model.FNode", ...]], List[Event]
         ] = {}
-        self._se = StateEvaluator(self._problem)
+        self._se = CompiledStateEvaluator(self._problem)
+        self._compiled_effects: Dict[Event, List[CompiledEffect]] = {}
         self._all_events_grounded: bool = False
+        # Data structures used by get_applicable_events_incremental, created at the first call:
+        # the position of every grounded event, used to keep the events order deterministic,
+        # the map from every grounded fluent to the events whose conditions read it and
+        # the events that must always be checked, because the fluents read by their
+        # conditions can't be known before evaluating them (for example nested fluents).
+        self._events_position: Optional[Dict[Event, int]] = None
+        self._watching_events: Dict["up.model.FNode", List[Event]] = {}
+        self._unwatched_events: List[Event] = []
+        self._state_layout: Optional["up.model.StateLayout"] = None
+
+    def get_initial_state(self) -> "up.model.PackedState":
+        """
+        Returns the initial state of the `Problem` given at construction time, represented
+        as a :class:`~unified_planning.model.PackedState`.
+
+        The :class:`~unified_planning.model.StateLayout` is computed at the first call and
+        shared by all the states derived from the returned one.
+
+        :return: The `PackedState` representing the initial state of the `Problem`.
+        """
+        if self._state_layout is None:
+            self._state_layout = up.model.StateLayout(
+                cast(up.model.Problem, self._problem)
+            )
+        return self._state_layout.initial_state
 
     def _get_unsatisfied_conditions(
         self, event: "Event", state: "up.model.ROState", early_termination: bool = False
@@ -83,12 +136,9 @@ class SequentialSimulator(Engine, SimulatorMixin):
         # Evaluate every condition and if the condition is False or the condition is not simplified as a
         # boolean constant in the given state, return False. Return True otherwise
         unsatisfied_conditions = []
+        compile = self._se.compile
         for c in event.conditions:
-            evaluated_cond = self._se.evaluate(c, state)
-            if (
-                not evaluated_cond.is_bool_constant()
-                or not evaluated_cond.bool_constant_value()
-            ):
+            if not compile(c)(state, NO_VARIABLES):
                 unsatisfied_conditions.append(c)
                 if early_termination:
                     break
@@ -127,20 +177,25 @@ class SequentialSimulator(Engine, SimulatorMixin):
         updated_values: Dict["up.model.FNode", "up.model.FNode"] = {}
         assigned_fluent: Set["up.model.FNode"] = set()
         em = self._problem.env.expression_manager
-        for e in event.effects:
-            evaluated_args = tuple(self._se.evaluate(a, state) for a in e.fluent.args)
-            fluent = self._problem.env.expression_manager.FluentExp(
-                e.fluent.fluent(), evaluated_args
-            )
-            if (not e.is_conditional()) or self._se.evaluate(
-                e.condition, state
-            ).is_true():
+        to_fnode = self._se.to_fnode
+        compiled_effects = self._compiled_effects.get(event, None)
+        if compiled_effects is None:
+            compiled_effects = self._compile_effects(event)
+        for e, grounded_fluent, fluent_args, condition, value in compiled_effects:
+            if grounded_fluent is not None:
+                fluent = grounded_fluent
+            else:
+                fluent = em.FluentExp(
+                    e.fluent.fluent(),
+                    tuple(to_fnode(a(state, NO_VARIABLES)) for a in fluent_args),
+                )
+            if condition is None or condition(state, NO_VARIABLES):
                 if e.is_assignment():
                     if fluent in updated_values:
                         raise UPConflictingEffectsException(
                             f"The fluent {fluent} is modified by 2 assignments in the same event."
                         )
-                    updated_values[fluent] = self._se.evaluate(e.value, state)
+                    updated_values[fluent] = to_fnode(value(state, NO_VARIABLES))
                     assigned_fluent.add(fluent)
                 else:
                     if fluent in assigned_fluent:
@@ -149,18 +204,18 @@ class SequentialSimulator(Engine, SimulatorMixin):
                         )
                     # If the fluent is in updated_values, we take his modified value, (which was modified by another increase or deacrease)
                     # otherwisee we take it's evaluation in the state as it's value.
-                    f_eval = updated_values.get(
-                        fluent, self._se.evaluate(fluent, state)
-                    )
-                    v_eval = self._se.evaluate(e.value, state)
+                    f_eval = updated_values.get(fluent, None)
+                    if f_eval is None:
+                        f_eval = state.get_value(fluent)
+                    v_eval = value(state, NO_VARIABLES)
                     if e.is_increase():
-                        updated_values[fluent] = em.auto_promote(
-                            f_eval.constant_value() + v_eval.constant_value()
-                        )[0]
+                        updated_values[fluent] = to_fnode(
+                            f_eval.constant_value() + v_eval
+                        )
                     elif e.is_decrease():
-                        updated_values[fluent] = em.auto_promote(
-                            f_eval.constant_value() - v_eval.constant_value()
-                        )[0]
+                        updated_values[fluent] = to_fnode(
+                            f_eval.constant_value() - v_eval
+                        )
                     else:
                         raise NotImplementedError
         if event.simulated_effect is not None:
@@ -175,6 +230,30 @@ class SequentialSimulator(Engine, SimulatorMixin):
                 updated_values[f] = v
         return state.make_child(updated_values)
 
+    def _compile_effects(self, event: "Event") -> List[CompiledEffect]:
+        """
+        Compiles the effects of the given event with the `CompiledStateEvaluator` and caches the result,
+        so every following application of the event evaluates the effects without walking their expressions.
+
+        :param event: The event whose effects are compiled.
+        :return: The list of compiled effects of the given event.
+        """
+        compiled_effects: List[CompiledEffect] = []
+        compile = self._se.compile
+        for e in event.effects:
+            if all(a.is_constant() for a in e.fluent.args):
+                grounded_fluent: Optional["up.model.FNode"] = e.fluent
+                fluent_args: List[CompiledExpression] = []
+            else:
+                grounded_fluent = None
+                fluent_args = [compile(a) for a in e.fluent.args]
+            condition = compile(e.condition) if e.is_conditional() else None
+            compiled_effects.append(
+                (e, grounded_fluent, fluent_args, condition, compile(e.value))
+            )
+        self._compiled_effects[event] = compiled_effects
+        return compiled_effects
+
     def _get_applicable_events(self, state: "up.model.ROState") -> Iterator["Event"]:
         """
         Returns a view over all the events that are applicable in the given State;
@@ -208,6 +287,89 @@ class SequentialSimulator(Engine, SimulatorMixin):
                     if self.is_applicable(event, state):
                         yield event
 
+    def get_applicable_events_incremental(
+        self,
+        state: "up.model.ROState",
+        parent_applicable_events: Container["Event"],
+        updated_fluents: Iterable["up.model.FNode"],
+    ) -> Tuple[List["Event"], List["Event"]]:
+        """
+        Returns the changes of the events applicable in the given `state` with respect to its parent `state`,
+        knowing the events applicable in the parent `state` and the grounded fluents that have a different
+        value in the given `state`.
+
+        Every grounded event is indexed by the grounded fluents read by its conditions, so only the events
+        watching one of the `updated_fluents` are re-evaluated; all the other events keep the applicability
+        they had in the parent `state`. The cost is proportional to the number of re-evaluated events, so the
+        caller keeps the applicable events in a structure that is updated in place with the returned changes.
+
+        The `updated_fluents` are the keys of the dictionary given to :func:`~unified_planning.model.COWState.make_child`
+        to create the given `state`; with :class:`~unified_planning.model.PackedState` they can also be computed
+        with the :func:`~unified_planning.model.PackedState.diff` method.
+
+        :param state: The state where the events applicability is computed.
+        :param parent_applicable_events: The events applicable in the parent of the given `state`, in a container with
+            a fast membership test (for example a `set`); for the initial state use
+            :func:`~unified_planning.engines.mixins.SimulatorMixin.get_applicable_events`.
+        :param updated_fluents: The grounded fluents whose value in the given `state` is different from the
+            value in the parent state.
+        :return: The events that are applicable in the given `state` and not in the parent `state`, and the events
+            that are applicable in the parent `state` and not in the given `state`; both lists are ordered as in
+            the total grounding of the `Problem`.
+        """
+        events_position = self._get_events_position()
+        checked: Set[Event] = set()
+        added: List[Event] = []
+        removed: List[Event] = []
+        watching_events = self._watching_events
+        for events in chain(
+            (self._unwatched_events,),
+            (watching_events.get(f, ()) for f in updated_fluents),
+        ):
+            for event in events:
+                if event in checked:
+                    continue
+                checked.add(event)
+                if self.is_applicable(event, state):
+                    if event not in parent_applicable_events:
+                        added.append(event)
+                elif event in parent_applicable_events:
+                    removed.append(event)
+        added.sort(key=events_position.__getitem__)
+        removed.sort(key=events_position.__getitem__)
+        return added, removed
+
+    def _get_events_position(self) -> Dict["Event", int]:
+        """
+        Grounds the whole `Problem`, if it was not already grounded, and creates the index from grounded fluents
+        to the events reading them in their conditions.
+
+        :return: The map from every grounded event to its position in the total grounding of the `Problem`.
+        """
+        if self._events_position is None:
+            events_position: Dict[Event, int] = {}
+            fve = self._problem.env.free_vars_extractor
+            for (
+                original_action,
+                params,
+                grounded_action,
+            ) in self._grounder.get_grounded_actions():
+                for event in self._get_or_create_events(
+                    original_action, params, grounded_action
+                ):
+                    events_position[event] = len(events_position)
+                    watched_fluents: Set["up.model.FNode"] = set()
+                    for c in event.conditions:
+                        watched_fluents.update(fve.get(c))
+                    if all(a.is_constant() for f in watched_fluents for a in f.args):
+                        for f in watched_fluents:
+                            self._watching_events.setdefault(f, []).append(event)
+                    else:
+                        self._unwatched_events.append(event)
+            self._all_events_grounded = True
+            self._events_position = events_position
+        return self._events_position
+
     def _get_events(
         self,
         action: "up.model.Action",
@@ -246,9 +408,9 @@ class SequentialSimulator(Engine, SimulatorMixin):
         :return: The list of all the goals that evaluated to False or the list containing the first goal evaluated to False if the flag "early_termination" is set.
         """
         unsatisfied_goals = []
+        compile = self._se.compile
         for g in cast(up.model.Problem, self._problem).goals:
-            g_eval = self._se.evaluate(g, state).bool_constant_value()
-            if not g_eval:
+            if not compile(g)(state, NO_VARIABLES):
                 unsatisfied_goals.append(g)
                 if early_termination:
                     break
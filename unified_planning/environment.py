@@ -45,7 +45,11 @@ class Environment:
         self._tc = unified_planning.model.walkers.TypeChecker(self)
         self._expression_manager = unified_planning.model.ExpressionManager(self)
         self._free_vars_oracle = unified_planning.model.FreeVarsOracle()
+        self._simplification_cache = (
+            unified_planning.model.walkers.SimplificationCache()
+        )
         self._simplifier = unified_planning.model.walkers.Simplifier(self)
+        self._normal_form_cache = unified_planning.model.walkers.NormalFormCache()
         self._free_vars_extractor = unified_planning.model.walkers.FreeVarsExtractor()
         self._credits_stream: Optional[IO[str]] = sys.stdout
 
@@ -96,6 +100,18 @@ class Environment:
         """Returns the environment's `Simplifier`."""
         return self._simplifier
 
+    @property
+    def simplification_cache(
+        self,
+    ) -> "unified_planning.model.walkers.SimplificationCache":
+        """Returns the `SimplificationCache` shared by the environment's `Simplifiers`."""
+        return self._simplification_cache
+
+    @property
+    def normal_form_cache(self) -> "unified_planning.model.walkers.NormalFormCache":
+        """Returns the `NormalFormCache` shared by the environment's `Nnf` and `Dnf` walkers."""
+        return self._normal_form_cache
+
     @property
     def free_vars_extractor(self) -> "unified_planning.model.walkers.FreeVarsExtractor":
         """Returns the environment's `FreeVarsExtractor`."""
@@ -63,3 +63,7 @@ class UPNoRequestedEngineAvailableException(UPException):
 
 class UPConflictingEffectsException(UPException):
     pass
+
+
+class UPNormalFormSizeError(UPException):
+    pass
@@ -1,4 +1,4 @@
 from unified_planning.io.python_writer import PythonWriter
 from unified_planning.io.pddl_reader import PDDLReader
-from unified_planning.io.pddl_writer import PDDLWriter
+from unified_planning.io.pddl_writer import PDDLWriter, PDDLWriterCache
 from unified_planning.io.anml_writer import ANMLWriter
@@ -13,6 +13,7 @@
 # limitations under the License.
 #
 
+import re
 from itertools import product
 import unified_planning as up
 import unified_planning.model.htn as htn
@@ -24,7 +25,7 @@ from unified_planning.exceptions import UPUsageError
 from unified_planning.model import FNode
 from collections import OrderedDict
 from fractions import Fraction
-from typing import Dict, Union, Callable, List, cast
+from typing import Any, Dict, Iterator, Union, Callable, List, cast
 from pyparsing import Word, alphanums, alphas, ZeroOrMore, OneOrMore, Keyword
 from pyparsing import Optional, Suppress, nestedExpr, Group, restOfLine
 
@@ -245,6 +246,132 @@ class PDDLGrammar:
         return self._parameters
 
 
+# A token is a parenthesis, a comment or a sequence of characters without spaces and parenthesis
+_TOKEN_RE = re.compile(r";[^\n]*|[()]|[^\s();]+")
+
+# The problem sections handled by the fast problem parser; every other section
+# is left to the pyparsing grammar.
+_FAST_PROBLEM_SECTIONS = {":requirements", ":objects", ":init", ":goal", ":metric"}
+
+
+class _UnsupportedSyntax(Exception):
+    """Raised when the fast problem parser can't handle the given file."""
+
+
+def _tokenize(lines: typing.Iterable[str]) -> Iterator[str]:
+    """Yields the tokens of the given lines, skipping the comments."""
+    for line in lines:
+        for token in _TOKEN_RE.findall(line):
+            if token[0] != ";":
+                yield token
+
+
+def _read_sexp(tokens: Iterator[str]) -> List[Any]:
+    """
+    Reads the first S-expression from the given tokens and returns it as nested lists
+    of strings. The expression is read iteratively, so it can be arbitrarily deep.
+    """
+    stack: List[List[Any]] = []
+    for token in tokens:
+        if token == "(":
+            stack.append([])
+        elif token == ")":
+            if not stack:
+                raise _UnsupportedSyntax("Unbalanced parenthesis")
+            closed = stack.pop()
+            if not stack:
+                return closed
+            stack[-1].append(closed)
+        elif stack:
+            stack[-1].append(token)
+        else:
+            raise _UnsupportedSyntax(f"Unexpected token {token} outside of parenthesis")
+    raise _UnsupportedSyntax("Unexpected end of file")
+
+
+def _read_typed_list(items: List[Any]) -> List[List[Any]]:
+    """
+    Reads a typed list of names, like `a b - t c`, into the groups returned by the
+    `PDDLGrammar`: `[[["a", "b"], "t"], [["c"]]]`.
+    """
+    res: List[List[Any]] = []
+    names: List[str] = []
+    i, size = 0, len(items)
+    while i < size:
+        item = items[i]
+        if not isinstance(item, str):
+            raise _UnsupportedSyntax(f"Unexpected expression {item} in a typed list")
+        if item == "-":
+            if not names or i + 1 == size or not isinstance(items[i + 1], str):
+                raise _UnsupportedSyntax("Malformed typed list")
+            res.append([names, items[i + 1]])
+            names = []
+            i += 2
+        else:
+            names.append(item)
+            i += 1
+    if names:
+        res.append([names])
+    return res
+
+
+def _read_problem(problem_filename: str) -> Dict[str, Any]:
+    """
+    Reads the given `PDDL` problem file with a streaming tokenizer and a recursive
+    descent parser, without using pyparsing; this is much faster than the
+    `PDDLGrammar` on problems with big `:objects` and `:init` sections.
+
+    The returned dict has the same structure of the `ParseResults` returned by
+    the `PDDLGrammar` problem, with lists in place of the `ParseResults`.
+    Raises `_UnsupportedSyntax` if the file contains something not handled here.
+    """
+    with open(problem_filename, "r") as problem_file:
+        tokens = _tokenize(problem_file)
+        define = _read_sexp(tokens)
+        if next(tokens, None) is not None:
+            raise _UnsupportedSyntax("Unexpected tokens after the problem definition")
+    if (
+        len(define) < 3
+        or define[0] != "define"
+        or not isinstance(define[1], list)
+        or len(define[1]) != 2
+        or define[1][0] != "problem"
+        or not isinstance(define[2], list)
+        or len(define[2]) != 2
+        or define[2][0] != ":domain"
+    ):
+        raise _UnsupportedSyntax("Malformed problem header")
+    res: Dict[str, Any] = {"name": define[1][1]}
+    found_sections = set()
+    for section in define[3:]:
+        if not isinstance(section, list) or len(section) == 0:
+            raise _UnsupportedSyntax(f"Malformed section {section}")
+        keyword = section[0]
+        if keyword not in _FAST_PROBLEM_SECTIONS or keyword in found_sections:
+            raise _UnsupportedSyntax(f"Section {keyword} not supported")
+        found_sections.add(keyword)
+        if keyword == ":objects":
+            res["objects"] = _read_typed_list(section[1:])
+        elif keyword == ":init":
+            for atom in section[1:]:
+                if not isinstance(atom, list):
+                    raise _UnsupportedSyntax(f"Malformed initial value {atom}")
+            res["init"] = section[1:]
+        elif keyword == ":goal":
+            if len(section) != 2 or not isinstance(section[1], list):
+                raise _UnsupportedSyntax("Malformed goal")
+            res["goal"] = [section[1]]
+        elif keyword == ":metric":
+            if len(section) != 3 or section[1] not in ("minimize", "maximize"):
+                raise _UnsupportedSyntax("Malformed metric")
+            res["optimization"] = section[1]
+            metric = section[2]
+            res["metric"] = [metric] if isinstance(metric, list) else metric
+    if ":init" not in found_sections:
+        raise _UnsupportedSyntax("Missing init section")
+    return res
+
+
 class PDDLReader:
     """
     Parse a `PDDL` domain file and, optionally, a `PDDL` problem file and generate the equivalent :class:`~unified_planning.model.Problem`.
@@ -282,7 +409,7 @@ class PDDLReader:
         act: typing.Optional[Union[up.model.Action, htn.Method]],
         types_map: Dict[str, up.model.Type],
         var: Dict[str, up.model.Variable],
-        exp: Union[ParseResults, str],
+        exp: Union[ParseResults, List[Any], str],
         assignments: Dict[str, "up.model.Object"] = {},
     ) -> up.model.FNode:
         stack = [(var, exp, False)]
@@ -310,9 +437,14 @@ class PDDLReader:
                 else:
                     raise up.exceptions.UPUnreachableCodeError
             else:
-                if isinstance(exp, ParseResults):
+                if isinstance(exp, (ParseResults, list)):
                     if len(exp) == 0:  # empty precodition
                         solved.append(self._em.TRUE())
+                    elif not isinstance(exp[0], str):
+                        if len(exp) != 1:
+                            raise SyntaxError(f"Not able to handle: {exp}")
+                        # expand an element inside brackets
+                        stack.append((var, exp[0], False))
                     elif exp[0] == "-" and len(exp) == 2:  # unary minus
                         stack.append((var, exp, True))
                         stack.append((var, exp[1], False))
@@ -861,7 +993,11 @@ class PDDLReader:
             problem.add_method(method)
 
         if problem_filename is not None:
-            problem_res = self._pp_problem.parseFile(problem_filename)
+            problem_res: Union[ParseResults, Dict[str, Any]]
+            try:
+                problem_res = _read_problem(problem_filename)
+            except _UnsupportedSyntax:
+                problem_res = self._pp_problem.parseFile(problem_filename)
 
             problem.name = problem_res["name"]
 
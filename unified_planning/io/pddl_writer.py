@@ -38,7 +38,7 @@ from unified_planning.exceptions import (
     UPException,
 )
 from unified_planning.model.types import _UserType
-from typing import Callable, Dict, IO, List, Optional, Set, Union, cast
+from typing import Any, Callable, Dict, IO, List, Optional, Set, Tuple, Union, cast
 from io import StringIO
 from functools import reduce
 
@@ -292,13 +292,57 @@ class ConverterToPDDLString(walkers.DagWalker):
         return f"(= {args[0]} {args[1]})"
 
 
+class PDDLWriterCache:
+    """
+    This class stores the `PDDL` generated by the :class:`PDDLWriters <unified_planning.io.PDDLWriter>`
+    created with it, so that writing many versions of the same :class:`~unified_planning.model.Problem`,
+    for example with only a different initial state or different goals, only generates
+    again the parts that changed since the last write.
+
+    The domain is cached as long as the name, the kind, the types, the fluents, the actions
+    and the quality metrics of the written problems do not change; the renamings and the
+    expression conversions are shared by all the `PDDLWriters` writing the same domain.
+    Every section of the problem (objects, init, goals and metric) is cached separately.
+    """
+
+    def __init__(self):
+        self._domain_key: Optional[Tuple[Any, ...]] = None
+        self._domain: Optional[str] = None
+        self._otn_renamings: Dict[Any, str] = {}
+        self._nto_renamings: Dict[str, Any] = {}
+        self._domain_objects: Optional[Dict[_UserType, Set[Object]]] = None
+        self._converter: Optional["ConverterToPDDLString"] = None
+        self._sections: Dict[str, Tuple[Tuple[Any, Any], str]] = {}
+
+    def _reset(self, domain_key: Tuple[Any, ...]):
+        self._domain_key = domain_key
+        self._domain = None
+        self._otn_renamings = {}
+        self._nto_renamings = {}
+        self._domain_objects = None
+        self._converter = None
+        self._sections = {}
+
+
 class PDDLWriter:
-    """This class can be used to write a :class:`~unified_planning.model.Problem` in `PDDL`."""
+    """
+    This class can be used to write a :class:`~unified_planning.model.Problem` in `PDDL`.
+
+    If a :class:`~unified_planning.io.PDDLWriterCache` is given, the `PDDL` generated for the
+    previous problems written with the same cache is reused where possible.
+    """
 
-    def __init__(self, problem: "up.model.Problem", needs_requirements: bool = True):
+    def __init__(
+        self,
+        problem: "up.model.Problem",
+        needs_requirements: bool = True,
+        cache: Optional[PDDLWriterCache] = None,
+    ):
         self.problem = problem
         self.problem_kind = self.problem.kind
         self.needs_requirements = needs_requirements
+        self._cache = cache
+        self._converter: Optional[ConverterToPDDLString] = None
         # otn represents the old to new renamings
         self.otn_renamings: Dict[
             Union[
@@ -325,8 +369,64 @@ class PDDLWriter:
         ] = {}
         # those 2 maps are "simmetrical", meaning that "(otn[k] == v) implies (nto[v] == k)"
         self.domain_objects: Optional[Dict[_UserType, Set[Object]]] = None
+        if cache is not None:
+            self._sync_with_cache(cache)
+
+    def _domain_key(self) -> Tuple[Any, ...]:
+        """Returns the key identifying the domain generated for the problem."""
+        actions = tuple(self.problem.actions)
+        return (
+            self.needs_requirements,
+            self.problem.name,
+            self.problem_kind,
+            tuple(self.problem.user_types),
+            tuple(self.problem.fluents),
+            actions,
+            # the actions might be modified in place, so the hashes are also compared
+            tuple(hash(a) for a in actions),
+            tuple(repr(m) for m in self.problem.quality_metrics),
+        )
+
+    def _sync_with_cache(self, cache: PDDLWriterCache):
+        """
+        Makes this writer share the renamings and the converted expressions of the
+        writers of the same domain; if the domain changed, the cache is reset.
+        """
+        domain_key = self._domain_key()
+        if cache._domain_key != domain_key:
+            cache._reset(domain_key)
+        self.otn_renamings = cache._otn_renamings
+        self.nto_renamings = cache._nto_renamings
+        if cache._domain_objects is None:
+            self._populate_domain_objects(ObjectsExtractor())
+            cache._domain_objects = self.domain_objects
+        self.domain_objects = cache._domain_objects
+        if cache._converter is None:
+            cache._converter = ConverterToPDDLString(
+                self.problem.env, self._get_mangled_name
+            )
+        self._converter = cache._converter
+        # the converter must use the problem of this writer to mangle new names
+        self._converter.get_mangled_name = self._get_mangled_name
+
+    def _get_converter(self) -> "ConverterToPDDLString":
+        if self._converter is None:
+            self._converter = ConverterToPDDLString(
+                self.problem.env, self._get_mangled_name
+            )
+        return self._converter
 
     def _write_domain(self, out: IO[str]):
+        if self._cache is None:
+            self._write_domain_content(out)
+            return
+        if self._cache._domain is None:
+            buffer = StringIO()
+            self._write_domain_content(buffer)
+            self._cache._domain = buffer.getvalue()
+        out.write(self._cache._domain)
+
+    def _write_domain_content(self, out: IO[str]):
         if self.problem_kind.has_intermediate_conditions_and_effects():
             raise UPProblemDefinitionError(
                 "PDDL2.1 does not support ICE.\nICE are Intermediate Conditions and Effects therefore when an Effect (or Condition) are not at StartTIming(0) or EndTIming(0)."
@@ -448,7 +548,7 @@ class PDDLWriter:
                 functions.append(f'({self._get_mangled_name(f)}{"".join(params)})')
             else:
                 raise UPTypeError("PDDL supports only boolean and numerical fluents")
-        if self.problem.kind.has_actions_cost() or self.problem.kind.has_plan_length():
+        if self.problem_kind.has_actions_cost() or self.problem_kind.has_plan_length():
             functions.append("(total-cost)")
         out.write(
             f' (:predicates {" ".join(predicates)})\n' if len(predicates) > 0 else ""
@@ -457,7 +557,7 @@ class PDDLWriter:
             f' (:functions {" ".join(functions)})\n' if len(functions) > 0 else ""
         )
 
-        converter = ConverterToPDDLString(self.problem.env, self._get_mangled_name)
+        converter = self._get_converter()
         costs = {}
         metrics = self.problem.quality_metrics
         if len(metrics) == 1:
@@ -607,68 +707,113 @@ class PDDLWriter:
             name = "pddl"
         else:
             name = _get_pddl_name(self.problem)
-        out.write(f"(define (problem {name}-problem)\n")
-        out.write(f" (:domain {name}-domain)\n")
         if self.domain_objects is None:
             # This method populates the self._domain_objects map
             self._populate_domain_objects(ObjectsExtractor())
         assert self.domain_objects is not None
-        if len(self.problem.user_types) > 0:
-            out.write(" (:objects")
-            for t in self.problem.user_types:
-                constants_of_this_type = self.domain_objects.get(
-                    cast(_UserType, t), None
+        out.write(f"(define (problem {name}-problem)\n (:domain {name}-domain)\n")
+        cache = self._cache
+        if cache is None:
+            out.write(self._get_objects_section())
+            out.write(self._get_init_section())
+            out.write(self._get_goal_section())
+            out.write(self._get_metric_section())
+        else:
+            problem = self.problem
+            sections: List[Tuple[str, Callable[[], Any], Callable[[], str]]] = [
+                (
+                    "objects",
+                    lambda: tuple(problem.all_objects),
+                    self._get_objects_section,
+                ),
+                (
+                    "init",
+                    lambda: (
+                        tuple(problem.all_objects),
+                        tuple(problem.explicit_initial_values.items()),
+                        tuple(problem.fluents_defaults.items()),
+                    ),
+                    self._get_init_section,
+                ),
+                ("goal", lambda: tuple(problem.goals), self._get_goal_section),
+                ("metric", lambda: None, self._get_metric_section),
+            ]
+            for section, get_key, get_section in sections:
+                key = get_key()
+                cached = cache._sections.get(section, None)
+                if cached is None or key not in cached[0]:
+                    text = get_section()
+                    # getting the initial values of the problem adds them to the explicit
+                    # initial values, so both the keys before and after are stored
+                    cached = ((key, get_key()), text)
+                    cache._sections[section] = cached
+                out.write(cached[1])
+        out.write(")\n")
+
+    def _get_objects_section(self) -> str:
+        assert self.domain_objects is not None
+        if len(self.problem.user_types) == 0:
+            return ""
+        res = [" (:objects"]
+        for t in self.problem.user_types:
+            constants_of_this_type = self.domain_objects.get(cast(_UserType, t), None)
+            if constants_of_this_type is None:
+                objects = [o for o in self.problem.all_objects if o.type == t]
+            else:
+                objects = [
+                    o
+                    for o in self.problem.all_objects
+                    if o.type == t and o not in constants_of_this_type
+                ]
+            if len(objects) > 0:
+                res.append(
+                    f'\n   {" ".join([self._get_mangled_name(o) for o in objects])} - {self._get_mangled_name(t)}'
                 )
-                if constants_of_this_type is None:
-                    objects = [o for o in self.problem.all_objects if o.type == t]
-                else:
-                    objects = [
-                        o
-                        for o in self.problem.all_objects
-                        if o.type == t and o not in constants_of_this_type
-                    ]
-                if len(objects) > 0:
-                    out.write(
-                        f'\n   {" ".join([self._get_mangled_name(o) for o in objects])} - {self._get_mangled_name(t)}'
-                    )
-            out.write("\n )\n")
-        converter = ConverterToPDDLString(self.problem.env, self._get_mangled_name)
-        out.write(" (:init")
+        res.append("\n )\n")
+        return "".join(res)
+
+    def _get_init_section(self) -> str:
+        converter = self._get_converter()
+        res = [" (:init"]
         for f, v in self.problem.initial_values.items():
             if v.is_true():
-                out.write(f" {converter.convert(f)}")
+                res.append(f" {converter.convert(f)}")
             elif v.is_false():
                 pass
             else:
-                out.write(f" (= {converter.convert(f)} {converter.convert(v)})")
-        if self.problem.kind.has_actions_cost():
-            out.write(f" (= (total-cost) 0)")
-        out.write(")\n")
-        out.write(
-            f' (:goal (and {" ".join([converter.convert(p) for p in self.problem.goals])}))\n'
-        )
+                res.append(f" (= {converter.convert(f)} {converter.convert(v)})")
+        if self.problem_kind.has_actions_cost():
+            res.append(f" (= (total-cost) 0)")
+        res.append(")\n")
+        return "".join(res)
+
+    def _get_goal_section(self) -> str:
+        converter = self._get_converter()
+        return f' (:goal (and {" ".join([converter.convert(p) for p in self.problem.goals])}))\n'
+
+    def _get_metric_section(self) -> str:
+        converter = self._get_converter()
         metrics = self.problem.quality_metrics
         if len(metrics) == 1:
             metric = metrics[0]
-            out.write(" (:metric ")
             if isinstance(metric, up.model.metrics.MinimizeExpressionOnFinalState):
-                out.write(f"minimize {converter.convert(metric.expression)}")
+                metric_str = f"minimize {converter.convert(metric.expression)}"
             elif isinstance(metric, up.model.metrics.MaximizeExpressionOnFinalState):
-                out.write(f"maximize {converter.convert(metric.expression)}")
+                metric_str = f"maximize {converter.convert(metric.expression)}"
             elif isinstance(metric, up.model.metrics.MinimizeActionCosts) or isinstance(
                 metric, up.model.metrics.MinimizeSequentialPlanLength
             ):
-                out.write(f"minimize (total-cost)")
+                metric_str = f"minimize (total-cost)"
             elif isinstance(metric, up.model.metrics.MinimizeMakespan):
-                out.write(f"minimize (total-time)")
+                metric_str = f"minimize (total-time)"
             else:
                 raise NotImplementedError
-            out.write(")\n")
+            return f" (:metric {metric_str})\n"
         elif len(metrics) > 1:
             raise up.exceptions.UPUnsupportedProblemTypeError(
                 "Only one metric is supported!"
             )
-        out.write(")\n")
+        return ""
 
     def print_domain(self):
         """Prints to std output the `PDDL` domain."""
@@ -29,7 +29,14 @@ from unified_planning.model.parameter import Parameter
 from unified_planning.model.abstract_problem import AbstractProblem
 from unified_planning.model.problem import Problem
 from unified_planning.model.problem_kind import ProblemKind
-from unified_planning.model.state import ROState, COWState, UPCOWState
+from unified_planning.model.static_facts import StaticFactsIndex
+from unified_planning.model.state import (
+    ROState,
+    COWState,
+    UPCOWState,
+    StateLayout,
+    PackedState,
+)
 from unified_planning.model.timing import (
     Timepoint,
     TimepointKind,
@@ -81,6 +88,9 @@ __all__ = [
     "ROState",
     "COWState",
     "UPCOWState",
+    "StateLayout",
+    "PackedState",
+    "StaticFactsIndex",
     "Timepoint",
     "TimepointKind",
     "Timing",
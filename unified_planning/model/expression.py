@@ -19,12 +19,14 @@ are represented by the same object.
 """
 
 
+import sys
+import weakref
 import unified_planning as up
 import unified_planning.model.types
 from unified_planning.model.operators import OperatorKind
 from unified_planning.exceptions import UPTypeError, UPExpressionDefinitionError
 from fractions import Fraction
-from typing import Iterable, List, Union, Dict, Tuple
+from typing import Iterable, List, MutableMapping, Union, Dict, Tuple
 
 Expression = Union[
     "up.model.fnode.FNode",
@@ -54,9 +56,13 @@ class ExpressionManager(object):
 
     def __init__(self, env: "up.environment.Environment"):
         self.env = env
-        self.expressions: Dict[
+        # The expressions are only weakly referenced, so the expressions that are
+        # not used anymore are released; since two alive expressions are never
+        # syntactically equivalent, the identity of the expressions is preserved.
+        # The ids are never reused, so they remain unique in the environment.
+        self.expressions: MutableMapping[
             "up.model.fnode.FNodeContent", "up.model.fnode.FNode"
-        ] = {}
+        ] = weakref.WeakValueDictionary()
         self._next_free_id = 1
 
         self.true_expression = self.create_node(
@@ -67,6 +73,59 @@ class ExpressionManager(object):
         )
         return
 
+    # The WeakValueDictionary is not picklable, so the alive expressions are
+    #  pickled in a normal dict and interned again in the new process.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["expressions"] = dict(self.expressions)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.expressions = weakref.WeakValueDictionary(self.expressions)
+
+    def collect(self) -> int:
+        """
+        Clears the memoization of the walkers shared in the `Environment`, so
+        the expressions that are not referenced anymore by the user are released.
+
+        Note that the expressions are released as soon as they are not referenced,
+        this method only removes the references kept by the `Environment` caches.
+
+        :return: The number of expressions released.
+        """
+        size = len(self.expressions)
+        self.env.simplifier.memoization.clear()
+        self.env.simplification_cache.clear()
+        self.env.normal_form_cache.clear()
+        self.env.free_vars_oracle.memoization.clear()
+        self.env.free_vars_extractor.memoization.clear()
+        self.env.type_checker.memoization.clear()
+        return size - len(self.expressions)
+
+    def memory_usage(self) -> Dict[OperatorKind, Tuple[int, int]]:
+        """
+        Returns, for every `OperatorKind`, the number of alive expressions of that
+        kind and the bytes they occupy.
+
+        The bytes count the expression, its content and the tuple of its arguments;
+        the payloads, like the `Fluents` or the `Objects`, are shared with the `Problem`
+        and they are not counted.
+
+        :return: The map from every `OperatorKind` with at least one alive expression
+            to the pair `(number of expressions, bytes)`.
+        """
+        res: Dict[OperatorKind, Tuple[int, int]] = {}
+        for content, node in list(self.expressions.items()):
+            count, size = res.get(content.node_type, (0, 0))
+            size += (
+                sys.getsizeof(node)
+                + sys.getsizeof(content)
+                + sys.getsizeof(content.args)
+            )
+            res[content.node_type] = (count + 1, size)
+        return res
+
     def _polymorph_args_to_tuple(
         self, *args: Union[Expression, Iterable[Expression]]
     ) -> Tuple[Expression, ...]:
@@ -164,8 +223,9 @@ class ExpressionManager(object):
         :return: The created expression.
         """
         content = up.model.fnode.FNodeContent(node_type, args, payload)
-        if content in self.expressions:
-            return self.expressions[content]
+        res = self.expressions.get(content, None)
+        if res is not None:
+            return res
         else:
             assert all(
                 a.environment == self.env for a in args
@@ -37,7 +37,7 @@ class FNode(object):
     be instantiated or modified by the user.
     """
 
-    __slots__ = ["_content", "_node_id", "_env"]
+    __slots__ = ["_content", "_node_id", "_env", "__weakref__"]
 
     def __init__(self, content: FNodeContent, node_id: int, environment: Environment):
         self._content = content
@@ -53,6 +53,13 @@ class FNode(object):
     def __hash__(self) -> int:
         return self._node_id
 
+    # The node is pickled through its constructor arguments, so that it has its
+    # node id (and so its hash) as soon as it is unpickled; otherwise, the
+    # dictionaries of the Environment keyed by FNodes could be unpickled while
+    # the state of a node is not set yet.
+    def __reduce__(self):
+        return (FNode, (self._content, self._node_id, self._env))
+
     def get_nary_expression_string(self, op: str, args: List["FNode"]) -> str:
         p = []
         if len(args) > 0:
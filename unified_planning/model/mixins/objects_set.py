@@ -16,7 +16,7 @@
 import unified_planning as up
 from unified_planning.model.types import _UserType
 from unified_planning.exceptions import UPProblemDefinitionError, UPValueError
-from typing import Iterator, List, Union, Optional, cast
+from typing import Dict, Iterator, List, Union, Optional, cast
 
 
 class ObjectsSetMixin:
@@ -33,6 +33,24 @@ class ObjectsSetMixin:
         self._add_user_type_method = add_user_type_method
         self._has_name_method = has_name_method
         self._objects: List["up.model.object.Object"] = []
+        # Index from the name to the object, lazily updated from the _objects list
+        self._objects_index: Dict[str, "up.model.object.Object"] = {}
+        self._indexed_objects: List["up.model.object.Object"] = self._objects
+
+    def _get_objects_index(self) -> Dict[str, "up.model.object.Object"]:
+        """
+        Returns the index from the names to the `objects` of the `problem`.
+
+        The `objects` are only appended to the `_objects` list, so the index is
+        extended with the new `objects`; if the list is replaced the index is rebuilt.
+        """
+        if self._indexed_objects is not self._objects:
+            self._objects_index = {}
+            self._indexed_objects = self._objects
+        if len(self._objects_index) != len(self._objects):
+            for o in self._objects[len(self._objects_index) :]:
+                self._objects_index[o.name] = o
+        return self._objects_index
 
     @property
     def env(self) -> "up.environment.Environment":
@@ -92,10 +110,10 @@ class ObjectsSetMixin:
 
         :param name: The `name` of the target `object` in the `problem`.
         """
-        for o in self._objects:
-            if o.name == name:
-                return o
-        raise UPValueError(f"Object of name: {name} is not defined!")
+        obj = self._get_objects_index().get(name, None)
+        if obj is None:
+            raise UPValueError(f"Object of name: {name} is not defined!")
+        return obj
 
     def has_object(self, name: str) -> bool:
         """
@@ -106,10 +124,7 @@ class ObjectsSetMixin:
         :return: `True` if an `object` with the given `name` is in the `problem`,
                 `False` otherwise.
         """
-        for o in self._objects:
-            if o.name == name:
-                return True
-        return False
+        return name in self._get_objects_index()
 
     def objects(
         self, typename: "up.model.types.Type"
@@ -22,16 +22,18 @@ from unified_planning.model import *
 from unified_planning.engines.results import CompilerResult
 from unified_planning.exceptions import UPExpressionDefinitionError, UPProblemDefinitionError
 from typing import List, Dict, Union, Optional
-from unified_planning.engines.compilers.utils import replace_action, get_fresh_name
+from unified_planning.engines.compilers.utils import get_fresh_name
 from functools import partial
 import unified_planning as up
-from unified_planning.social_law.robustness_verification import FluentMap, FluentMapSubstituter
+from unified_planning.social_law.robustness_verification import FluentMap, replace_agent_action
 from unified_planning.engines import Credits
 from unified_planning.model.fnode import FNode
 from unified_planning.model.operators import OperatorKind
 from unified_planning.model.expression import Expression
 from unified_planning.exceptions import UPTypeError
-from typing import List, Dict
+from unified_planning.model.walkers.identitydag import IdentityDagWalker
+from typing import List, Dict, Tuple
+from collections import OrderedDict
 
 credits = Credits('Multi Agent Problem Centralizer',
                   'Technion Cognitive Robotics Lab (cf. https://github.com/TechnionCognitiveRoboticsLab)',
@@ -42,12 +44,94 @@ credits = Credits('Multi Agent Problem Centralizer',
                   'Compilation from a multi agent planning problem to a centralized single agent problem.')
 
 
+class CentralizationRenaming():
+    """ The renaming of the fluents of the multi agent problems of an environment to the fluents of their centralized problems.
+
+    A centralized fluent only depends on the original fluent and on the name of the agent it belongs to, so every renamed
+    fluent is created once and shared by all the centralizations; the same holds for the renamed expressions of the actions
+    of an agent, as long as the agent and the environment have the same fluents."""
+
+    def __init__(self, env: "up.environment.Environment", max_substituters: int = 1000):
+        self.env = env
+        self.fmap = FluentMap("c")
+        # The map from (agent name, fluent) to the centralized fluent; environment fluents have None as agent name
+        self.table: Dict[Tuple[Optional[str], Fluent], Fluent] = {}
+        # The least recently used substituters are removed when there are more than max_substituters of them
+        self._max_substituters = max_substituters
+        self._substituters: "OrderedDict[Tuple, RenamingSubstituter]" = OrderedDict()
+
+    def centralized_fluent(self, agent: Optional[Agent], fluent: Fluent) -> Fluent:
+        """ Returns the centralized version of the given fluent, of the given agent or of the environment if agent is None."""
+        key = (None if agent is None else agent.name, fluent)
+        g_fluent = self.table.get(key, None)
+        if g_fluent is None:
+            g_fluent = self.fmap.create_fluent(fluent, agent)
+            self.table[key] = g_fluent
+        return g_fluent
+
+    def rename(self, fact: FNode, agent: Optional[Agent]) -> FNode:
+        """ Returns the centralized version of the given fact, of the given agent or of the environment if agent is None."""
+        return self.env.expression_manager.FluentExp(self.centralized_fluent(agent, fact.fluent()), tuple(fact.args))
+
+    def get_substituter(self, problem: MultiAgentProblem, agent: Agent) -> "RenamingSubstituter":
+        """ Returns the substituter of the expressions in the actions of the given agent, shared by all the problems in
+        which the agent and the environment have the same fluents."""
+        key = self.get_agent_key(problem, agent)
+        substituter = self._substituters.get(key, None)
+        if substituter is None:
+            substituter = RenamingSubstituter(self, problem, agent)
+            self._substituters[key] = substituter
+            while len(self._substituters) > self._max_substituters:
+                self._substituters.popitem(last=False)
+        else:
+            self._substituters.move_to_end(key)
+        return substituter
+
+    @staticmethod
+    def get_agent_key(problem: MultiAgentProblem, agent: Agent) -> Tuple:
+        """ Returns the key identifying how the expressions in the actions of the given agent are renamed."""
+        return (agent.name, frozenset(agent.fluents), frozenset(problem.ma_environment.fluents))
+
+
+class RenamingSubstituter(IdentityDagWalker):
+    """ Renames the fluents of the expressions in the actions of an agent according to a CentralizationRenaming; the results
+    are memoized, so every sub-expression is renamed only once across all the centralizations sharing the substituter."""
+
+    def __init__(self, renaming: CentralizationRenaming, problem: MultiAgentProblem, agent: Agent):
+        IdentityDagWalker.__init__(self, renaming.env, False)
+        self.renaming = renaming
+        self.agent = agent
+        self.env_fluents = frozenset(problem.ma_environment.fluents)
+        self.agent_fluents = frozenset(agent.fluents)
+
+    def substitute(self, expression: FNode) -> FNode:
+        return self.walk(expression)
+
+    def walk_dot(self, expression: FNode, args: List[FNode], **kwargs) -> FNode:
+        return self.renaming.rename(expression.arg(0), expression.agent())
+
+    def walk_fluent_exp(self, expression: FNode, args: List[FNode], **kwargs) -> FNode:
+        fluent = expression.fluent()
+        if fluent in self.env_fluents:
+            return self.manager.FluentExp(self.renaming.centralized_fluent(None, fluent), tuple(args))
+        elif fluent in self.agent_fluents:
+            return self.manager.FluentExp(self.renaming.centralized_fluent(self.agent, fluent), tuple(args))
+        return self.manager.FluentExp(fluent, tuple(args))
+
+
 class MultiAgentProblemCentralizer(engines.engine.Engine, CompilerMixin):
     '''Multi Agent Problem Centralizer class:
     this class requires a (multi agent) problem and generates a centralized single agnet problem.'''
-    def __init__(self):
+    def __init__(self, max_fragments: int = 1000, max_environments: int = 8):
         engines.engine.Engine.__init__(self)
         CompilerMixin.__init__(self, CompilationKind.MA_CENTRALIZATION)                
+        # The fluents renaming of each environment and the centralized copies of the actions of each agent, kept between
+        # compilations, so that centralizing again a problem in which only some agents changed only compiles the changed agents.
+        # When there are more than max_environments renamings or max_fragments fragments, the least recently used are removed
+        self._max_fragments = max_fragments
+        self._max_environments = max_environments
+        self._renamings: "OrderedDict[up.environment.Environment, CentralizationRenaming]" = OrderedDict()
+        self._fragments: "OrderedDict[Tuple, List[Action]]" = OrderedDict()
         
     @staticmethod
     def get_credits(**kwargs) -> Optional['Credits']:
@@ -83,7 +167,6 @@ class MultiAgentProblemCentralizer(engines.engine.Engine, CompilerMixin):
         supported_kind.set_time("TIMED_EFFECT")
         supported_kind.set_time("TIMED_GOALS")
         supported_kind.set_time("DURATION_INEQUALITIES")
-        supported_kind.set_simulated_entities("SIMULATED_EFFECTS")
         return supported_kind
 
     @staticmethod
@@ -103,64 +186,123 @@ class MultiAgentProblemCentralizer(engines.engine.Engine, CompilerMixin):
         new_kind.unset_problem_class("ACTION_BASED_MULTI_AGENT")
         return new_kind
 
+    def clear_fragments(self):
+        """ Removes the fluents renamings and the centralized copies of the actions kept for the following compilations."""
+        self._renamings.clear()
+        self._fragments.clear()
+
+    def get_renaming(self, env: "up.environment.Environment") -> CentralizationRenaming:
+        """ Returns the fluents renaming of the given environment; when the renaming of the least recently used environment
+        is removed, the centralized copies of the actions of that environment are removed too."""
+        renaming = self._renamings.get(env, None)
+        if renaming is None:
+            renaming = CentralizationRenaming(env, self._max_fragments)
+            self._renamings[env] = renaming
+            while len(self._renamings) > self._max_environments:
+                old_env, _ = self._renamings.popitem(last=False)
+                for key in [key for key in self._fragments if key[0] is old_env]:
+                    del self._fragments[key]
+        else:
+            self._renamings.move_to_end(env)
+        return renaming
+
+    def centralize_action(self, substituter: RenamingSubstituter, agent: Agent, action: Action) -> Action:
+        """ Returns the centralized copy of the given action of the given agent."""
+        parameters: "OrderedDict[str, Type]" = OrderedDict((p.name, p.type) for p in action.parameters)
+        name = agent.name + "__" + action.name
+        if isinstance(action, InstantaneousAction):
+            return self._centralize_instantaneous_action(substituter, name, parameters, action)
+        elif isinstance(action, DurativeAction):
+            return self._centralize_durative_action(substituter, name, parameters, action)
+        raise UPProblemDefinitionError(f"The action {action.name} of the agent {agent.name} can not be centralized")
+
+    @staticmethod
+    def _centralize_effect(substituter: RenamingSubstituter, effect: Effect) -> Effect:
+        return Effect(substituter.substitute(effect.fluent), substituter.substitute(effect.value),
+                      substituter.substitute(effect.condition), effect.kind)
+
+    def _centralize_instantaneous_action(self, substituter: RenamingSubstituter, name: str,
+                                         parameters: "OrderedDict[str, Type]",
+                                         action: InstantaneousAction) -> InstantaneousAction:
+        if action.simulated_effect is not None:
+            raise UPProblemDefinitionError(f"The simulated effect of the action {action.name} can not be centralized")
+        new_action = InstantaneousAction(name, _parameters=parameters, _env=action.env)
+        for c in action.preconditions:
+            new_action.add_precondition(substituter.substitute(c))
+        for e in action.effects:
+            new_action._add_effect_instance(self._centralize_effect(substituter, e))
+        return new_action
+
+    def _centralize_durative_action(self, substituter: RenamingSubstituter, name: str,
+                                    parameters: "OrderedDict[str, Type]",
+                                    action: DurativeAction) -> DurativeAction:
+        if len(action.simulated_effects) > 0:
+            raise UPProblemDefinitionError(f"The simulated effects of the action {action.name} can not be centralized")
+        new_action = DurativeAction(name, _parameters=parameters, _env=action.env)
+        new_action.set_duration_constraint(action.duration)
+        for interval, conditions in action.conditions.items():
+            for c in conditions:
+                new_action.add_condition(interval, substituter.substitute(c))
+        for timing, effects in action.effects.items():
+            for e in effects:
+                new_action._add_effect_instance(timing, self._centralize_effect(substituter, e))
+        return new_action
+
     def _compile(self, problem: "up.model.AbstractProblem", compilation_kind: "up.engines.CompilationKind") -> CompilerResult:
         '''Creates a problem that is a centralized single agent version of the original problem'''
         assert isinstance(problem, MultiAgentProblem)
 
         #Represents the map from the new action to the old action
-        new_to_old: Dict[Action, (Agent, Action)] = {}
+        new_to_old: Dict[Action, Optional[Tuple[Agent, Action]]] = {}
 
-        new_problem = Problem()
+        new_problem = Problem(env=problem.env)
         new_problem.name = f'{self.name}_{problem.name}'
                 
         new_problem.add_objects(problem.all_objects)
 
 
-        fmap = FluentMap("c")
-        fmap.add_facts(problem, new_problem)
+        renaming = self.get_renaming(problem.env)
+        for f in problem.ma_environment.fluents:
+            new_problem.add_fluent(renaming.centralized_fluent(None, f),
+                                   default_initial_value=problem.ma_environment.fluents_defaults[f])
+        for agent in problem.agents:
+            for f in agent.fluents:
+                new_problem.add_fluent(renaming.centralized_fluent(agent, f), default_initial_value=agent.fluents_defaults[f])
 
         eiv = problem.explicit_initial_values     
         for fluent in eiv:
             if fluent.is_dot():                
-                new_problem.set_initial_value(fmap.get_agent_version(fluent.agent(), fluent.args[0]), eiv[fluent])
+                new_problem.set_initial_value(renaming.rename(fluent.args[0], fluent.agent()), eiv[fluent])
             else:
-                new_problem.set_initial_value(fmap.get_environment_version(fluent), eiv[fluent])
-            
+                new_problem.set_initial_value(renaming.rename(fluent, None), eiv[fluent])
 
-        fsub = FluentMapSubstituter(problem, new_problem.env)
         for agent in problem.agents:
-            for action in agent.actions:
-                d = {}
-                for p in action.parameters:
-                    d[p.name] = p.type
-                if isinstance(action, InstantaneousAction):                    
-                    new_action = InstantaneousAction(agent.name + "__" + action.name, _parameters=d)        
-                    for p in action.preconditions:
-                        new_action.add_precondition(fsub.substitute(p, fmap, agent))                        
-                    for e in action.effects:
-                        new_action.add_effect(fsub.substitute(e.fluent, fmap, agent), e.value)                    
-                elif isinstance(action, DurativeAction):
-                    new_action = DurativeAction(agent.name + "__" + action.name, _parameters=d)     
-                    new_action.set_duration_constraint(action.duration)
-                    
-                    for timing in action.conditions.keys():
-                        for c in action.conditions[timing]:                            
-                            new_action.add_condition(timing, fsub.substitute(c, fmap, agent))
-
-                    for timing in action.effects.keys():
-                        for e in action.effects[timing]:
-                            new_action.add_effect(timing, fsub.substitute(e.fluent, fmap, agent), e.value)
+            agent_key = renaming.get_agent_key(problem, agent)
+            key = (problem.env, agent_key, tuple(agent.actions))
+            fragment = self._fragments.get(key, None)
+            if fragment is None:
+                substituter = renaming.get_substituter(problem, agent)
+                fragment = [self.centralize_action(substituter, agent, action) for action in agent.actions]
+                # The actions in the key are cloned, so that the key is not changed by later modifications of the actions
+                self._fragments[(problem.env, agent_key, tuple(a.clone() for a in agent.actions))] = fragment
+                while len(self._fragments) > self._max_fragments:
+                    self._fragments.popitem(last=False)
+            else:
+                self._fragments.move_to_end(key)
+            for action, fragment_action in zip(agent.actions, fragment):
+                # The kept copies are cloned, so that they are not changed by the modifications of the new problem
+                new_action = fragment_action.clone()
                 new_problem.add_action(new_action)
                 new_to_old[new_action] = (agent, action)
 
         for goal in problem.goals:
             if goal.is_dot():                
-                new_problem.add_goal(fmap.get_agent_version(goal.agent(), goal.args[0]))
+                new_problem.add_goal(renaming.rename(goal.args[0], goal.agent()))
             else:
-                new_problem.add_goal(fmap.get_environment_version(goal))
+                new_problem.add_goal(renaming.rename(goal, None))
 
         return CompilerResult(
-            new_problem, partial(replace_action, map=new_to_old), self.name
+            new_problem, partial(replace_agent_action, map=new_to_old), self.name
         )
 
 
@@ -26,13 +26,14 @@ from unified_planning.model.mixins import (
 from unified_planning.model.expression import ConstantExpression
 from unified_planning.model.operators import OperatorKind
 from unified_planning.model.fluent import get_all_fluent_exp
+from unified_planning.model.static_facts import StaticFactsIndex
 from unified_planning.exceptions import (
     UPProblemDefinitionError,
     UPTypeError,
     UPExpressionDefinitionError,
 )
 from fractions import Fraction
-from typing import List, Dict, Set, Tuple, Union, cast
+from typing import List, Dict, Optional, Set, Tuple, Union, cast
 
 
 class Problem(
@@ -64,6 +65,9 @@ class Problem(
         ObjectsSetMixin.__init__(self, self.env, self._add_user_type, self.has_name)
         self._operators_extractor = up.model.walkers.OperatorsExtractor()
         self._initial_value: Dict["up.model.fnode.FNode", "up.model.fnode.FNode"] = {}
+        # the index of the initial values, created when needed and discarded
+        # every time the initial values are modified
+        self._static_facts: Optional[StaticFactsIndex] = None
         self._timed_effects: Dict[
             "up.model.timing.Timing", List["up.model.effect.Effect"]
         ] = {}
@@ -317,6 +321,7 @@ class Problem(
         if not fluent_exp.type.is_compatible(value_exp.type):
             raise UPTypeError("Initial value assignment has not compatible types!")
         self._initial_value[fluent_exp] = value_exp
+        self._static_facts = None
 
     def initial_value(
         self, fluent: Union["up.model.fnode.FNode", "up.model.fluent.Fluent"]
@@ -352,6 +357,7 @@ class Problem(
         for f in self._fluents:
             for f_exp in get_all_fluent_exp(self, f):
                 res[f_exp] = self.initial_value(f_exp)
+        self._static_facts = None
         return res
 
     @property
@@ -366,6 +372,18 @@ class Problem(
         """
         return self._initial_value
 
+    @property
+    def static_facts(self) -> StaticFactsIndex:
+        """
+        Returns the :class:`~unified_planning.model.StaticFactsIndex` of the initial values of the `Problem`,
+        used to evaluate the :func:`static fluents <unified_planning.model.Problem.get_static_fluents>` with a single lookup.
+
+        The index is created once and returned by every call, until the initial values of the `Problem` are modified.
+        """
+        if self._static_facts is None:
+            self._static_facts = StaticFactsIndex(self)
+        return self._static_facts
+
     def add_timed_goal(
         self,
         interval: Union["up.model.timing.Timing", "up.model.timing.TimeInterval"],
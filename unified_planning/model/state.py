@@ -13,7 +13,7 @@
 # limitations under the License.
 #
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 import unified_planning as up
 from unified_planning.exceptions import UPUsageError, UPValueError
 
@@ -140,3 +140,218 @@ class UPCOWState(COWState):
                     complete_values.setdefault(k, v)
                 current_element = current_element._father
             return UPCOWState(complete_values)
+
+
+class StateLayout:
+    """
+    This class assigns an integer slot to every grounded fluent of a :class:`~unified_planning.model.Problem`
+    and is shared by all the :class:`~unified_planning.model.PackedState` of that `Problem`.
+
+    Boolean fluents are mapped to a bit position, while every other fluent (numeric or object)
+    is mapped to a position in a tuple of constant expressions; numeric values are kept as constant
+    `FNode` because their values are arbitrary precision `int` or `Fraction`.
+
+    Important NOTE: the layout is computed at construction time, so if the `Problem` is modified
+    afterwards (for example adding objects or fluents), a new layout must be created.
+    """
+
+    def __init__(self, problem: "up.model.problem.Problem"):
+        self._env = problem.env
+        self._true = self._env.expression_manager.TRUE()
+        self._false = self._env.expression_manager.FALSE()
+        self._bool_slots: Dict["up.model.FNode", int] = {}
+        self._value_slots: Dict["up.model.FNode", int] = {}
+        self._bool_fluents: List["up.model.FNode"] = []
+        self._value_fluents: List["up.model.FNode"] = []
+        bits = 0
+        values: List["up.model.FNode"] = []
+        for fluent_exp, value in problem.initial_values.items():
+            if fluent_exp.type.is_bool_type():
+                slot = len(self._bool_slots)
+                self._bool_slots[fluent_exp] = slot
+                self._bool_fluents.append(fluent_exp)
+                if value.bool_constant_value():
+                    bits |= 1 << slot
+            else:
+                self._value_slots[fluent_exp] = len(values)
+                self._value_fluents.append(fluent_exp)
+                values.append(value)
+        self._initial_state = PackedState(self, bits, tuple(values))
+
+    @property
+    def initial_state(self) -> "PackedState":
+        """Returns the `PackedState` representing the initial state of the `Problem` given at construction time."""
+        return self._initial_state
+
+    @property
+    def size(self) -> int:
+        """Returns the number of grounded fluents that have a slot in this layout."""
+        return len(self._bool_slots) + len(self._value_slots)
+
+    def has_slot(self, fluent_exp: "up.model.FNode") -> bool:
+        """
+        Returns `True` if the given grounded fluent expression has a slot in this layout.
+
+        :param fluent_exp: The grounded fluent expression to check.
+        :return: `True` if the given `fluent_exp` has a slot, `False` otherwise.
+        """
+        return fluent_exp in self._bool_slots or fluent_exp in self._value_slots
+
+    def bool_slot(self, fluent_exp: "up.model.FNode") -> Optional[int]:
+        """
+        Returns the position of the bit that stores the given grounded boolean fluent expression
+        in the :func:`~unified_planning.model.PackedState.key` of the states of this layout.
+
+        :param fluent_exp: The grounded boolean fluent expression.
+        :return: The bit position of the given `fluent_exp`, or `None` if it does not have a boolean slot.
+        """
+        return self._bool_slots.get(fluent_exp, None)
+
+    def make_state(
+        self, values: Dict["up.model.FNode", "up.model.FNode"]
+    ) -> "PackedState":
+        """
+        Creates a `PackedState` from a complete assignment of values.
+
+        :param values: The map from every grounded fluent expression of the layout to its value;
+            fluents missing from this map take the value they have in the initial state.
+        :return: The created `PackedState`.
+        """
+        return self._initial_state.make_child(values)
+
+
+class PackedState(COWState):
+    """
+    `COWState` implementation that stores the values in a flat representation defined by
+    a :class:`~unified_planning.model.StateLayout`: boolean fluents are packed as bits of a
+    single integer and the other fluents are stored in a tuple indexed by their slot.
+
+    Retrieving a value costs a single dictionary lookup, regardless of how many states
+    were created before this one, and a `PackedState` can be used as key of a `dict`
+    or element of a `set`, because it is hashed and compared by its packed values.
+    """
+
+    __slots__ = ["_layout", "_bits", "_values", "_hash"]
+
+    def __init__(
+        self,
+        layout: StateLayout,
+        bits: int,
+        values: Tuple["up.model.FNode", ...],
+    ):
+        self._layout = layout
+        self._bits = bits
+        self._values = values
+        self._hash: Optional[int] = None
+
+    def __repr__(self) -> str:
+        return str({f: self.get_value(f) for f in self._layout._bool_slots}) + str(
+            {f: self.get_value(f) for f in self._layout._value_slots}
+        )
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash((self._bits, self._values))
+        return self._hash
+
+    def __eq__(self, oth: object) -> bool:
+        if isinstance(oth, PackedState):
+            return (
+                self._layout is oth._layout
+                and self._bits == oth._bits
+                and self._values == oth._values
+            )
+        return False
+
+    @property
+    def layout(self) -> StateLayout:
+        """Returns the `StateLayout` of this `PackedState`."""
+        return self._layout
+
+    @property
+    def key(self) -> Tuple[int, Tuple["up.model.FNode", ...]]:
+        """
+        Returns a compact and hashable representation of this state, made of the integer
+        containing the boolean fluents bits and of the tuple of the other fluents values.
+        Two states of the same `StateLayout` are equal if and only if their keys are equal.
+        """
+        return (self._bits, self._values)
+
+    def diff(self, other: "PackedState") -> List["up.model.FNode"]:
+        """
+        Returns the grounded fluents that have a different value in `self` and in the `other` state.
+
+        :param other: The state to compare with `self`; it must have the same `StateLayout`.
+        :return: The list of grounded fluents whose value differs in the 2 states.
+        """
+        if self._layout is not other._layout:
+            raise UPUsageError("The compared states have different state layouts.")
+        res: List["up.model.FNode"] = []
+        changed_bits = self._bits ^ other._bits
+        bool_fluents = self._layout._bool_fluents
+        while changed_bits:
+            lowest_bit = changed_bits & -changed_bits
+            res.append(bool_fluents[lowest_bit.bit_length() - 1])
+            changed_bits ^= lowest_bit
+        if self._values is not other._values:
+            value_fluents = self._layout._value_fluents
+            for i, (v1, v2) in enumerate(zip(self._values, other._values)):
+                if v1 is not v2:
+                    res.append(value_fluents[i])
+        return res
+
+    def get_value(self, value: "up.model.FNode") -> "up.model.FNode":
+        """
+        This method retrieves the value in the `State`.
+        NOTE that the searched value must be set in the state.
+
+        :params value: The value searched for in the `State`.
+        :return: The set value.
+        """
+        layout = self._layout
+        slot = layout._bool_slots.get(value, None)
+        if slot is not None:
+            return layout._true if (self._bits >> slot) & 1 else layout._false
+        slot = layout._value_slots.get(value, None)
+        if slot is not None:
+            return self._values[slot]
+        raise UPUsageError(
+            f"The state {self} does not have a value for the value {value}"
+        )
+
+    def make_child(
+        self, updated_values: Dict["up.model.FNode", "up.model.FNode"]
+    ) -> "PackedState":
+        """
+        Returns a different `PackedState` in which every value in updated_values.keys() is evaluated as his mapping
+        in new the `updated_values` dict and every other value is evaluated as in `self`.
+
+        :param updated_values: The dictionary that contains the `values` that need to be updated in the new `State`.
+        :return: The new `State` created.
+        """
+        layout = self._layout
+        bits = self._bits
+        new_values: Optional[List["up.model.FNode"]] = None
+        for fluent_exp, value in updated_values.items():
+            slot = layout._bool_slots.get(fluent_exp, None)
+            if slot is not None:
+                if not value.is_bool_constant():
+                    raise UPValueError(
+                        f"The value {value} assigned to {fluent_exp} is not a boolean constant."
+                    )
+                if value.bool_constant_value():
+                    bits |= 1 << slot
+                else:
+                    bits &= ~(1 << slot)
+                continue
+            slot = layout._value_slots.get(fluent_exp, None)
+            if slot is None:
+                raise UPUsageError(
+                    f"The fluent {fluent_exp} does not have a slot in the state layout."
+                )
+            if new_values is None:
+                new_values = list(self._values)
+            new_values[slot] = value
+        if new_values is None:
+            return PackedState(layout, bits, self._values)
+        return PackedState(layout, bits, tuple(new_values))
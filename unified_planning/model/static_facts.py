@@ -0,0 +1,127 @@
+# Copyright 2021 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""This module defines the StaticFactsIndex, used to look up the initial values of a Problem."""
+
+from typing import Dict, FrozenSet, Optional, Tuple
+import unified_planning as up
+
+
+class StaticFactsIndex:
+    """
+    This class indexes the initial values of a :class:`~unified_planning.model.Problem`, so that the
+    value of a grounded fluent in the initial state, and so the value of a `static fluent`, is found
+    with a single lookup.
+
+    The explicit initial values are kept in a map from the grounded fluent expression to the value,
+    and for every `Fluent` in a map from the tuple of the arguments to the value; since the
+    expressions are unique in their `Environment`, both are hashed by identity. The values not set
+    explicitly are the `Fluent` defaults of the `Problem`.
+
+    The index is created and cached by the :func:`static_facts <unified_planning.model.Problem.static_facts>`
+    property of the `Problem`, that discards it when the initial values are modified; the index does
+    not depend on the `Actions`, so the caller decides which `Fluents` are static.
+    """
+
+    def __init__(self, problem: "up.model.problem.Problem"):
+        self._defaults = problem.fluents_defaults
+        self._explicit_values = dict(problem.explicit_initial_values)
+        # the maps of the explicit values of every fluent, created when needed
+        self._values: Optional[
+            Dict[
+                "up.model.fluent.Fluent",
+                Dict[Tuple["up.model.fnode.FNode", ...], "up.model.fnode.FNode"],
+            ]
+        ] = None
+        self._true_args: Dict[
+            "up.model.fluent.Fluent", FrozenSet[Tuple["up.model.fnode.FNode", ...]]
+        ] = {}
+        self._fingerprints: Dict["up.model.fluent.Fluent", FrozenSet] = {}
+
+    def value(
+        self, fluent_exp: "up.model.fnode.FNode"
+    ) -> Optional["up.model.fnode.FNode"]:
+        """
+        Returns the initial value of the given grounded fluent expression.
+
+        :param fluent_exp: The fluent expression to evaluate; its arguments must be constants.
+        :return: The initial value, or `None` if the value is neither set nor defaulted.
+        """
+        res = self._explicit_values.get(fluent_exp, None)
+        if res is None:
+            res = self._defaults.get(fluent_exp.fluent(), None)
+        return res
+
+    def args_value(
+        self,
+        fluent: "up.model.fluent.Fluent",
+        args: Tuple["up.model.fnode.FNode", ...],
+    ) -> Optional["up.model.fnode.FNode"]:
+        """
+        Returns the initial value of the given `fluent` with the given constant arguments,
+        without creating the fluent expression.
+
+        :param fluent: The `Fluent` to evaluate.
+        :param args: The constant arguments of the `fluent`.
+        :return: The initial value, or `None` if the value is neither set nor defaulted.
+        """
+        res = self.explicit_values(fluent).get(args, None)
+        if res is None:
+            res = self._defaults.get(fluent, None)
+        return res
+
+    def default(
+        self, fluent: "up.model.fluent.Fluent"
+    ) -> Optional["up.model.fnode.FNode"]:
+        """Returns the default initial value of the given `fluent`, or `None`."""
+        return self._defaults.get(fluent, None)
+
+    def explicit_values(
+        self, fluent: "up.model.fluent.Fluent"
+    ) -> Dict[Tuple["up.model.fnode.FNode", ...], "up.model.fnode.FNode"]:
+        """
+        Returns the map from the arguments to the value of the initial values of the given `fluent`
+        set explicitly in the `Problem`; the returned map must not be modified.
+        """
+        if self._values is None:
+            self._values = {}
+            for f_exp, v in self._explicit_values.items():
+                self._values.setdefault(f_exp.fluent(), {})[tuple(f_exp.args)] = v
+        return self._values.get(fluent, {})
+
+    def true_args(
+        self, fluent: "up.model.fluent.Fluent"
+    ) -> FrozenSet[Tuple["up.model.fnode.FNode", ...]]:
+        """
+        Returns the set of the arguments of the given boolean `fluent` that are explicitly
+        set to `True` in the initial state.
+        """
+        res = self._true_args.get(fluent, None)
+        if res is None:
+            res = frozenset(
+                args for args, v in self.explicit_values(fluent).items() if v.is_true()
+            )
+            self._true_args[fluent] = res
+        return res
+
+    def fingerprint(self, fluent: "up.model.fluent.Fluent") -> FrozenSet:
+        """
+        Returns a hashable representation of the explicit initial values of the given `fluent`;
+        two `Problems` with the same explicit initial values for the `fluent` have equal fingerprints.
+        """
+        res = self._fingerprints.get(fluent, None)
+        if res is None:
+            res = frozenset(self.explicit_values(fluent).items())
+            self._fingerprints[fluent] = res
+        return res
@@ -61,6 +61,10 @@ class _BoolType(Type):
     def __repr__(self) -> str:
         return "bool"
 
+    def __reduce__(self):
+        # The type is compared by identity, so the unpickled one must be the singleton
+        return "BOOL"
+
     def is_bool_type(self) -> bool:
         """Returns true iff is boolean type."""
         return True
@@ -72,6 +76,9 @@ class _TimeType(Type):
     def __repr__(self) -> str:
         return "time"
 
+    def __reduce__(self):
+        return "TIME"
+
     def is_time_type(self) -> bool:
         """Returns true iff is boolean type."""
         return True
@@ -15,15 +15,18 @@
 
 from unified_planning.model.walkers.dag import DagWalker
 from unified_planning.model.walkers.generic import handles
-from unified_planning.model.walkers.dnf import Dnf, Nnf
+from unified_planning.model.walkers.dnf import Dnf, Nnf, NormalFormCache
 from unified_planning.model.walkers.expression_quantifiers_remover import (
     ExpressionQuantifiersRemover,
 )
 from unified_planning.model.walkers.linear_checker import LinearChecker
 from unified_planning.model.walkers.operators_extractor import OperatorsExtractor
 from unified_planning.model.walkers.quantifier_simplifier import QuantifierSimplifier
-from unified_planning.model.walkers.simplifier import Simplifier
+from unified_planning.model.walkers.simplifier import Simplifier, SimplificationCache
 from unified_planning.model.walkers.state_evaluator import StateEvaluator
+from unified_planning.model.walkers.compiled_state_evaluator import (
+    CompiledStateEvaluator,
+)
 from unified_planning.model.walkers.substituter import Substituter
 from unified_planning.model.walkers.type_checker import TypeChecker
 from unified_planning.model.walkers.free_vars import FreeVarsExtractor
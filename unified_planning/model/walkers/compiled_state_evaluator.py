@@ -0,0 +1,255 @@
+# Copyright 2021 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+from fractions import Fraction
+from itertools import product
+from typing import Any, Callable, Dict, List, Union
+import unified_planning as up
+import unified_planning.model.walkers as walkers
+from unified_planning.model.fnode import FNode
+from unified_planning.model.operators import OperatorKind
+from unified_planning.exceptions import UPProblemDefinitionError
+
+# A compiled expression takes the state and the values of the quantified variables
+# and returns the python value of the expression: a bool, an int, a Fraction or an Object.
+CompiledExpression = Callable[
+    ["up.model.state.ROState", Dict["up.model.variable.Variable", Any]], Any
+]
+
+NO_VARIABLES: Dict["up.model.variable.Variable", Any] = {}
+
+
+class CompiledStateEvaluator(walkers.dag.DagWalker):
+    """
+    Evaluates grounded expressions in a :class:`~unified_planning.model.ROState`, like the
+    :class:`~unified_planning.model.walkers.StateEvaluator`, but every expression is translated
+    only once into a python closure over the state; the closure is memoized and reused for every
+    following evaluation, so no expression is created when evaluating it.
+
+    Important NOTE:
+    After the initialization, the :class:`~unified_planning.model.Problem` given as input can not be modified
+    or the `CompiledStateEvaluator` behavior is undefined.
+    """
+
+    def __init__(self, problem: "up.model.problem.Problem"):
+        walkers.dag.DagWalker.__init__(self)
+        self._problem = problem
+        self.manager = problem.env.expression_manager
+
+    def compile(self, expression: FNode) -> CompiledExpression:
+        """
+        Returns the closure computing the value of the given expression; the closure takes the `State`
+        and a map from the quantified `Variables` to their values, that is empty for the
+        top level expressions.
+
+        :param expression: The grounded expression to compile.
+        :return: The closure evaluating the given `expression`.
+        """
+        return self.walk(expression)
+
+    def evaluate_value(self, expression: FNode, state: "up.model.state.ROState") -> Any:
+        """
+        Evaluates the given expression in the given `State` and returns its python value.
+
+        :param expression: The grounded expression to evaluate.
+        :param state: The `State` where the expression needs to be evaluated.
+        :return: The python value of the given expression: a `bool`, an `int`, a `Fraction`
+            or an :class:`~unified_planning.model.Object`.
+        """
+        return self.walk(expression)(state, NO_VARIABLES)
+
+    def evaluate(self, expression: FNode, state: "up.model.state.ROState") -> FNode:
+        """
+        Evaluates the given expression in the given `State`.
+
+        :param expression: The expression that needs to be evaluated.
+        :param state: The `State` where the expression needs to be evaluated.
+        :return: The constant expression corresponding to the given expression evaluated in the
+            given `State`.
+        """
+        return self.to_fnode(self.walk(expression)(state, NO_VARIABLES))
+
+    def to_fnode(
+        self, value: Union[bool, int, Fraction, "up.model.object.Object"]
+    ) -> FNode:
+        """
+        Returns the constant expression representing the given python value.
+
+        :param value: The value to convert, as returned by a compiled expression.
+        :return: The constant expression representing the given value.
+        """
+        if value is True:
+            return self.manager.TRUE()
+        elif value is False:
+            return self.manager.FALSE()
+        elif isinstance(value, int):
+            return self.manager.Int(value)
+        elif isinstance(value, Fraction):
+            return self.manager.Real(value)
+        elif isinstance(value, up.model.object.Object):
+            return self.manager.ObjectExp(value)
+        raise NotImplementedError
+
+    def walk_and(self, expression: FNode, args: List[CompiledExpression]):
+        def _and(state, variables):
+            for a in args:
+                if not a(state, variables):
+                    return False
+            return True
+
+        return _and
+
+    def walk_or(self, expression: FNode, args: List[CompiledExpression]):
+        def _or(state, variables):
+            for a in args:
+                if a(state, variables):
+                    return True
+            return False
+
+        return _or
+
+    def walk_not(self, expression: FNode, args: List[CompiledExpression]):
+        (arg,) = args
+        return lambda state, variables: not arg(state, variables)
+
+    def walk_implies(self, expression: FNode, args: List[CompiledExpression]):
+        left, right = args
+        return lambda state, variables: (not left(state, variables)) or right(
+            state, variables
+        )
+
+    def walk_iff(self, expression: FNode, args: List[CompiledExpression]):
+        left, right = args
+        return lambda state, variables: left(state, variables) == right(
+            state, variables
+        )
+
+    def _quantified_assignments(self, expression: FNode):
+        vars = expression.variables()
+        possible_objects = [list(self._problem.objects(v.type)) for v in vars]
+        return vars, possible_objects
+
+    def walk_exists(self, expression: FNode, args: List[CompiledExpression]):
+        (body,) = args
+        vars, possible_objects = self._quantified_assignments(expression)
+
+        def _exists(state, variables):
+            new_variables = dict(variables)
+            for o in product(*possible_objects):
+                new_variables.update(zip(vars, o))
+                if body(state, new_variables):
+                    return True
+            return False
+
+        return _exists
+
+    def walk_forall(self, expression: FNode, args: List[CompiledExpression]):
+        (body,) = args
+        vars, possible_objects = self._quantified_assignments(expression)
+
+        def _forall(state, variables):
+            new_variables = dict(variables)
+            for o in product(*possible_objects):
+                new_variables.update(zip(vars, o))
+                if not body(state, new_variables):
+                    return False
+            return True
+
+        return _forall
+
+    def walk_fluent_exp(self, expression: FNode, args: List[CompiledExpression]):
+        if all(a.is_constant() for a in expression.args):
+            # The fluent is grounded, so the same key is used for every evaluation
+            return lambda state, variables: state.get_value(expression).constant_value()
+        fluent = expression.fluent()
+        manager = self.manager
+        to_fnode = self.to_fnode
+
+        def _fluent_exp(state, variables):
+            fluent_args = tuple(to_fnode(a(state, variables)) for a in args)
+            return state.get_value(
+                manager.FluentExp(fluent, fluent_args)
+            ).constant_value()
+
+        return _fluent_exp
+
+    def walk_plus(self, expression: FNode, args: List[CompiledExpression]):
+        def _plus(state, variables):
+            res = 0
+            for a in args:
+                res += a(state, variables)
+            return res
+
+        return _plus
+
+    def walk_minus(self, expression: FNode, args: List[CompiledExpression]):
+        left, right = args
+        return lambda state, variables: left(state, variables) - right(state, variables)
+
+    def walk_times(self, expression: FNode, args: List[CompiledExpression]):
+        def _times(state, variables):
+            res = 1
+            for a in args:
+                res *= a(state, variables)
+            return res
+
+        return _times
+
+    def walk_div(self, expression: FNode, args: List[CompiledExpression]):
+        left, right = args
+
+        def _div(state, variables):
+            res = Fraction(left(state, variables), right(state, variables))
+            if res.denominator == 1:
+                return res.numerator
+            return res
+
+        return _div
+
+    def walk_le(self, expression: FNode, args: List[CompiledExpression]):
+        left, right = args
+        return lambda state, variables: left(state, variables) <= right(
+            state, variables
+        )
+
+    def walk_lt(self, expression: FNode, args: List[CompiledExpression]):
+        left, right = args
+        return lambda state, variables: left(state, variables) < right(state, variables)
+
+    def walk_equals(self, expression: FNode, args: List[CompiledExpression]):
+        left, right = args
+        return lambda state, variables: left(state, variables) == right(
+            state, variables
+        )
+
+    def walk_variable_exp(self, expression: FNode, args: List[CompiledExpression]):
+        variable = expression.variable()
+        return lambda state, variables: variables[variable]
+
+    @walkers.handles(OperatorKind.OBJECT_EXP)
+    @walkers.handles(
+        OperatorKind.BOOL_CONSTANT,
+        OperatorKind.INT_CONSTANT,
+        OperatorKind.REAL_CONSTANT,
+    )
+    def walk_constant(self, expression: FNode, args: List[CompiledExpression]):
+        value = expression.constant_value()
+        return lambda state, variables: value
+
+    def walk_param_exp(self, expression: FNode, args: List[CompiledExpression]):
+        raise UPProblemDefinitionError(
+            f"The CompiledStateEvaluator should only be used on grounded expressions."
+        )
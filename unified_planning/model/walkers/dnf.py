@@ -16,11 +16,84 @@
 
 import unified_planning.environment
 import unified_planning.model.walkers as walkers
-from unified_planning.exceptions import UPUnreachableCodeError
+from unified_planning.exceptions import (
+    UPNormalFormSizeError,
+    UPUnreachableCodeError,
+    UPValueError,
+)
 from unified_planning.model.fnode import FNode
 from unified_planning.model.operators import OperatorKind
-from typing import List, Tuple
-from itertools import product
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+
+# A conjunction of literals of a DNF expression
+Clause = Tuple[FNode, ...]
+
+
+class NormalFormCache:
+    """
+    This class holds the normal forms computed by all the :class:`Nnf` and :class:`Dnf`
+    of an `Environment`, so that the normal form of every sub-expression is computed
+    only once, and the statistics of the expansions into `DNF`.
+
+    Since the expressions are unique in the `Environment`, the normal form of an expression
+    is the same wherever it is found; the cache is emptied by the
+    :func:`collect <unified_planning.model.ExpressionManager.collect>` method of the
+    `ExpressionManager`.
+    """
+
+    def __init__(self):
+        # The map from (polarity, expression) to the NNF of the expression, negated if
+        # the polarity is False
+        self.nnf_memoization: Dict[Tuple[bool, FNode], FNode] = {}
+        # The map from a NNF expression to the clauses of its DNF
+        self.dnf_memoization: Dict[FNode, List[Clause]] = {}
+        self._statistics: Dict[str, int] = {}
+        self._reset_statistics()
+
+    def _reset_statistics(self):
+        for key in [
+            "nnf_hits",
+            "nnf_misses",
+            "dnf_hits",
+            "dnf_misses",
+            "expanded_clauses",
+            "duplicate_clauses",
+            "subsumed_clauses",
+            "size_limit_exceeded",
+        ]:
+            self._statistics[key] = 0
+
+    def count(self, key: str, value: int = 1):
+        """Adds the given value to the given statistic."""
+        self._statistics[key] += value
+
+    @property
+    def statistics(self) -> Dict[str, int]:
+        """
+        Returns the statistics of the normal forms computed since the creation of the
+        cache or since the last :func:`clear <unified_planning.model.walkers.NormalFormCache.clear>`:
+
+        * ``nnf_hits`` and ``nnf_misses``: the calls to ``get_nnf_expression`` whose
+          result was or was not already in the cache;
+        * ``dnf_hits`` and ``dnf_misses``: the same, for ``get_dnf_expression``;
+        * ``expanded_clauses``: the clauses created distributing the conjunctions over
+          the disjunctions;
+        * ``duplicate_clauses`` and ``subsumed_clauses``: the clauses removed because
+          equal to, or implied by, another clause of the same disjunction;
+        * ``size_limit_exceeded``: the expansions stopped because the `DNF` exceeded
+          the maximum number of clauses.
+        """
+        return dict(self._statistics)
+
+    def clear(self):
+        """Removes all the normal forms of the cache and resets the statistics."""
+        self.nnf_memoization.clear()
+        self.dnf_memoization.clear()
+        self._reset_statistics()
+
+    def __len__(self) -> int:
+        return len(self.nnf_memoization) + len(self.dnf_memoization)
 
 
 class Nnf:
@@ -35,6 +108,7 @@ class Nnf:
     def __init__(self, env: "unified_planning.environment.Environment"):
         self.env = env
         self.manager = env.expression_manager
+        self._cache = env.normal_form_cache
 
     def get_nnf_expression(self, expression: FNode) -> FNode:
         """Function used to transform a logic expression into the equivalent
@@ -49,6 +123,12 @@ class Nnf:
         :param expression: The expression that must be returned in NNF form.
         :return: The expression semantically equivalent to the given expression, but in NNF form.
         """
+        memoization = self._cache.nnf_memoization
+        res = memoization.get((True, expression), None)
+        if res is not None:
+            self._cache.count("nnf_hits")
+            return res
+        self._cache.count("nnf_misses")
         stack: List[Tuple[bool, FNode, bool]] = []
         stack.append((True, expression, False))
         solved: List[FNode] = []
@@ -61,6 +141,7 @@ class Nnf:
                         new_e = self.manager.And(args)
                     else:
                         new_e = self.manager.Or(args)
+                    memoization[(p, e)] = new_e
                     solved.append(new_e)
                 elif e.is_or():
                     args = [solved.pop() for _ in range(len(e.args))]
@@ -68,6 +149,7 @@ class Nnf:
                         new_e = self.manager.Or(args)
                     else:
                         new_e = self.manager.And(args)
+                    memoization[(p, e)] = new_e
                     solved.append(new_e)
                 else:
                     raise UPUnreachableCodeError(
@@ -76,6 +158,8 @@ class Nnf:
             else:
                 if e.is_not():
                     stack.append((not p, e.arg(0), False))
+                elif (p, e) in memoization:
+                    solved.append(memoization[(p, e)])
                 elif e.is_and() or e.is_or():
                     stack.append((p, e, True))
                     for arg in e.args:
@@ -83,6 +167,9 @@ class Nnf:
                 elif e.is_implies():
                     na1 = self.manager.Not(e.arg(0))
                     new_e = self.manager.Or(na1, e.arg(1))
+                    if (p, new_e) in memoization:
+                        solved.append(memoization[(p, new_e)])
+                        continue
                     # stack.append((p, new_e, False)) would be enough.
                     # but this requires more iterations on the stack
                     # while the arguments can be expanded in this
@@ -96,6 +183,9 @@ class Nnf:
                     e1 = self.manager.And(e.arg(0), e.arg(1))
                     e2 = self.manager.And(na1, na2)
                     new_e = self.manager.Or(e1, e2)
+                    if (p, new_e) in memoization:
+                        solved.append(memoization[(p, new_e)])
+                        continue
                     # stack.append((p, new_e, False)) would be enough.
                     # but this requires more iterations on the stack
                     # while the arguments can be expanded in this
@@ -113,7 +203,9 @@ class Nnf:
                     else:
                         solved.append(self.manager.Not(e))
         assert len(solved) == 1  # sanity check
-        return solved.pop()
+        res = solved.pop()
+        memoization[(True, expression)] = res
+        return res
 
 
 class Dnf(walkers.dag.DagWalker):
@@ -124,14 +216,35 @@ class Dnf(walkers.dag.DagWalker):
     and then every And and Or are propagated to be a unique equivalent Or of
     Ands or Atomic expressions, where 'atomic expressions' could also be a
     Not of an atomic expression.
+
+    While the conjunctions are distributed over the disjunctions, the duplicated
+    clauses and the clauses implied by another clause of the same disjunction are
+    removed. The results are memoized in the `NormalFormCache` of the `Environment`,
+    so they are shared by all the `Dnf` instances.
+
+    The size of the DNF can be exponential in the size of the expression; when
+    ``max_clauses`` is given, the expansion stops with an
+    :class:`~unified_planning.exceptions.UPNormalFormSizeError` as soon as a
+    sub-expression has more clauses than ``max_clauses``.
     """
 
-    def __init__(self, env: "unified_planning.environment.Environment"):
-        walkers.dag.DagWalker.__init__(self, True)
+    def __init__(
+        self,
+        env: "unified_planning.environment.Environment",
+        max_clauses: Optional[int] = None,
+    ):
+        walkers.dag.DagWalker.__init__(self)
+        if max_clauses is not None and max_clauses < 1:
+            raise UPValueError(
+                f"The max_clauses of the Dnf must be positive, got {max_clauses}"
+            )
         self.env = env
         self.manager = env.expression_manager
+        self.max_clauses = max_clauses
         self._nnf = Nnf(self.env)
         self._simplifier = walkers.simplifier.Simplifier(self.env)
+        self._cache = env.normal_form_cache
+        self.memoization = self._cache.dnf_memoization
 
     def get_dnf_expression(self, expression: FNode) -> FNode:
         """Function used to transform a logic expression into the equivalent
@@ -144,43 +257,121 @@ class Dnf(walkers.dag.DagWalker):
 
         For example, the form: !(a => (b && c)) becomes:
         a && (!b || !c), in NNF form, and then:
-        (a && !b) || (a && !c), therefore a DNF expression."""
+        (a && !b) || (a && !c), therefore a DNF expression.
+
+        :param expression: The expression that must be returned in DNF form.
+        :return: The expression semantically equivalent to the given expression, but in DNF form.
+        :raises UPNormalFormSizeError: If ``max_clauses`` is given and the DNF of the expression,
+            or of one of its sub-expressions, has more than ``max_clauses`` clauses.
+        """
         nnf_exp = self._nnf.get_nnf_expression(expression)
-        tuples = self.walk(nnf_exp)
-        return self.manager.Or(self.manager.And(and_args) for and_args in tuples)
+        if nnf_exp in self.memoization:
+            self._cache.count("dnf_hits")
+        else:
+            self._cache.count("dnf_misses")
+        try:
+            clauses = self.walk(nnf_exp)
+        except UPNormalFormSizeError:
+            # The results of the sub-expressions already expanded stay memoized
+            self.stack.clear()
+            raise
+        if self.max_clauses is not None and len(clauses) > self.max_clauses:
+            # The clauses were memoized by a Dnf with a larger max_clauses
+            self._size_limit_exceeded(nnf_exp, len(clauses))
+        return self.manager.Or(self.manager.And(clause) for clause in clauses)
+
+    def _get_children(self, expression: FNode):
+        # The other expressions are atoms of the DNF, so their arguments are not walked
+        if expression.is_and() or expression.is_or():
+            return expression.args
+        return []
+
+    def _size_limit_exceeded(self, expression: FNode, size: int):
+        self._cache.count("size_limit_exceeded")
+        raise UPNormalFormSizeError(
+            f"The DNF of {expression} has {size} clauses, more than the limit of {self.max_clauses}"
+        )
+
+    def _add_clause(
+        self,
+        clauses: List[Clause],
+        literals: List[FrozenSet[FNode]],
+        clause: Clause,
+    ):
+        """Adds the given clause to the given disjunction, unless it is implied by one
+        of its clauses, and removes the clauses implied by the given one."""
+        clause_literals = frozenset(clause)
+        for lits in literals:
+            if lits <= clause_literals:
+                if len(lits) == len(clause_literals):
+                    self._cache.count("duplicate_clauses")
+                else:
+                    self._cache.count("subsumed_clauses")
+                return
+        subsumed = [i for i, lits in enumerate(literals) if clause_literals <= lits]
+        if len(subsumed) > 0:
+            self._cache.count("subsumed_clauses", len(subsumed))
+            for i in reversed(subsumed):
+                del clauses[i]
+                del literals[i]
+        clauses.append(clause)
+        literals.append(clause_literals)
 
     def walk_and(
-        self, expression: FNode, args: List[List[List[FNode]]], **kwargs
-    ) -> List[List[FNode]]:
-        res: List[List[FNode]] = []
-        tuples = product(*args)
-        # tuples is an iterable of tuples, where each tuple
-        # represents one son of the resulting Or.
-        # list will contain each son of the resulting And.
-        # for example:
-        #   tuples = ([a, b], [c]) ([d])
+        self, expression: FNode, args: List[List[Clause]], **kwargs
+    ) -> List[Clause]:
+        # The conjunctions are distributed one argument at a time, so the clauses
+        # removed at every step are not expanded with the following arguments.
+        # For example:
+        #   args = [[(a, b), (c,)], [(d,)]]
         # will result in
-        #   Or(And(a, b, c), And(d))
-        for conj_list in tuples:
-            big_conjunction = [lit for conj in conj_list for lit in conj]
-            simp = self._simplifier.simplify(self.manager.And(big_conjunction))
-            if simp.is_true():
-                return []
-            elif simp.is_false():
-                pass
-            elif simp.is_and():
-                res.append(simp.args)
-            else:
-                res.append([simp])
+        #   Or(And(a, b, d), And(c, d))
+        res: List[Clause] = [()]
+        for arg in args:
+            new_res: List[Clause] = []
+            literals: List[FrozenSet[FNode]] = []
+            for conj in res:
+                for other_conj in arg:
+                    self._cache.count("expanded_clauses")
+                    simp = self._simplifier.simplify(
+                        self.manager.And(conj + other_conj)
+                    )
+                    if simp.is_true():
+                        self._add_clause(new_res, literals, ())
+                    elif simp.is_false():
+                        pass
+                    elif simp.is_and():
+                        self._add_clause(new_res, literals, tuple(simp.args))
+                    else:
+                        self._add_clause(new_res, literals, (simp,))
+            res = new_res
+            if self.max_clauses is not None and len(res) > self.max_clauses:
+                self._size_limit_exceeded(expression, len(res))
         return res
 
     def walk_or(
-        self, expression: FNode, args: List[List[List[FNode]]], **kwargs
-    ) -> List[List[FNode]]:
-        return [conjunction for disjunction in args for conjunction in disjunction]
+        self, expression: FNode, args: List[List[Clause]], **kwargs
+    ) -> List[Clause]:
+        res: List[Clause] = []
+        literals: List[FrozenSet[FNode]] = []
+        for disjunction in args:
+            for conjunction in disjunction:
+                self._add_clause(res, literals, conjunction)
+        if self.max_clauses is not None and len(res) > self.max_clauses:
+            self._size_limit_exceeded(expression, len(res))
+        return res
+
+    def walk_bool_constant(
+        self, expression: FNode, args: List[List[Clause]], **kwargs
+    ) -> List[Clause]:
+        # True is the disjunction of the empty clause, False the empty disjunction
+        return [()] if expression.bool_constant_value() else []
 
-    @walkers.handles(set(OperatorKind) - set({OperatorKind.AND, OperatorKind.OR}))
+    @walkers.handles(
+        set(OperatorKind)
+        - set({OperatorKind.AND, OperatorKind.OR, OperatorKind.BOOL_CONSTANT})
+    )
     def walk_all(
-        self, expression: FNode, args: List[List[List[FNode]]], **kwargs
-    ) -> List[List[FNode]]:
-        return [[expression]]
+        self, expression: FNode, args: List[List[Clause]], **kwargs
+    ) -> List[Clause]:
+        return [(expression,)]
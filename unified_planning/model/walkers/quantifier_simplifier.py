@@ -14,7 +14,7 @@
 #
 
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 from itertools import product
 
 import unified_planning as up
@@ -30,6 +30,10 @@ class QuantifierSimplifier(Simplifier):
     """
     Same to the :class:`~unified_planning.model.walkers.Simplifier`, but does not expand quantifiers and solves them
     locally using the :class:`~unified_planning.model.Problem` given at construction time.
+
+    The values of the `static fluents` of the `Problem` that are not in the given assignments are read from the
+    :func:`static_facts <unified_planning.model.Problem.static_facts>` of the `Problem`, so the assignments
+    can contain only the values of the fluents modified by the actions.
     """
 
     def __init__(
@@ -41,8 +45,12 @@ class QuantifierSimplifier(Simplifier):
         self._env = env
         self.manager = env.expression_manager
         self._problem = problem
+        # The result of a walk depends on the assignments, so it can't be shared
+        self._cache = None
         self._assignments: Optional[Dict["Expression", "Expression"]] = None
         self._variable_assignments: Optional[Dict["Expression", "Expression"]] = None
+        # computed when needed, because most expressions are evaluated from the assignments
+        self._static_fluents: Optional[Set["up.model.Fluent"]] = None
 
     def qsimplify(
         self,
@@ -107,6 +115,7 @@ class QuantifierSimplifier(Simplifier):
         variables_assignments: Dict["Expression", "Expression"],
     ) -> "FNode":
         new_qsimplifier = QuantifierSimplifier(self._env, self._problem)
+        new_qsimplifier._static_fluents = self._static_fluents
         assert self._variable_assignments is not None
         assert self._assignments is not None
         copy = self._variable_assignments.copy()
@@ -169,6 +178,8 @@ class QuantifierSimplifier(Simplifier):
         new_exp = self.manager.FluentExp(expression.fluent(), tuple(args))
         assert self._assignments is not None
         res = self._assignments.get(new_exp, None)
+        if res is None:
+            res = self._static_value(expression.fluent(), args)
         if res is not None:
             (res,) = self.manager.auto_promote(res)
             assert type(res) is FNode
@@ -178,6 +189,17 @@ class QuantifierSimplifier(Simplifier):
                 f"Value of Fluent {str(expression)} not found in {str(self._assignments)}"
             )
 
+    def _static_value(
+        self, fluent: "up.model.Fluent", args: List["FNode"]
+    ) -> Optional["FNode"]:
+        """Returns the initial value of the given static fluent, or None if the fluent is not static."""
+        assert self._problem is not None
+        if self._static_fluents is None:
+            self._static_fluents = self._problem.get_static_fluents()
+        if fluent not in self._static_fluents or not all(a.is_constant() for a in args):
+            return None
+        return self._problem.static_facts.args_value(fluent, tuple(args))
+
     def walk_variable_exp(self, expression: "FNode", args: List["FNode"]) -> "FNode":
         assert self._variable_assignments is not None
         res = self._variable_assignments.get(expression.variable(), None)
@@ -15,14 +15,135 @@
 
 from fractions import Fraction
 from collections import OrderedDict
-from typing import List, Optional, Set, Union
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple, Union
 import unified_planning as up
 import unified_planning.environment
 import unified_planning.model.walkers as walkers
 from unified_planning.model.fnode import FNode
+from unified_planning.exceptions import UPProblemDefinitionError
 import unified_planning.model.operators as op
 
 
+class SimplificationCache:
+    """
+    This class is a bounded cache of the simplified expressions, shared by all the
+    :class:`Simplifiers <unified_planning.model.walkers.Simplifier>` of an `Environment`.
+
+    The simplification of an expression depends on the `static fluents` of the `Problem`
+    given to the `Simplifier`, so every entry is keyed by the id of the expression and by
+    the fingerprint of the static fluents and of their initial values; two `Simplifiers`
+    created on problems with the same static context share their results.
+
+    When the cache is full, the least recently used entry is removed; the fingerprints
+    of at most `max_contexts` static contexts are kept in the same way, a context that
+    is removed gets a new fingerprint the next time it is used.
+    """
+
+    def __init__(self, max_size: int = 100000, max_contexts: int = 1000):
+        if max_size < 0:
+            raise up.exceptions.UPValueError(
+                f"The max_size of the SimplificationCache must be non-negative, got {max_size}"
+            )
+        self._max_size = max_size
+        self._max_contexts = max_contexts
+        self._cache: "OrderedDict[Tuple[int, int], FNode]" = OrderedDict()
+        self._fingerprints: "OrderedDict[FrozenSet, int]" = OrderedDict()
+        # The fingerprints are never reused, because the Simplifiers keep the one of their problem
+        self._next_fingerprint = 0
+        self._hits = 0
+        self._misses = 0
+
+    def fingerprint(
+        self, problem: Optional["unified_planning.model.problem.Problem"]
+    ) -> int:
+        """
+        Returns the fingerprint of the static context of the given `Problem`; the
+        fingerprint is the same for every `Problem` with the same `static fluents` and
+        the same initial values for them.
+
+        :param problem: The `Problem` defining the static context, `None` means no
+            static fluents.
+        :return: The fingerprint of the static context of the given `Problem`.
+        """
+        if problem is None:
+            context: FrozenSet = frozenset()
+        else:
+            static_fluents = problem.get_static_fluents()
+            static_facts = problem.static_facts
+            context = frozenset(
+                (f, static_facts.default(f), static_facts.fingerprint(f))
+                for f in static_fluents
+            )
+        res = self._fingerprints.get(context, None)
+        if res is None:
+            res = self._next_fingerprint
+            self._next_fingerprint += 1
+            self._fingerprints[context] = res
+            if len(self._fingerprints) > self._max_contexts:
+                self._fingerprints.popitem(last=False)
+        else:
+            self._fingerprints.move_to_end(context)
+        return res
+
+    def get(self, expression: FNode, fingerprint: int) -> Optional[FNode]:
+        """
+        Returns the simplification of the given expression in the given static
+        context, or `None` if it is not in the cache.
+
+        :param expression: The expression to simplify.
+        :param fingerprint: The fingerprint of the static context, as returned
+            by the :func:`fingerprint <unified_planning.model.walkers.simplifier.SimplificationCache.fingerprint>` method.
+        :return: The cached simplified expression or `None`.
+        """
+        key = (expression.node_id, fingerprint)
+        res = self._cache.get(key, None)
+        if res is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+            self._cache.move_to_end(key)
+        return res
+
+    def put(self, expression: FNode, fingerprint: int, simplified: FNode):
+        """
+        Stores the simplification of the given expression in the given static context.
+
+        :param expression: The simplified expression.
+        :param fingerprint: The fingerprint of the static context.
+        :param simplified: The simplification of the given `expression`.
+        """
+        if self._max_size == 0:
+            return
+        self._cache[(expression.node_id, fingerprint)] = simplified
+        if len(self._cache) > self._max_size:
+            self._cache.popitem(last=False)
+
+    def clear(self):
+        """Removes all the entries of the cache and the fingerprints, and resets the counters."""
+        self._cache.clear()
+        self._fingerprints.clear()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self) -> int:
+        """Returns the number of simplifications found in the cache."""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Returns the number of simplifications not found in the cache."""
+        return self._misses
+
+    @property
+    def max_size(self) -> int:
+        """Returns the maximum number of entries of the cache."""
+        return self._max_size
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
 class Simplifier(walkers.dag.DagWalker):
     """Performs basic simplifications of the input expression.
 
@@ -38,11 +159,15 @@ class Simplifier(walkers.dag.DagWalker):
         walkers.dag.DagWalker.__init__(self)
         self.env = env
         self.manager = env.expression_manager
+        self._static_facts: Optional["unified_planning.model.StaticFactsIndex"] = None
         if problem is not None:
             self.static_fluents = problem.get_static_fluents()
+            self._static_facts = problem.static_facts
         else:
             self.static_fluents = set()
         self.problem: Optional["unified_planning.model.problem.Problem"] = problem
+        self._cache: Optional[SimplificationCache] = env.simplification_cache
+        self._fingerprint = self._cache.fingerprint(problem)
 
     def _number_to_fnode(self, value: Union[int, float, Fraction]) -> FNode:
         if isinstance(value, int):
@@ -60,7 +185,13 @@ class Simplifier(walkers.dag.DagWalker):
         :param expression: The target expression that must be simplified with constant propagation.
         :return: The simplified expression.
         """
-        return self.walk(expression)
+        if self._cache is None:
+            return self.walk(expression)
+        res = self._cache.get(expression, self._fingerprint)
+        if res is None:
+            res = self.walk(expression)
+            self._cache.put(expression, self._fingerprint, res)
+        return res
 
     def walk_and(self, expression: FNode, args: List[FNode]) -> FNode:
         if len(args) == 2 and args[0] == args[1]:
@@ -238,13 +369,16 @@ class Simplifier(walkers.dag.DagWalker):
         if expression.fluent() not in self.static_fluents:
             return self.manager.FluentExp(expression.fluent(), tuple(args))
         else:
-            assert self.problem is not None
+            assert self._static_facts is not None
             for a in args:
                 if not a.is_constant():
                     return self.manager.FluentExp(expression.fluent(), tuple(args))
-            return self.problem.initial_value(
-                self.manager.FluentExp(expression.fluent(), tuple(args))
-            )
+            if any(a is not b for a, b in zip(args, expression.args)):
+                expression = self.manager.FluentExp(expression.fluent(), tuple(args))
+            res = self._static_facts.value(expression)
+            if res is None:
+                raise UPProblemDefinitionError("Initial value not set!")
+            return res
 
     def walk_dot(self, expression: FNode, args: List[FNode]) -> FNode:
         return self.manager.Dot(expression.agent(), args[0])
@@ -14,6 +14,7 @@
 #
 
 
+import weakref
 import unified_planning.model.types
 import unified_planning.environment
 import unified_planning.model.walkers as walkers
@@ -30,6 +31,18 @@ class TypeChecker(walkers.dag.DagWalker):
     def __init__(self, env: "unified_planning.environment.Environment"):
         walkers.dag.DagWalker.__init__(self)
         self.env = env
+        # Every expression created is type-checked, so the memoization must not
+        # keep alive the expressions released by the ExpressionManager.
+        self.memoization = weakref.WeakKeyDictionary()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["memoization"] = dict(self.memoization)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.memoization = weakref.WeakKeyDictionary(self.memoization)
 
     def get_type(self, expression: FNode) -> "unified_planning.model.types.Type":
         """
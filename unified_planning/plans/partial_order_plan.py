@@ -14,14 +14,17 @@
 #
 
 
-import networkx as nx
 import unified_planning as up
 import unified_planning.plans as plans
 from unified_planning.environment import Environment
 from unified_planning.exceptions import UPUsageError
 from unified_planning.plans.plan import ActionInstance
 from unified_planning.plans.sequential_plan import SequentialPlan
-from typing import Callable, Dict, Iterator, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # networkx is imported where it is used, because importing it is slow
+    import networkx as nx
 
 
 class PartialOrderPlan(plans.plan.Plan):
@@ -33,7 +36,7 @@ class PartialOrderPlan(plans.plan.Plan):
             "plans.plan.ActionInstance", List["plans.plan.ActionInstance"]
         ],
         environment: Optional["Environment"] = None,
-        _graph: Optional[nx.DiGraph] = None,
+        _graph: Optional["nx.DiGraph"] = None,
     ):
         """
         Constructs the PartialOrderPlan using the adjacency list representation.
@@ -82,6 +85,8 @@ class PartialOrderPlan(plans.plan.Plan):
                         raise UPUsageError(
                             "The environment given to the plan is not the same of the actions in the plan."
                         )
+            import networkx as nx
+
             self._graph = nx.convert.from_dict_of_lists(
                 adjacency_list, create_using=nx.DiGraph
             )
@@ -91,6 +96,8 @@ class PartialOrderPlan(plans.plan.Plan):
 
     def __eq__(self, oth: object) -> bool:
         if isinstance(oth, PartialOrderPlan):
+            import networkx as nx
+
             return nx.is_isomorphic(
                 self._graph,
                 oth._graph,
@@ -100,6 +107,8 @@ class PartialOrderPlan(plans.plan.Plan):
             return False
 
     def __hash__(self) -> int:
+        import networkx as nx
+
         return hash(nx.weisfeiler_lehman_graph_hash(self._graph))
 
     def __contains__(self, item: object) -> bool:
@@ -113,6 +122,8 @@ class PartialOrderPlan(plans.plan.Plan):
         self,
     ) -> Dict["plans.plan.ActionInstance", List["plans.plan.ActionInstance"]]:
         """Returns the graph of action instances as an adjacency list."""
+        import networkx as nx
+
         return nx.convert.to_dict_of_lists(self._graph)
 
     def replace_action_instances(
@@ -150,10 +161,14 @@ class PartialOrderPlan(plans.plan.Plan):
 
     def to_sequential_plan(self) -> SequentialPlan:
         """Returns one between all possible `SequentialPlans` that respects the ordering constraints given by this `PartialOrderPlan`."""
+        import networkx as nx
+
         return SequentialPlan(list(nx.topological_sort(self._graph)), self._environment)
 
     def all_sequential_plans(self) -> Iterator[SequentialPlan]:
         """Returns all possible `SequentialPlans` that respects the ordering constraints given by this `PartialOrderPlan`."""
+        import networkx as nx
+
         for sorted_plan in nx.all_topological_sorts(self._graph):
             yield SequentialPlan(list(sorted_plan), self._environment)
 
@@ -166,6 +181,8 @@ class PartialOrderPlan(plans.plan.Plan):
         :param action_instance: The `ActionInstance` of which neighbors must be retrieved.
         :return: The `Iterator` over all the neighbors of the given `action_instance`.
         """
+        import networkx as nx
+
         try:
             retval = self._graph.neighbors(action_instance)
         except nx.NetworkXError:
@@ -14,7 +14,6 @@
 #
 
 
-import networkx as nx
 import unified_planning as up
 import unified_planning.plans as plans
 import unified_planning.model.walkers as walkers
@@ -131,6 +130,8 @@ class SequentialPlan(plans.plan.Plan):
         # fluent in their preconditions (or in the condition of their conditional effects)
         all_required: Dict[FNode, List["plans.plan.ActionInstance"]] = {}
         # graph stores the information gathered through the process
+        import networkx as nx
+
         graph = nx.DiGraph()
         for action_instance in self.actions:
             graph.add_node(action_instance)
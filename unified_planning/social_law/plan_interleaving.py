@@ -0,0 +1,300 @@
+# Copyright 2022 Technion
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""This module defines the JointPlanExecutor, which executes the interleavings of the plans of the agents of a multi agent problem."""
+
+import random
+from dataclasses import dataclass, field
+from enum import Enum, auto
+from typing import Callable, Dict, List, Optional
+import unified_planning as up
+from unified_planning.model import COWState, FNode, PackedState, Problem
+from unified_planning.model.multi_agent import Agent, MultiAgentProblem
+from unified_planning.model.multi_agent.ma_centralizer import (
+    MultiAgentProblemCentralizer,
+)
+from unified_planning.engines.sequential_simulator import SequentialSimulator
+from unified_planning.plans import SequentialPlan, ActionInstance
+
+
+class InterleavingStatus(Enum):
+    SUCCESS = auto()  # All the plans were executed and the goals were achieved
+    DEADLOCK = auto()  # No agent could execute the next step of its plan
+    GOALS_NOT_REACHED = (
+        auto()
+    )  # All the plans were executed but some goal is not achieved
+
+
+@dataclass
+class InterleavingResult:
+    status: InterleavingStatus
+    plan: SequentialPlan
+    state: COWState
+    blocked_agents: List[Agent] = field(default_factory=list)
+
+
+class _CompiledStep:
+    """A step of the plan of an agent, with its grounded preconditions and effects compiled as masks over the bits of a PackedState.
+
+    When the step can not be represented with masks (for example because it reads or writes a numeric fluent, or
+    because it has conditional effects) maskable is False and the events of the simulator are used instead."""
+
+    __slots__ = ["action_instance", "events", "maskable", "pos", "neg", "add", "delete"]
+
+    def __init__(
+        self,
+        action_instance: ActionInstance,
+        events: List["up.engines.mixins.simulator.Event"],
+        layout: "up.model.StateLayout",
+    ):
+        self.action_instance = action_instance
+        self.events = events
+        self.maskable: bool = True
+        self.pos: int = 0
+        self.neg: int = 0
+        self.add: int = 0
+        self.delete: int = 0
+        try:
+            for event in events:
+                if event.simulated_effect is not None:
+                    raise _NotMaskable()
+                for c in event.conditions:
+                    self._add_condition(c, layout)
+                for e in event.effects:
+                    if (
+                        e.is_conditional()
+                        or not e.is_assignment()
+                        or not e.value.is_bool_constant()
+                    ):
+                        raise _NotMaskable()
+                    slot = layout.bool_slot(e.fluent)
+                    if slot is None:
+                        raise _NotMaskable()
+                    if e.value.bool_constant_value():
+                        self.add |= 1 << slot
+                    else:
+                        self.delete |= 1 << slot
+            if self.add & self.delete:
+                raise _NotMaskable()
+        except _NotMaskable:
+            self.maskable = False
+            self.pos = self.neg = self.add = self.delete = 0
+
+    def _add_condition(self, condition: FNode, layout: "up.model.StateLayout"):
+        if condition.is_and():
+            for arg in condition.args:
+                self._add_condition(arg, layout)
+        elif condition.is_true():
+            pass
+        elif condition.is_not():
+            slot = layout.bool_slot(condition.arg(0))
+            if slot is None:
+                raise _NotMaskable()
+            self.neg |= 1 << slot
+        else:
+            slot = layout.bool_slot(condition)
+            if slot is None:
+                raise _NotMaskable()
+            self.pos |= 1 << slot
+
+
+class _NotMaskable(Exception):
+    pass
+
+
+# A Scheduler receives the current state, the map from the name of every agent to the index of its next step
+# and the enabled agents, and returns the agent to move
+Scheduler = Callable[[COWState, Dict[str, int], List[Agent]], Agent]
+
+
+class JointPlanExecutor:
+    """Executes the plans of the agents of a MultiAgentProblem in a shared state, interleaving their steps.
+
+    Every step of every plan is grounded once, when the executor is created, and compiled as masks over the bits of
+    the PackedState of the centralized problem; so checking if a step is applicable, or applying it, only costs a few
+    integer operations and the applicability of the next step of every agent is computed at once.
+    The same executor can run many different interleavings of the same plans, with round_robin or with a Scheduler,
+    a function that chooses which of the agents whose next step is applicable moves next.
+
+    A MultiAgentProblemCentralizer can be given, so that the centralizations of the actions of the agents are shared
+    among executors of problems that differ only in some agents.
+    """
+
+    def __init__(
+        self,
+        problem: MultiAgentProblem,
+        plans: Dict[Agent, SequentialPlan],
+        centralizer: Optional[MultiAgentProblemCentralizer] = None,
+    ):
+        if centralizer is None:
+            centralizer = MultiAgentProblemCentralizer()
+        centralized = centralizer.compile(problem).problem
+        assert isinstance(centralized, Problem)
+        self._centralized = centralized
+        self._simulator = SequentialSimulator(self._centralized)
+        self._initial_state = self._simulator.get_initial_state()
+        self._agents = [agent for agent in problem.agents if agent in plans]
+        self._steps: Dict[str, List[_CompiledStep]] = {}
+        for agent in self._agents:
+            steps = []
+            for ai in plans[agent].actions:
+                action = self._centralized.action(agent.name + "__" + ai.action.name)
+                events = self._simulator.get_events(action, ai.actual_parameters)
+                steps.append(
+                    _CompiledStep(
+                        ActionInstance(ai.action, ai.actual_parameters, agent),
+                        events,
+                        self._initial_state.layout,
+                    )
+                )
+            self._steps[agent.name] = steps
+
+    @property
+    def centralized_problem(self) -> "up.model.Problem":
+        """Returns the centralized problem in which the plans are executed."""
+        return self._centralized
+
+    def steps(self, agent: Agent) -> List[ActionInstance]:
+        """Returns the steps of the plan of the given agent."""
+        return [step.action_instance for step in self._steps[agent.name]]
+
+    def _is_applicable(self, step: _CompiledStep, state: COWState) -> bool:
+        if step.maskable and isinstance(state, PackedState):
+            bits = state.key[0]
+            return bits & step.pos == step.pos and not bits & step.neg
+        return all(self._simulator.is_applicable(event, state) for event in step.events)
+
+    def _apply(self, step: _CompiledStep, state: COWState) -> COWState:
+        if step.maskable and isinstance(state, PackedState):
+            bits, values = state.key
+            return PackedState(state.layout, (bits | step.add) & ~step.delete, values)
+        for event in step.events:
+            state = self._simulator.apply_unsafe(event, state)
+        return state
+
+    def enabled_agents(self, state: COWState, position: Dict[str, int]) -> List[Agent]:
+        """Returns the agents that did not finish their plan and whose next step is applicable in the given state.
+
+        :param state: The current state.
+        :param position: The map from the name of every agent to the index of its next step.
+        """
+        res = []
+        for agent in self._agents:
+            steps = self._steps[agent.name]
+            i = position[agent.name]
+            if i < len(steps) and self._is_applicable(steps[i], state):
+                res.append(agent)
+        return res
+
+    def _result(
+        self, state: COWState, plan: SequentialPlan, position: Dict[str, int]
+    ) -> InterleavingResult:
+        blocked = [
+            agent
+            for agent in self._agents
+            if position[agent.name] < len(self._steps[agent.name])
+        ]
+        if len(blocked) > 0:
+            return InterleavingResult(InterleavingStatus.DEADLOCK, plan, state, blocked)
+        if len(self._simulator.get_unsatisfied_goals(state)) > 0:
+            return InterleavingResult(InterleavingStatus.GOALS_NOT_REACHED, plan, state)
+        return InterleavingResult(InterleavingStatus.SUCCESS, plan, state)
+
+    def round_robin(self) -> InterleavingResult:
+        """Executes the plans in rounds: in every round each agent, in order, executes its next step if it is applicable.
+
+        The execution fails with a deadlock when no agent can move during a whole round."""
+        state: COWState = self._initial_state
+        plan = SequentialPlan([])
+        position = {agent.name: 0 for agent in self._agents}
+        active_agents = self._agents
+        while len(active_agents) > 0:
+            action_performed = False
+            active_agents_next = []
+            for agent in active_agents:
+                steps = self._steps[agent.name]
+                i = position[agent.name]
+                if i < len(steps):
+                    active_agents_next.append(agent)
+                    if self._is_applicable(steps[i], state):
+                        state = self._apply(steps[i], state)
+                        plan.actions.append(steps[i].action_instance)
+                        position[agent.name] = i + 1
+                        action_performed = True
+            if not action_performed:
+                break
+            active_agents = active_agents_next
+        return self._result(state, plan, position)
+
+    def run(self, scheduler: Scheduler) -> InterleavingResult:
+        """Executes the plans one step at a time, moving the agent chosen by the given scheduler among the enabled agents.
+
+        The execution fails with a deadlock when no agent that did not finish its plan can move."""
+        state: COWState = self._initial_state
+        plan = SequentialPlan([])
+        position = {agent.name: 0 for agent in self._agents}
+        enabled = self.enabled_agents(state, position)
+        while len(enabled) > 0:
+            agent = scheduler(state, position, enabled)
+            step = self._steps[agent.name][position[agent.name]]
+            state = self._apply(step, state)
+            plan.actions.append(step.action_instance)
+            position[agent.name] += 1
+            enabled = self.enabled_agents(state, position)
+        return self._result(state, plan, position)
+
+    def random_scheduler(self, rng: random.Random) -> Scheduler:
+        """Returns a Scheduler that moves a random enabled agent."""
+        return lambda state, position, enabled: rng.choice(enabled)
+
+    def adversarial_scheduler(
+        self, state: COWState, position: Dict[str, int], enabled: List[Agent]
+    ) -> Agent:
+        """A Scheduler that moves the enabled agent whose step disables the next step of the largest number of
+        other agents, trying to lead the execution to a deadlock; ties are broken moving the agent that executed
+        the fewest steps, so that all the agents are in the middle of their plans at the same time."""
+        best, best_score = enabled[0], None
+        for agent in enabled:
+            successor = self._apply(
+                self._steps[agent.name][position[agent.name]], state
+            )
+            disabled = sum(
+                1
+                for other in enabled
+                if other is not agent
+                and not self._is_applicable(
+                    self._steps[other.name][position[other.name]], successor
+                )
+            )
+            score = (disabled, -position[agent.name])
+            if best_score is None or score > best_score:
+                best, best_score = agent, score
+        return best
+
+    def sample_interleavings(
+        self, samples: int, seed: Optional[int] = None, adversarial: bool = True
+    ) -> List[InterleavingResult]:
+        """Executes the round robin interleaving, the adversarial one (if adversarial is True) and samples random ones.
+
+        :param samples: The number of random interleavings to execute.
+        :param seed: The seed of the random interleavings, so that they can be reproduced.
+        :param adversarial: If True, the adversarial interleaving is executed too.
+        :return: The results of all the executed interleavings, in this order.
+        """
+        results = [self.round_robin()]
+        if adversarial:
+            results.append(self.run(self.adversarial_scheduler))
+        rng = random.Random(seed)
+        for _ in range(samples):
+            results.append(self.run(self.random_scheduler(rng)))
+        return results
@@ -14,33 +14,37 @@
 #
 """This module defines the social law class."""
 
-from collections import defaultdict
+from collections import defaultdict, deque
 import unified_planning as up
 from unified_planning.social_law.single_agent_projection import SingleAgentProjection
 from unified_planning.social_law.robustness_verification import SimpleInstantaneousActionRobustnessVerifier
 from unified_planning.social_law.waitfor_specification import WaitforSpecification
 from unified_planning.social_law.ma_problem_waitfor import MultiAgentProblemWithWaitfor
+from unified_planning.social_law.plan_interleaving import JointPlanExecutor, InterleavingStatus
 from unified_planning.model import Parameter, Fluent, InstantaneousAction, problem_kind
 from unified_planning.shortcuts import *
-from unified_planning.exceptions import UPProblemDefinitionError
+from unified_planning.exceptions import UPException, UPProblemDefinitionError, UPUsageError
 from unified_planning.model import Problem, InstantaneousAction, DurativeAction, Action
-from typing import Type, List, Dict, Callable, OrderedDict
+from typing import Type, List, Dict, Callable, Deque, OrderedDict, Tuple
 from enum import Enum, auto
 from unified_planning.io import PDDLWriter, PDDLReader
 from unified_planning.engines import Credits
 from unified_planning.model.multi_agent import *
 from unified_planning.engines.mixins.compiler import CompilationKind, CompilerMixin
 import unified_planning.engines as engines
-from unified_planning.plans import Plan, SequentialPlan
+from unified_planning.plans import Plan, SequentialPlan, ActionInstance
 import unified_planning.engines.results 
 from unified_planning.engines.meta_engine import MetaEngine
 import unified_planning.engines.mixins as mixins
 from unified_planning.engines.mixins.oneshot_planner import OptimalityGuarantee
 from unified_planning.engines.results import *
 from unified_planning.engines.sequential_simulator import SequentialSimulator
+from unified_planning.engines.plan_validator import SequentialPlanValidator
 from unified_planning.model.multi_agent.ma_centralizer import MultiAgentProblemCentralizer
 from functools import partial
 from unified_planning.engines.compilers.utils import replace_action
+from unified_planning.engines.parallel import WorkerPool, serialize_arguments
+import time
 
 credits = Credits('Social Law Robustness Checker',
                   'Technion Cognitive Robotics Lab (cf. https://github.com/TechnionCognitiveRoboticsLab)',
@@ -72,16 +76,130 @@ class SocialLawRobustnessResult(Result):
     
 
 
+class SingleAgentProjectionCache:
+    '''Memoizes the results of the single agent projections across robustness checks.
+
+    During the social law synthesis, a successor of a search node usually changes the projection
+    of only one agent, so the results of the other agents are looked up by the agent name and a
+    fingerprint of the projected problem (actions, fluents, objects, initial state and goals).
+    When the projection of an agent changed, a plan that was found for an earlier projection of
+    the same agent is reused if it is still valid, which is the case when it does not use any of
+    the newly disallowed action instances.
+
+    At most max_results results are kept, the least recently used are discarded first, and only
+    the last max_plans plans of every agent are validated when looking for a plan to reuse.
+    '''
+    def __init__(self, max_results : int = 10000, max_plans : int = 8):
+        self._max_results = max_results
+        self._results : OrderedDict[Tuple, Optional[SequentialPlan]] = OrderedDict() # None represents an unsolvable projection
+        self._plans : Dict[str, Deque[SequentialPlan]] = {}
+        self._max_plans = max_plans
+        self.hits = 0
+        self.reused_plans = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(agent_name : str, projection : Problem) -> Tuple:
+        return (agent_name,
+                frozenset(projection.fluents),
+                frozenset(projection.fluents_defaults.items()),
+                frozenset(projection.actions),
+                frozenset(projection.all_objects),
+                frozenset(projection.explicit_initial_values.items()),
+                frozenset(projection.goals))
+
+    @staticmethod
+    def _adapt_plan(plan : SequentialPlan, projection : Problem) -> Optional[SequentialPlan]:
+        # The actions are cloned by the social laws, so they are replaced by name, as the objects
+        em = projection.env.expression_manager
+        actions = []
+        for ai in plan.actions:
+            if not projection.has_action(ai.action.name):
+                return None
+            action = projection.action(ai.action.name)
+            if len(action.parameters) != len(ai.actual_parameters):
+                return None
+            parameters = []
+            for p in ai.actual_parameters:
+                if p.is_object_exp():
+                    if not projection.has_object(p.object().name):
+                        return None
+                    p = em.ObjectExp(projection.object(p.object().name))
+                elif p.environment is not projection.env:
+                    p = em.auto_promote(p.constant_value())[0]
+                parameters.append(p)
+            actions.append(ActionInstance(action, tuple(parameters)))
+        return SequentialPlan(actions)
+
+    def lookup(self, agent_name : str, projection : Problem) -> Optional[Tuple[bool, Optional[SequentialPlan]]]:
+        '''Returns None if the result of the projection is not known, otherwise if the projection is
+        solvable and a plan for it, that is None only when the projection is unsolvable.'''
+        key = self.fingerprint(agent_name, projection)
+        if key in self._results:
+            self._results.move_to_end(key)
+            plan = self._results[key]
+            if plan is None:
+                self.hits += 1
+                return (False, None)
+            new_plan = self._adapt_plan(plan, projection)
+            if new_plan is not None:
+                self.hits += 1
+                return (True, new_plan)
+            # The cached plan can not be used in this projection, so it is a miss
+        plans = self._plans.get(agent_name, None)
+        if plans is not None and SequentialPlanValidator.supports(projection.kind):
+            validator = SequentialPlanValidator(env=projection.env)
+            for plan in reversed(plans):
+                new_plan = self._adapt_plan(plan, projection)
+                if new_plan is not None and validator.validate(projection, new_plan).status == ValidationResultStatus.VALID:
+                    self.reused_plans += 1
+                    self._store(key, new_plan)
+                    return (True, new_plan)
+        self.misses += 1
+        return None
+
+    def add(self, agent_name : str, projection : Problem, plan : Optional[SequentialPlan]):
+        '''Stores the result of the projection, where a None plan means that it is unsolvable.'''
+        self._store(self.fingerprint(agent_name, projection), plan)
+        if plan is not None:
+            plans = self._plans.get(agent_name, None)
+            if plans is None:
+                plans = deque(maxlen=self._max_plans)
+                self._plans[agent_name] = plans
+            plans.append(plan)
+
+    def _store(self, key : Tuple, plan : Optional[SequentialPlan]):
+        self._results[key] = plan
+        self._results.move_to_end(key)
+        while len(self._results) > self._max_results:
+            self._results.popitem(last=False)
+
+    def clear(self):
+        self._results.clear()
+        self._plans.clear()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+
 class SocialLawRobustnessChecker(engines.engine.Engine, mixins.OneshotPlannerMixin):
     '''social law robustness checker class:
     This class checks if a given MultiAgentProblemWithWaitfor is robust or not.
     '''
-    def __init__(self, planner_name : str = None, robustness_verifier_name : str = None, save_pddl = False):
+    def __init__(self, planner_name : Optional[str] = None, robustness_verifier_name : Optional[str] = None, save_pddl = False, max_workers : int = 1, cache_projections : bool = True):
         engines.engine.Engine.__init__(self)
         mixins.OneshotPlannerMixin.__init__(self)
         self._planner_name = planner_name
         self._robustness_verifier_name = robustness_verifier_name
         self._save_pddl = save_pddl
+        # When more than one worker is given, the single agent projections are solved concurrently
+        self._max_workers = max_workers
+        self._pool : Optional[WorkerPool] = None
+        self._projection_cache = SingleAgentProjectionCache() if cache_projections else None
+        # The robustness verifier is kept across the calls, as it caches the compilation of the actions
+        self._robustness_verifier : Optional[Tuple[ProblemKind, "up.engines.engine.Engine"]] = None
+        # The centralizer is kept across the calls too, so only the agents that changed are centralized again
+        self._centralizer = MultiAgentProblemCentralizer()
         
 
     @property
@@ -137,27 +255,146 @@ class SocialLawRobustnessChecker(engines.engine.Engine, mixins.OneshotPlannerMix
     def status(self) -> SocialLawRobustnessStatus:
         return self._status
 
-    def is_single_agent_solvable(self, problem : MultiAgentProblem) -> bool:
+    @property
+    def projection_cache(self) -> Optional["SingleAgentProjectionCache"]:
+        """Returns the cache of the single agent projection results, if the checker uses one."""
+        return self._projection_cache
+
+    def is_single_agent_solvable(self, problem : MultiAgentProblem, timeout : Optional[float] = None) -> Optional[bool]:
+        """Returns True iff every single agent projection of the given problem is solvable, False if
+        one of them is unsolvable and None if it is unknown, because the time budget is over or the
+        planner could not decide a projection (for example it timed out).
+
+        The projections are solved one after the other, or concurrently when the checker has more
+        than one worker; the given timeout (in seconds) is the budget shared by all the projections
+        and the check stops at the first projection that is not solved.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        projections : List[Tuple[str, Problem]] = []
         for agent in problem.agents:
             sap = SingleAgentProjection(agent)        
             result = sap.compile(problem)
+            assert isinstance(result.problem, Problem)
 
             if self._save_pddl:
                 w = PDDLWriter(result.problem)
                 w.write_domain("sap__" + agent.name + "__domain.pddl")
                 w.write_problem("sap__" + agent.name + "__problem.pddl")            
 
+            if self._projection_cache is not None:
+                cached = self._projection_cache.lookup(agent.name, result.problem)
+                if cached is not None:
+                    if not cached[0]:
+                        return False
+                    continue
+            if self._max_workers > 1:
+                projections.append((agent.name, result.problem))
+                continue
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                return None # The budget is over before the projection is solved
             with OneshotPlanner(name=self._planner_name, problem_kind=result.problem.kind) as planner:
-                presult = planner.solve(result.problem)
-                if presult.status not in unified_planning.engines.results.POSITIVE_OUTCOMES:                    
-                    return False
+                presult = planner.solve(result.problem, timeout=remaining)
+                self._store_projection_result(agent.name, result.problem, presult)
+                solvable = self._projection_solvability(presult)
+                if not solvable:
+                    return solvable
+        if len(projections) > 0:
+            return self._are_projections_solvable(problem.env.factory, projections, deadline)
         return True
 
+    @staticmethod
+    def _projection_solvability(presult : PlanGenerationResult) -> Optional[bool]:
+        if presult.status in unified_planning.engines.results.POSITIVE_OUTCOMES:
+            return True
+        elif presult.status in [PlanGenerationResultStatus.UNSOLVABLE_PROVEN, PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY]:
+            return False
+        return None # Timeouts and errors do not tell anything about the projection
+
+    def _store_projection_result(self, agent_name : str, projection : Problem, presult : PlanGenerationResult):
+        if self._projection_cache is None:
+            return
+        if presult.status in unified_planning.engines.results.POSITIVE_OUTCOMES:
+            assert presult.plan is not None
+            plan = projection.normalize_plan(presult.plan)
+            assert isinstance(plan, SequentialPlan)
+            self._projection_cache.add(agent_name, projection, plan)
+        elif presult.status in [PlanGenerationResultStatus.UNSOLVABLE_PROVEN, PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY]:
+            # Timeouts and errors are not cached, the planner might succeed on the next call
+            self._projection_cache.add(agent_name, projection, None)
+
+    def _planner_engine_name(self, factory : "up.engines.factory.Factory", problem_kind : ProblemKind) -> str:
+        if self._planner_name is not None:
+            return self._planner_name
+        with factory.OneshotPlanner(problem_kind=problem_kind) as planner:
+            EngineClass = type(planner)
+        for name in factory.engines:
+            if factory.engine(name) is EngineClass:
+                return name
+        raise UPUsageError(f"Planner {EngineClass} is not in the factory")
+
+    def _are_projections_solvable(self, factory : "up.engines.factory.Factory", projections : List[Tuple[str, Problem]], deadline : Optional[float]) -> Optional[bool]:
+        problem_kind = projections[0][1].kind
+        for _, projection in projections[1:]:
+            problem_kind = problem_kind.union(projection.kind)
+        engine_name = self._planner_engine_name(factory, problem_kind)
+        num_workers = min(self._max_workers, len(projections))
+        if self._pool is None:
+            self._pool = WorkerPool(factory)
+        # The workers are kept warm across the calls, as long as the planner does not change
+        self._pool.start([(engine_name, {})] * num_workers)
+
+        to_solve = list(projections)
+        free_workers = list(range(num_workers))
+        pending : Dict[int, int] = {} # call id -> worker index
+        submitted : Dict[int, Tuple[str, Problem]] = {}
+        solvable : Optional[bool] = True
+        while solvable and (len(to_solve) > 0 or len(pending) > 0):
+            while len(to_solve) > 0 and len(free_workers) > 0:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                agent_name, projection = to_solve.pop(0)
+                payload = serialize_arguments((projection, None, remaining, None))
+                idx = free_workers.pop()
+                call_id = self._pool.submit(idx, "solve", False, True, payload)
+                pending[call_id] = idx
+                submitted[call_id] = (agent_name, projection)
+            if deadline is not None and time.time() >= deadline:
+                solvable = None # The shared budget is over
+                break
+            wait = 1 if deadline is None else min(1, deadline - time.time())
+            res_item = self._pool.get(pending, max(wait, 0))
+            if res_item is None:
+                continue
+            call_id, presult = res_item
+            free_workers.append(pending.pop(call_id))
+            if isinstance(presult, BaseException):
+                self._pool.cancel(pending)
+                raise presult
+            if presult is None:
+                self._pool.cancel(pending)
+                raise UPException(f"The worker solving the projection of {submitted[call_id][0]} died")
+            self._store_projection_result(*submitted[call_id], presult)
+            solvable = self._projection_solvability(presult)
+        # The planners still running are stopped, so that they do not keep running in the background
+        if len(pending) > 0:
+            self._pool.cancel(pending)
+        return solvable
+
+    def destroy(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
     def multi_agent_robustness_counterexample(self, problem : MultiAgentProblemWithWaitfor) -> SocialLawRobustnessResult:
-        rbv = Compiler(
-            name = self._robustness_verifier_name,
-            problem_kind = problem.kind, 
-            compilation_kind=CompilationKind.MA_SL_ROBUSTNESS_VERIFICATION)
+        problem_kind = problem.kind
+        if self._robustness_verifier is None or self._robustness_verifier[0] != problem_kind:
+            self._robustness_verifier = (problem_kind, Compiler(
+                name = self._robustness_verifier_name,
+                problem_kind = problem_kind, 
+                compilation_kind=CompilationKind.MA_SL_ROBUSTNESS_VERIFICATION))
+        rbv = self._robustness_verifier[1]
         rbv_result = rbv.compile(problem)
 
         if self._save_pddl:
@@ -189,7 +426,10 @@ class SocialLawRobustnessChecker(engines.engine.Engine, mixins.OneshotPlannerMix
     def is_robust(self, problem : MultiAgentProblemWithWaitfor) -> SocialLawRobustnessResult:
         status =  SocialLawRobustnessStatus.ROBUST_RATIONAL
         # Check single agent solvability
-        if not self.is_single_agent_solvable(problem):
+        solvable = self.is_single_agent_solvable(problem)
+        if solvable is None:
+            return SocialLawRobustnessResult(SocialLawRobustnessStatus.UNKNOWN, None, None)
+        elif not solvable:
             return SocialLawRobustnessResult(SocialLawRobustnessStatus.NON_ROBUST_SINGLE_AGENT, None, None)
         
         # Check for rational robustness
@@ -203,72 +443,42 @@ class SocialLawRobustnessChecker(engines.engine.Engine, mixins.OneshotPlannerMix
             timeout: Optional[float] = None,
             output_stream: Optional[IO[str]] = None) -> 'up.engines.results.PlanGenerationResult':
         assert isinstance(problem, MultiAgentProblemWithWaitfor)
-        plans = {}
-        current_step = {}
+        plans : Dict[Agent, SequentialPlan] = {}
         for agent in problem.agents:
             sap = SingleAgentProjection(agent)        
             result = sap.compile(problem)
+            assert isinstance(result.problem, Problem)
 
+            if self._projection_cache is not None:
+                cached = self._projection_cache.lookup(agent.name, result.problem)
+                if cached is not None:
+                    if not cached[0]:
+                        return PlanGenerationResult(PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY,
+                                                    plan=None,
+                                                    engine_name = self.name)
+                    assert cached[1] is not None
+                    plans[agent] = cached[1]
+                    continue
             with OneshotPlanner(name=self._planner_name, problem_kind=result.problem.kind) as planner:
                 presult = planner.solve(result.problem, timeout=timeout, output_stream=output_stream)
+                self._store_projection_result(agent.name, result.problem, presult)
                 if presult.status not in unified_planning.engines.results.POSITIVE_OUTCOMES:
                     return unified_planning.engines.results.PlanGenerationResult(
-                        unified_planning.engines.results.UNSOLVABLE_INCOMPLETELY,
+                        PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY,
                         plan=None,
                         engine_name = self.name)
+                assert isinstance(presult.plan, SequentialPlan)
                 plans[agent] = presult.plan
-                current_step[agent] = 0
-
-        mac = MultiAgentProblemCentralizer()
-        cresult = mac.compile(problem)        
-        simulator = SequentialSimulator(cresult.problem)
-        current_state: "COWState" = UPCOWState(cresult.problem.initial_values)
-
-        plan = SequentialPlan([])
-
-        active_agents = problem.agents.copy()
-        active_agents_next = []
-                
-        while len(active_agents) > 0:
-            action_performed = False
-            for agent in active_agents:
-                if current_step[agent] < len(plans[agent].actions):
-                    active_agents_next.append(agent)
-                    ai = plans[agent].actions[current_step[agent]]
-                    action = cresult.problem.action(agent.name + "__" + ai.action.name)
-                    assert isinstance(action, unified_planning.model.InstantaneousAction)
-
-                    applicable = True
-                    events = simulator.get_events(action, ai.actual_parameters)
-                    for event in events:
-                        if not simulator.is_applicable(event, current_state):
-                            applicable = False
-                            break
-                    
-                    if applicable:
-                        plan.actions.append(ActionInstance(ai.action, ai.actual_parameters, agent))
-                        action_performed = True
-                        for event in events:                
-                            current_state = simulator.apply_unsafe(event, current_state)
-                        current_step[agent] = current_step[agent] + 1
-            if not action_performed and len(active_agents_next) > 0:
-                # deadlock occurred
-                return PlanGenerationResult(unified_planning.engines.results.PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY,
-                                            plan=None,
-                                            engine_name = self.name)
-            active_agents = active_agents_next.copy()
-            active_agents_next = []
 
-        unsatisfied_goals = simulator.get_unsatisfied_goals(current_state)
-        if len(unsatisfied_goals) == 0:            
+        interleaving = JointPlanExecutor(problem, plans, self._centralizer).round_robin()
+        if interleaving.status == InterleavingStatus.SUCCESS:
             return unified_planning.engines.results.PlanGenerationResult(
                 unified_planning.engines.results.PlanGenerationResultStatus.SOLVED_SATISFICING,
-                plan=plan,
+                plan=interleaving.plan,
                 engine_name = self.name      
             )
         else:
-            # Goal not achieved at the end
+            # Deadlock occurred, or goal not achieved at the end
             return PlanGenerationResult(unified_planning.engines.results.PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY,
                                             plan=None,
                                             engine_name = self.name)
-        
\ No newline at end of file
@@ -20,9 +20,10 @@ from unified_planning.engines.mixins.compiler import CompilationKind, CompilerMi
 from unified_planning.model.multi_agent import *
 from unified_planning.model import *
 from unified_planning.engines.results import CompilerResult, PlanGenerationResultStatus
-from unified_planning.exceptions import UPExpressionDefinitionError, UPProblemDefinitionError
-from typing import List, Dict, Union, Optional, Set
-from unified_planning.engines.compilers.utils import replace_action, get_fresh_name
+from unified_planning.exceptions import UPExpressionDefinitionError, UPProblemDefinitionError, UPUsageError
+from typing import List, Dict, Union, Optional, Set, Tuple
+from unified_planning.engines.compilers.utils import get_fresh_name
+from unified_planning.plans import ActionInstance
 from functools import partial
 from operator import neg
 from unified_planning.model import Parameter, Fluent, InstantaneousAction
@@ -30,7 +31,8 @@ from unified_planning.shortcuts import *
 from unified_planning.exceptions import UPProblemDefinitionError
 from unified_planning.model import Problem, InstantaneousAction, DurativeAction, Action
 from typing import List, Dict
-from itertools import product
+from itertools import product, chain
+from collections import OrderedDict
 
 # from unified_planning.social_law.robustness_checker import SocialLawRobustnessChecker, SocialLawRobustnessStatus
 from unified_planning.social_law.waitfor_specification import WaitforSpecification
@@ -57,13 +59,27 @@ POSITIVE_OUTCOMES = frozenset(
 )
 
 
+def replace_agent_action(action_instance: ActionInstance,
+                         map: Dict[Action, Optional[Tuple[Agent, Action]]]) -> Optional[ActionInstance]:
+    """ Replaces the action of the given action instance with the agent action it is a copy of; the agent of the
+    returned action instance is the agent executing the action."""
+    try:
+        replaced = map[action_instance.action]
+    except KeyError:
+        raise UPUsageError("The Action of the given ActionInstance does not have a valid replacement.")
+    if replaced is None:
+        return None
+    agent, action = replaced
+    return ActionInstance(action, action_instance.actual_parameters, agent)
+
+
 class FluentMap():
     """ This class maintains a copy of each fluent in the given problem (environment and agent specific). Default value (if specified) is the default value for the new facts."""
 
     def __init__(self, prefix: str, default_value=None, override_type=None):
         self.prefix = prefix
-        self.env_fluent_map = {}
-        self.agent_fluent_map = {}
+        self.env_fluent_map: Dict[str, Fluent] = {}
+        self.agent_fluent_map: Dict[Tuple[str, str], Fluent] = {}
         self._default_value = default_value
         self._override_type = override_type
 
@@ -103,7 +119,7 @@ class FluentMap():
             name = self.prefix + "-" + f.name
         else:
             name = self.prefix + "-" + agent.name + "-" + f.name
-        g_fluent = Fluent(name, ftype, f.signature)
+        g_fluent = Fluent(name, ftype, f.signature, f.environment)
         return g_fluent
 
     def add_facts(self, problem, new_problem):
@@ -166,10 +182,14 @@ class RobustnessVerifier(engines.engine.Engine, CompilerMixin):
     '''Robustness verifier (abstract) class:
     this class requires a (multi agent) problem, and creates a classical planning problem which is unsolvable iff the multi agent problem is not robust.'''
 
-    def __init__(self):
+    def __init__(self, max_fragments: int = 10000):
         engines.engine.Engine.__init__(self)
         CompilerMixin.__init__(self, CompilationKind.MA_SL_ROBUSTNESS_VERIFICATION)
         self.act_pred = None
+        # The compiled copies of each agent action, kept between compilations; when there are more than
+        # max_fragments of them, the least recently used are removed
+        self._max_fragments = max_fragments
+        self._fragments: "OrderedDict[Tuple, List[Action]]" = OrderedDict()
 
     @staticmethod
     def get_credits(**kwargs) -> Optional['Credits']:
@@ -192,6 +212,48 @@ class RobustnessVerifier(engines.engine.Engine, CompilerMixin):
         new_kind.unset_problem_class("ACTION_BASED_MULTI_AGENT")
         return new_kind
 
+    def get_agent_fragment_key(self, problem: MultiAgentProblemWithWaitfor, agent: Agent) -> Tuple:
+        """ Returns the part of the key of the compiled copies of the given agent actions that depends on the agent and on the problem.
+        The compiled copies of an action only depend on the fluents (environment and agent specific), on the agents names and on the
+        waitfor specification, so they are reused by the following compilations of the same or of a slightly different problem."""
+        return (problem.env, agent.name, frozenset(agent.fluents), frozenset(problem.ma_environment.fluents),
+                tuple(ag.name for ag in problem.agents))
+
+    def get_action_fragment_key(self, problem: MultiAgentProblemWithWaitfor, agent: Agent, action: Action, agent_key: Tuple) -> Tuple:
+        """ Returns the key of the compiled copies of the given action of the given agent."""
+        return (agent_key, action, tuple(problem.waitfor.get_preconditions_wait(agent.name, action.name)))
+
+    def clear_fragments(self):
+        """ Removes the compiled copies of the actions kept for the following compilations."""
+        self._fragments.clear()
+
+    def get_fragment(self, key: Tuple) -> Optional[List[Action]]:
+        """ Returns the compiled copies of an action with the given key, or None if they are not kept."""
+        fragment = self._fragments.get(key, None)
+        if fragment is not None:
+            self._fragments.move_to_end(key)
+        return fragment
+
+    def put_fragment(self, key: Tuple, fragment: List[Action]):
+        """ Keeps the compiled copies of an action with the given key for the following compilations."""
+        # The action in the key is cloned, so that the key is not changed by later modifications of the action
+        self._fragments[(key[0], key[1].clone(), key[2])] = fragment
+        while len(self._fragments) > self._max_fragments:
+            self._fragments.popitem(last=False)
+
+    def add_fragment_actions(self, new_problem: Problem, new_to_old: Dict[Action, Optional[Tuple[Agent, Action]]],
+                             fragment: List[Action], agent: Agent, action: Action):
+        """ Adds to the new problem a copy of every compiled action of the fragment, so that the kept fragment
+        is not changed by the modifications of the compiled problem."""
+        for fragment_action in fragment:
+            new_action = fragment_action.clone()
+            new_problem.add_action(new_action)
+            new_to_old[new_action] = (agent, action)
+
+    def get_agent_actions(self, problem: MultiAgentProblemWithWaitfor, agent: Agent) -> List[Action]:
+        """ Returns the actions of the given agent that are part of the robustness verification problem."""
+        return agent.actions
+
     def get_agent_obj(self, agent: Agent):
         return Object(agent.name, self.agent_type)
 
@@ -204,7 +266,8 @@ class RobustnessVerifier(engines.engine.Engine, CompilerMixin):
                 l.append(goal)
         return l
 
-    def get_action_preconditions(self, problem: MultiAgentProblemWithWaitfor, agent: Agent, action: Action, fail: bool,
+    @staticmethod
+    def get_action_preconditions(problem: MultiAgentProblemWithWaitfor, agent: Agent, action: Action, fail: bool,
                                  wait: bool) -> List[FNode]:
         """ Get the preconditions for the given action of the given agent. fail/wait specify which preconditions we want (True to return, False to omit) """
         assert fail or wait
@@ -263,8 +326,8 @@ class InstantaneousActionRobustnessVerifier(RobustnessVerifier):
     '''Robustness verifier class for instanteanous actions:
     this class requires a (multi agent) problem, and creates a classical planning problem which is unsolvable iff the multi agent problem is not robust.'''
 
-    def __init__(self):
-        RobustnessVerifier.__init__(self)
+    def __init__(self, max_fragments: int = 10000):
+        RobustnessVerifier.__init__(self, max_fragments)
 
     @staticmethod
     def supported_kind() -> ProblemKind:
@@ -304,8 +367,8 @@ class SimpleInstantaneousActionRobustnessVerifier(InstantaneousActionRobustnessV
     Implements the robustness verification compilation from Nir, Shleyfman, Karpas limited to propositions with the bugs fixed
     '''
 
-    def __init__(self):
-        InstantaneousActionRobustnessVerifier.__init__(self)
+    def __init__(self, max_fragments: int = 10000):
+        InstantaneousActionRobustnessVerifier.__init__(self, max_fragments)
 
     @property
     def name(self):
@@ -314,9 +377,10 @@ class SimpleInstantaneousActionRobustnessVerifier(InstantaneousActionRobustnessV
     def _compile(self, problem: "up.model.AbstractProblem",
                  compilation_kind: "up.engines.CompilationKind") -> CompilerResult:
         '''Creates a the robustness verification problem.'''
+        assert isinstance(problem, MultiAgentProblemWithWaitfor)
 
         # Represents the map from the new action to the old action
-        new_to_old: Dict[Action, Action] = {}
+        new_to_old: Dict[Action, Optional[Tuple[Agent, Action]]] = {}
 
         new_problem = self.initialize_problem(problem)
 
@@ -362,65 +426,69 @@ class SimpleInstantaneousActionRobustnessVerifier(InstantaneousActionRobustnessV
                 new_problem.add_action(end_f)
                 new_to_old[end_f] = None
 
-            for action in agent.actions:
-                # Success version - affects globals same way as original
-                a_s = self.create_action_copy(problem, agent, action, "s")
-                a_s.add_precondition(Not(waiting(self.get_agent_obj(agent))))
-                a_s.add_precondition(Not(crash))
-                for effect in action.effects:
-                    if effect.value.is_true():
-                        a_s.add_precondition(Not(self.fsub.substitute(effect.fluent, self.waiting_fluent_map, agent)))
-                for fact in self.get_action_preconditions(problem, agent, action, True, True):
-                    a_s.add_precondition(self.fsub.substitute(fact, self.global_fluent_map, agent))
-                for effect in action.effects:
-                    a_s.add_effect(self.fsub.substitute(effect.fluent, self.global_fluent_map, agent), effect.value)
-                new_problem.add_action(a_s)
-                new_to_old[a_s] = action
-
-                real_preconds = self.get_action_preconditions(problem, agent, action, fail=True, wait=False)
-
-                # Fail version
-                for i, fact in enumerate(real_preconds):
-                    a_f = self.create_action_copy(problem, agent, action, "f" + str(i))
-                    a_f.add_precondition(act_pred)
-                    a_f.add_precondition(Not(waiting(self.get_agent_obj(agent))))
-                    a_f.add_precondition(Not(crash))
-                    for pre in self.get_action_preconditions(problem, agent, action, False, True):
-                        a_f.add_precondition(self.fsub.substitute(pre, self.global_fluent_map, agent))
-                    a_f.add_precondition(Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
-                    a_f.add_effect(failure, True)
-                    a_f.add_effect(crash, True)
-                    new_problem.add_action(a_f)
-                    new_to_old[a_f] = action
-
-                # Wait version                
-                for i, fact in enumerate(self.get_action_preconditions(problem, agent, action, False, True)):
-                    a_w = self.create_action_copy(problem, agent, action, "w" + str(i))
-                    a_w.add_precondition(act_pred)
-                    a_w.add_precondition(Not(crash))
-                    a_w.add_precondition(Not(waiting(self.get_agent_obj(agent))))
-                    a_w.add_precondition(Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
-                    assert not fact.is_not()
-                    a_w.add_effect(self.fsub.substitute(fact, self.waiting_fluent_map, agent),
-                                   True)  # , action.agent.obj), True)
-                    a_w.add_effect(waiting(self.get_agent_obj(agent)), True)
-                    a_w.add_effect(failure, True)
-                    new_problem.add_action(a_w)
-                    new_to_old[a_w] = action
-
-                # Phantom version            
-                a_pc = self.create_action_copy(problem, agent, action, "pc")
-                a_pc.add_precondition(act_pred)
-                a_pc.add_precondition(crash)
-                new_problem.add_action(a_pc)
-                new_to_old[a_pc] = action
-
-                # Phantom version            
-                a_pw = self.create_action_copy(problem, agent, action, "pw")
-                a_pw.add_precondition(act_pred)
-                a_pw.add_precondition(waiting(self.get_agent_obj(agent)))
-                new_problem.add_action(a_pw)
-                new_to_old[a_pw] = action
+            agent_key = self.get_agent_fragment_key(problem, agent)
+            for action in self.get_agent_actions(problem, agent):
+                assert isinstance(action, InstantaneousAction)
+                key = self.get_action_fragment_key(problem, agent, action, agent_key)
+                fragment = self.get_fragment(key)
+                if fragment is None:
+                    fragment = []
+                    # Success version - affects globals same way as original
+                    a_s = self.create_action_copy(problem, agent, action, "s")
+                    a_s.add_precondition(Not(waiting(self.get_agent_obj(agent))))
+                    a_s.add_precondition(Not(crash))
+                    for effect in action.effects:
+                        if effect.value.is_true():
+                            a_s.add_precondition(Not(self.fsub.substitute(effect.fluent, self.waiting_fluent_map, agent)))
+                    for fact in self.get_action_preconditions(problem, agent, action, True, True):
+                        a_s.add_precondition(self.fsub.substitute(fact, self.global_fluent_map, agent))
+                    for effect in action.effects:
+                        a_s.add_effect(self.fsub.substitute(effect.fluent, self.global_fluent_map, agent), effect.value)
+                    fragment.append(a_s)
+
+                    real_preconds = self.get_action_preconditions(problem, agent, action, fail=True, wait=False)
+
+                    # Fail version
+                    for i, fact in enumerate(real_preconds):
+                        a_f = self.create_action_copy(problem, agent, action, "f" + str(i))
+                        a_f.add_precondition(act_pred)
+                        a_f.add_precondition(Not(waiting(self.get_agent_obj(agent))))
+                        a_f.add_precondition(Not(crash))
+                        for pre in self.get_action_preconditions(problem, agent, action, False, True):
+                            a_f.add_precondition(self.fsub.substitute(pre, self.global_fluent_map, agent))
+                        a_f.add_precondition(Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
+                        a_f.add_effect(failure, True)
+                        a_f.add_effect(crash, True)
+                        fragment.append(a_f)
+
+                    # Wait version                
+                    for i, fact in enumerate(self.get_action_preconditions(problem, agent, action, False, True)):
+                        a_w = self.create_action_copy(problem, agent, action, "w" + str(i))
+                        a_w.add_precondition(act_pred)
+                        a_w.add_precondition(Not(crash))
+                        a_w.add_precondition(Not(waiting(self.get_agent_obj(agent))))
+                        a_w.add_precondition(Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
+                        assert not fact.is_not()
+                        a_w.add_effect(self.fsub.substitute(fact, self.waiting_fluent_map, agent),
+                                       True)  # , action.agent.obj), True)
+                        a_w.add_effect(waiting(self.get_agent_obj(agent)), True)
+                        a_w.add_effect(failure, True)
+                        fragment.append(a_w)
+
+                    # Phantom version            
+                    a_pc = self.create_action_copy(problem, agent, action, "pc")
+                    a_pc.add_precondition(act_pred)
+                    a_pc.add_precondition(crash)
+                    fragment.append(a_pc)
+
+                    # Phantom version            
+                    a_pw = self.create_action_copy(problem, agent, action, "pw")
+                    a_pw.add_precondition(act_pred)
+                    a_pw.add_precondition(waiting(self.get_agent_obj(agent)))
+                    fragment.append(a_pw)
+
+                    self.put_fragment(key, fragment)
+                self.add_fragment_actions(new_problem, new_to_old, fragment, agent, action)
 
         # Goal
         new_problem.add_goal(failure)
@@ -428,7 +496,7 @@ class SimpleInstantaneousActionRobustnessVerifier(InstantaneousActionRobustnessV
             new_problem.add_goal(fin(self.get_agent_obj(agent)))
 
         return CompilerResult(
-            new_problem, partial(replace_action, map=new_to_old), self.name
+            new_problem, partial(replace_agent_action, map=new_to_old), self.name
         )
 
 
@@ -438,19 +506,24 @@ class WaitingActionRobustnessVerifier(InstantaneousActionRobustnessVerifier):
     Implements the robustness verification compilation from Tuisov, Shleyfman, Karpas with the bugs fixed
     '''
 
-    def __init__(self):
-        InstantaneousActionRobustnessVerifier.__init__(self)
+    def __init__(self, max_fragments: int = 10000):
+        InstantaneousActionRobustnessVerifier.__init__(self, max_fragments)
 
     @property
     def name(self):
         return "wrbv"
 
+    def get_agent_fragment_key(self, problem: MultiAgentProblemWithWaitfor, agent: Agent) -> Tuple:
+        # The deadlock versions of an action depend on all the actions of its agent
+        return RobustnessVerifier.get_agent_fragment_key(self, problem, agent) + (tuple(a.name for a in agent.actions),)
+
     def _compile(self, problem: "up.model.AbstractProblem",
                  compilation_kind: "up.engines.CompilationKind") -> CompilerResult:
         '''Creates a the robustness verification problem.'''
+        assert isinstance(problem, MultiAgentProblemWithWaitfor)
 
         # Represents the map from the new action to the old action
-        new_to_old: Dict[Action, Action] = {}
+        new_to_old: Dict[Action, Optional[Tuple[Agent, Action]]] = {}
 
         new_problem = self.initialize_problem(problem)
 
@@ -472,7 +545,7 @@ class WaitingActionRobustnessVerifier(InstantaneousActionRobustnessVerifier):
         new_problem.add_fluent(conflict, default_initial_value=False)
         new_problem.add_fluent(fin, default_initial_value=False)
 
-        allow_action_map = {}
+        allow_action_map: Dict[str, Dict[str, Fluent]] = {}
         for agent in problem.agents:
             for action in agent.actions:
                 action_fluent = Fluent("allow-" + agent.name + "-" + action.name)
@@ -485,62 +558,66 @@ class WaitingActionRobustnessVerifier(InstantaneousActionRobustnessVerifier):
 
         # Add actions
         for agent in problem.agents:
+            agent_key = self.get_agent_fragment_key(problem, agent)
             for action in agent.actions:
-                # Success version - affects globals same way as original
-                a_s = self.create_action_copy(problem, agent, action, "s" + agent.name)
-                a_s.add_precondition(stage_1)
-                a_s.add_precondition(allow_action_map[agent.name][action.name])
-                for fact in self.get_action_preconditions(problem, agent, action, True, True):
-                    a_s.add_precondition(self.fsub.substitute(fact, self.global_fluent_map, agent))
-                for effect in action.effects:
-                    a_s.add_effect(self.fsub.substitute(effect.fluent, self.global_fluent_map, agent), effect.value)
-                new_problem.add_action(a_s)
-                new_to_old[a_s] = action
-
-                # Fail version
-                for i, fact in enumerate(self.get_action_preconditions(problem, agent, action, True, False)):
-                    a_f = self.create_action_copy(problem, agent, action, "f" + str(i))
-                    a_f.add_precondition(stage_1)
-                    a_f.add_precondition(allow_action_map[agent.name][action.name])
-                    for pre in self.get_action_preconditions(problem, agent, action, False, True):
-                        a_f.add_precondition(self.fsub.substitute(pre, self.global_fluent_map, agent))
-                    a_f.add_precondition(Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
-                    a_f.add_effect(precondition_violation, True)
-                    a_f.add_effect(stage_2, True)
-                    a_f.add_effect(stage_1, False)
-                    new_problem.add_action(a_f)
-                    new_to_old[a_f] = action
-
-                for i, fact in enumerate(self.get_action_preconditions(problem, agent, action, False, True)):
-                    # Wait version
-                    a_w = self.create_action_copy(problem, agent, action, "w" + str(i))
-                    a_w.add_precondition(stage_1)
-                    a_w.add_precondition(allow_action_map[agent.name][action.name])
-                    a_w.add_precondition(Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
-                    assert not fact.is_not()
-                    a_w.add_effect(self.fsub.substitute(fact, self.waiting_fluent_map, agent),
-                                   True)  # , action.agent.obj), True)
-                    new_problem.add_action(a_w)
-                    new_to_old[a_w] = action
-
-                    # deadlock version
-                    a_deadlock = self.create_action_copy(problem, agent, action, "d" + str(i))
-                    a_deadlock.add_precondition(Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
-                    for another_action in allow_action_map[agent.name].keys():
-                        a_deadlock.add_precondition(Not(allow_action_map[agent.name][another_action]))
-                    a_deadlock.add_effect(fin(self.get_agent_obj(agent)), True)
-                    a_deadlock.add_effect(possible_deadlock, True)
-                    new_problem.add_action(a_deadlock)
-                    new_to_old[a_deadlock] = action
-
-                # local version
-                a_local = self.create_action_copy(problem, agent, action, "l")
-                a_local.add_precondition(stage_2)
-                a_local.add_precondition(allow_action_map[agent.name][action.name])
-                for fluent in allow_action_map[agent.name].values():
-                    a_local.add_effect(fluent, True)
-                new_problem.add_action(a_local)
-                new_to_old[a_local] = action
+                assert isinstance(action, InstantaneousAction)
+                key = self.get_action_fragment_key(problem, agent, action, agent_key)
+                fragment = self.get_fragment(key)
+                if fragment is None:
+                    fragment = []
+                    # Success version - affects globals same way as original
+                    a_s = self.create_action_copy(problem, agent, action, "s")
+                    a_s.add_precondition(stage_1)
+                    a_s.add_precondition(allow_action_map[agent.name][action.name])
+                    for fact in self.get_action_preconditions(problem, agent, action, True, True):
+                        a_s.add_precondition(self.fsub.substitute(fact, self.global_fluent_map, agent))
+                    for effect in action.effects:
+                        a_s.add_effect(self.fsub.substitute(effect.fluent, self.global_fluent_map, agent), effect.value)
+                    fragment.append(a_s)
+
+                    # Fail version
+                    for i, fact in enumerate(self.get_action_preconditions(problem, agent, action, True, False)):
+                        a_f = self.create_action_copy(problem, agent, action, "f" + str(i))
+                        a_f.add_precondition(stage_1)
+                        a_f.add_precondition(allow_action_map[agent.name][action.name])
+                        for pre in self.get_action_preconditions(problem, agent, action, False, True):
+                            a_f.add_precondition(self.fsub.substitute(pre, self.global_fluent_map, agent))
+                        a_f.add_precondition(Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
+                        a_f.add_effect(precondition_violation, True)
+                        a_f.add_effect(stage_2, True)
+                        a_f.add_effect(stage_1, False)
+                        fragment.append(a_f)
+
+                    for i, fact in enumerate(self.get_action_preconditions(problem, agent, action, False, True)):
+                        # Wait version
+                        a_w = self.create_action_copy(problem, agent, action, "w" + str(i))
+                        a_w.add_precondition(stage_1)
+                        a_w.add_precondition(allow_action_map[agent.name][action.name])
+                        a_w.add_precondition(Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
+                        assert not fact.is_not()
+                        a_w.add_effect(self.fsub.substitute(fact, self.waiting_fluent_map, agent),
+                                       True)  # , action.agent.obj), True)
+                        fragment.append(a_w)
+
+                        # deadlock version
+                        a_deadlock = self.create_action_copy(problem, agent, action, "d" + str(i))
+                        a_deadlock.add_precondition(Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
+                        for another_action in allow_action_map[agent.name].keys():
+                            a_deadlock.add_precondition(Not(allow_action_map[agent.name][another_action]))
+                        a_deadlock.add_effect(fin(self.get_agent_obj(agent)), True)
+                        a_deadlock.add_effect(possible_deadlock, True)
+                        fragment.append(a_deadlock)
+
+                    # local version
+                    a_local = self.create_action_copy(problem, agent, action, "l")
+                    a_local.add_precondition(stage_2)
+                    a_local.add_precondition(allow_action_map[agent.name][action.name])
+                    for fluent in allow_action_map[agent.name].values():
+                        a_local.add_effect(fluent, True)
+                    fragment.append(a_local)
+
+                    self.put_fragment(key, fragment)
+                self.add_fragment_actions(new_problem, new_to_old, fragment, agent, action)
 
             # end-success
             end_s = InstantaneousAction("end_s_" + agent.name)
@@ -601,7 +678,7 @@ class WaitingActionRobustnessVerifier(InstantaneousActionRobustnessVerifier):
         new_problem.add_goal(conflict)
 
         return CompilerResult(
-            new_problem, partial(replace_action, map=new_to_old), self.name
+            new_problem, partial(replace_agent_action, map=new_to_old), self.name
         )
 
 
@@ -609,8 +686,8 @@ class DurativeActionRobustnessVerifier(RobustnessVerifier):
     '''Robustness verifier class for durative actions:
     this class requires a (multi agent) problem, and creates a temporal planning problem which is unsolvable iff the multi agent problem is not robust.'''
 
-    def __init__(self):
-        RobustnessVerifier.__init__(self)
+    def __init__(self, max_fragments: int = 10000):
+        RobustnessVerifier.__init__(self, max_fragments)
 
     @staticmethod
     def supported_kind() -> ProblemKind:
@@ -670,10 +747,10 @@ class DurativeActionRobustnessVerifier(RobustnessVerifier):
         # new_action.add_condition(ClosedDurationInterval(StartTiming(), EndTiming()), self.act_pred)
 
         # TODO: can probably do this better with a substitution walker
-        for timing in action.conditions.keys():
-            for fact in action.conditions[timing]:
+        for interval in action.conditions.keys():
+            for fact in action.conditions[interval]:
                 assert not fact.is_and()
-                new_action.add_condition(timing, self.fsub.substitute(fact, self.local_fluent_map[agent], agent))
+                new_action.add_condition(interval, self.fsub.substitute(fact, self.local_fluent_map[agent], agent))
         for timing in action.effects.keys():
             for effect in action.effects[timing]:
                 new_action.add_effect(timing, self.fsub.substitute(effect.fluent, self.local_fluent_map[agent], agent),
@@ -684,9 +761,10 @@ class DurativeActionRobustnessVerifier(RobustnessVerifier):
     def _compile(self, problem: "up.model.AbstractProblem",
                  compilation_kind: "up.engines.CompilationKind") -> CompilerResult:
         '''Creates a the robustness verification problem.'''
+        assert isinstance(problem, MultiAgentProblemWithWaitfor)
 
         # Represents the map from the new action to the old action
-        new_to_old: Dict[Action, Action] = {}
+        new_to_old: Dict[Action, Optional[Tuple[Agent, Action]]] = {}
 
         new_problem = self.initialize_problem(problem)
 
@@ -736,210 +814,210 @@ class DurativeActionRobustnessVerifier(RobustnessVerifier):
                 new_problem.add_action(end_f_action)
                 new_to_old[end_f_action] = None
 
+            agent_key = self.get_agent_fragment_key(problem, agent)
             for action in agent.actions:
-                c_start, c_overall, c_end = self.get_action_conditions(problem, agent, action, fail=True, wait=True)
-                w_start, w_overall, w_end = self.get_action_conditions(problem, agent, action, fail=False, wait=True)
-                f_start, f_overall, f_end = self.get_action_conditions(problem, agent, action, fail=True, wait=False)
-                assert (c_overall == f_overall and c_end == f_end and w_overall == [] and w_end == [])
-
-                a_s = self.create_action_copy(problem, agent, action, "s")
-                a_s.add_condition(StartTiming(), Not(waiting(self.get_agent_obj(agent))))
-                a_s.add_condition(ClosedDurationInterval(StartTiming(), EndTiming()), act())
-                # Conditions/Effects on global copy
-                for timing in action.conditions.keys():
-                    for fact in action.conditions[timing]:
-                        assert not fact.is_and()
-                        a_s.add_condition(timing, self.fsub.substitute(fact, self.global_fluent_map, agent))
-                for timing in action.effects.keys():
-                    for effect in action.effects[timing]:
-                        a_s.add_effect(timing, self.fsub.substitute(effect.fluent, self.global_fluent_map, agent),
-                                       effect.value)
-                # accounting for invariant count
-                for c in c_overall:
-                    a_s.add_increase_effect(StartTiming(), self.fsub.substitute(c, inv_count_map, agent), 1)
-                    a_s.add_decrease_effect(EndTiming(), self.fsub.substitute(c, inv_count_map, agent), 1)
-                for effect in action.effects.get(StartTiming(), []):
-                    if effect.value.is_false():
-                        a_s.add_condition(StartTiming(),
-                                          Equals(self.fsub.substitute(effect.fluent, inv_count_map, agent), 0))
-                for effect in action.effects.get(EndTiming(), []):
-                    if effect.value.is_false():
-                        a_s.add_condition(EndTiming(),
-                                          Equals(self.fsub.substitute(effect.fluent, inv_count_map, agent), 1))
-                # accouting for other agents waiting
-                for effect in action.effects.get(StartTiming(), []):
-                    if effect.value.is_true():
-                        for ag in problem.agents:
+                assert isinstance(action, DurativeAction)
+                key = self.get_action_fragment_key(problem, agent, action, agent_key)
+                fragment = self.get_fragment(key)
+                if fragment is None:
+                    fragment = []
+                    c_start, c_overall, c_end = self.get_action_conditions(problem, agent, action, fail=True, wait=True)
+                    w_start, w_overall, w_end = self.get_action_conditions(problem, agent, action, fail=False, wait=True)
+                    f_start, f_overall, f_end = self.get_action_conditions(problem, agent, action, fail=True, wait=False)
+                    assert (c_overall == f_overall and c_end == f_end and w_overall == [] and w_end == [])
+
+                    a_s = self.create_action_copy(problem, agent, action, "s")
+                    a_s.add_condition(StartTiming(), Not(waiting(self.get_agent_obj(agent))))
+                    a_s.add_condition(ClosedDurationInterval(StartTiming(), EndTiming()), act())
+                    # Conditions/Effects on global copy
+                    for interval in action.conditions.keys():
+                        for fact in action.conditions[interval]:
+                            assert not fact.is_and()
+                            a_s.add_condition(interval, self.fsub.substitute(fact, self.global_fluent_map, agent))
+                    for timing in action.effects.keys():
+                        for effect in action.effects[timing]:
+                            a_s.add_effect(timing, self.fsub.substitute(effect.fluent, self.global_fluent_map, agent),
+                                           effect.value)
+                    # accounting for invariant count
+                    for c in c_overall:
+                        a_s.add_increase_effect(StartTiming(), self.fsub.substitute(c, inv_count_map, agent), 1)
+                        a_s.add_decrease_effect(EndTiming(), self.fsub.substitute(c, inv_count_map, agent), 1)
+                    for effect in action.effects.get(StartTiming(), []):
+                        if effect.value.is_false():
                             a_s.add_condition(StartTiming(),
-                                              Not(self.fsub.substitute(effect.fluent, waiting_fluent_map[ag], agent)))
-                for effect in action.effects.get(EndTiming(), []):
-                    if effect.value.is_true():
-                        for ag in problem.agents:
-                            a_s.add_condition(ClosedDurationInterval(StartTiming(), EndTiming()),
-                                              Not(self.fsub.substitute(effect.fluent, waiting_fluent_map[ag], agent)))
-                new_problem.add_action(a_s)
-                new_to_old[a_s] = action
-
-                # Fail start version            
-                for i, fact in enumerate(f_start):
-                    a_fstart = self.create_action_copy(problem, agent, action, "fstart" + str(i))
-                    for c in w_start:
-                        a_fstart.add_condition(StartTiming(), self.fsub.substitute(c, self.global_fluent_map, agent))
-                    a_fstart.add_condition(StartTiming(),
-                                           Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
-                    a_fstart.add_condition(StartTiming(), Not(waiting(self.get_agent_obj(agent))))
-                    a_fstart.add_effect(StartTiming(), failure, True)
-                    new_problem.add_action(a_fstart)
-                    new_to_old[a_fstart] = action
-
-                # Fail inv version            
-                for i, fact in enumerate(f_overall):
-                    overall_condition_added_by_start_effect = False
+                                              Equals(self.fsub.substitute(effect.fluent, inv_count_map, agent), 0))
+                    for effect in action.effects.get(EndTiming(), []):
+                        if effect.value.is_false():
+                            a_s.add_condition(EndTiming(),
+                                              Equals(self.fsub.substitute(effect.fluent, inv_count_map, agent), 1))
+                    # accouting for other agents waiting
                     for effect in action.effects.get(StartTiming(), []):
-                        if effect.fluent == fact and effect.value.is_true():
-                            overall_condition_added_by_start_effect = True
-                            break
-                    if not overall_condition_added_by_start_effect:
-                        a_finv = self.create_action_copy(problem, agent, action, "finv" + str(i))
+                        if effect.value.is_true():
+                            for ag in problem.agents:
+                                a_s.add_condition(StartTiming(),
+                                                  Not(self.fsub.substitute(effect.fluent, waiting_fluent_map[ag], agent)))
+                    for effect in action.effects.get(EndTiming(), []):
+                        if effect.value.is_true():
+                            for ag in problem.agents:
+                                a_s.add_condition(ClosedDurationInterval(StartTiming(), EndTiming()),
+                                                  Not(self.fsub.substitute(effect.fluent, waiting_fluent_map[ag], agent)))
+                    fragment.append(a_s)
+
+                    # Fail start version            
+                    for i, fact in enumerate(f_start):
+                        a_fstart = self.create_action_copy(problem, agent, action, "fstart" + str(i))
+                        for c in w_start:
+                            a_fstart.add_condition(StartTiming(), self.fsub.substitute(c, self.global_fluent_map, agent))
+                        a_fstart.add_condition(StartTiming(),
+                                               Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
+                        a_fstart.add_condition(StartTiming(), Not(waiting(self.get_agent_obj(agent))))
+                        a_fstart.add_effect(StartTiming(), failure, True)
+                        fragment.append(a_fstart)
+
+                    # Fail inv version            
+                    for i, fact in enumerate(f_overall):
+                        overall_condition_added_by_start_effect = False
+                        for effect in action.effects.get(StartTiming(), []):
+                            if effect.fluent == fact and effect.value.is_true():
+                                overall_condition_added_by_start_effect = True
+                                break
+                        if not overall_condition_added_by_start_effect:
+                            a_finv = self.create_action_copy(problem, agent, action, "finv" + str(i))
+                            for c in c_start:
+                                a_finv.add_condition(StartTiming(),
+                                                     self.fsub.substitute(c, self.global_fluent_map, agent))
+                            a_finv.add_condition(StartTiming(),
+                                                 Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
+                            for effect in action.effects.get(StartTiming(), []):
+                                a_finv.add_effect(StartTiming(),
+                                                  self.fsub.substitute(effect.fluent, self.global_fluent_map, agent),
+                                                  effect.value)
+                                if effect.value.is_false():
+                                    a_finv.add_condition(StartTiming(),
+                                                         Equals(self.fsub.substitute(effect.fluent, inv_count_map, agent),
+                                                                0))
+                                if effect.value.is_true():
+                                    for ag in problem.agents:
+                                        a_finv.add_condition(StartTiming(),
+                                                             Not(self.fsub.substitute(effect.fluent, waiting_fluent_map[ag],
+                                                                                      agent)))
+                            a_finv.add_condition(StartTiming(), Not(waiting(self.get_agent_obj(agent))))
+                            a_finv.add_effect(StartTiming(), failure, True)
+                            fragment.append(a_finv)
+
+                    # Fail end version            
+                    for i, fact in enumerate(f_end):
+                        a_fend = self.create_action_copy(problem, agent, action, "fend" + str(i))
                         for c in c_start:
-                            a_fstart.add_condition(StartTiming(),
-                                                   self.fsub.substitute(c, self.global_fluent_map, agent))
-                        a_finv.add_condition(StartTiming(),
-                                             Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
+                            a_fend.add_condition(StartTiming(), self.fsub.substitute(c, self.global_fluent_map, agent))
+                        for c in c_overall:
+                            a_fend.add_condition(OpenDurationInterval(StartTiming(), EndTiming()),
+                                                 self.fsub.substitute(c, self.global_fluent_map, agent))
+                        a_fend.add_condition(StartTiming(), Not(waiting(self.get_agent_obj(agent))))
+                        a_fend.add_condition(EndTiming(), Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
                         for effect in action.effects.get(StartTiming(), []):
-                            a_finv.add_effect(StartTiming(),
+                            a_fend.add_effect(StartTiming(),
                                               self.fsub.substitute(effect.fluent, self.global_fluent_map, agent),
                                               effect.value)
                             if effect.value.is_false():
-                                a_finv.add_condition(StartTiming(),
-                                                     Equals(self.fsub.substitute(effect.fluent, inv_count_map, agent),
-                                                            0))
+                                a_fend.add_condition(StartTiming(),
+                                                     Equals(self.fsub.substitute(effect.fluent, inv_count_map, agent), 0))
                             if effect.value.is_true():
                                 for ag in problem.agents:
-                                    a_finv.add_condition(StartTiming(),
+                                    a_fend.add_condition(StartTiming(),
                                                          Not(self.fsub.substitute(effect.fluent, waiting_fluent_map[ag],
                                                                                   agent)))
-                        a_finv.add_condition(StartTiming(), Not(waiting(self.get_agent_obj(agent))))
-                        a_finv.add_effect(StartTiming(), failure, True)
-                        new_problem.add_action(a_finv)
-                        new_to_old[a_finv] = action
-
-                # Fail end version            
-                for i, fact in enumerate(f_end):
-                    a_fend = self.create_action_copy(problem, agent, action, "fend" + str(i))
-                    for c in c_start:
-                        a_fend.add_condition(StartTiming(), self.fsub.substitute(c, self.global_fluent_map, agent))
-                    for c in c_overall:
-                        a_fend.add_condition(OpenDurationInterval(StartTiming(), EndTiming()),
-                                             self.fsub.substitute(c, self.global_fluent_map, agent))
-                    a_fend.add_condition(StartTiming(), Not(waiting(self.get_agent_obj(agent))))
-                    a_fend.add_condition(EndTiming(), Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
-                    for effect in action.effects.get(StartTiming(), []):
-                        a_fend.add_effect(StartTiming(),
-                                          self.fsub.substitute(effect.fluent, self.global_fluent_map, agent),
-                                          effect.value)
-                        if effect.value.is_false():
-                            a_fend.add_condition(StartTiming(),
-                                                 Equals(self.fsub.substitute(effect.fluent, inv_count_map, agent), 0))
-                        if effect.value.is_true():
-                            for agent in problem.agents:
+                        for effect in action.effects.get(EndTiming(), []):
+                            # if effect.value.is_false():
+                            #    a_fend.add_condition(StartTiming(), Equals(self.get_inv_count_version(effect.fluent), 0))
+                            if effect.value.is_true():
                                 for ag in problem.agents:
-                                    a_fend.add_condition(StartTiming(),
+                                    # Changed timing from start to end
+                                    a_fend.add_condition(EndTiming(),
                                                          Not(self.fsub.substitute(effect.fluent, waiting_fluent_map[ag],
                                                                                   agent)))
-                    for effect in action.effects.get(EndTiming(), []):
-                        # if effect.value.is_false():
-                        #    a_fend.add_condition(StartTiming(), Equals(self.get_inv_count_version(effect.fluent), 0))
-                        if effect.value.is_true():
-                            for ag in problem.agents:
-                                # Changed timing from start to end
-                                a_fend.add_condition(EndTiming(),
-                                                     Not(self.fsub.substitute(effect.fluent, waiting_fluent_map[ag],
-                                                                              agent)))
-                    a_fend.add_condition(StartTiming(), Not(waiting(self.get_agent_obj(agent))))
-                    a_fend.add_effect(EndTiming(), failure, True)
-                    for c in c_overall:
-                        a_fend.add_increase_effect(StartTiming(), self.fsub.substitute(c, inv_count_map, agent), 1)
-                    new_problem.add_action(a_fend)
-                    new_to_old[a_fend] = action
-
-                # Del inv start version            
-                for i, effect in enumerate(action.effects.get(StartTiming(), [])):
-                    if effect.value.is_false():
-                        a_finvstart = self.create_action_copy(problem, agent, action, "finvstart" + str(i))
-                        a_finvstart.add_condition(StartTiming(), Not(waiting(self.get_agent_obj(agent))))
-                        for c in c_start:
-                            a_finvstart.add_condition(StartTiming(),
-                                                      self.fsub.substitute(c, self.global_fluent_map, agent))
-                        a_finvstart.add_condition(StartTiming(),
-                                                  GT(self.fsub.substitute(effect.fluent, inv_count_map, agent), 0))
-                        a_finvstart.add_effect(StartTiming(), failure, True)
-                        new_problem.add_action(a_finvstart)
-                        new_to_old[a_finvstart] = action
-
-                # Del inv end version            
-                for i, effect in enumerate(action.effects.get(EndTiming(), [])):
-                    if effect.value.is_false():
-                        a_finvend = self.create_action_copy(problem, agent, action, "finvend" + str(i))
-                        a_finvend.add_condition(StartTiming(), Not(waiting(self.get_agent_obj(agent))))
-                        for c in c_start:
-                            a_finvend.add_condition(StartTiming(),
-                                                    self.fsub.substitute(c, self.global_fluent_map, agent))
+                        a_fend.add_condition(StartTiming(), Not(waiting(self.get_agent_obj(agent))))
+                        a_fend.add_effect(EndTiming(), failure, True)
                         for c in c_overall:
-                            a_finvend.add_condition(OpenDurationInterval(StartTiming(), EndTiming()),
-                                                    self.fsub.substitute(c, self.global_fluent_map, agent))
-                        for c in c_end:
-                            a_finvend.add_condition(EndTiming(), self.fsub.substitute(c, self.global_fluent_map, agent))
-                        a_finvend.add_condition(EndTiming(),
-                                                GT(self.fsub.substitute(effect.fluent, inv_count_map, agent), 0))
-
-                        for seffect in action.effects.get(StartTiming(), []):
-                            a_finvend.add_effect(StartTiming(),
-                                                 self.fsub.substitute(seffect.fluent, self.global_fluent_map, agent),
-                                                 seffect.value)
-                            if seffect.value.is_false():
-                                a_finvstart.add_condition(StartTiming(), Equals(
-                                    self.fsub.substitute(seffect.fluent, inv_count_map, agent), 0))
-                            if seffect.value.is_true():
-                                for ag in problem.agents:
-                                    a_finvend.add_condition(StartTiming(),
-                                                            Not(self.fsub.substitute(seffect.fluent,
-                                                                                     waiting_fluent_map[ag], agent)))
-                                    a_finvend.add_condition(OpenDurationInterval(StartTiming(), EndTiming()),
-                                                            Not(self.fsub.substitute(seffect.fluent,
-                                                                                     waiting_fluent_map[ag], agent)))
-                        for seffect in action.effects.get(EndTiming(), []):
-                            a_finvend.add_effect(EndTiming(),
-                                                 self.fsub.substitute(seffect.fluent, self.global_fluent_map, agent),
-                                                 seffect.value)
-
-                        # self.add_condition_inv_count_zero(effect.fluent, a_finvend, StartTiming(), True, 0)
-                        a_finvend.add_effect(StartTiming(), failure, True)
-                        for interval, condition in action.conditions.items():
-                            if interval.lower != interval.upper:
-                                for fact in condition:
-                                    a_finvend.add_increase_effect(StartTiming(),
-                                                                  self.fsub.substitute(fact, inv_count_map, agent), 1)
-                        new_problem.add_action(a_finvend)
-                        new_to_old[a_finvend] = action
-
-                # a^w_x version - wait forever for x to be true
-                for i, w_fact in enumerate(w_start):
-                    a_wx = self.create_action_copy(problem, agent, action, "w" + str(i))
-                    a_wx.add_condition(StartTiming(), Not(waiting(self.get_agent_obj(agent))))
-
-                    a_wx.add_effect(StartTiming(), failure, True)
-                    a_wx.add_effect(StartTiming(), waiting(self.get_agent_obj(agent)), True)
-                    a_wx.add_condition(StartTiming(), Not(self.fsub.substitute(w_fact, self.global_fluent_map, agent)))
-                    a_wx.add_effect(StartTiming(), self.fsub.substitute(w_fact, waiting_fluent_map[agent], agent), True)
-                    new_problem.add_action(a_wx)
-                    new_to_old[a_wx] = action
-
-                # a_waiting version - dummy version while agent is waiting
-                a_waiting = self.create_action_copy(problem, agent, action, "sw")
-                a_waiting.add_condition(StartTiming(), waiting(self.get_agent_obj(agent)))
-                new_problem.add_action(a_waiting)
-                new_to_old[a_waiting] = action
+                            a_fend.add_increase_effect(StartTiming(), self.fsub.substitute(c, inv_count_map, agent), 1)
+                        fragment.append(a_fend)
+
+                    # Del inv start version            
+                    for i, effect in enumerate(action.effects.get(StartTiming(), [])):
+                        if effect.value.is_false():
+                            a_finvstart = self.create_action_copy(problem, agent, action, "finvstart" + str(i))
+                            a_finvstart.add_condition(StartTiming(), Not(waiting(self.get_agent_obj(agent))))
+                            for c in c_start:
+                                a_finvstart.add_condition(StartTiming(),
+                                                          self.fsub.substitute(c, self.global_fluent_map, agent))
+                            a_finvstart.add_condition(StartTiming(),
+                                                      GT(self.fsub.substitute(effect.fluent, inv_count_map, agent), 0))
+                            a_finvstart.add_effect(StartTiming(), failure, True)
+                            fragment.append(a_finvstart)
+
+                    # Del inv end version            
+                    for i, effect in enumerate(action.effects.get(EndTiming(), [])):
+                        if effect.value.is_false():
+                            a_finvend = self.create_action_copy(problem, agent, action, "finvend" + str(i))
+                            a_finvend.add_condition(StartTiming(), Not(waiting(self.get_agent_obj(agent))))
+                            for c in c_start:
+                                a_finvend.add_condition(StartTiming(),
+                                                        self.fsub.substitute(c, self.global_fluent_map, agent))
+                            for c in c_overall:
+                                a_finvend.add_condition(OpenDurationInterval(StartTiming(), EndTiming()),
+                                                        self.fsub.substitute(c, self.global_fluent_map, agent))
+                            for c in c_end:
+                                a_finvend.add_condition(EndTiming(), self.fsub.substitute(c, self.global_fluent_map, agent))
+                            a_finvend.add_condition(EndTiming(),
+                                                    GT(self.fsub.substitute(effect.fluent, inv_count_map, agent), 0))
+
+                            for seffect in action.effects.get(StartTiming(), []):
+                                a_finvend.add_effect(StartTiming(),
+                                                     self.fsub.substitute(seffect.fluent, self.global_fluent_map, agent),
+                                                     seffect.value)
+                                if seffect.value.is_false():
+                                    a_finvend.add_condition(StartTiming(), Equals(
+                                        self.fsub.substitute(seffect.fluent, inv_count_map, agent), 0))
+                                if seffect.value.is_true():
+                                    for ag in problem.agents:
+                                        a_finvend.add_condition(StartTiming(),
+                                                                Not(self.fsub.substitute(seffect.fluent,
+                                                                                         waiting_fluent_map[ag], agent)))
+                                        a_finvend.add_condition(OpenDurationInterval(StartTiming(), EndTiming()),
+                                                                Not(self.fsub.substitute(seffect.fluent,
+                                                                                         waiting_fluent_map[ag], agent)))
+                            for seffect in action.effects.get(EndTiming(), []):
+                                a_finvend.add_effect(EndTiming(),
+                                                     self.fsub.substitute(seffect.fluent, self.global_fluent_map, agent),
+                                                     seffect.value)
+
+                            # self.add_condition_inv_count_zero(effect.fluent, a_finvend, StartTiming(), True, 0)
+                            a_finvend.add_effect(StartTiming(), failure, True)
+                            for interval, condition in action.conditions.items():
+                                if interval.lower != interval.upper:
+                                    for fact in condition:
+                                        a_finvend.add_increase_effect(StartTiming(),
+                                                                      self.fsub.substitute(fact, inv_count_map, agent), 1)
+                            fragment.append(a_finvend)
+
+                    # a^w_x version - wait forever for x to be true
+                    for i, w_fact in enumerate(w_start):
+                        a_wx = self.create_action_copy(problem, agent, action, "w" + str(i))
+                        a_wx.add_condition(StartTiming(), Not(waiting(self.get_agent_obj(agent))))
+
+                        a_wx.add_effect(StartTiming(), failure, True)
+                        a_wx.add_effect(StartTiming(), waiting(self.get_agent_obj(agent)), True)
+                        a_wx.add_condition(StartTiming(), Not(self.fsub.substitute(w_fact, self.global_fluent_map, agent)))
+                        a_wx.add_effect(StartTiming(), self.fsub.substitute(w_fact, waiting_fluent_map[agent], agent), True)
+                        fragment.append(a_wx)
+
+                    # a_waiting version - dummy version while agent is waiting
+                    a_waiting = self.create_action_copy(problem, agent, action, "sw")
+                    a_waiting.add_condition(StartTiming(), waiting(self.get_agent_obj(agent)))
+                    fragment.append(a_waiting)
+
+                    self.put_fragment(key, fragment)
+                self.add_fragment_actions(new_problem, new_to_old, fragment, agent, action)
 
         # Goal
         new_problem.add_goal(failure)
@@ -951,242 +1029,254 @@ class DurativeActionRobustnessVerifier(RobustnessVerifier):
         w.write_problem("problem.pddl")
 
         return CompilerResult(
-            new_problem, partial(replace_action, map=new_to_old), self.name
+            new_problem, partial(replace_agent_action, map=new_to_old), self.name
         )
 
 
-class DeleteDecompositionVerifier(InstantaneousActionRobustnessVerifier):
-    '''Robustness verifier class for instanteanous actions using alternative formulation:
+class _GroundAction:
+    """ A grounded action of an agent, as needed by the relaxed reachability analysis.
+    Each atom is a tuple (agent name or None for the environment fluents, fluent name, objects).
+    The goals are represented by a _GroundAction without agent and action names."""
+
+    def __init__(self, agent_name: Optional[str], action_name: Optional[str]):
+        self.agent_name = agent_name
+        self.action_name = action_name
+        self.preconditions: Set[Tuple] = set()
+        self.negative_preconditions: Set[Tuple] = set()
+        # The atoms of the conditions that are neither atoms nor negated atoms; they are ignored
+        # by the reachability analysis, but they might be violated by any change
+        self.other_conditions: Set[Tuple] = set()
+        self.add_effects: Set[Tuple] = set()
+        self.delete_effects: Set[Tuple] = set()
+
+
+class _NotGroundable(Exception):
+    pass
+
+
+class DeleteDecompositionVerifier(SimpleInstantaneousActionRobustnessVerifier):
+    '''Robustness verifier class for instanteanous actions based on delete decomposition:
      this class requires a multi-agent problem, and creates a classical planning problem which is unsolvable iff the multi agent problem is not robust.
-     Implements the robustness verification compilation from Tuisov, Shleyfman, Karpas with the bugs fixed
+     The actions that are not reachable in the delete relaxation of the problem (computed with a fixpoint over the grounded actions) are useless,
+     as no agent can ever apply them. If no useful action of an agent deletes an atom required by another agent (or adds an atom that another agent requires to be false),
+     the problem is delete decomposable: every agent can execute its own plan whatever the other agents do, so the problem is robust and the created problem
+     is a trivially unsolvable one. Otherwise, the created problem is the one of the SimpleInstantaneousActionRobustnessVerifier, without the useless actions.
      '''
 
-    def __init__(self):
-        InstantaneousActionRobustnessVerifier.__init__(self)
+    def __init__(self, max_fragments: int = 10000):
+        SimpleInstantaneousActionRobustnessVerifier.__init__(self, max_fragments)
+        self._useful_actions: Optional[Set[Tuple[Optional[str], Optional[str]]]] = None
 
     @property
     def name(self):
         return "ddvr"
 
-    def find_useless_actions(self, problem) -> Set[InstantaneousAction]:
-        '''
-        Find actions that are not used in any plan
-        '''
+    def get_agent_actions(self, problem: MultiAgentProblemWithWaitfor, agent: Agent) -> List[Action]:
+        if self._useful_actions is None:
+            return agent.actions
+        return [a for a in agent.actions if (agent.name, a.name) in self._useful_actions]
+
+    def _ground_atom(self, problem: MultiAgentProblem, agent: Optional[Agent], expression: FNode,
+                     binding: Dict[Parameter, Object]) -> Tuple:
+        if expression.is_dot():
+            owner = expression.agent().name
+            expression = expression.arg(0)
+        elif expression.fluent() in problem.ma_environment.fluents or agent is None:
+            owner = None
+        else:
+            owner = agent.name
+        objs = []
+        for arg in expression.args:
+            if arg.is_parameter_exp():
+                objs.append(binding[arg.parameter()])
+            elif arg.is_object_exp():
+                objs.append(arg.object())
+            else:
+                raise _NotGroundable()
+        return (owner, expression.fluent().name, tuple(objs))
+
+    def _collect_atoms(self, problem: MultiAgentProblem, agent: Optional[Agent], expression: FNode,
+                       binding: Dict[Parameter, Object], atoms: Set[Tuple]):
+        if expression.is_fluent_exp() or expression.is_dot():
+            atoms.add(self._ground_atom(problem, agent, expression, binding))
+        else:
+            for arg in expression.args:
+                self._collect_atoms(problem, agent, arg, binding, atoms)
+
+    def _add_condition(self, problem: MultiAgentProblem, agent: Optional[Agent], condition: FNode,
+                       binding: Dict[Parameter, Object], ground_action: _GroundAction):
+        if condition.is_and():
+            for arg in condition.args:
+                self._add_condition(problem, agent, arg, binding, ground_action)
+        elif condition.is_fluent_exp() or condition.is_dot():
+            ground_action.preconditions.add(self._ground_atom(problem, agent, condition, binding))
+        elif condition.is_not() and (condition.arg(0).is_fluent_exp() or condition.arg(0).is_dot()):
+            ground_action.negative_preconditions.add(self._ground_atom(problem, agent, condition.arg(0), binding))
+        elif not condition.is_bool_constant():
+            self._collect_atoms(problem, agent, condition, binding, ground_action.other_conditions)
+
+    def _ground_actions(self, problem: MultiAgentProblem) -> List[_GroundAction]:
+        res = []
         for agent in problem.agents:
-            for an_action in agent.actions:
-                new_problem = self.initialize_problem(problem)
-                new_fluent = Fluent("artificial")
-                new_problem.add_fluent(new_fluent)
-                new_problem.add_goal(new_fluent)
-                new_action = self.create_action_copy(problem, agent, an_action, "s")
-                new_action.add_precondition(new_fluent)
-                new_problem.add_action(new_action)
-                # slrc = SocialLawRobustnessChecker(
-                #     planner_name="fast-downward",
-                #     robustness_verifier_name="SimpleInstantaneousActionRobustnessVerifier"
-                # )
-                # presult = slrc.solve(problem)
-                # assert presult.status in POSITIVE_OUTCOMES
-        return set()
-
-    def find_useless_atoms(self, problem, useless_actions) -> Set[Fluent]:
-        '''Find atoms that are not used in any plan'''
-        unused_atoms = set()
+            for action in agent.actions:
+                if not isinstance(action, InstantaneousAction):
+                    raise _NotGroundable()
+                parameters = action.parameters
+                if any(not p.type.is_user_type() for p in parameters):
+                    raise _NotGroundable()
+                for objs in product(*(list(problem.objects(p.type)) for p in parameters)):
+                    binding = dict(zip(parameters, objs))
+                    ground_action = _GroundAction(agent.name, action.name)
+                    for precondition in action.preconditions:
+                        self._add_condition(problem, agent, precondition, binding, ground_action)
+                    for effect in action.effects:
+                        atom = self._ground_atom(problem, agent, effect.fluent, binding)
+                        if effect.is_conditional():
+                            self._collect_atoms(problem, agent, effect.condition, binding, ground_action.other_conditions)
+                        if effect.value.is_true():
+                            ground_action.add_effects.add(atom)
+                        elif effect.value.is_false():
+                            ground_action.delete_effects.add(atom)
+                        else:
+                            ground_action.add_effects.add(atom)
+                            ground_action.delete_effects.add(atom)
+                    res.append(ground_action)
+        return res
+
+    def _initial_atoms(self, problem: MultiAgentProblem) -> Set[Tuple]:
+        res = set()
+        owned_fluents: List[Tuple[Optional[str], Fluent, Optional[FNode]]] = [
+            (None, f, problem.ma_environment.fluents_defaults.get(f, None)) for f in problem.ma_environment.fluents]
         for agent in problem.agents:
-            for action in problem.actions:
-                if action not in useless_actions:
-                    for interval, condition in action.conditions.items():
-                        for fact in condition:
-                            unused_atoms.add(fact)
-                    for interval, effect in action.effects.items():
-                        for fact in effect:
-                            unused_atoms.add(fact)
-        return unused_atoms
+            owned_fluents.extend((agent.name, f, agent.fluents_defaults.get(f, None)) for f in agent.fluents)
+        for owner, f, default in owned_fluents:
+            if default is not None and default.is_true():
+                for objs in product(*(list(problem.objects(p.type)) for p in f.signature)):
+                    res.add((owner, f.name, objs))
+        for fluent, value in problem.explicit_initial_values.items():
+            atom = self._ground_atom(problem, None, fluent, {})
+            if value.is_true():
+                res.add(atom)
+            else:
+                res.discard(atom)
+        return res
+
+    def _reachable_ground_actions(self, problem: MultiAgentProblem) -> List[_GroundAction]:
+        '''Returns the grounded actions that are reachable in the delete relaxation of the given problem,
+        ignoring the negative and the complex preconditions.'''
+        ground_actions = self._ground_actions(problem)
+        reached = self._initial_atoms(problem)
+        missing = [0] * len(ground_actions)
+        waiting: Dict[Tuple, List[int]] = {}
+        to_apply = []
+        for i, ground_action in enumerate(ground_actions):
+            for atom in ground_action.preconditions:
+                if atom not in reached:
+                    missing[i] += 1
+                    waiting.setdefault(atom, []).append(i)
+            if missing[i] == 0:
+                to_apply.append(i)
+        reachable = []
+        while len(to_apply) > 0:
+            ground_action = ground_actions[to_apply.pop()]
+            reachable.append(ground_action)
+            for atom in ground_action.add_effects:
+                if atom not in reached:
+                    reached.add(atom)
+                    for j in waiting.pop(atom, []):
+                        missing[j] -= 1
+                        if missing[j] == 0:
+                            to_apply.append(j)
+        return reachable
+
+    def _goal_conditions(self, problem: MultiAgentProblem) -> _GroundAction:
+        '''Returns the goals of the given problem, as the preconditions of a grounded action of no agent.'''
+        goals = _GroundAction(None, None)
+        for goal in problem.goals:
+            self._add_condition(problem, None, goal, {}, goals)
+        return goals
+
+    def _required_atoms(self, problem: MultiAgentProblem, reachable: List[_GroundAction]) -> Tuple[Dict[Tuple, Set[Optional[str]]], Dict[Tuple, Set[Optional[str]]]]:
+        '''Returns the maps from the atoms required to be true (false) by the reachable actions or by the goals,
+        to the agents requiring them (None for the goals of no specific agent).'''
+        required_true: Dict[Tuple, Set[Optional[str]]] = {}
+        required_false: Dict[Tuple, Set[Optional[str]]] = {}
+        goals = self._goal_conditions(problem)
+        for requirement in chain(reachable, [goals]):
+            for atom in chain(requirement.preconditions, requirement.other_conditions):
+                # The goals of an agent are Dot expressions, so their owner is the agent
+                owner = requirement.agent_name if requirement is not goals else atom[0]
+                required_true.setdefault(atom, set()).add(owner)
+            for atom in chain(requirement.negative_preconditions, requirement.other_conditions):
+                owner = requirement.agent_name if requirement is not goals else atom[0]
+                required_false.setdefault(atom, set()).add(owner)
+        return required_true, required_false
+
+    def find_useless_actions(self, problem: MultiAgentProblem) -> Set[Tuple[str, str]]:
+        '''
+        Find the actions (as agent name, action name) that are not used in any plan, because none of their
+        groundings is reachable in the delete relaxation of the problem.
+        '''
+        useful = set((ga.agent_name, ga.action_name) for ga in self._reachable_ground_actions(problem))
+        return set((agent.name, action.name) for agent in problem.agents for action in agent.actions) - useful
+
+    def find_useless_atoms(self, problem: MultiAgentProblem) -> Set[Tuple]:
+        '''Find the atoms changed by the useful actions that are not required by any useful action nor by the goals.'''
+        reachable = self._reachable_ground_actions(problem)
+        required_true, required_false = self._required_atoms(problem, reachable)
+        changed = set()
+        for ground_action in reachable:
+            changed.update(ground_action.add_effects)
+            changed.update(ground_action.delete_effects)
+        return set(atom for atom in changed if atom not in required_true and atom not in required_false)
+
+    def _is_decomposable(self, problem: MultiAgentProblem, reachable: List[_GroundAction]) -> bool:
+        required_true, required_false = self._required_atoms(problem, reachable)
+        for ground_action in reachable:
+            for atom in ground_action.delete_effects:
+                if any(agent_name != ground_action.agent_name for agent_name in required_true.get(atom, ())):
+                    return False
+            for atom in ground_action.add_effects:
+                if any(agent_name != ground_action.agent_name for agent_name in required_false.get(atom, ())):
+                    return False
+        return True
 
     def check_decomposability(self, problem: MultiAgentProblem) -> bool:
-        useless_actions = self.find_useless_actions(problem)
-        useless_predicates = self.find_useless_atoms(problem, useless_actions)
-        for agent in problem.agents:
-            for action in problem.actions:
-                if action not in useless_actions:
-                    delete_effects = action.effects.get()
-                    for interval, effect in action.effects.items():
-                        for fact in effect:
-                            if fact in useless_predicates:
-                                return False
-
-    # def _compile(self, problem: "up.model.AbstractProblem",
-    #              compilation_kind: CompilationKind) -> "up.engines.results.CompilerResult":
-    #     new_to_old: Dict[Action, Action] = {}
-    #     new_problem = self.initialize_problem(problem)
-    #     self.global_fluent_map = FluentMap("w", default_value=False)
-    #     useless_actions = self.find_useless_actions(problem)
-
-
-"""
+        '''Returns True iff no useful action of an agent can violate a condition of another agent, or a goal.'''
+        try:
+            return self._is_decomposable(problem, self._reachable_ground_actions(problem))
+        except _NotGroundable:
+            return False
+
     def _compile(self, problem: "up.model.AbstractProblem",
                  compilation_kind: "up.engines.CompilationKind") -> CompilerResult:
         '''Creates a the robustness verification problem.'''
+        assert isinstance(problem, MultiAgentProblemWithWaitfor)
+        try:
+            reachable = self._reachable_ground_actions(problem)
+        except _NotGroundable:
+            reachable = None
+        if reachable is not None and self._is_decomposable(problem, reachable):
+            new_problem = Problem(f'{self.name}_{problem.name}')
+            conflict = Fluent("conflict")
+            new_problem.add_fluent(conflict, default_initial_value=False)
+            new_problem.add_goal(conflict)
+            return CompilerResult(
+                new_problem, partial(replace_agent_action, map={}), self.name
+            )
+
+        if reachable is not None:
+            self._useful_actions = set((ga.agent_name, ga.action_name) for ga in reachable)
+        try:
+            return SimpleInstantaneousActionRobustnessVerifier._compile(self, problem, compilation_kind)
+        finally:
+            self._useful_actions = None
 
-        # Represents the map from the new action to the old action
-        new_to_old: Dict[Action, Action] = {}
-
-        new_problem = self.initialize_problem(problem)
-
-        self.waiting_fluent_map = FluentMap("w", default_value=False)
-        self.waiting_fluent_map.add_facts(problem, new_problem)
-
-        # Add fluents
-        stage_1 = Fluent("stage 1")
-        stage_2 = Fluent("stage 2")
-        precondition_violation = Fluent("precondition violation")
-        possible_deadlock = Fluent("possible deadlock")
-        conflict = Fluent("conflict")
-        fin = Fluent("fin", _signature=[Parameter("a", self.agent_type)])
-
-        new_problem.add_fluent(stage_1, default_initial_value=False)
-        new_problem.add_fluent(stage_2, default_initial_value=False)
-        new_problem.add_fluent(precondition_violation, default_initial_value=False)
-        new_problem.add_fluent(possible_deadlock, default_initial_value=False)
-        new_problem.add_fluent(conflict, default_initial_value=False)
-        new_problem.add_fluent(fin, default_initial_value=False)
-
-        allow_action_map = {}
-        for agent in problem.agents:
-            for action in agent.actions:
-                action_fluent = Fluent("allow-" + agent.name + "-" + action.name)
-                # allow_action_map.setdefault(action.agent, {}).update(action=action_fluent)
-                if agent.name not in allow_action_map.keys():
-                    allow_action_map[agent.name] = {action.name: action_fluent}
-                else:
-                    allow_action_map[agent.name][action.name] = action_fluent
-                new_problem.add_fluent(action_fluent, default_initial_value=True)
-
-        # Add actions
-        for agent in problem.agents:
-            for action in agent.actions:
-                # Success version - affects globals same way as original
-                a_s = self.create_action_copy(problem, agent, action, "s" + agent.name)
-                a_s.add_precondition(stage_1)
-                a_s.add_precondition(allow_action_map[agent.name][action.name])
-                for fact in self.get_action_preconditions(problem, agent, action, True, True):
-                    a_s.add_precondition(self.fsub.substitute(fact, self.global_fluent_map, agent))
-                for effect in action.effects:
-                    a_s.add_effect(self.fsub.substitute(effect.fluent, self.global_fluent_map, agent), effect.value)
-                new_problem.add_action(a_s)
-                new_to_old[a_s] = action
-
-                # Fail version
-                for i, fact in enumerate(self.get_action_preconditions(problem, agent, action, True, False)):
-                    a_f = self.create_action_copy(problem, agent, action, "f" + str(i))
-                    a_f.add_precondition(stage_1)
-                    a_f.add_precondition(allow_action_map[agent.name][action.name])
-                    for pre in self.get_action_preconditions(problem, agent, action, False, True):
-                        a_f.add_precondition(self.fsub.substitute(pre, self.global_fluent_map, agent))
-                    a_f.add_precondition(Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
-                    a_f.add_effect(precondition_violation, True)
-                    a_f.add_effect(stage_2, True)
-                    a_f.add_effect(stage_1, False)
-                    new_problem.add_action(a_f)
-                    new_to_old[a_f] = action
-
-                for i, fact in enumerate(self.get_action_preconditions(problem, agent, action, False, True)):
-                    # Wait version
-                    a_w = self.create_action_copy(problem, agent, action, "w" + str(i))
-                    a_w.add_precondition(stage_1)
-                    a_w.add_precondition(allow_action_map[agent.name][action.name])
-                    a_w.add_precondition(Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
-                    assert not fact.is_not()
-                    a_w.add_effect(self.fsub.substitute(fact, self.waiting_fluent_map, agent),
-                                   True)  # , action.agent.obj), True)
-                    new_problem.add_action(a_w)
-                    new_to_old[a_w] = action
-
-                    # deadlock version
-                    a_deadlock = self.create_action_copy(problem, agent, action, "d" + str(i))
-                    a_deadlock.add_precondition(Not(self.fsub.substitute(fact, self.global_fluent_map, agent)))
-                    for another_action in allow_action_map[agent.name].keys():
-                        a_deadlock.add_precondition(Not(allow_action_map[agent.name][another_action]))
-                    a_deadlock.add_effect(fin(self.get_agent_obj(agent)), True)
-                    a_deadlock.add_effect(possible_deadlock, True)
-                    new_problem.add_action(a_deadlock)
-                    new_to_old[a_deadlock] = action
-
-                # local version
-                a_local = self.create_action_copy(problem, agent, action, "l")
-                a_local.add_precondition(stage_2)
-                a_local.add_precondition(allow_action_map[agent.name][action.name])
-                for fluent in allow_action_map[agent.name].values():
-                    a_local.add_effect(fluent, True)
-                new_problem.add_action(a_local)
-                new_to_old[a_local] = action
-
-            # end-success        
-            end_s = InstantaneousAction("end_s_" + agent.name)
-            for goal in self.get_agent_goal(problem, agent):
-                end_s.add_precondition(self.fsub.substitute(goal, self.global_fluent_map, agent))
-                end_s.add_precondition(self.fsub.substitute(goal, self.local_fluent_map[agent], agent))
-            end_s.add_effect(fin(self.get_agent_obj(agent)), True)
-            end_s.add_effect(stage_1, False)
-            new_problem.add_action(end_s)
-            new_to_old[end_s] = None
-
-        # start-stage-2
-        start_stage_2 = InstantaneousAction("start_stage_2")
-        for agent in problem.agents:
-            start_stage_2.add_precondition(fin(self.get_agent_obj(agent)))
-        start_stage_2.add_effect(stage_2, True)
-        start_stage_2.add_effect(stage_1, False)
-        new_problem.add_action(start_stage_2)
-        new_to_old[start_stage_2] = None
-
-        # goals_not_achieved
-        goals_not_achieved = InstantaneousAction("goals_not_achieved")
-        goals_not_achieved.add_precondition(stage_2)
-        for agent in problem.agents:
-            for i, goal in enumerate(self.get_agent_goal(problem, agent)):
-                goals_not_achieved.add_precondition(Not(self.fsub.substitute(goal, self.global_fluent_map, agent)))
-                for g in self.get_agent_goal(problem, agent):
-                    goals_not_achieved.add_precondition(self.fsub.substitute(g, self.local_fluent_map[agent], agent))
-        goals_not_achieved.add_effect(conflict, True)
-        new_problem.add_action(goals_not_achieved)
-        new_to_old[goals_not_achieved] = None
-
-        # declare_deadlock
-        declare_deadlock = InstantaneousAction("declare_deadlock")
-        declare_deadlock.add_precondition(stage_2)
-        declare_deadlock.add_precondition(possible_deadlock)
-        for agent in problem.agents:
-            for i, goal in enumerate(self.get_agent_goal(problem, agent)):
-                for g in self.get_agent_goal(problem, agent):
-                    declare_deadlock.add_precondition(self.fsub.substitute(goal, self.local_fluent_map[agent], agent))
-        declare_deadlock.add_effect(conflict, True)
-        new_problem.add_action(declare_deadlock)
-        new_to_old[declare_deadlock] = None
-
-        # declare_fail
-        declare_fail = InstantaneousAction("declare_fail")
-        declare_fail.add_precondition(stage_2)
-        declare_fail.add_precondition(precondition_violation)
-        for agent in problem.agents:
-            for i, goal in enumerate(self.get_agent_goal(problem, agent)):
-                for g in self.get_agent_goal(problem, agent):
-                    declare_fail.add_precondition(self.fsub.substitute(goal, self.local_fluent_map[agent], agent))
-        declare_fail.add_effect(conflict, True)
-        new_problem.add_action(declare_fail)
-        new_to_old[declare_fail] = None
-
-        # Goal
-        new_problem.add_goal(conflict)
-
-        return CompilerResult(
-            new_problem, partial(replace_action, map=new_to_old), self.name
-        )
-"""
 
 env = up.environment.get_env()
 env.factory.add_engine('SimpleInstantaneousActionRobustnessVerifier', __name__,
                        'SimpleInstantaneousActionRobustnessVerifier')
+env.factory.add_engine('DeleteDecompositionVerifier', __name__, 'DeleteDecompositionVerifier')
 
 
 # env.factory.add_engine('WaitingActionRobustnessVerifier', __name__, 'WaitingActionRobustnessVerifier')
@@ -1342,44 +1432,50 @@ def get_intersection_problem(
 
 
 def create_grid_problem(length: int, width: int, num_of_agents: int) -> MultiAgentProblemWithWaitfor:
-    problem = MultiAgentProblemWithWaitfor("intersection")
+    """ Creates a grid of the given size, where the i-th robot starts at (i, i), has to reach (length - i - 1, width - i - 1)
+    and can drive to the free adjacent locations."""
+    problem = MultiAgentProblemWithWaitfor("grid")
     loc = UserType("loc")
 
     connected = Fluent('connected', BoolType(), l1=loc, l2=loc)
     free = Fluent('free', BoolType(), l=loc)
     problem.ma_environment.add_fluent(connected, default_initial_value=False)
     problem.ma_environment.add_fluent(free, default_initial_value=True)
+    locations = {}
     for i in range(length):
         for j in range(width):
-            problem.add_object(unified_planning.model.Object("l" + str(i) + "-" + str(j), loc))
+            locations[i, j] = unified_planning.model.Object("l" + str(i) + "-" + str(j), loc)
+            problem.add_object(locations[i, j])
+    for (i, j), l in locations.items():
+        for neighbour in [(i + 1, j), (i, j + 1)]:
+            if neighbour in locations:
+                problem.set_initial_value(connected(l, locations[neighbour]), True)
+                problem.set_initial_value(connected(locations[neighbour], l), True)
 
     at = Fluent('at', BoolType(), l1=loc)
-    arrived = Fluent('arrived', BoolType())
-    not_arrived = Fluent('not-arrived', BoolType())
-    start = Fluent('start', BoolType(), l=loc)
-
-
 
     drive = InstantaneousAction('drive', l1=loc, l2=loc)
     l1 = drive.parameter('l1')
     l2 = drive.parameter('l2')
     drive.add_precondition(at(l1))
     drive.add_precondition(free(l2))
+    drive.add_precondition(connected(l1, l2))
     drive.add_effect(at(l2), True)
     drive.add_effect(free(l2), False)
     drive.add_effect(at(l1), False)
     drive.add_effect(free(l1), True)
 
     for i in range(num_of_agents):
-        robot = Agent(f"robot_{i}", problem)
+        robot = Agent(f"robot-{i}", problem)
+        robot.add_fluent(at, default_initial_value=False)
+        robot.add_action(drive.clone())
         problem.add_agent(robot)
-        goal_location = (length - i - 1, width - i - 1)
-        robot.add_action(drive)
-        starting_location = unified_planning.model.Object("starting-location", (i, i))
-
-        problem.set_initial_value(Dot(robot, robot.fluent("at")(starting_location)), True)
-        problem.add_goal(Dot(robot, robot.fluent("at")(goal_location)))
+        starting_location = locations[i, i]
+        goal_location = locations[length - i - 1, width - i - 1]
 
+        problem.set_initial_value(Dot(robot, at(starting_location)), True)
+        problem.set_initial_value(free(starting_location), False)
+        problem.add_goal(Dot(robot, at(goal_location)))
 
     return problem
 
@@ -21,7 +21,7 @@ from unified_planning.model import Parameter, Fluent, InstantaneousAction, probl
 from unified_planning.shortcuts import *
 from unified_planning.exceptions import UPProblemDefinitionError
 from unified_planning.model import Problem, InstantaneousAction, DurativeAction, Action
-from typing import Type, List, Dict, Callable, OrderedDict
+from typing import Type, List, Dict, Set, Callable, OrderedDict
 from enum import Enum, auto
 from unified_planning.io import PDDLWriter, PDDLReader
 from unified_planning.engines import Credits
@@ -319,6 +319,102 @@ class SocialLaw(engines.engine.Engine, CompilerMixin):
             new_problem, partial(replace_action, map=new_to_old), self.name
         )
 
+    def _disallowed_actions_delta(self, base_law : "SocialLaw") -> Optional[Set[Tuple[str, str, Tuple[str]]]]:
+        '''Returns the actions disallowed by this social law and not by the given one, or None if the
+        two social laws differ in something else.'''
+        if self.added_waitfors != base_law.added_waitfors or \
+            self.new_fluents != base_law.new_fluents or \
+            self.new_fluent_initial_val != base_law.new_fluent_initial_val or \
+            self.added_action_parameters != base_law.added_action_parameters or \
+            self.added_preconditions != base_law.added_preconditions or \
+            self.new_objects != base_law.new_objects or \
+            not base_law.disallowed_actions.issubset(self.disallowed_actions):
+            return None
+        return self.disallowed_actions - base_law.disallowed_actions
+
+    def compile_incremental(self, problem : MultiAgentProblemWithWaitfor, base_law : "SocialLaw", base_result : CompilerResult) -> CompilerResult:
+        '''Compiles the given problem with this social law, starting from the result of the compilation of the
+        same problem with the given base social law.
+
+        When this social law only disallows more actions than the base one (as the successors generated by the
+        social law synthesis do), the new problem is built from the base compiled problem: the agents and the
+        actions that are not changed by the new disallowed actions are shared with the base problem, while the
+        agents and the actions that are changed are copied (copy-on-write). Otherwise, the problem is compiled
+        from scratch.'''
+        delta = self._disallowed_actions_delta(base_law)
+        if delta is None:
+            return self.compile(problem)
+        base_problem = base_result.problem
+        assert isinstance(base_problem, MultiAgentProblemWithWaitfor)
+
+        new_problem = MultiAgentProblemWithWaitfor()
+        new_problem.name = f'{self.name}_{problem.name}'
+        new_problem.ma_environment._fluents = base_problem.ma_environment._fluents[:]
+        new_problem.ma_environment._fluents_defaults = base_problem.ma_environment._fluents_defaults.copy()
+        new_problem._agents = base_problem.agents[:]
+        new_problem._user_types = base_problem._user_types[:]
+        new_problem._user_types_hierarchy = base_problem._user_types_hierarchy.copy()
+        new_problem._objects = base_problem._objects[:]
+        new_problem._initial_value = base_problem._initial_value.copy()
+        new_problem._goals = base_problem._goals[:]
+        new_problem._initial_defaults = base_problem._initial_defaults.copy()
+        new_problem._waitfor = base_problem.waitfor.clone()
+
+        # Maps the name of the copied agents to the agent of the base problem and its copy
+        copied_agents: Dict[str, Tuple[up.model.multi_agent.Agent, up.model.multi_agent.Agent]] = {}
+        for agent_name, action_name, disallowed_args in delta:
+            agent = new_problem.agent(agent_name)
+            allowed_name = "allowed__" + action_name
+            if not agent.has_fluent(allowed_name):
+                if agent_name not in copied_agents:
+                    # The agent of the base problem is shared, so it is copied before being modified
+                    new_ag = up.model.multi_agent.Agent(agent_name, new_problem)
+                    new_ag._fluents = agent._fluents[:]
+                    new_ag._fluents_defaults = agent._fluents_defaults.copy()
+                    new_ag._actions = agent._actions[:]
+                    new_ag._goals = agent._goals[:]
+                    new_problem._agents[new_problem._agents.index(agent)] = new_ag
+                    copied_agents[agent_name] = (agent, new_ag)
+                    agent = new_ag
+                action = agent.action(action_name)
+                new_action = action.clone()
+                agent._actions[agent._actions.index(action)] = new_action
+
+                allowed_fluent = Fluent(allowed_name, _signature = new_action.parameters)
+                agent.add_fluent(allowed_fluent, default_initial_value = True)
+                allowed_precondition = FluentExp(allowed_fluent, new_action.parameters)
+                new_action.add_precondition(allowed_precondition)
+                new_problem.waitfor.annotate_as_waitfor(agent_name, action_name, allowed_precondition)
+            else:
+                allowed_fluent = agent.fluent(allowed_name)
+
+            arg_objs = []
+            for arg in disallowed_args:
+                arg_obj = new_problem.object(arg)
+                arg_objs.append(arg_obj)
+            new_problem.set_initial_value(
+                Dot(agent, FluentExp(allowed_fluent, tuple(arg_objs))), 
+                False
+            )            
+
+        # The initial values of the copied agents are moved to the copies
+        if len(copied_agents) > 0:
+            for k in [k for k in new_problem._initial_value if k.is_dot() and k.agent().name in copied_agents]:
+                old_ag, new_ag = copied_agents[k.agent().name]
+                if k.agent() is old_ag:
+                    v = new_problem._initial_value.pop(k)
+                    new_problem._initial_value[Dot(new_ag, k.arg(0))] = v
+
+        # The agents and the actions are in the same order of the original problem, as in the compile
+        new_to_old: Dict[Action, Action] = {}
+        for ag, new_ag in zip(problem.agents, new_problem.agents):
+            for a, new_action in zip(ag.actions, new_ag.actions):
+                new_to_old[new_action] = (ag, a)
+
+        return CompilerResult(
+            new_problem, partial(replace_action, map=new_to_old), self.name
+        )
+
     def add_waitfor_annotation(self, agent_name : str, action_name : str, precondition_fluent_name : str, pre_condition_args: Tuple[str]):
         self.added_waitfors.add( (agent_name, action_name, precondition_fluent_name, pre_condition_args) )
 
@@ -20,10 +20,11 @@ from unified_planning.shortcuts import *
 from unified_planning.social_law.ma_problem_waitfor import MultiAgentProblemWithWaitfor
 from unified_planning.social_law.social_law import SocialLaw
 from unified_planning.social_law.robustness_checker import SocialLawRobustnessChecker, SocialLawRobustnessResult, SocialLawRobustnessStatus
+from unified_planning.social_law.robustness_verification import RobustnessVerifier
 from unified_planning.model import Parameter, Fluent, InstantaneousAction, problem_kind
 from unified_planning.exceptions import UPProblemDefinitionError
 from unified_planning.model import Problem, InstantaneousAction, DurativeAction, Action
-from typing import Type, List, Dict, Callable, OrderedDict, Set
+from typing import Type, List, Dict, Callable, OrderedDict, Set, Tuple
 from enum import Enum, auto
 from unified_planning.io import PDDLWriter, PDDLReader
 from unified_planning.engines import Credits
@@ -44,7 +45,8 @@ import queue
 from dataclasses import dataclass, field
 from typing import Any
 from itertools import chain, combinations
-from unified_planning.model.walkers import FreeVarsExtractor
+from unified_planning.model.walkers import FreeVarsExtractor, Substituter
+from unified_planning.engines.parallel import WorkerPool, serialize_arguments
 
 credits = Credits('Social Law Synthesis',
                   'Technion Cognitive Robotics Lab (cf. https://github.com/TechnionCognitiveRoboticsLab)',
@@ -71,10 +73,14 @@ class SearchNode:
 
     priority: int
     social_law : SocialLaw = field(compare=False)
+    parent : Optional["SearchNode"] = field(compare=False)
+    compilation : Optional[CompilerResult] = field(compare=False)
 
-    def __init__(self, social_law : SocialLaw, priority : int = 0):
+    def __init__(self, social_law : SocialLaw, priority : int = 0, parent : Optional["SearchNode"] = None):
         self.priority = priority
         self.social_law = social_law
+        self.parent = parent
+        self.compilation = None
 
 class Heuristic:
     def __init__(self):
@@ -108,7 +114,7 @@ class StatisticsHeuristic(Heuristic):
             for i, ai in enumerate(robustness_result.counter_example_orig_actions.actions):
                 compiled_action_instance = robustness_result.counter_example.actions[i]
                 parts = compiled_action_instance.action.name.split("_")
-                agent_name = parts[1]                                                    
+                agent_name = ai.agent.name
                 if parts[0][0] in ["w","f"]:
                     before_fail = False
 
@@ -140,7 +146,7 @@ class EarlyPOHeuristic(Heuristic):
             for i, ai in enumerate(robustness_result.counter_example_orig_actions.actions):
                 compiled_action_instance = robustness_result.counter_example.actions[i]
                 parts = compiled_action_instance.action.name.split("_")
-                agent_name = parts[1]                                                    
+                agent_name = ai.agent.name
                 args_as_str = tuple(map(str, ai.actual_parameters))
                 if parts[0][0] in ["w","f"]:
                     break
@@ -217,14 +223,119 @@ class POQueue:
             for pref_index in prefs:
                 queue_index = queue_index + (2 ** pref_index)
             self.queues[queue_index].put(node)
-            
+
+class SocialLawSubsumptionIndex:
+    """ This class indexes a set of social laws, and finds if a social law is stricter than (or equal to) one of them,
+    as defined by SocialLaw.is_stricter_than. 
+    The social laws are grouped by their new fluent initial values, which must be equal, and each group is a set-trie
+    over the added waitfors, disallowed actions and added preconditions, sorted by their index;
+    the search for a subset only visits the branches whose elements are in the given social law."""
+
+    def __init__(self):
+        self._items : Dict[Tuple[str, Any], int] = {}
+        self._tries : Dict[frozenset, Dict[Any, Any]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _item_ids(self, social_law : SocialLaw, add_missing : bool) -> List[int]:
+        ids = []
+        for kind, elements in (("w", social_law.added_waitfors), ("d", social_law.disallowed_actions), ("p", social_law.added_preconditions)):
+            for e in elements:
+                item_id = self._items.get((kind, e), None)
+                if item_id is None:
+                    if not add_missing:
+                        # No indexed social law has this element, so it can not be part of a subset
+                        continue
+                    item_id = len(self._items)
+                    self._items[(kind, e)] = item_id
+                ids.append(item_id)
+        ids.sort()
+        return ids
+
+    def add(self, social_law : SocialLaw):
+        ids = self._item_ids(social_law, True)
+        node = self._tries.setdefault(frozenset(social_law.new_fluent_initial_val), {})
+        for item_id in ids:
+            node = node.setdefault(item_id, {})
+        if None not in node:
+            node[None] = social_law
+            self._size = self._size + 1
+
+    def find_subsumed(self, social_law : SocialLaw) -> Optional[SocialLaw]:
+        """Returns an indexed social law such that the given one is stricter than it, or None if there is none."""
+        root = self._tries.get(frozenset(social_law.new_fluent_initial_val), None)
+        if root is None:
+            return None
+        ids = self._item_ids(social_law, False)
+        stack = [(root, 0)]
+        while len(stack) > 0:
+            node, start = stack.pop()
+            if None in node:
+                return node[None]
+            for i in range(start, len(ids)):
+                child = node.get(ids[i], None)
+                if child is not None:
+                    stack.append((child, i + 1))
+        return None
+
+class SocialLawRobustnessWorker(engines.engine.Engine):
+    """ Checks the robustness of the social laws of the parallel search in a worker process. The initial problem is
+    given once, when the worker is started, and every call only receives a social law, that is compiled from the
+    compilation of the last social law checked by the worker; the robustness checker is kept across the calls, so
+    its caches are too."""
+    def __init__(self, problem : MultiAgentProblemWithWaitfor, planner_name : Optional[str] = None):
+        engines.engine.Engine.__init__(self)
+        self._problem = problem
+        self._checker = SocialLawRobustnessChecker(planner_name=planner_name)
+        self._last : Optional[Tuple[SocialLaw, CompilerResult]] = None
+
+    @property
+    def name(self) -> str:
+        return f"SocialLawRobustnessWorker[{self._checker.name}]"
+
+    @staticmethod
+    def supported_kind() -> "ProblemKind":
+        return SocialLawRobustnessChecker.supported_kind()
+
+    @staticmethod
+    def supports(problem_kind):
+        return SocialLawRobustnessChecker.supports(problem_kind)
+
+    def is_robust(self, social_law : SocialLaw) -> SocialLawRobustnessResult:
+        if self._last is not None:
+            compilation = social_law.compile_incremental(self._problem, *self._last)
+        else:
+            compilation = social_law.compile(self._problem)
+        self._last = (social_law, compilation)
+        problem = compilation.problem
+        assert isinstance(problem, MultiAgentProblemWithWaitfor)
+        return self._checker.is_robust(problem)
+
+    def destroy(self):
+        self._checker.destroy()
+
+
 class SocialLawGenerator:
     """ This class takes in a multi agent problem (possibly with social laws), and searches for a social law which will turn it robust."""
     def __init__(self, 
                     search : SocialLawGeneratorSearch = SocialLawGeneratorSearch.BFS, 
                     heuristic : Optional[Heuristic] = None,
-                    preferred_operator_heuristics : List[Heuristic] = []):
+                    preferred_operator_heuristics : List[Heuristic] = [],
+                    max_workers : int = 1,
+                    counterexample_guided : bool = False,
+                    batch_size : int = 2,
+                    planner_name : Optional[str] = None):
         self.search = search
+        # The planner used by the robustness checker (None to let the factory choose)
+        self.planner_name = planner_name
+        # In the counterexample guided mode, the successors are ranked edits found by analyzing the counterexample, 
+        # and the first batch_size edits are also tried together in a single successor
+        self.counterexample_guided = counterexample_guided
+        self.batch_size = batch_size
+        # When more than one worker is given, up to max_workers search nodes are evaluated concurrently
+        self.max_workers = max_workers
         self.heuristic = heuristic
         self.po = preferred_operator_heuristics
         self.all_heuristics = set(preferred_operator_heuristics)
@@ -235,10 +346,13 @@ class SocialLawGenerator:
     def init_counters(self):
         self.generated = 0
         self.expanded = 0
+        # Number of the nodes pruned for being stricter than a social law with an unsolvable single agent projection
+        self.pruned = 0
 
     def generate_successors(self, current_sl : SocialLaw, action_index_in_plan : int, original_action_instance : ActionInstance, compiled_action_instance : ActionInstance):
-        parts = compiled_action_instance.action.name.split("_")
-        agent_name = parts[1]
+        # The robustness verifiers map every copy back to an action instance of its agent
+        assert original_action_instance.agent is not None
+        agent_name = original_action_instance.agent.name
         action_name = original_action_instance.action.name
 
         # Generate a successor which disallows this action
@@ -249,9 +363,176 @@ class SocialLawGenerator:
 
         return [succ_sl]
 
+    def _counterexample_steps(self, problem : MultiAgentProblemWithWaitfor, counter_example : SequentialPlan, counter_example_orig_actions : SequentialPlan) -> List[Tuple[str, Agent, InstantaneousAction, Tuple[FNode, ...]]]:
+        """Returns the steps of the counterexample that are copies of an agent action, as (prefix of the copy, agent, action, parameters).
+        The counterexample in terms of the original actions, mapped back by the robustness verifier, has an action instance (with
+        its agent) for every copy, in the same order, while the other actions of the counterexample are removed."""
+        steps : List[Tuple[str, Agent, InstantaneousAction, Tuple[FNode, ...]]] = []
+        orig_actions = iter(counter_example_orig_actions.actions)
+        orig = next(orig_actions, None)
+        for ai in counter_example.actions:
+            if orig is None:
+                break
+            assert orig.agent is not None
+            # The copies are named prefix_agent_action
+            suffix = "_" + orig.agent.name + "_" + orig.action.name
+            if not ai.action.name.endswith(suffix) or ai.actual_parameters != orig.actual_parameters:
+                continue
+            agent = problem.agent(orig.agent.name)
+            action = agent.action(orig.action.name)
+            assert isinstance(action, InstantaneousAction)
+            steps.append((ai.action.name[:-len(suffix)], agent, action, self._problem_parameters(problem, orig.actual_parameters)))
+            orig = next(orig_actions, None)
+        return steps
+
+    @staticmethod
+    def _problem_parameters(problem : MultiAgentProblemWithWaitfor, parameters : Tuple[FNode, ...]) -> Tuple[FNode, ...]:
+        """Returns the given parameters in the environment of the given problem; the counterexamples found by the
+        workers of the parallel search are in the environment of the worker."""
+        em = problem.env.expression_manager
+        res = []
+        for p in parameters:
+            if p.environment is not problem.env:
+                p = em.ObjectExp(problem.object(p.object().name)) if p.is_object_exp() else em.auto_promote(p.constant_value())[0]
+            res.append(p)
+        return tuple(res)
+
+    def _ground(self, substituter : Substituter, expression : FNode, action : Action, parameters : Tuple[FNode, ...]) -> FNode:
+        em = substituter.env.expression_manager
+        return substituter.substitute(expression, {em.ParameterExp(p): v for p, v in zip(action.parameters, parameters)})
+
+    def find_counterexample_edits(self, problem : MultiAgentProblemWithWaitfor, counter_example : SequentialPlan, counter_example_orig_actions : SequentialPlan) -> List[Tuple]:
+        """Analyzes the given counterexample of the robustness of the given problem, and returns the candidate edits of the social law, best first.
+        An edit is ("disallow", agent name, action name, arguments) or ("waitfor", agent name, action name, fluent name, arguments).
+        The first edits disallow the actions of the other agents that deleted the violated (or waited for) precondition, the latest first, 
+        then the violated precondition is annotated as waitfor, and the last edits disallow the other executed actions, the latest first."""
+        steps = self._counterexample_steps(problem, counter_example, counter_example_orig_actions)
+        substituter = Substituter(problem.env)
+        culprits : List[Tuple] = []
+        waitfors : List[Tuple] = []
+        executed : List[Tuple] = []
+        for index, (prefix, agent, action, parameters) in enumerate(steps):
+            if prefix == "s":
+                executed.append(("disallow", agent.name, action.name, tuple(map(str, parameters))))
+                continue
+            if prefix[0] not in "fw" or not prefix[1:].isdigit():
+                continue
+            # The copy of the action where the i-th precondition is violated (f) or waited for (w)
+            fail = prefix[0] == "f"
+            preconditions = RobustnessVerifier.get_action_preconditions(problem, agent, action, fail, not fail)
+            fact = preconditions[int(prefix[1:])]
+            if fail and fact.is_fluent_exp() and all(a.is_parameter_exp() or a.is_object_exp() for a in fact.args):
+                args = tuple(a.parameter().name if a.is_parameter_exp() else a.object().name for a in fact.args)
+                waitfors.append(("waitfor", agent.name, action.name, fact.fluent().name, args))
+            if fact.is_fluent_exp() and fact.fluent() in problem.ma_environment.fluents:
+                grounded_fact = self._ground(substituter, fact, action, parameters)
+                for other_prefix, other_agent, other_action, other_parameters in reversed(steps[:index]):
+                    if other_prefix != "s" or other_agent.name == agent.name:
+                        continue
+                    for effect in other_action.effects:
+                        if effect.value.is_false() and self._ground(substituter, effect.fluent, other_action, other_parameters) == grounded_fact:
+                            culprits.append(("disallow", other_agent.name, other_action.name, tuple(map(str, other_parameters))))
+                            break
+            # The steps after the first failure or wait are not part of the counterexample
+            break
+        edits = []
+        for edit in chain(culprits, waitfors, reversed(executed)):
+            if edit not in edits:
+                edits.append(edit)
+        return edits
+
+    def _apply_edit(self, social_law : SocialLaw, edit : Tuple):
+        if edit[0] == "disallow":
+            social_law.disallow_action(edit[1], edit[2], edit[3])
+        else:
+            social_law.add_waitfor_annotation(edit[1], edit[2], edit[3], edit[4])
+
+    def generate_counterexample_successors(self, current_sl : SocialLaw, problem : MultiAgentProblemWithWaitfor, counter_example : SequentialPlan, counter_example_orig_actions : SequentialPlan) -> List[SocialLaw]:
+        """Returns the successors of the given social law for the given counterexample, best first: the first successor 
+        applies the best batch_size edits together, so they are tested with a single robustness check, then each edit is applied alone."""
+        edits = self.find_counterexample_edits(problem, counter_example, counter_example_orig_actions)
+        successors = []
+        if self.batch_size > 1 and len(edits) > 1:
+            batch_sl = current_sl.clone()
+            for edit in edits[:self.batch_size]:
+                self._apply_edit(batch_sl, edit)
+            successors.append(batch_sl)
+        for edit in edits:
+            succ_sl = current_sl.clone()
+            self._apply_edit(succ_sl, edit)
+            successors.append(succ_sl)
+        return successors
+
+
+    def _skip_node(self, current_sl : SocialLaw, closed : Set[SocialLaw], infeasible_sap : SocialLawSubsumptionIndex) -> bool:
+        if current_sl in closed:
+            return True
+        closed.add(current_sl)
+        
+        # Check that this isn't stricter than a social law for while the single agent projection is not solvable
+        if infeasible_sap.find_subsumed(current_sl) is not None:
+            self.pruned = self.pruned + 1
+            return True
+        self.expanded = self.expanded + 1
+        return False
+
+    def _compile_node(self, node : SearchNode, initial_problem : MultiAgentProblemWithWaitfor) -> MultiAgentProblemWithWaitfor:
+        """Compiles the initial problem with the social law of the given node; the compilation of the parent
+        node is reused, so only the changes made by the successor are applied."""
+        parent = node.parent
+        if parent is not None and parent.compilation is not None:
+            node.compilation = node.social_law.compile_incremental(initial_problem, parent.social_law, parent.compilation)
+        else:
+            node.compilation = node.social_law.compile(initial_problem)
+        node.parent = None
+        problem = node.compilation.problem
+        assert isinstance(problem, MultiAgentProblemWithWaitfor)
+        return problem
+
+    def _report_result(self, current_node : SearchNode, robustness_result : SocialLawRobustnessResult, open : POQueue, infeasible_sap : SocialLawSubsumptionIndex) -> bool:
+        """Updates the search with the robustness result of the given node, and returns True iff the node is a solution."""
+        current_sl = current_node.social_law
+        for h in self.all_heuristics:
+            h.report_current_node(current_node, robustness_result)
+
+        if robustness_result.status == SocialLawRobustnessStatus.ROBUST_RATIONAL:
+            # We found a robust social law - return
+            return True
+        elif robustness_result.status == SocialLawRobustnessStatus.NON_ROBUST_SINGLE_AGENT:
+            # We made one of the single agent problems unsolvable - this is a dead end (for this simple search)
+            infeasible_sap.add(current_sl)
+        elif robustness_result.status == SocialLawRobustnessStatus.UNKNOWN:
+            # The robustness of the node could not be decided, so it is neither a dead end nor expanded
+            pass
+        else:
+            # The robustness checker gives a counterexample, and its original actions, for every non robust social law
+            counter_example = robustness_result.counter_example
+            counter_example_orig_actions = robustness_result.counter_example_orig_actions
+            assert isinstance(counter_example, SequentialPlan) and isinstance(counter_example_orig_actions, SequentialPlan)
+            if self.counterexample_guided and current_node.compilation is not None:
+                problem = current_node.compilation.problem
+                assert isinstance(problem, MultiAgentProblemWithWaitfor)
+                for succ_sl in self.generate_counterexample_successors(current_sl, problem, counter_example, counter_example_orig_actions):
+                    self._add_successor(current_node, succ_sl, open)
+            else:
+                # We have a counter example, generate a successor for removing each of the actions that appears there                    
+                for i, ai in enumerate(counter_example_orig_actions.actions):
+                    compiled_action_instance = counter_example.actions[i]
+                    for succ_sl in self.generate_successors(current_sl, i, ai, compiled_action_instance):
+                        self._add_successor(current_node, succ_sl, open)
+        return False
+
+    def _add_successor(self, current_node : SearchNode, succ_sl : SocialLaw, open : POQueue):
+        succ_node = SearchNode(succ_sl, parent=current_node)
+        
+        pref = list(map(lambda poh: poh.get_priority(succ_node), self.po))
+        
+        if self.heuristic is not None:
+            succ_node.priority = self.heuristic.get_priority(succ_node)
+        open.put(succ_node, pref)
+        self.generated = self.generated + 1
 
     def generate_social_law(self, initial_problem : MultiAgentProblemWithWaitfor):
-        robustness_checker = SocialLawRobustnessChecker()        
         self.init_counters()
 
         for h in self.all_heuristics:
@@ -259,51 +540,70 @@ class SocialLawGenerator:
 
         open = POQueue(len(self.po), self.search)
         closed : Set[SocialLaw] = set()
-        infeasible_sap : Set[SocialLaw] = set()
+        infeasible_sap = SocialLawSubsumptionIndex()
 
         empty_social_law = SocialLaw()
         open.put( SearchNode(empty_social_law), [1] * len(self.po) )
         self.generated = self.generated + 1
 
+        if self.max_workers > 1:
+            return self._parallel_search(initial_problem, open, closed, infeasible_sap)
+
+        robustness_checker = SocialLawRobustnessChecker(planner_name=self.planner_name)
         while not open.empty():
             current_node = open.get()
             current_sl = current_node.social_law
-            if current_sl not in closed:
-                closed.add(current_sl)
-                self.expanded = self.expanded + 1
-                
-                # Check that this isn't stricter than a social law for while the single agent projection is not solvable
-                for infeasible_sl in infeasible_sap:
-                    if current_sl.is_stricter_than(infeasible_sl):
-                        continue
-
-                current_problem = current_sl.compile(initial_problem).problem
+            if not self._skip_node(current_sl, closed, infeasible_sap):
+                current_problem = self._compile_node(current_node, initial_problem)
                 robustness_result = robustness_checker.is_robust(current_problem)
-                for h in self.all_heuristics:
-                    h.report_current_node(current_node, robustness_result)
-
-                if robustness_result.status == SocialLawRobustnessStatus.ROBUST_RATIONAL:
-                    # We found a robust social law - return
+                if self._report_result(current_node, robustness_result, open, infeasible_sap):
                     return current_node.social_law
-                elif robustness_result.status == SocialLawRobustnessStatus.NON_ROBUST_SINGLE_AGENT:
-                    # We made one of the single agent problems unsolvable - this is a dead end (for this simple search)
-                    infeasible_sap.add(current_sl)                    
-                else:
-                    # We have a counter example, generate a successor for removing each of the actions that appears there                    
-                    for i, ai in enumerate(robustness_result.counter_example_orig_actions.actions):
-                        compiled_action_instance = robustness_result.counter_example.actions[i]
-                        for succ_sl in self.generate_successors(current_sl, i, ai, compiled_action_instance):
-                            succ_node = SearchNode(succ_sl)
-                            
-                            pref = list(map(lambda poh: poh.get_priority(succ_node), self.po))
-                            
-                            if self.heuristic is not None:
-                                succ_node.priority = self.heuristic.get_priority(succ_node)
-                            open.put(succ_node, pref)
-                            self.generated = self.generated + 1
-
-                        
-
 
-
-    
+    def _parallel_search(self, initial_problem : MultiAgentProblemWithWaitfor, open : POQueue, closed : Set[SocialLaw], infeasible_sap : SocialLawSubsumptionIndex):
+        """Evaluates up to max_workers open nodes at the same time, each one with a robustness checker
+        running in its own process; the results are reported to the search as soon as they are
+        available, so the order in which the nodes are expanded depends on the planners run time.
+        The workers get the initial problem when they are started, so only the social laws are sent."""
+        pool = WorkerPool(initial_problem.env.factory)
+        num_workers = self.max_workers
+        options = {"problem": initial_problem, "planner_name": self.planner_name}
+        pool.start([(SocialLawRobustnessWorker, options)] * num_workers)
+        free_workers = list(range(num_workers))
+        pending : Dict[int, int] = {} # call id -> worker index
+        evaluated : Dict[int, SearchNode] = {}
+        try:
+            while not open.empty() or len(pending) > 0:
+                while not open.empty() and len(free_workers) > 0:
+                    current_node = open.get()
+                    current_sl = current_node.social_law
+                    if not self._skip_node(current_sl, closed, infeasible_sap):
+                        if self.counterexample_guided:
+                            # The compilation is needed to analyze the counterexample
+                            self._compile_node(current_node, initial_problem)
+                        idx = free_workers.pop()
+                        call_id = pool.submit(idx, "is_robust", False, True, serialize_arguments((current_sl,)))
+                        pending[call_id] = idx
+                        evaluated[call_id] = current_node
+                if len(pending) == 0:
+                    continue
+                res_item = pool.get(pending)
+                if res_item is None:
+                    continue
+                call_id, robustness_result = res_item
+                free_workers.append(pending.pop(call_id))
+                current_node = evaluated.pop(call_id)
+                if isinstance(robustness_result, BaseException):
+                    pool.cancel(pending)
+                    pending.clear()
+                    raise robustness_result
+                if robustness_result is None:
+                    continue # The worker died, so the node is not evaluated
+                if self._report_result(current_node, robustness_result, open, infeasible_sap):
+                    # Stop the evaluation of the other nodes
+                    pool.cancel(pending)
+                    pending.clear()
+                    return current_node.social_law
+        finally:
+            if len(pending) > 0:
+                pool.cancel(pending)
+            pool.shutdown()
@@ -26,9 +26,9 @@ class WaitforSpecification:
         self.waitfor_map = {}
 
     def annotate_as_waitfor(self, agent_name: str, action_name : str, precondition : FNode):
-        if not (agent_name, action_name) in self.waitfor_map:
-            self.waitfor_map[(agent_name, action_name)] = []    
-        self.waitfor_map[(agent_name, action_name)].append(precondition)
+        # The lists are shared with the clones, so they are replaced instead of extended
+        preconditions = self.waitfor_map.get((agent_name, action_name), [])
+        self.waitfor_map[(agent_name, action_name)] = preconditions + [precondition]
 
     def get_preconditions_wait(self,  agent_name: str, action_name : str) -> List[FNode]:
         if (agent_name, action_name) in self.waitfor_map:
@@ -51,9 +51,9 @@ class WaitforSpecification:
         return hash(self.waitfor_map)
 
     def clone(self):
+        # The preconditions lists are never modified in place, so they are shared (copy-on-write)
         new_w = WaitforSpecification()
-        for agent_name, action_name in self.waitfor_map:
-            new_w.waitfor_map[(agent_name, action_name)] = self.waitfor_map[(agent_name, action_name)][:]
+        new_w.waitfor_map = self.waitfor_map.copy()
         return new_w
 
 
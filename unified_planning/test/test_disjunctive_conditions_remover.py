@@ -29,6 +29,7 @@ from unified_planning.test import (
 )
 from unified_planning.test.examples import get_example_problems
 from unified_planning.engines import CompilationKind
+from unified_planning.plans import ActionInstance, SequentialPlan
 from unified_planning.engines.compilers import (
     DisjunctiveConditionsRemover,
     QuantifiersRemover,
@@ -156,6 +157,66 @@ class TestDisjunctiveConditionsRemover(TestCase):
 
         self.assertEqual(len(dnf_problem.actions), 1)
 
+    def test_max_clauses(self):
+        # mockup problem
+        fluents = [Fluent(name) for name in "abcdef"]
+        a, b, c, d, e, f = [FluentExp(fl) for fl in fluents]
+        g = Fluent("g")
+        act = InstantaneousAction("act")
+        # The DNF has 8 clauses
+        act.add_precondition(And(Or(a, b), Or(c, d), Or(e, f)))
+        act.add_effect(g, True)
+        problem = Problem("mockup")
+        for fl in fluents + [g]:
+            problem.add_fluent(fl, default_initial_value=False)
+        problem.add_action(act)
+        problem.set_initial_value(b, True)
+        problem.set_initial_value(c, True)
+        problem.set_initial_value(f, True)
+        problem.add_goal(g)
+
+        dnfr = DisjunctiveConditionsRemover()
+        res = dnfr.compile(problem, CompilationKind.DISJUNCTIVE_CONDITIONS_REMOVING)
+        self.assertEqual(len(res.problem.actions), 8)
+
+        dnfr = DisjunctiveConditionsRemover(max_clauses=4)
+        res = dnfr.compile(problem, CompilationKind.DISJUNCTIVE_CONDITIONS_REMOVING)
+        dnf_problem = res.problem
+        self.assertFalse(dnf_problem.kind.has_disjunctive_conditions())
+        # A start action, an auxiliary action for every literal and the act action
+        self.assertEqual(len(dnf_problem.actions), 8)
+        start = dnf_problem.action("dcrm_act_start")
+        new_act = dnf_problem.action("act")
+        aux = {}
+        for na in dnf_problem.actions:
+            if na not in (start, new_act):
+                self.assertIsNone(res.map_back_action_instance(ActionInstance(na)))
+                aux[na.preconditions[-1]] = na
+        self.assertEqual(set(aux), {a, b, c, d, e, f})
+
+        plan = SequentialPlan(
+            [ActionInstance(start)]
+            + [ActionInstance(aux[x]) for x in (b, c, f)]
+            + [ActionInstance(new_act)]
+        )
+        valid = up.engines.results.ValidationResultStatus.VALID
+        with PlanValidator(name="sequential_plan_validator") as validator:
+            self.assertEqual(validator.validate(dnf_problem, plan).status, valid)
+            act_plan = SequentialPlan([ActionInstance(new_act)])
+            self.assertNotEqual(validator.validate(dnf_problem, act_plan).status, valid)
+            # The auxiliary fluent of (e or f) can not be set with e
+            wrong_plan = SequentialPlan(
+                [ActionInstance(start)]
+                + [ActionInstance(aux[x]) for x in (b, c, e)]
+                + [ActionInstance(new_act)]
+            )
+            self.assertNotEqual(
+                validator.validate(dnf_problem, wrong_plan).status, valid
+            )
+            original_plan = plan.replace_action_instances(res.map_back_action_instance)
+            self.assertEqual([ai.action for ai in original_plan.actions], [act])
+            self.assertEqual(validator.validate(problem, original_plan).status, valid)
+
     @skipIfNoOneshotPlannerForProblemKind(basic_classical_kind)
     def test_ad_hoc_3(self):
         # mockup problem
@@ -18,6 +18,7 @@ from unified_planning.shortcuts import *
 from unified_planning.test import TestCase, main
 from unified_planning.environment import get_env
 from unified_planning.model.walkers import Dnf, Nnf, Substituter
+from unified_planning.exceptions import UPNormalFormSizeError
 
 
 class TestDnf(TestCase):
@@ -71,8 +72,9 @@ class TestDnf(TestCase):
             "(((not a) or b) and ((not a) or c)) or ((a and (not b)) and (a and (not c)))",
             str(nnf3),
         )
+        # ((not a) and c) and (b and (not a)) are implied by (not a), so they are removed
         self.assertIn(
-            "(not a) or ((not a) and c) or (b and (not a)) or (b and c) or (a and (not b) and (not c)",
+            "((not a) or (b and c) or (a and (not b) and (not c)))",
             str(dnf3),
         )
 
@@ -162,3 +164,47 @@ class TestDnf(TestCase):
         subs = {a: True, b: True, c: True, d: True}
         self.assertEqual(self._subs_simp(e5, subs), self._subs_simp(nnf5, subs))
         self.assertEqual(self._subs_simp(e5, subs), self._subs_simp(dnf5, subs))
+
+    def test_dnf_true_conjunction(self):
+        dnf = Dnf(get_env())
+
+        a = FluentExp(Fluent("a"))
+        # a || (!a && true) || true
+        e6 = Or(a, And(Not(a), TRUE()), TRUE())
+        self.assertEqual(dnf.get_dnf_expression(e6), TRUE())
+        self.assertEqual(dnf.get_dnf_expression(And(TRUE(), TRUE())), TRUE())
+
+    def test_dnf_cache_and_size_limit(self):
+        env = unified_planning.environment.Environment()
+        em = env.expression_manager
+        cache = env.normal_form_cache
+        fluents = [em.FluentExp(Fluent(f"f{i}", env=env)) for i in range(12)]
+        # (f0 || f1) && (f2 || f3) && ... has 2^6 clauses
+        e = em.And(em.Or(fluents[i], fluents[i + 1]) for i in range(0, 12, 2))
+        dnf = Dnf(env, max_clauses=32)
+        with self.assertRaises(UPNormalFormSizeError):
+            dnf.get_dnf_expression(e)
+        self.assertEqual(cache.statistics["size_limit_exceeded"], 1)
+
+        big_dnf = Dnf(env, max_clauses=64)
+        res = big_dnf.get_dnf_expression(e)
+        self.assertTrue(res.is_or())
+        self.assertEqual(len(res.args), 64)
+        # The result is shared by the other Dnf, that still respects its limit
+        misses = cache.statistics["dnf_misses"]
+        self.assertEqual(Dnf(env).get_dnf_expression(e), res)
+        self.assertEqual(cache.statistics["dnf_misses"], misses)
+        with self.assertRaises(UPNormalFormSizeError):
+            dnf.get_dnf_expression(e)
+
+        # (f0 || (f0 && f1)) && (f0 || f0) is simplified to f0 while it is expanded
+        f0, f1 = fluents[0], fluents[1]
+        self.assertEqual(
+            dnf.get_dnf_expression(em.And(em.Or(f0, em.And(f0, f1)), em.Or(f0, f0))),
+            f0,
+        )
+        self.assertGreater(cache.statistics["subsumed_clauses"], 0)
+
+        env.expression_manager.collect()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.statistics["dnf_misses"], 0)
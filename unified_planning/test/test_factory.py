@@ -14,9 +14,11 @@
 
 import os
 import inspect
+import pickle
 import tempfile
 import unified_planning
 from unified_planning.shortcuts import *
+from unified_planning.engines.compilers import Grounder
 from unified_planning.test import TestCase, skipIfEngineNotAvailable
 
 
@@ -34,3 +36,28 @@ class TestFactory(TestCase):
             env.factory.configure_from_file(config_filename)
             self.assertTrue("pyperplan" not in env.factory.preference_list)
             self.assertEqual(env.factory.preference_list, ["tamer"])
+
+    def test_lazy_engines(self):
+        env = unified_planning.environment.Environment()
+        factory = env.factory
+        # No engine is imported until it is used
+        self.assertEqual(len(factory._engines), 0)
+        self.assertIs(factory.engine("up_grounder"), Grounder)
+        self.assertEqual(list(factory._engines.keys()), ["up_grounder"])
+        with env.factory.Compiler(
+            compilation_kind=CompilationKind.GROUNDING, name="up_grounder"
+        ) as grounder:
+            self.assertIsInstance(grounder, Grounder)
+        # The meta engines combinations are created on demand, only for compatible engines
+        self.assertNotIn("oversubscription[up_grounder]", factory.engines)
+        self.assertNotIn("oversubscription[up_grounder]", factory.preference_list)
+        with self.assertRaises(KeyError):
+            factory.engine("oversubscription[up_grounder]")
+        with self.assertRaises(ImportError):
+            factory.add_engine("missing", "unified_planning.missing_module", "Engine")
+        self.assertNotIn("missing", factory.engines)
+        # The loaded classes are not pickled, they are loaded again when used
+        copy = pickle.loads(pickle.dumps(factory))
+        self.assertEqual(len(copy._engines), 0)
+        self.assertIs(copy.engine("up_grounder"), Grounder)
+        self.assertEqual(copy.preference_list, factory.preference_list)
@@ -30,7 +30,10 @@ from unified_planning.test import (
 )
 from unified_planning.test.examples import get_example_problems
 from unified_planning.engines import CompilationKind
-from unified_planning.engines.compilers import Grounder
+from unified_planning.engines.compilers import Grounder, ReachabilityGrounder
+from unified_planning.engines.compilers.grounder import GrounderHelper
+from unified_planning.model.types import domain_size, domain_item
+from itertools import product
 
 
 class TestGrounder(TestCase):
@@ -337,3 +340,156 @@ class TestGrounder(TestCase):
                     problem_kind=problem.kind, plan_kind=plan.kind
                 ) as pv:
                     self.assertTrue(pv.validate(problem, plan))
+
+    def test_parallel_grounding(self):
+        for example in self.problems.values():
+            problem = example.problem
+            if not Grounder.supports(problem.kind):
+                continue
+            res = Grounder().compile(problem, CompilationKind.GROUNDING)
+            parallel_res = Grounder(processes=2).compile(
+                problem, CompilationKind.GROUNDING
+            )
+            self.assertEqual(res.problem, parallel_res.problem)
+            for a, pa in zip(res.problem.actions, parallel_res.problem.actions):
+                self.assertEqual(a, pa)
+                ai = res.map_back_action_instance(
+                    unified_planning.plans.ActionInstance(a)
+                )
+                pai = parallel_res.map_back_action_instance(
+                    unified_planning.plans.ActionInstance(pa)
+                )
+                self.assertEqual(ai.action, pai.action)
+                self.assertEqual(ai.actual_parameters, pai.actual_parameters)
+
+    def test_reachability_grounder(self):
+        for example in self.problems.values():
+            problem, plan = example.problem, example.plan
+            if not ReachabilityGrounder.supports(problem.kind):
+                continue
+            res = Grounder().compile(problem, CompilationKind.GROUNDING)
+            reachability_res = ReachabilityGrounder().compile(
+                problem, CompilationKind.GROUNDING
+            )
+            # the reachable actions are a subsequence of the grounded actions
+            grounded_actions = iter(res.problem.actions)
+            for a in reachability_res.problem.actions:
+                self.assertIn(a, grounded_actions)
+            # every grounded action instance of the plan must be reachable
+            grounded, reachable = set(), set()
+            for compiler_res, instances in (
+                (res, grounded),
+                (reachability_res, reachable),
+            ):
+                for a in compiler_res.problem.actions:
+                    ai = compiler_res.map_back_action_instance(
+                        unified_planning.plans.ActionInstance(a)
+                    )
+                    instances.add((ai.action, ai.actual_parameters))
+            if isinstance(plan, unified_planning.plans.SequentialPlan):
+                for ai in plan.actions:
+                    if (ai.action, ai.actual_parameters) in grounded:
+                        self.assertIn((ai.action, ai.actual_parameters), reachable)
+
+    def test_reachability_grounder_prunes(self):
+        Location = UserType("Location")
+        at = Fluent("at", BoolType(), l=Location)
+        road = Fluent("road", BoolType(), l_from=Location, l_to=Location)
+        move = InstantaneousAction("move", l_from=Location, l_to=Location)
+        l_from, l_to = move.parameters
+        move.add_precondition(at(l_from))
+        move.add_precondition(road(l_from, l_to))
+        move.add_effect(at(l_from), False)
+        move.add_effect(at(l_to), True)
+        l1, l2, l3, l4 = (Object(f"l{i}", Location) for i in range(1, 5))
+        problem = Problem("roads")
+        problem.add_fluent(at, default_initial_value=False)
+        problem.add_fluent(road, default_initial_value=False)
+        problem.add_action(move)
+        problem.add_objects([l1, l2, l3, l4])
+        problem.set_initial_value(at(l1), True)
+        problem.set_initial_value(road(l1, l2), True)
+        problem.set_initial_value(road(l2, l1), True)
+        problem.set_initial_value(road(l3, l4), True)
+        problem.add_goal(at(l2))
+
+        with Compiler(
+            name="up_reachability_grounder",
+            compilation_kind=CompilationKind.GROUNDING,
+        ) as grounder:
+            res = grounder.compile(problem, CompilationKind.GROUNDING)
+        full_res = Grounder().compile(problem, CompilationKind.GROUNDING)
+        # road is static, so move(l3, l4) is the only action pruned only by the reachability
+        self.assertEqual(len(full_res.problem.actions), 3)
+        self.assertEqual(
+            [a.name for a in res.problem.actions], ["move_l1_l2", "move_l2_l1"]
+        )
+
+    def test_static_conditions_pruning(self):
+        for example in self.problems.values():
+            problem = example.problem
+            if not Grounder.supports(problem.kind):
+                continue
+            # the full product of the domains of the parameters of every action
+            full_map = {}
+            for a in problem.actions:
+                domains = [
+                    [
+                        domain_item(problem, p.type, i)
+                        for i in range(domain_size(problem, p.type))
+                    ]
+                    for p in a.parameters
+                ]
+                full_map[a] = list(product(*domains))
+            res = Grounder().compile(problem, CompilationKind.GROUNDING)
+            full_res = Grounder(grounding_actions_map=full_map).compile(
+                problem, CompilationKind.GROUNDING
+            )
+            self.assertEqual(res.problem, full_res.problem)
+            self.assertEqual(
+                [a.name for a in res.problem.actions],
+                [a.name for a in full_res.problem.actions],
+            )
+
+        Location = UserType("Location")
+        at = Fluent("at", BoolType(), l=Location)
+        road = Fluent("road", BoolType(), l_from=Location, l_to=Location)
+        blocked = Fluent("blocked", BoolType(), l=Location)
+        move = InstantaneousAction("move", l_from=Location, l_to=Location)
+        l_from, l_to = move.parameters
+        move.add_precondition(at(l_from))
+        move.add_precondition(road(l_to, l_from))
+        move.add_precondition(Not(blocked(l_to)))
+        move.add_precondition(Not(Equals(l_from, l_to)))
+        move.add_effect(at(l_from), False)
+        move.add_effect(at(l_to), True)
+        locations = [Object(f"l{i}", Location) for i in range(1, 6)]
+        l1, l2, l3, l4, l5 = locations
+        problem = Problem("roads")
+        problem.add_fluent(at, default_initial_value=False)
+        problem.add_fluent(road, default_initial_value=False)
+        problem.add_fluent(blocked, default_initial_value=False)
+        problem.add_action(move)
+        problem.add_objects(locations)
+        problem.set_initial_value(at(l1), True)
+        for x, y in [(l2, l1), (l1, l2), (l3, l1), (l1, l1), (l5, l4), (l4, l3)]:
+            problem.set_initial_value(road(x, y), True)
+        problem.set_initial_value(blocked(l5), True)
+        problem.add_goal(at(l3))
+
+        helper = GrounderHelper(problem)
+        # l_to is generated by the roads of l_from, the parameters are in the product order
+        self.assertEqual(
+            list(helper.get_possible_parameters(move)),
+            [
+                (ObjectExp(l1), ObjectExp(l2)),
+                (ObjectExp(l1), ObjectExp(l3)),
+                (ObjectExp(l2), ObjectExp(l1)),
+                (ObjectExp(l3), ObjectExp(l4)),
+            ],
+        )
+        res = Grounder().compile(problem, CompilationKind.GROUNDING)
+        self.assertEqual(
+            [a.name for a in res.problem.actions],
+            ["move_l1_l2", "move_l1_l3", "move_l2_l1", "move_l3_l4"],
+        )
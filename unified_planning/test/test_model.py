@@ -55,6 +55,29 @@ class TestModel(TestCase):
             "type of the object does not belong to the same environment of the object",
         )
 
+    def test_expression_collection(self):
+        env = up.environment.Environment()
+        em = env.expression_manager
+        x = Fluent("x", env.type_manager.IntType(), env=env)
+        x_exp = em.FluentExp(x)
+        size = len(em.expressions)
+        e = em.Plus(x_exp, 1)
+        self.assertIs(e, em.Plus(x_exp, 1))
+        e_id = e._node_id
+        self.assertEqual(len(em.expressions), size + 2)
+        usage = em.memory_usage()
+        self.assertEqual(usage[OperatorKind.PLUS][0], 1)
+        self.assertEqual(usage[OperatorKind.INT_CONSTANT][0], 1)
+        self.assertGreater(usage[OperatorKind.PLUS][1], 0)
+        env.simplifier.simplify(em.Plus(e, 2))
+        del e
+        self.assertGreater(len(em.expressions), size)
+        self.assertGreater(em.collect(), 0)
+        self.assertEqual(len(em.expressions), size)
+        self.assertNotIn(OperatorKind.PLUS, em.memory_usage())
+        # the ids of the released expressions are never reused
+        self.assertGreater(em.Plus(x_exp, 1)._node_id, e_id)
+
     def test_clone_problem_and_action(self):
         for _, (problem, _) in self.problems.items():
             problem_clone_1 = problem.clone()
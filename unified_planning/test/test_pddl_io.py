@@ -20,7 +20,13 @@ import unified_planning
 from unified_planning.shortcuts import *
 from unified_planning.test import TestCase, main, skipIfNoOneshotPlannerForProblemKind
 from unified_planning.test import skipIfNoOneshotPlannerSatisfiesOptimalityGuarantee
-from unified_planning.io import PDDLWriter, PDDLReader
+from unified_planning.io import PDDLWriter, PDDLReader, PDDLWriterCache
+from unified_planning.io.pddl_reader import (
+    PDDLGrammar,
+    ParseResults,
+    _read_problem,
+    _UnsupportedSyntax,
+)
 from unified_planning.test.examples import get_example_problems
 from unified_planning.model.problem_kind import full_numeric_kind
 from unified_planning.model.types import _UserType
@@ -396,6 +402,62 @@ class TestPddlIO(TestCase):
         self.assertEqual(2, len(problem.method("m-drive-to-via").subtasks))
         self.assertEqual(2, len(problem.task_network.subtasks))
 
+    def test_fast_problem_reader(self):
+        grammar = PDDLGrammar()
+        for domain in sorted(os.listdir(PDDL_DOMAINS_PATH)):
+            problem_filename = os.path.join(PDDL_DOMAINS_PATH, domain, "problem.pddl")
+            if not os.path.isfile(problem_filename):
+                continue
+            fast_res = _read_problem(problem_filename)
+            pyparsing_res = grammar.problem.parseFile(problem_filename)
+            for key in ["name", "objects", "init", "goal", "optimization", "metric"]:
+                expected = pyparsing_res.get(key, None)
+                if isinstance(expected, ParseResults):
+                    expected = expected.asList()
+                self.assertEqual(fast_res.get(key, None), expected)
+        # the htn section is left to the pyparsing grammar
+        with self.assertRaises(_UnsupportedSyntax):
+            _read_problem(
+                os.path.join(PDDL_DOMAINS_PATH, "htn-transport", "problem.hddl")
+            )
+
+    def test_writer_cache(self):
+        for example in self.problems.values():
+            problem = example.problem
+            kind = problem.kind
+            if (
+                kind.has_intermediate_conditions_and_effects()
+                or kind.has_object_fluents()
+                or kind.has_oversubscription()
+                or kind.has_timed_effect()
+                or kind.has_timed_goals()
+            ):
+                continue
+            cache = PDDLWriterCache()
+            w = PDDLWriter(problem, cache=cache)
+            self.assertEqual(w.get_domain(), PDDLWriter(problem).get_domain())
+            self.assertEqual(w.get_problem(), PDDLWriter(problem).get_problem())
+            domain = cache._domain
+            # only the goals order changes, so the domain and the init are reused
+            new_problem = problem.clone()
+            new_problem.clear_goals()
+            for g in reversed(problem.goals):
+                new_problem.add_goal(g)
+            init_section = cache._sections["init"][1]
+            new_w = PDDLWriter(new_problem, cache=cache)
+            self.assertIs(new_w.get_domain(), domain)
+            self.assertEqual(new_w.get_problem(), PDDLWriter(new_problem).get_problem())
+            self.assertIs(cache._sections["init"][1], init_section)
+            # a different domain is generated again
+            new_problem.name = f"{problem.name}_changed"
+            changed_w = PDDLWriter(new_problem, cache=cache)
+            self.assertEqual(
+                changed_w.get_domain(), PDDLWriter(new_problem).get_domain()
+            )
+            self.assertEqual(
+                changed_w.get_problem(), PDDLWriter(new_problem).get_problem()
+            )
+
     def test_examples_io(self):
         for example in self.problems.values():
             problem = example.problem
@@ -13,12 +13,61 @@
 # limitations under the License.
 
 
+import os
+import signal
 import unified_planning
+from multiprocessing import Process
 from unified_planning.shortcuts import *
-from unified_planning.test import TestCase, main
+from unified_planning.test import TestCase, main, skipIf
 from unified_planning.test.examples import get_example_problems
 from unified_planning.engines import SequentialPlanValidator, ValidationResultStatus
 from unified_planning.environment import get_env
+from unified_planning.engines.results import LogLevel, LogMessage
+
+
+class _InstanceValidator(SequentialPlanValidator):
+    """A validator that reports the engine instance and the number of calls it served."""
+
+    def __init__(self, **options):
+        SequentialPlanValidator.__init__(self, **options)
+        self._calls = 0
+
+    def _validate(self, problem, plan):
+        self._calls += 1
+        res = SequentialPlanValidator._validate(self, problem, plan)
+        res.log_messages = [LogMessage(LogLevel.INFO, f"{id(self)}:{self._calls}")]
+        return res
+
+
+class _DyingValidator(SequentialPlanValidator):
+    """A validator that kills its own process when it validates a problem named "dying"."""
+
+    def _validate(self, problem, plan):
+        if problem.name == "dying":
+            os.kill(os.getpid(), signal.SIGKILL)
+        return SequentialPlanValidator._validate(self, problem, plan)
+
+
+class _ForkingValidator(SequentialPlanValidator):
+    """A validator that validates the plan in a child process of its own."""
+
+    def _validate(self, problem, plan):
+        child = Process(
+            target=SequentialPlanValidator._validate, args=(self, problem, plan)
+        )
+        child.start()
+        child.join()
+        assert child.exitcode == 0
+        return SequentialPlanValidator._validate(self, problem, plan)
+
+
+class _UnpicklableValidator(SequentialPlanValidator):
+    """A validator whose results can not be pickled."""
+
+    def _validate(self, problem, plan):
+        res = SequentialPlanValidator._validate(self, problem, plan)
+        res.callback = lambda: None
+        return res
 
 
 class TestProblem(TestCase):
@@ -63,3 +112,69 @@ class TestProblem(TestCase):
                     self.assertEqual(
                         validation_result.status, ValidationResultStatus.VALID
                     )
+
+    def test_parallel_warm_workers(self):
+        names = ["sequential_plan_validator", "sequential_plan_validator"]
+        with PlanValidator(names=names) as pv:
+            pids = None
+            for name in ["basic", "robot", "robot_loader"]:
+                problem, plan = self.problems[name].problem, self.problems[name].plan
+                validation_result = pv.validate(problem, plan)
+                self.assertEqual(validation_result.status, ValidationResultStatus.VALID)
+                # The worker processes are started once and reused by every call
+                workers_pids = [w.process.pid for w in pv._pool._workers.values()]
+                if pids is None:
+                    pids = workers_pids
+                self.assertEqual(pids, workers_pids)
+            self.assertEqual(len(pids), 2)
+        self.assertIsNone(pv._pool)
+
+    def test_parallel_warm_engine(self):
+        env = unified_planning.environment.Environment()
+        env.factory.add_engine("instance_validator", __name__, "_InstanceValidator")
+        with env.factory.PlanValidator(names=["instance_validator"]) as pv:
+            reports = []
+            for name in ["basic", "robot", "robot_loader"]:
+                problem, plan = self.problems[name].problem, self.problems[name].plan
+                validation_result = pv.validate(problem, plan)
+                self.assertEqual(validation_result.status, ValidationResultStatus.VALID)
+                reports.append(validation_result.log_messages[0].message)
+        # The same engine instance of the worker serves every call
+        instances = [r.split(":")[0] for r in reports]
+        self.assertEqual(len(set(instances)), 1)
+        self.assertEqual([r.split(":")[1] for r in reports], ["1", "2", "3"])
+
+    @skipIf(not hasattr(signal, "SIGKILL"), "The workers can not be killed")
+    def test_parallel_dead_workers(self):
+        env = unified_planning.environment.Environment()
+        env.factory.add_engine("dying_validator", __name__, "_DyingValidator")
+        problem, plan = self.problems["basic"].problem, self.problems["basic"].plan
+        dying_problem = problem.clone()
+        dying_problem.name = "dying"
+        with env.factory.PlanValidator(names=["dying_validator"]) as pv:
+            # No result is given when every worker dies
+            with self.assertRaises(unified_planning.exceptions.UPException):
+                pv.validate(dying_problem, plan)
+            # The dead worker is replaced by the next call
+            validation_result = pv.validate(problem, plan)
+            self.assertEqual(validation_result.status, ValidationResultStatus.VALID)
+
+    def test_parallel_unpicklable_result(self):
+        env = unified_planning.environment.Environment()
+        env.factory.add_engine(
+            "unpicklable_validator", __name__, "_UnpicklableValidator"
+        )
+        problem, plan = self.problems["basic"].problem, self.problems["basic"].plan
+        with env.factory.PlanValidator(names=["unpicklable_validator"]) as pv:
+            # The result that can not be sent back is reported instead of being lost
+            with self.assertRaises(unified_planning.exceptions.UPException):
+                pv.validate(problem, plan)
+
+    def test_parallel_nested_processes(self):
+        env = unified_planning.environment.Environment()
+        env.factory.add_engine("forking_validator", __name__, "_ForkingValidator")
+        problem, plan = self.problems["basic"].problem, self.problems["basic"].plan
+        with env.factory.PlanValidator(names=["forking_validator"]) as pv:
+            # The engines of the workers can start processes of their own
+            validation_result = pv.validate(problem, plan)
+            self.assertEqual(validation_result.status, ValidationResultStatus.VALID)
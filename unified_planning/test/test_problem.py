@@ -17,6 +17,8 @@ import unified_planning as up
 from unified_planning.shortcuts import *
 from unified_planning.test import TestCase, main, examples
 from unified_planning.test.examples import get_example_problems
+from unified_planning.model.walkers import Simplifier, QuantifierSimplifier
+from unified_planning.exceptions import UPProblemDefinitionError
 
 
 class TestProblem(TestCase):
@@ -452,6 +454,51 @@ class TestProblem(TestCase):
                         Real(Fraction(-1)),
                     )
 
+    def test_static_facts(self):
+        Location = UserType("Location")
+        road = Fluent("road", BoolType(), l_from=Location, l_to=Location)
+        at = Fluent("at", BoolType(), l=Location)
+        move = InstantaneousAction("move", l_from=Location, l_to=Location)
+        l_from, l_to = move.parameters
+        move.add_precondition(And(at(l_from), road(l_from, l_to)))
+        move.add_effect(at(l_to), True)
+        l1, l2, l3 = (Object(f"l{i}", Location) for i in range(1, 4))
+        problem = Problem("roads")
+        problem.add_fluent(road, default_initial_value=False)
+        problem.add_fluent(at, default_initial_value=False)
+        problem.add_action(move)
+        problem.add_objects([l1, l2, l3])
+        problem.set_initial_value(road(l1, l2), True)
+        problem.set_initial_value(at(l1), True)
+
+        static_facts = problem.static_facts
+        self.assertIs(problem.static_facts, static_facts)
+        self.assertEqual(static_facts.value(road(l1, l2)), TRUE())
+        self.assertEqual(static_facts.value(road(l2, l1)), FALSE())
+        self.assertEqual(
+            static_facts.args_value(road, (ObjectExp(l1), ObjectExp(l2))), TRUE()
+        )
+        self.assertEqual(static_facts.true_args(road), {(ObjectExp(l1), ObjectExp(l2))})
+        self.assertEqual(Simplifier(get_env(), problem).simplify(road(l1, l2)), TRUE())
+
+        # the index is discarded when the initial values are modified
+        problem.set_initial_value(road(l2, l3), True)
+        self.assertIsNot(problem.static_facts, static_facts)
+        self.assertEqual(problem.static_facts.value(road(l2, l3)), TRUE())
+        self.assertEqual(Simplifier(get_env(), problem).simplify(road(l2, l3)), TRUE())
+        self.assertEqual(static_facts.value(road(l2, l3)), FALSE())
+
+        # the QuantifierSimplifier reads the static fluents missing in the assignments
+        qs = QuantifierSimplifier(get_env(), problem)
+        x = Variable("x", Location)
+        e = Exists(And(road(l2, x), Not(at(x))), x)
+        assignments = {at(l): FALSE() for l in (l1, l2, l3)}
+        self.assertEqual(qs.qsimplify(e, assignments, {}), TRUE())
+        assignments[at(l3)] = TRUE()
+        self.assertEqual(qs.qsimplify(e, assignments, {}), FALSE())
+        with self.assertRaises(UPProblemDefinitionError):
+            qs.qsimplify(at(l1), {}, {})
+
     def test_problem_defaults(self):
         Location = UserType("Location")
         robot_at = Fluent("robot_at", BoolType(), position=Location)
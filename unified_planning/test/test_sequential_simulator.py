@@ -16,7 +16,10 @@
 import unified_planning as up
 from unified_planning.shortcuts import *
 from unified_planning.engines import SequentialSimulator, SimulatorMixin
-from unified_planning.model import UPCOWState
+from unified_planning.exceptions import UPUsageError, UPValueError
+from unified_planning.model import UPCOWState, PackedState, StateLayout
+from unified_planning.model.walkers import StateEvaluator, CompiledStateEvaluator
+from unified_planning.engines.compilers import GrounderHelper
 from unified_planning.test import TestCase, main
 from unified_planning.test.examples import get_example_problems
 from itertools import product
@@ -28,6 +31,9 @@ class TestSimulator(TestCase):
         TestCase.setUp(self)
         self.problems = get_example_problems()
 
+    def initial_state(self, problem: "up.model.Problem") -> "up.model.COWState":
+        return UPCOWState(problem.initial_values)
+
     def simulate_on_hierarchical_blocks_world(
         self, simulator: SimulatorMixin, problem: "up.model.Problem"
     ):
@@ -43,7 +49,7 @@ class TestSimulator(TestCase):
         block_1 = problem.object("block_1")
         block_2 = problem.object("block_2")
         block_3 = problem.object("block_3")
-        state = UPCOWState(problem.initial_values)
+        state = self.initial_state(problem)
         # The initial state is:
         # ts_1, block_3, block_1, block_2
         # ts_2
@@ -151,3 +157,105 @@ class TestSimulator(TestCase):
         problem = self.problems["hierarchical_blocks_world"].problem
         with Simulator(problem) as simulator:
             self.simulate_on_hierarchical_blocks_world(simulator, problem)
+
+    def test_compiled_state_evaluator(self):
+        for example in self.problems.values():
+            problem = example.problem
+            if not SequentialSimulator.supports(problem.kind):
+                continue
+            se = StateEvaluator(problem)
+            cse = CompiledStateEvaluator(problem)
+            state = self.initial_state(problem)
+            grounder = GrounderHelper(problem)
+            for _, _, grounded_action in grounder.get_grounded_actions():
+                if grounded_action is None:
+                    continue
+                assert isinstance(grounded_action, up.model.InstantaneousAction)
+                expressions = list(grounded_action.preconditions)
+                for e in grounded_action.effects:
+                    expressions.extend((e.condition, e.value))
+                for exp in expressions:
+                    self.assertEqual(se.evaluate(exp, state), cse.evaluate(exp, state))
+            for g in problem.goals:
+                self.assertEqual(se.evaluate(g, state), cse.evaluate(g, state))
+
+    def test_incremental_applicable_events(self):
+        for name in ["hierarchical_blocks_world", "robot_loader_adv", "robot"]:
+            problem = self.problems[name].problem
+            simulator = SequentialSimulator(problem)
+            state = self.initial_state(problem)
+            applicable = set(simulator.get_applicable_events(state))
+            for _ in range(10):
+                if len(applicable) == 0:
+                    break
+                expected = list(simulator.get_applicable_events(state))
+                event = expected[len(expected) // 2]
+                new_state = simulator.apply_unsafe(event, state)
+                updated_fluents = [
+                    f
+                    for f in problem.initial_values
+                    if new_state.get_value(f) != state.get_value(f)
+                ]
+                added, removed = simulator.get_applicable_events_incremental(
+                    new_state, applicable, updated_fluents
+                )
+                self.assertTrue(all(e not in applicable for e in added))
+                self.assertTrue(all(e in applicable for e in removed))
+                applicable.difference_update(removed)
+                applicable.update(added)
+                self.assertEqual(
+                    applicable, set(simulator.get_applicable_events(new_state))
+                )
+                state = new_state
+
+
+class TestSimulatorPackedState(TestSimulator):
+    def initial_state(self, problem: "up.model.Problem") -> "up.model.COWState":
+        return StateLayout(problem).initial_state
+
+    def test_packed_state(self):
+        problem = self.problems["robot"].problem
+        em = problem.env.expression_manager
+        robot_at = problem.fluent("robot_at")
+        battery_charge = problem.fluent("battery_charge")
+        l1 = problem.object("l1")
+        l2 = problem.object("l2")
+        simulator = SequentialSimulator(problem)
+        state = simulator.get_initial_state()
+        self.assertTrue(isinstance(state, PackedState))
+        self.assertEqual(state.get_value(robot_at(l1)), em.TRUE())
+        self.assertEqual(state.get_value(battery_charge()), em.Int(100))
+        child = state.make_child(
+            {
+                robot_at(l1): em.FALSE(),
+                robot_at(l2): em.TRUE(),
+                battery_charge(): em.Int(90),
+            }
+        )
+        self.assertEqual(child.get_value(robot_at(l1)), em.FALSE())
+        self.assertEqual(child.get_value(robot_at(l2)), em.TRUE())
+        self.assertEqual(child.get_value(battery_charge()), em.Int(90))
+        # the parent state is not modified
+        self.assertEqual(state.get_value(robot_at(l1)), em.TRUE())
+        self.assertEqual(state.get_value(battery_charge()), em.Int(100))
+        # going back to the initial values gives an equal state
+        back = child.make_child(
+            {
+                robot_at(l1): em.TRUE(),
+                robot_at(l2): em.FALSE(),
+                battery_charge(): em.Int(100),
+            }
+        )
+        self.assertEqual(back, state)
+        self.assertEqual(hash(back), hash(state))
+        self.assertEqual(back.key, state.key)
+        self.assertNotEqual(child, state)
+        self.assertEqual(len({state, child, back}), 2)
+        self.assertEqual(
+            set(child.diff(state)), {robot_at(l1), robot_at(l2), battery_charge()}
+        )
+        self.assertEqual(back.diff(state), [])
+        with self.assertRaises(UPUsageError):
+            state.get_value(em.TRUE())
+        with self.assertRaises(UPValueError):
+            state.make_child({robot_at(l1): em.Int(1)})
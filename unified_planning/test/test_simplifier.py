@@ -16,7 +16,11 @@
 import unified_planning
 from unified_planning.shortcuts import *
 from unified_planning.test import TestCase, main
-from unified_planning.model.walkers import Simplifier, Substituter
+from unified_planning.model.walkers import (
+    Simplifier,
+    SimplificationCache,
+    Substituter,
+)
 from unified_planning.environment import get_env
 from fractions import Fraction
 
@@ -557,6 +561,74 @@ class TestArithmeticOperators(TestCase):
         self.assertEqual(r3, t)
         self.assertEqual(r3, e3.simplify())
 
+    def test_simplification_cache(self):
+        env = unified_planning.environment.Environment()
+        Location = env.type_manager.UserType("Location")
+        connected = Fluent(
+            "connected",
+            env.type_manager.BoolType(),
+            l_from=Location,
+            l_to=Location,
+            env=env,
+        )
+        at = Fluent("at", env.type_manager.BoolType(), l=Location, env=env)
+        l1, l2 = Object("l1", Location, env), Object("l2", Location, env)
+        problem = Problem("cache", env)
+        problem.add_fluent(connected, default_initial_value=False)
+        problem.add_fluent(at, default_initial_value=False)
+        problem.add_objects([l1, l2])
+        problem.set_initial_value(connected(l1, l2), True)
+        move = InstantaneousAction("move", _env=env, l_from=Location, l_to=Location)
+        l_from, l_to = move.parameters
+        move.add_precondition(at(l_from))
+        move.add_effect(at(l_to), True)
+        problem.add_action(move)
+
+        cache = env.simplification_cache
+        cache.clear()
+        e = env.expression_manager.And(at(l1), connected(l1, l2))
+        s1 = Simplifier(env, problem)
+        self.assertEqual(s1.simplify(e), at(l1))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        # a Simplifier on a problem with the same static context reuses the result
+        s2 = Simplifier(env, problem.clone())
+        self.assertEqual(s2.simplify(e), at(l1))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # a different static context does not share the results
+        problem.set_initial_value(connected(l1, l2), False)
+        s3 = Simplifier(env, problem)
+        self.assertEqual(s3.simplify(e), env.expression_manager.FALSE())
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        s4 = Simplifier(env)
+        self.assertEqual(s4.simplify(e), e)
+        self.assertEqual(len(cache), 3)
+
+        small_cache = SimplificationCache(max_size=2)
+        fingerprint = small_cache.fingerprint(None)
+        exps = [at(l1), at(l2), connected(l1, l2)]
+        for exp in exps:
+            small_cache.put(exp, fingerprint, exp)
+        self.assertEqual(len(small_cache), 2)
+        self.assertIsNone(small_cache.get(exps[0], fingerprint))
+        self.assertEqual(small_cache.get(exps[2], fingerprint), exps[2])
+        self.assertEqual((small_cache.hits, small_cache.misses), (1, 1))
+
+        # the static contexts are bounded too, and their fingerprints are not reused
+        small_cache = SimplificationCache(max_contexts=1)
+        first = small_cache.fingerprint(None)
+        small_cache.fingerprint(problem)
+        self.assertNotEqual(small_cache.fingerprint(None), first)
+        self.assertEqual(len(small_cache._fingerprints), 1)
+
+        # the fingerprints are released by the collection of the environment
+        self.assertGreater(len(cache._fingerprints), 0)
+        env.expression_manager.collect()
+        self.assertEqual(len(cache._fingerprints), 0)
+        s5 = Simplifier(env, problem)
+        self.assertNotIn(s5._fingerprint, (s1._fingerprint, s3._fingerprint))
+        self.assertEqual(s5.simplify(e), env.expression_manager.FALSE())
+        self.assertEqual(s1.simplify(e), at(l1))
+
 
 class TestWithSubstituter(TestCase):
     def setUp(self):
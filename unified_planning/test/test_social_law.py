@@ -15,20 +15,27 @@
 
 import unified_planning as up
 from unified_planning.shortcuts import *
-from unified_planning.test import TestCase, main
+from unified_planning.test import TestCase, main, skipIfEngineNotAvailable
 from unified_planning.test.examples.multi_agent import get_example_problems, get_intersection_problem
 from unified_planning.social_law.single_agent_projection import SingleAgentProjection
-from unified_planning.social_law.robustness_verification import RobustnessVerifier, SimpleInstantaneousActionRobustnessVerifier, WaitingActionRobustnessVerifier
-from unified_planning.social_law.robustness_checker import SocialLawRobustnessChecker, SocialLawRobustnessStatus
+from unified_planning.social_law.robustness_verification import RobustnessVerifier, SimpleInstantaneousActionRobustnessVerifier, WaitingActionRobustnessVerifier, DeleteDecompositionVerifier, create_grid_problem
+from unified_planning.social_law.robustness_checker import SocialLawRobustnessChecker, SocialLawRobustnessStatus, SingleAgentProjectionCache
 from unified_planning.social_law.social_law import SocialLaw
 from unified_planning.social_law.waitfor_specification import WaitforSpecification
 from unified_planning.social_law.ma_problem_waitfor import MultiAgentProblemWithWaitfor
 from unified_planning.model.multi_agent.ma_centralizer import MultiAgentProblemCentralizer
-from unified_planning.social_law.synthesis import SocialLawGenerator, SocialLawGeneratorSearch, get_gbfs_social_law_generator
+from unified_planning.social_law.plan_interleaving import JointPlanExecutor, InterleavingStatus
+from unified_planning.social_law.synthesis import SocialLawGenerator, SocialLawGeneratorSearch, get_gbfs_social_law_generator, StatisticsHeuristic, EarlyPOHeuristic, PublicActionsPOHeuristic, SocialLawSubsumptionIndex
 from unified_planning.model.multi_agent import *
 from unified_planning.io import PDDLWriter
+from unified_planning.plans import SequentialPlan, ActionInstance
 from unified_planning.engines import PlanGenerationResultStatus
-from collections import namedtuple
+from unified_planning.engines import Engine, CompilationKind, PlanGenerationResult
+from unified_planning.engines.compilers import ReachabilityGrounder
+from unified_planning.engines.mixins import OneshotPlannerMixin
+from unified_planning.engines.sequential_simulator import SequentialSimulator
+from collections import namedtuple, deque
+import os
 
 POSITIVE_OUTCOMES = frozenset(
     [
@@ -44,6 +51,127 @@ UNSOLVABLE_OUTCOMES = frozenset(
     ]
 )
 
+STUB_PLANNER_NAME = "test-bfs"
+
+class BreadthFirstPlanner(Engine, OneshotPlannerMixin):
+    '''Breadth first search over the grounded problem, used by the tests instead of an external planner.'''
+    def __init__(self, **options):
+        Engine.__init__(self)
+        OneshotPlannerMixin.__init__(self)
+
+    @property
+    def name(self) -> str:
+        return STUB_PLANNER_NAME
+
+    @staticmethod
+    def supported_kind():
+        return SequentialSimulator.supported_kind()
+
+    @staticmethod
+    def supports(problem_kind):
+        return problem_kind <= BreadthFirstPlanner.supported_kind()
+
+    def _solve(self, problem, callback=None, timeout=None, output_stream=None):
+        grounding = ReachabilityGrounder().compile(problem, CompilationKind.GROUNDING)
+        simulator = SequentialSimulator(grounding.problem)
+        events = [(action, event) for action in grounding.problem.actions for event in simulator.get_events(action, ())]
+        initial_state = simulator.get_initial_state()
+        parents = {initial_state: None}
+        frontier = deque([initial_state])
+        while len(frontier) > 0:
+            state = frontier.popleft()
+            if simulator.is_goal(state):
+                actions = []
+                while parents[state] is not None:
+                    state, action = parents[state]
+                    actions.append(ActionInstance(action))
+                plan = SequentialPlan(actions[::-1]).replace_action_instances(grounding.map_back_action_instance)
+                return PlanGenerationResult(PlanGenerationResultStatus.SOLVED_SATISFICING, plan, self.name)
+            for action, event in events:
+                if simulator.is_applicable(event, state):
+                    successor = simulator.apply_unsafe(event, state)
+                    if successor not in parents:
+                        parents[successor] = (state, action)
+                        frontier.append(successor)
+        return PlanGenerationResult(PlanGenerationResultStatus.UNSOLVABLE_PROVEN, None, self.name)
+
+
+class DyingPlanner(BreadthFirstPlanner):
+    '''A planner that kills the process running it.'''
+    def _solve(self, problem, callback=None, timeout=None, output_stream=None):
+        os._exit(1)
+
+
+def add_stub_planners():
+    '''Adds the stub planners to the global factory, that only uses them when they are asked by name.'''
+    factory = get_env().factory
+    if STUB_PLANNER_NAME not in factory.engines:
+        preference_list = factory.preference_list
+        factory.add_engine(STUB_PLANNER_NAME, __name__, "BreadthFirstPlanner")
+        factory.add_engine("test-dying", __name__, "DyingPlanner")
+        factory.preference_list = preference_list
+
+
+def get_two_agents_grid_problem(agent_names=("a1", "a2")):
+    '''Two agents swap the corners of a 2x2 grid, moving clockwise or counterclockwise.'''
+    problem = MultiAgentProblemWithWaitfor()
+    
+    loc = UserType("loc")
+
+    # Environment     
+    connected = Fluent('connected', BoolType(), l1=loc, l2=loc)        
+    problem.ma_environment.add_fluent(connected, default_initial_value=False)
+
+    free = Fluent('free', BoolType(), l=loc)
+    problem.ma_environment.add_fluent(free, default_initial_value=True)
+
+    nw, ne, sw, se = Object("nw", loc), Object("ne", loc), Object("sw", loc), Object("se", loc)        
+    problem.add_objects([nw, ne, sw, se])
+    problem.set_initial_value(connected(nw, ne), True)
+    problem.set_initial_value(connected(nw, sw), True)
+    problem.set_initial_value(connected(ne, nw), True)
+    problem.set_initial_value(connected(ne, se), True)
+    problem.set_initial_value(connected(sw, se), True)
+    problem.set_initial_value(connected(sw, nw), True)
+    problem.set_initial_value(connected(se, sw), True)
+    problem.set_initial_value(connected(se, ne), True)
+
+
+    at = Fluent('at', BoolType(), l1=loc)
+
+    move = InstantaneousAction('move', l1=loc, l2=loc)
+    l1 = move.parameter('l1')
+    l2 = move.parameter('l2')
+    move.add_precondition(at(l1))
+    move.add_precondition(free(l2))
+    move.add_precondition(connected(l1,l2))
+    move.add_effect(at(l2),True)
+    move.add_effect(free(l2), False)
+    move.add_effect(at(l1), False)
+    move.add_effect(free(l1), True)    
+
+    agent1 = Agent(agent_names[0], problem)
+    problem.add_agent(agent1)
+    agent1.add_fluent(at, default_initial_value=False)
+    agent1.add_action(move)
+    problem.waitfor.annotate_as_waitfor(agent1.name, move.name, free(l2))
+
+    agent2 = Agent(agent_names[1], problem)
+    problem.add_agent(agent2)
+    agent2.add_fluent(at, default_initial_value=False)
+    agent2.add_action(move)
+    problem.waitfor.annotate_as_waitfor(agent2.name, move.name, free(l2))
+
+    problem.set_initial_value(Dot(agent1, at(nw)), True)
+    problem.set_initial_value(Dot(agent2, at(se)), True)
+    problem.set_initial_value(free(nw), False)
+    problem.set_initial_value(free(se), False)
+
+    problem.add_goal(Dot(agent1, at(sw)))
+    problem.add_goal(Dot(agent2, at(ne)))
+    return problem
+
+
 class RobustnessTestCase:
     def __init__(self, name, 
                     expected_outcome : SocialLawRobustnessStatus, 
@@ -70,61 +198,7 @@ class TestProblem(TestCase):
         ]
 
     def test_synthesis(self):
-        problem = MultiAgentProblemWithWaitfor()
-        
-        loc = UserType("loc")
-    
-        # Environment     
-        connected = Fluent('connected', BoolType(), l1=loc, l2=loc)        
-        problem.ma_environment.add_fluent(connected, default_initial_value=False)
-
-        free = Fluent('free', BoolType(), l=loc)
-        problem.ma_environment.add_fluent(free, default_initial_value=True)
-
-        nw, ne, sw, se = Object("nw", loc), Object("ne", loc), Object("sw", loc), Object("se", loc)        
-        problem.add_objects([nw, ne, sw, se])
-        problem.set_initial_value(connected(nw, ne), True)
-        problem.set_initial_value(connected(nw, sw), True)
-        problem.set_initial_value(connected(ne, nw), True)
-        problem.set_initial_value(connected(ne, se), True)
-        problem.set_initial_value(connected(sw, se), True)
-        problem.set_initial_value(connected(sw, nw), True)
-        problem.set_initial_value(connected(se, sw), True)
-        problem.set_initial_value(connected(se, ne), True)
-
-
-        at = Fluent('at', BoolType(), l1=loc)
-
-        move = InstantaneousAction('move', l1=loc, l2=loc)
-        l1 = move.parameter('l1')
-        l2 = move.parameter('l2')
-        move.add_precondition(at(l1))
-        move.add_precondition(free(l2))
-        move.add_precondition(connected(l1,l2))
-        move.add_effect(at(l2),True)
-        move.add_effect(free(l2), False)
-        move.add_effect(at(l1), False)
-        move.add_effect(free(l1), True)    
-
-        agent1 = Agent("a1", problem)
-        problem.add_agent(agent1)
-        agent1.add_fluent(at, default_initial_value=False)
-        agent1.add_action(move)
-        problem.waitfor.annotate_as_waitfor(agent1.name, move.name, free(l2))
-
-        agent2 = Agent("a2", problem)
-        problem.add_agent(agent2)
-        agent2.add_fluent(at, default_initial_value=False)
-        agent2.add_action(move)
-        problem.waitfor.annotate_as_waitfor(agent2.name, move.name, free(l2))
-
-        problem.set_initial_value(Dot(agent1, at(nw)), True)
-        problem.set_initial_value(Dot(agent2, at(se)), True)
-        problem.set_initial_value(free(nw), False)
-        problem.set_initial_value(free(se), False)
-
-        problem.add_goal(Dot(agent1, at(sw)))
-        problem.add_goal(Dot(agent2, at(ne)))
+        problem = get_two_agents_grid_problem()
 
 
         slrc = SocialLawRobustnessChecker(
@@ -235,6 +309,355 @@ class TestProblem(TestCase):
                 self.assertIn(presult.status, POSITIVE_OUTCOMES, t.name)
 
 
+    def test_parallel_synthesis(self):
+        add_stub_planners()
+        problem = get_two_agents_grid_problem()
+        g = SocialLawGenerator(SocialLawGeneratorSearch.GBFS,
+                               heuristic=StatisticsHeuristic(),
+                               preferred_operator_heuristics=[EarlyPOHeuristic(), PublicActionsPOHeuristic()],
+                               max_workers=2,
+                               planner_name=STUB_PLANNER_NAME)
+        sl = g.generate_social_law(problem)
+        self.assertIsNotNone(sl)
+        slrc = SocialLawRobustnessChecker(planner_name=STUB_PLANNER_NAME)
+        self.assertEqual(slrc.is_robust(sl.compile(problem).problem).status, SocialLawRobustnessStatus.ROBUST_RATIONAL)
+
+        # The counterexamples found by the workers are analyzed in the main process
+        results = []
+        for max_workers in [1, 2]:
+            g = SocialLawGenerator(SocialLawGeneratorSearch.GBFS, counterexample_guided=True, max_workers=max_workers, planner_name=STUB_PLANNER_NAME)
+            results.append(g.generate_social_law(problem))
+        self.assertEqual(results[0], results[1])
+
+    def test_incremental_compilation(self):
+        problem = get_intersection_problem(wait_drive=True, durative=False).problem
+        base_sl = SocialLaw()
+        base_sl.disallow_action("car-north", "drive", ("south-ent", "cross-se", "north"))
+        base_result = base_sl.compile(problem)
+        base_problem = base_result.problem
+        base_initial_values = base_problem.explicit_initial_values.copy()
+        base_waitfor_map = {k: v[:] for k, v in base_problem.waitfor.waitfor_map.items()}
+
+        succ_sl = base_sl.clone()
+        succ_sl.disallow_action("car-north", "drive", ("cross-se", "cross-ne", "north"))
+        succ_sl.disallow_action("car-east", "drive", ("west-ent", "cross-sw", "east"))
+        expected = succ_sl.compile(problem).problem
+        result = succ_sl.compile_incremental(problem, base_sl, base_result)
+        succ_problem = result.problem
+
+        self.assertEqual(succ_problem.agents, expected.agents)
+        self.assertEqual(succ_problem.explicit_initial_values, expected.explicit_initial_values)
+        self.assertEqual(succ_problem.waitfor.waitfor_map, expected.waitfor.waitfor_map)
+        self.assertEqual(succ_problem.goals, expected.goals)
+        # Only the agent with a newly disallowed action is copied
+        self.assertIs(succ_problem.agent("car-north"), base_problem.agent("car-north"))
+        self.assertIs(succ_problem.agent("car-south"), base_problem.agent("car-south"))
+        self.assertIsNot(succ_problem.agent("car-east"), base_problem.agent("car-east"))
+        self.assertFalse(base_problem.agent("car-east").has_fluent("allowed__drive"))
+        self.assertEqual(base_problem.explicit_initial_values, base_initial_values)
+        self.assertEqual(base_problem.waitfor.waitfor_map, base_waitfor_map)
+
+        new_to_old = result.map_back_action_instance.keywords["map"]
+        for agent in succ_problem.agents:
+            self.assertEqual(new_to_old[agent.action("drive")][1], problem.agent(agent.name).action("drive"))
+
+        # A social law that changes more than the disallowed actions is compiled from scratch
+        other_sl = succ_sl.clone()
+        other_sl.add_waitfor_annotation("car-east", "drive", "free", ("l2",))
+        other_problem = other_sl.compile_incremental(problem, base_sl, base_result).problem
+        self.assertEqual(other_problem.waitfor.waitfor_map, other_sl.compile(problem).problem.waitfor.waitfor_map)
+
+    def test_robustness_verification_fragments(self):
+        problem = get_intersection_problem(wait_drive=True, durative=False).problem
+        l = SocialLaw()
+        l.disallow_action("car-north", "drive", ("south-ent", "cross-se", "north"))
+        for rbv_class in [SimpleInstantaneousActionRobustnessVerifier, WaitingActionRobustnessVerifier]:
+            rbv = rbv_class()
+            base_result = rbv.compile(problem)
+            num_fragments = len(rbv._fragments)
+            result = rbv.compile(l.compile(problem).problem)
+            expected = rbv_class().compile(l.compile(problem).problem)
+            w, expected_w = PDDLWriter(result.problem), PDDLWriter(expected.problem)
+            self.assertEqual(w.get_domain(), expected_w.get_domain())
+            self.assertEqual(w.get_problem(), expected_w.get_problem())
+            # Only the copies of the actions of car-north, that has the new allowed fluent, are compiled again
+            self.assertEqual(len(rbv._fragments), num_fragments + 2)
+            # The compiled problems do not share their actions with the kept copies
+            name = "s_car-south_drive"
+            base_result.problem.action(name).add_precondition(FALSE())
+            self.assertNotIn(FALSE(), rbv.compile(problem).problem.action(name).preconditions)
+            self.assertNotIn(FALSE(), result.problem.action(name).preconditions)
+
+            small_rbv = rbv_class(max_fragments=2)
+            small_rbv.compile(problem)
+            self.assertEqual(len(small_rbv._fragments), 2)
+
+    def test_delete_decomposition(self):
+        ddv = DeleteDecompositionVerifier()
+        # A single agent can not be disturbed by the others
+        p_single = get_intersection_problem(["car-north"]).problem
+        self.assertTrue(ddv.check_decomposability(p_single))
+        rbv_problem = ddv.compile(p_single).problem
+        self.assertEqual(len(rbv_problem.actions), 0)
+        self.assertEqual(rbv_problem.goals, [FluentExp(rbv_problem.fluent("conflict"))])
+
+        # The cars delete the free locations required by the other cars
+        problem = get_intersection_problem().problem
+        self.assertFalse(ddv.check_decomposability(problem))
+        self.assertEqual(ddv.find_useless_actions(problem), set())
+        expected = SimpleInstantaneousActionRobustnessVerifier().compile(problem).problem
+        self.assertEqual([a.name for a in ddv.compile(problem).problem.actions], [a.name for a in expected.actions])
+
+        l = SocialLaw()
+        l.add_new_fluent(None, "never", (), False)
+        l.add_precondition_to_action("car-north", "drive", "never", ())
+        p_nodrive = l.compile(problem).problem
+        self.assertEqual(ddv.find_useless_actions(p_nodrive), {("car-north", "drive")})
+        action_names = [a.name for a in ddv.compile(p_nodrive).problem.actions]
+        self.assertNotIn("s_car-north_drive", action_names)
+        self.assertIn("s_car-south_drive", action_names)
+
+    def test_grid_problem(self):
+        problem = create_grid_problem(3, 3, 2)
+        self.assertEqual([ag.name for ag in problem.agents], ["robot-0", "robot-1"])
+        self.assertEqual(len(list(problem.objects(problem.user_type("loc")))), 9)
+        self.assertEqual(len(problem.goals), 2)
+        # Each robot can reach its goal alone
+        ddv = DeleteDecompositionVerifier()
+        self.assertEqual(ddv.find_useless_actions(problem), set())
+
+    def test_plan_interleaving(self):
+        routes = {"car-north": ("north", ["south-ent", "cross-se", "cross-ne", "north-ex"]),
+                  "car-south": ("south", ["north-ent", "cross-nw", "cross-sw", "south-ex"]),
+                  "car-west": ("west", ["east-ent", "cross-ne", "cross-nw", "west-ex"]),
+                  "car-east": ("east", ["west-ent", "cross-sw", "cross-se", "east-ex"])}
+        def plans(problem):
+            o = problem.object
+            res = {}
+            for agent in problem.agents:
+                d, route = routes[agent.name]
+                actions = [ActionInstance(agent.action("arrive"), (o(route[0]),))]
+                for l1, l2 in zip(route, route[1:]):
+                    actions.append(ActionInstance(agent.action("drive"), (o(l1), o(l2), o(d))))
+                res[agent] = SequentialPlan(actions)
+            return res
+
+        problem = get_intersection_problem(["car-north", "car-east"], wait_drive=False).problem
+        executor = JointPlanExecutor(problem, plans(problem))
+        result = executor.round_robin()
+        self.assertEqual(result.status, InterleavingStatus.SUCCESS)
+        self.assertEqual([(ai.agent.name, ai.action.name) for ai in result.plan.actions[:4]],
+                         [("car-north", "arrive"), ("car-east", "arrive"), ("car-north", "drive"), ("car-east", "drive")])
+        self.assertEqual(len(result.plan.actions), 8)
+        for r in executor.sample_interleavings(10, seed=0):
+            self.assertEqual(r.status, InterleavingStatus.SUCCESS)
+            self.assertEqual(len(r.plan.actions), 8)
+
+        # All the cars enter the intersection at the same time and block each other
+        problem = get_intersection_problem(wait_drive=False).problem
+        executor = JointPlanExecutor(problem, plans(problem))
+        result = executor.round_robin()
+        self.assertEqual(result.status, InterleavingStatus.DEADLOCK)
+        self.assertEqual(len(result.blocked_agents), 4)
+        self.assertEqual(len(result.plan.actions), 8)
+        # Moving one car at a time avoids the deadlock
+        one_at_a_time = lambda state, position, enabled: max(enabled, key=lambda agent: position[agent.name])
+        self.assertEqual(executor.run(one_at_a_time).status, InterleavingStatus.SUCCESS)
+        self.assertEqual(executor.run(executor.adversarial_scheduler).status, InterleavingStatus.DEADLOCK)
+
+    def test_counterexample_successors(self):
+        problem = get_intersection_problem(["car-north", "car-east"], wait_drive=False).problem
+        rbv_result = SimpleInstantaneousActionRobustnessVerifier().compile(problem)
+        rbv_problem = rbv_result.problem
+        o = problem.object
+        # car-north enters cross-se right before car-east tries to, and car-east crashes
+        counter_example = SequentialPlan([
+            ActionInstance(rbv_problem.action("s_car-north_arrive"), (o("south-ent"),)),
+            ActionInstance(rbv_problem.action("s_car-east_arrive"), (o("west-ent"),)),
+            ActionInstance(rbv_problem.action("s_car-east_drive"), (o("west-ent"), o("cross-sw"), o("east"))),
+            ActionInstance(rbv_problem.action("s_car-north_drive"), (o("south-ent"), o("cross-se"), o("north"))),
+            ActionInstance(rbv_problem.action("f1_car-east_drive"), (o("cross-sw"), o("cross-se"), o("east"))),
+            ActionInstance(rbv_problem.action("pc_car-north_drive"), (o("cross-se"), o("cross-ne"), o("north"))),
+        ])
+        orig_actions = counter_example.replace_action_instances(rbv_result.map_back_action_instance)
+        self.assertEqual([ai.agent.name for ai in orig_actions.actions], ["car-north", "car-east", "car-east", "car-north", "car-east", "car-north"])
+        g = SocialLawGenerator(counterexample_guided=True, batch_size=2)
+        edits = g.find_counterexample_edits(problem, counter_example, orig_actions)
+        self.assertEqual(edits, [("disallow", "car-north", "drive", ("south-ent", "cross-se", "north")),
+                                 ("waitfor", "car-east", "drive", "free", ("l2",)),
+                                 ("disallow", "car-east", "drive", ("west-ent", "cross-sw", "east")),
+                                 ("disallow", "car-east", "arrive", ("west-ent",)),
+                                 ("disallow", "car-north", "arrive", ("south-ent",))])
+
+        successors = g.generate_counterexample_successors(SocialLaw(), problem, counter_example, orig_actions)
+        self.assertEqual(len(successors), len(edits) + 1)
+        self.assertEqual(successors[0].disallowed_actions, {("car-north", "drive", ("south-ent", "cross-se", "north"))})
+        self.assertEqual(successors[0].added_waitfors, {("car-east", "drive", "free", ("l2",))})
+        self.assertEqual(successors[2].added_waitfors, {("car-east", "drive", "free", ("l2",))})
+        self.assertEqual(len(successors[2].disallowed_actions), 0)
+        self.assertEqual(len(successors[2].compile(problem).problem.waitfor.get_preconditions_wait("car-east", "drive")), 1)
+
+        # The agents are found also when their names contain the separator of the compiled actions names
+        add_stub_planners()
+        problem = get_two_agents_grid_problem(("agent_1", "agent_2"))
+        rbv_result = SimpleInstantaneousActionRobustnessVerifier().compile(problem)
+        with OneshotPlanner(name=STUB_PLANNER_NAME) as planner:
+            counter_example = planner.solve(rbv_result.problem).plan
+        self.assertIsNotNone(counter_example)
+        orig_actions = counter_example.replace_action_instances(rbv_result.map_back_action_instance)
+        self.assertEqual(set(ai.agent.name for ai in orig_actions.actions), {"agent_1", "agent_2"})
+        edits = g.find_counterexample_edits(problem, counter_example, orig_actions)
+        self.assertGreater(len(edits), 0)
+        for edit in edits:
+            self.assertIn(edit[1], ["agent_1", "agent_2"])
+
+    def test_subsumption_index(self):
+        def social_law(disallowed, waitfors=(), initial_values=()):
+            l = SocialLaw()
+            l.add_new_fluent(None, "yieldsto", (("l1", "loc"), ("l2", "loc")), False)
+            for args in disallowed:
+                l.disallow_action("car-north", "drive", args)
+            for args in waitfors:
+                l.add_waitfor_annotation("car-north", "drive", "free", args)
+            for args in initial_values:
+                l.set_initial_value_for_new_fluent(None, "yieldsto", args, True)
+            return l
+
+        index = SocialLawSubsumptionIndex()
+        self.assertIsNone(index.find_subsumed(SocialLaw()))
+        infeasible = [social_law([("a",), ("b",)]), social_law([("c",)], [("l2",)]), social_law([("d",)], initial_values=[("x", "y")])]
+        for l in infeasible:
+            index.add(l)
+        index.add(infeasible[0].clone())
+        self.assertEqual(len(index), 3)
+
+        candidates = [social_law([]), social_law([("a",)]), social_law([("b",), ("a",), ("e",)]),
+                      social_law([("c",), ("a",)]), social_law([("c",), ("a",)], [("l2",)]),
+                      social_law([("d",)]), social_law([("d",), ("a",)], initial_values=[("x", "y")]),
+                      social_law([("a",), ("b",)], initial_values=[("x", "y")])]
+        for l in candidates:
+            expected = any(l.is_stricter_than(i) for i in infeasible)
+            found = index.find_subsumed(l)
+            self.assertEqual(found is not None, expected, str(l))
+            if found is not None:
+                self.assertTrue(l.is_stricter_than(found))
+
+    def test_projection_cache(self):
+        problem = MultiAgentProblemWithWaitfor()
+        loc = UserType("loc")
+        connected = Fluent('connected', BoolType(), l1=loc, l2=loc)
+        problem.ma_environment.add_fluent(connected, default_initial_value=False)
+        nw, ne, sw = Object("nw", loc), Object("ne", loc), Object("sw", loc)
+        problem.add_objects([nw, ne, sw])
+        for l1, l2 in [(nw, ne), (ne, nw), (nw, sw), (sw, nw)]:
+            problem.set_initial_value(connected(l1, l2), True)
+        at = Fluent('at', BoolType(), l1=loc)
+        move = InstantaneousAction('move', l1=loc, l2=loc)
+        l1 = move.parameter('l1')
+        l2 = move.parameter('l2')
+        move.add_precondition(at(l1))
+        move.add_precondition(connected(l1, l2))
+        move.add_effect(at(l2), True)
+        move.add_effect(at(l1), False)
+        for name, start, goal in [("a1", nw, sw), ("a2", ne, nw)]:
+            agent = Agent(name, problem)
+            problem.add_agent(agent)
+            agent.add_fluent(at, default_initial_value=False)
+            agent.add_action(move)
+            problem.set_initial_value(Dot(agent, at(start)), True)
+            problem.add_goal(Dot(agent, at(goal)))
+
+        def projection(social_law, agent_name):
+            sl_problem = social_law.compile(problem).problem
+            return SingleAgentProjection(sl_problem.agent(agent_name)).compile(sl_problem).problem
+
+        cache = SingleAgentProjectionCache()
+        p_a1 = projection(SocialLaw(), "a1")
+        self.assertIsNone(cache.lookup("a1", p_a1))
+        cache.add("a1", p_a1, SequentialPlan([ActionInstance(p_a1.action("move"), (ObjectExp(nw), ObjectExp(sw)))]))
+
+        # Restricting another agent does not change the projection of a1
+        l = SocialLaw()
+        l.disallow_action("a2", "move", ("ne", "nw"))
+        solvable, plan = cache.lookup("a1", projection(l, "a1"))
+        self.assertTrue(solvable)
+        self.assertEqual((cache.hits, cache.reused_plans), (1, 0))
+
+        # The cached plan does not use the disallowed action, so it is reused
+        l.disallow_action("a1", "move", ("nw", "ne"))
+        p_a1 = projection(l, "a1")
+        solvable, plan = cache.lookup("a1", p_a1)
+        self.assertTrue(solvable)
+        self.assertEqual(plan.actions[0].action, p_a1.action("move"))
+        self.assertEqual((cache.hits, cache.reused_plans), (1, 1))
+
+        l.disallow_action("a1", "move", ("nw", "sw"))
+        p_a1 = projection(l, "a1")
+        self.assertIsNone(cache.lookup("a1", p_a1))
+        cache.add("a1", p_a1, None)
+        self.assertEqual(cache.lookup("a1", p_a1), (False, None))
+        self.assertEqual(len(cache), 3)
+
+        # A plan of an action with the same name but a different signature is not reused
+        other_move = InstantaneousAction('move', l1=loc)
+        other_cache = SingleAgentProjectionCache()
+        other_cache.add("a1", p_a1, SequentialPlan([ActionInstance(other_move, (ObjectExp(nw),))]))
+        self.assertIsNone(other_cache.lookup("a1", projection(SocialLaw(), "a1")))
+        # Even for the same projection, a cached plan that can not be adapted is a miss
+        self.assertIsNone(other_cache.lookup("a1", p_a1))
+        self.assertEqual(other_cache.hits, 0)
+
+        # The results and the plans kept for reuse are bounded
+        bounded_cache = SingleAgentProjectionCache(max_results=2, max_plans=1)
+        l = SocialLaw()
+        projections = []
+        for args in [("nw", "ne"), ("ne", "nw"), ("nw", "sw")]:
+            l.disallow_action("a1", "move", args)
+            projections.append(projection(l, "a1"))
+            bounded_cache.add("a1", projections[-1], None)
+        self.assertEqual(len(bounded_cache), 2)
+        self.assertIsNone(bounded_cache.lookup("a1", projections[0]))
+        self.assertEqual(bounded_cache.lookup("a1", projections[2]), (False, None))
+        p_a1 = projection(SocialLaw(), "a1")
+        for _ in range(2):
+            bounded_cache.add("a1", p_a1, SequentialPlan([ActionInstance(p_a1.action("move"), (ObjectExp(nw), ObjectExp(sw)))]))
+        self.assertEqual(len(bounded_cache._plans["a1"]), 1)
+
+        # A cached unsolvable projection is not solved again
+        add_stub_planners()
+        slrc = SocialLawRobustnessChecker(planner_name=STUB_PLANNER_NAME)
+        slrc.projection_cache.add("a1", projection(SocialLaw(), "a1"), None)
+        self.assertEqual(slrc._solve(problem).status, PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY)
+
+    def test_concurrent_single_agent_solvability(self):
+        add_stub_planners()
+        with SocialLawRobustnessChecker(planner_name=STUB_PLANNER_NAME, max_workers=2, cache_projections=False) as concurrent_slrc:
+            for t in self.test_cases:
+                problem = get_intersection_problem(t.cars, t.yields_list, t.wait_drive, durative=False).problem
+                slrc = SocialLawRobustnessChecker(planner_name=STUB_PLANNER_NAME)
+                self.assertTrue(concurrent_slrc.is_single_agent_solvable(problem, timeout=60), t.name)
+                self.assertTrue(slrc.is_single_agent_solvable(problem), t.name)
+
+        # A projection made unsolvable is detected by both
+        l = SocialLaw()
+        l.disallow_action("car-south", "arrive", ("north-ent",))
+        problem = l.compile(get_intersection_problem(wait_drive=False).problem).problem
+        with SocialLawRobustnessChecker(planner_name=STUB_PLANNER_NAME, max_workers=2, cache_projections=False) as concurrent_slrc:
+            self.assertFalse(SocialLawRobustnessChecker(planner_name=STUB_PLANNER_NAME).is_single_agent_solvable(problem))
+            self.assertFalse(concurrent_slrc.is_single_agent_solvable(problem))
+            self.assertEqual(concurrent_slrc.is_robust(problem).status, SocialLawRobustnessStatus.NON_ROBUST_SINGLE_AGENT)
+
+            # When the budget is over the solvability is unknown, not false
+            problem = get_intersection_problem(wait_drive=False).problem
+            self.assertIsNone(concurrent_slrc.is_single_agent_solvable(problem, timeout=0))
+            self.assertIsNone(SocialLawRobustnessChecker(planner_name=STUB_PLANNER_NAME, cache_projections=False).is_single_agent_solvable(problem, timeout=0))
+
+        # A crashed worker is an error, not an unsolvable projection
+        with SocialLawRobustnessChecker(planner_name="test-dying", max_workers=2, cache_projections=False) as dying_slrc:
+            with self.assertRaises(up.exceptions.UPException):
+                dying_slrc.is_single_agent_solvable(problem)
+
+
     def test_centralizer(self):
         for t in self.test_cases:
             for durative in [False]:# True]:
@@ -245,7 +668,84 @@ class TestProblem(TestCase):
                     presult = planner.solve(cresult.problem)
                     self.assertIn(presult.status, POSITIVE_OUTCOMES, t.name)
 
-        
+    def test_incremental_centralization(self):
+        problem = get_intersection_problem(wait_drive=False).problem
+        l = SocialLaw()
+        l.disallow_action("car-north", "drive", ("south-ent", "cross-se", "north"))
+        l_problem = l.compile(problem).problem
+        mac = MultiAgentProblemCentralizer()
+        mac.compile(problem)
+        num_fragments = len(mac._fragments)
+        cproblem = mac.compile(l_problem).problem
+        # Only the actions of the agent changed by the social law are centralized again
+        self.assertEqual(len(mac._fragments), num_fragments + 1)
+        fresh_cproblem = MultiAgentProblemCentralizer().compile(l_problem).problem
+        w, fresh_w = PDDLWriter(cproblem), PDDLWriter(fresh_cproblem)
+        self.assertEqual(w.get_domain(), fresh_w.get_domain())
+        self.assertEqual(w.get_problem(), fresh_w.get_problem())
+        # The centralized problems do not share their actions with the kept copies
+        cproblem.actions[0].add_precondition(FALSE())
+        self.assertIsNot(mac.compile(l_problem).problem.actions[0], cproblem.actions[0])
+        self.assertNotIn(FALSE(), mac.compile(l_problem).problem.actions[0].preconditions)
+
+        small_mac = MultiAgentProblemCentralizer(max_fragments=1, max_environments=1)
+        small_mac.compile(problem)
+        self.assertEqual(len(small_mac._fragments), 1)
+        env = up.environment.Environment()
+        other_problem = MultiAgentProblem("other", env)
+        agent = Agent("agent", other_problem)
+        f = Fluent("f", env=env)
+        agent.add_fluent(f, default_initial_value=False)
+        a = InstantaneousAction("a", _env=env)
+        a.add_effect(f, True)
+        agent.add_action(a)
+        other_problem.add_agent(agent)
+        other_problem.add_goal(env.expression_manager.Dot(agent, env.expression_manager.FluentExp(f)))
+        self.assertEqual(small_mac.compile(other_problem).problem.env, env)
+        self.assertEqual(list(small_mac._renamings), [other_problem.env])
+        self.assertTrue(all(key[0] is other_problem.env for key in small_mac._fragments))
+
+    def test_centralizer_effects(self):
+        # The problem has its own environment, as the simulated effect can not be pickled with the global one
+        env = up.environment.Environment()
+        em = env.expression_manager
+        problem = MultiAgentProblem("effects", env)
+        count = Fluent("count", env.type_manager.IntType(0, 10), env=env)
+        problem.ma_environment.add_fluent(count, default_initial_value=0)
+        ready = Fluent("ready", env=env)
+        done = Fluent("done", env=env)
+        step = InstantaneousAction("step", _env=env)
+        step.add_effect(done, True, ready)
+        step.add_increase_effect(count, 1)
+        agent = Agent("robot", problem)
+        agent.add_fluent(ready, default_initial_value=True)
+        agent.add_fluent(done, default_initial_value=False)
+        agent.add_action(step)
+        problem.add_agent(agent)
+        problem.add_goal(em.Dot(agent, em.FluentExp(done)))
+
+        mac = MultiAgentProblemCentralizer()
+        result = mac.compile(problem)
+        cproblem = result.problem
+        renaming = mac.get_renaming(env)
+        # The centralized actions are mapped back to the actions of their agents
+        orig = result.map_back_action_instance(ActionInstance(cproblem.action("robot__step")))
+        self.assertEqual((orig.agent, orig.action), (agent, step))
+        conditional, increase = cproblem.action("robot__step").effects
+        # The conditions and the kinds of the effects are kept, with the fluents of the agent renamed
+        self.assertEqual(conditional.condition, em.FluentExp(renaming.centralized_fluent(agent, ready)))
+        self.assertEqual(conditional.fluent, em.FluentExp(renaming.centralized_fluent(agent, done)))
+        self.assertTrue(increase.is_increase())
+        self.assertEqual(increase.fluent, em.FluentExp(renaming.centralized_fluent(None, count)))
+
+        # The simulated effects can not be centralized
+        simulated = InstantaneousAction("simulated", _env=env)
+        simulated.set_simulated_effect(SimulatedEffect([em.FluentExp(done)], lambda problem, state, parameters: [em.TRUE()]))
+        agent.add_action(simulated)
+        with self.assertRaises(up.exceptions.UPProblemDefinitionError):
+            mac.compile(problem)
+
+
     def test_all_cases_durative(self):
         for t in self.test_cases:
             problem = get_intersection_problem(t.cars, t.yields_list, t.wait_drive, durative=True).problem